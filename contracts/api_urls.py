@@ -151,6 +151,12 @@ urlpatterns = [
         api_views.BiometricAuthenticationStatusAPIView.as_view(),
         name="api_biometric_auth_status",
     ),
+    # Resultado de un paso biométrico encolado (face/document con async=true)
+    path(
+        "biometric-analyses/<uuid:analysis_id>/",
+        api_views.BiometricAnalysisStatusAPIView.as_view(),
+        name="api_biometric_analysis_status",
+    ),
     # ===================================================================
     # SISTEMA DE WORKFLOW DE MATCHES APROBADOS (NUEVO)
     # ===================================================================
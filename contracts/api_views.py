@@ -3,6 +3,7 @@ Vistas de API REST para la aplicación de contratos de VeriHome.
 OPTIMIZED with performance monitoring and intelligent caching.
 """
 
+import logging
 from rest_framework import viewsets, generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -43,6 +44,9 @@ from .serializers import (
 )
 from users.services import AdminActionLogger
 from matching.models import MatchRequest
+from .biometric_worker import BiometricQueueFull
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
@@ -351,8 +355,8 @@ class SignContractAPIView(APIView):
 
             # Logging automático
             if hasattr(request, "impersonation_session"):
-                logger = AdminActionLogger(request.impersonation_session)
-                logger.log_action(
+                action_logger = AdminActionLogger(request.impersonation_session)
+                action_logger.log_action(
                     action_type="contract_sign",
                     description=f"Firma digital de contrato {contract.title} con nivel {verification_level}",
                     target_object=contract,
@@ -385,10 +389,7 @@ class SignContractAPIView(APIView):
             )
 
         except Exception as e:
-            import traceback
-
-            print(f"Error en firma de contrato: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception(f"Error en firma de contrato: {str(e)}")
             return Response(
                 {"detail": f"Error al firmar el contrato: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -846,7 +847,7 @@ class DigitalSignatureAPIView(APIView):
             signature.signature_image.save(filename, data, save=True)
 
         except Exception as e:
-            print(f"Error saving signature image: {e}")
+            logger.error(f"Error saving signature image: {e}")
 
     def update_contract_status(self, contract):
         """Actualiza el estado del contrato después de la firma."""
@@ -878,8 +879,10 @@ class DigitalSignatureAPIView(APIView):
         """Envía notificaciones de firma."""
         # Implementar sistema de notificaciones
         # Por ahora solo logging
-        print(
-            f"Signature notification: Contract {contract.contract_number} signed by {signature.signer.get_full_name()}"
+        logger.debug(
+            "Signature notification: Contract %s signed by %s",
+            contract.contract_number,
+            signature.signer.get_full_name(),
         )
 
 
@@ -1044,7 +1047,7 @@ class ContractPreviewPDFAPIView(APIView):
                     if match_request and match_request.tenant:
                         allowed_users.append(match_request.tenant)
                 except Exception as e:
-                    print(f"⚠️ Error buscando match_request: {e}")
+                    logger.warning(f"⚠️ Error buscando match_request: {e}")
 
                 if request.user not in allowed_users:
                     return Response(
@@ -1172,7 +1175,7 @@ class ContractAdditionalClausesAPIView(APIView):
                 order=next_number,
             )
 
-            print(
+            logger.info(
                 f"✅ Cláusula adicional creada: {clause.ordinal_text}. {clause.title}"
             )
 
@@ -1271,7 +1274,9 @@ class ContractAdditionalClausesAPIView(APIView):
                         to_state=lcc.current_state,
                     )
 
-            print(f"✅ Cláusula actualizada: {clause.ordinal_text}. {clause.title}")
+            logger.info(
+                f"✅ Cláusula actualizada: {clause.ordinal_text}. {clause.title}"
+            )
 
             return Response(
                 {
@@ -1317,7 +1322,7 @@ class ContractAdditionalClausesAPIView(APIView):
             clause.is_active = False
             clause.save()
 
-            print(f"✅ Cláusula eliminada: {clause.ordinal_text}. {clause.title}")
+            logger.info(f"✅ Cláusula eliminada: {clause.ordinal_text}. {clause.title}")
 
             return Response(
                 {"success": True, "message": "Cláusula eliminada exitosamente"}
@@ -1531,7 +1536,7 @@ class StartBiometricAuthenticationAPIView(APIView):
             contract = None
             try:
                 contract = LandlordControlledContract.objects.get(id=contract_id)
-                print(
+                logger.info(
                     f"✅ Contrato encontrado en LandlordControlledContract: {contract.contract_number}"
                 )
             except LandlordControlledContract.DoesNotExist:
@@ -1548,7 +1553,7 @@ class StartBiometricAuthenticationAPIView(APIView):
                         "pending_landlord_biometric",
                     ],
                 )
-                print(
+                logger.info(
                     f"✅ Contrato encontrado en Contract (viejo): {contract.contract_number}"
                 )
 
@@ -1610,8 +1615,10 @@ class StartBiometricAuthenticationAPIView(APIView):
 
                 workflow_status = match_request.workflow_status
 
-                print(
-                    f"🔐 Turn validation - User: {user_type}, Workflow status: {workflow_status}"
+                logger.debug(
+                    "🔐 Turn validation - User: %s, Workflow status: %s",
+                    user_type,
+                    workflow_status,
                 )
 
                 # Validación de turno: Flujo secuencial Tenant → Garante → Landlord
@@ -1689,7 +1696,7 @@ class StartBiometricAuthenticationAPIView(APIView):
                 # Es un LandlordControlledContract, obtener el Contract sincronizado
                 try:
                     contract_for_biometric = Contract.objects.get(id=contract.id)
-                    print(
+                    logger.info(
                         f"✅ Usando Contract sincronizado para biométrico: {contract_for_biometric.contract_number}"
                     )
                 except Contract.DoesNotExist:
@@ -1755,6 +1762,38 @@ class StartBiometricAuthenticationAPIView(APIView):
             )
 
 
+def _wants_async(request) -> bool:
+    """`async=true` (body o query) pide encolar el paso biométrico."""
+    value = request.data.get("async", request.query_params.get("async"))
+    return str(value).lower() in {"1", "true", "yes"}
+
+
+def _queue_biometric_step(request, method, *args):
+    """Encola un paso del flujo biométrico y responde 202 con su id."""
+    from .biometric_worker import submit_service_operation
+
+    analysis_id = submit_service_operation(method, *args, owner_id=str(request.user.id))
+    return Response(
+        {
+            "analysis_id": analysis_id,
+            "status": "pending",
+            "status_url": f"/api/v1/contracts/biometric-analyses/{analysis_id}/",
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+def _biometric_queue_full_response(exc):
+    return Response(
+        {
+            "error": "Verificación biométrica saturada, reintenta en unos segundos",
+            "detail": str(exc),
+        },
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "5"},
+    )
+
+
 class FaceCaptureAPIView(APIView):
     """Vista para capturar fotos faciales (frontal y lateral)."""
 
@@ -1785,6 +1824,15 @@ class FaceCaptureAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            if _wants_async(request):
+                return _queue_biometric_step(
+                    request,
+                    "process_face_capture",
+                    str(auth.id),
+                    face_front_data,
+                    face_side_data,
+                )
+
             # Procesar capturas faciales
             result = biometric_service.process_face_capture(
                 str(auth.id), face_front_data, face_side_data
@@ -1797,6 +1845,8 @@ class FaceCaptureAPIView(APIView):
                 {"error": "Autenticación biométrica no encontrada o expirada"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        except BiometricQueueFull as exc:
+            return _biometric_queue_full_response(exc)
         except Exception as e:
             return Response(
                 {"error": f"Error procesando capturas faciales: {str(e)}"},
@@ -1831,6 +1881,16 @@ class DocumentCaptureAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            if _wants_async(request):
+                return _queue_biometric_step(
+                    request,
+                    "process_document_verification",
+                    str(auth.id),
+                    document_image_data,
+                    document_type,
+                    document_number,
+                )
+
             # Procesar documento
             result = biometric_service.process_document_verification(
                 str(auth.id), document_image_data, document_type, document_number
@@ -1843,6 +1903,8 @@ class DocumentCaptureAPIView(APIView):
                 {"error": "Autenticación biométrica no encontrada"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        except BiometricQueueFull as exc:
+            return _biometric_queue_full_response(exc)
         except Exception as e:
             return Response(
                 {"error": f"Error procesando documento: {str(e)}"},
@@ -1887,6 +1949,8 @@ class CombinedCaptureAPIView(APIView):
                 {"error": "Autenticación biométrica no encontrada"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        except BiometricQueueFull as exc:
+            return _biometric_queue_full_response(exc)
         except Exception as e:
             return Response(
                 {"error": f"Error procesando imagen combinada: {str(e)}"},
@@ -1986,7 +2050,7 @@ class CompleteAuthenticationAPIView(APIView):
 
             # 🔧 CRÍTICO: Procesar los datos biométricos enviados desde el frontend
             data = request.data
-            print(f"📦 Datos recibidos en complete-auth: {data.keys()}")
+            logger.debug("📦 Datos recibidos en complete-auth: %s", data.keys())
 
             # Los datos vienen con IDs de pasos: face_capture, document_verification, voice_recording, digital_signature
             # Necesitamos mapearlos a los campos del modelo
@@ -2063,12 +2127,12 @@ class CompleteAuthenticationAPIView(APIView):
 
             # Guardar los datos actualizados
             auth.save()
-            print(f"✅ Datos biométricos guardados en auth {auth.id}")
+            logger.info(f"✅ Datos biométricos guardados en auth {auth.id}")
 
             # 🔧 CRÍTICO: Calcular overall_confidence_score ANTES de completar
             auth.calculate_overall_confidence()
             auth.save()
-            print(
+            logger.info(
                 f"✅ overall_confidence_score calculado: {auth.overall_confidence_score}"
             )
 
@@ -2086,8 +2150,7 @@ class CompleteAuthenticationAPIView(APIView):
             import traceback
 
             error_traceback = traceback.format_exc()
-            print("❌ ERROR COMPLETO en complete-auth:")
-            print(error_traceback)
+            logger.exception("❌ ERROR COMPLETO en complete-auth")
             return Response(
                 {
                     "error": f"Error completando autenticación: {str(e)}",
@@ -2148,6 +2211,35 @@ class BiometricAuthenticationStatusAPIView(APIView):
             )
 
 
+class BiometricAnalysisStatusAPIView(APIView):
+    """Polling del resultado de un paso biométrico encolado (`async=true`)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, analysis_id):
+        from .biometric_worker import STATUS_DONE, STATUS_FAILED, get_analysis
+
+        record = get_analysis(str(analysis_id))
+        # Sólo quien encoló el paso puede consultarlo.
+        if not record or record.get("owner_id") != str(request.user.id):
+            return Response(
+                {"error": "Análisis no encontrado o expirado"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        payload = {
+            "analysis_id": record["analysis_id"],
+            "status": record["status"],
+            "submitted_at": record.get("submitted_at"),
+            "finished_at": record.get("finished_at"),
+        }
+        if record["status"] == STATUS_DONE:
+            payload["result"] = record.get("result")
+        elif record["status"] == STATUS_FAILED:
+            payload["error"] = record.get("error")
+        return Response(payload)
+
+
 class TenantProcessesAPIView(generics.ListAPIView):
     """Vista para que los inquilinos vean sus procesos de arrendamiento en curso."""
 
@@ -2159,8 +2251,11 @@ class TenantProcessesAPIView(generics.ListAPIView):
             from matching.models import MatchRequest
 
             # Debug info del usuario actual
-            print(
-                f"🔍 TenantProcesses - User: {request.user.email}, Type: {request.user.user_type}, ID: {request.user.id}"
+            logger.debug(
+                "🔍 TenantProcesses - User: %s, Type: %s, ID: %s",
+                request.user.email,
+                request.user.user_type,
+                request.user.id,
             )
 
             # Expandir tipos de usuario permitidos - incluir cualquier usuario que pueda ser arrendatario
@@ -2199,7 +2294,7 @@ class TenantProcessesAPIView(generics.ListAPIView):
                 ]
 
                 # Intentar con campo 'tenant' primero
-                match_requests = (
+                match_requests = list(
                     MatchRequest.objects.filter(
                         tenant=request.user, status__in=workflow_statuses
                     )
@@ -2207,21 +2302,28 @@ class TenantProcessesAPIView(generics.ListAPIView):
                     .order_by("-created_at")
                 )
 
-                print(
-                    f"🔍 Found {match_requests.count()} workflow MatchRequests for user {request.user.email}"
+                logger.debug(
+                    "🔍 Found %s workflow MatchRequests for user %s",
+                    len(match_requests),
+                    request.user.email,
                 )
 
                 for match_obj in match_requests:
-                    print(
-                        f"  - MatchRequest {match_obj.id}: Stage {match_obj.workflow_stage}, Status {match_obj.workflow_status}"
+                    logger.debug(
+                        "  - MatchRequest %s: Stage %s, Status %s",
+                        match_obj.id,
+                        match_obj.workflow_stage,
+                        match_obj.workflow_status,
                     )
                     processes.append(self._format_match_request(match_obj))
 
             except Exception as e:
-                print(f"Error fetching MatchRequest: {e}")
+                logger.error(f"Error fetching MatchRequest: {e}")
 
-            print(
-                f"🔍 TenantProcesses: Found {len(processes)} processes for user {request.user}"
+            logger.debug(
+                "🔍 TenantProcesses: Found %s processes for user %s",
+                len(processes),
+                request.user,
             )
 
             return Response({"results": processes, "count": len(processes)})
@@ -2239,10 +2341,13 @@ class TenantProcessesAPIView(generics.ListAPIView):
         status_key = getattr(match_obj, "workflow_status", "pending")
         workflow_db_data = getattr(match_obj, "workflow_data", {})
 
-        print(
-            f"🔍 TENANT VIEW - MatchRequest {match_obj.id}: Stage={current_stage}, Status={status_key}"
+        logger.debug(
+            "🔍 TENANT VIEW - MatchRequest %s: Stage=%s, Status=%s",
+            match_obj.id,
+            current_stage,
+            status_key,
         )
-        print(f"🔍 TENANT VIEW - workflow_data from DB: {workflow_db_data}")
+        logger.debug("🔍 TENANT VIEW - workflow_data from DB: %s", workflow_db_data)
 
         # Usar datos reales del workflow o valores por defecto
         workflow_data = workflow_db_data if workflow_db_data else {}
@@ -2332,15 +2437,17 @@ class MatchedCandidatesAPIView(APIView):
                     .order_by("-created_at")
                 )
                 matches.extend(match_requests)
-                print(
-                    f"🔍 Found {len(match_requests)} MatchRequest matches for user {request.user}"
+                logger.debug(
+                    "🔍 Found %s MatchRequest matches for user %s",
+                    len(match_requests),
+                    request.user,
                 )
             except Exception as e:
-                print(f"❌ Error fetching MatchRequest: {e}")
+                logger.error(f"❌ Error fetching MatchRequest: {e}")
 
             # CONSOLIDATED: Using only MatchRequest as single source of truth
 
-            print(f"🔍 Total matches found: {len(matches)}")
+            logger.debug("🔍 Total matches found: %s", len(matches))
 
             # 🔧 SERIALIZAR DATOS - Solo MatchRequest con datos reales del workflow
             candidates_data = []
@@ -2349,8 +2456,12 @@ class MatchedCandidatesAPIView(APIView):
                 workflow_stage = getattr(match, "workflow_stage", 1)
                 workflow_status = getattr(match, "workflow_status", "pending")
                 workflow_data = getattr(match, "workflow_data", {})
-                print(
-                    f"📊 MatchRequest {match.id}: Stage={workflow_stage}, Status={workflow_status}, Data={workflow_data}"
+                logger.debug(
+                    "📊 MatchRequest %s: Stage=%s, Status=%s, Data=%s",
+                    match.id,
+                    workflow_stage,
+                    workflow_status,
+                    workflow_data,
                 )
 
                 # ✅ Simplificado: Solo MatchRequest
@@ -2424,11 +2535,14 @@ class MatchedCandidatesAPIView(APIView):
                         if "contract_created" not in workflow_data:
                             workflow_data["contract_created"] = contract_info
 
-                        print(
-                            f"📄 Contract found for match {match.id}: {existing_contract.id}, biometric_state: {biometric_state}"
+                        logger.debug(
+                            "📄 Contract found for match %s: %s, biometric_state: %s",
+                            match.id,
+                            existing_contract.id,
+                            biometric_state,
                         )
                 except Exception as e:
-                    print(f"❌ Error checking contract: {e}")
+                    logger.error(f"❌ Error checking contract: {e}")
 
                 candidate_data = {
                     "id": str(match.id),
@@ -2592,7 +2706,7 @@ C.C.                                    C.C.
                     landlord=request.user,
                     # REMOVED: status='accepted' - Allow any status as workflow progresses
                 )
-                print(f"🎯 Found MatchRequest: {match_request.id}")
+                logger.debug("🎯 Found MatchRequest: %s", match_request.id)
             except MatchRequest.DoesNotExist:
                 return Response(
                     {"error": "Match request no encontrado o no tienes permisos"},
@@ -2721,9 +2835,9 @@ www.verihome.com | soporte@verihome.com
                         recipient_list=[tenant.email],
                         fail_silently=False,
                     )
-                    print(f"✅ Email de visita enviado a {tenant.email}")
+                    logger.info(f"✅ Email de visita enviado a {tenant.email}")
                 except Exception as e:
-                    print(f"❌ Error enviando email: {str(e)}")
+                    logger.error(f"❌ Error enviando email: {str(e)}")
 
                 # 3. CREAR NOTIFICACIÓN INTERNA PARA EL EQUIPO VERIHOME
                 # (Esto se puede expandir para crear tickets internos)
@@ -2784,7 +2898,7 @@ www.verihome.com | soporte@verihome.com
                     }
                 )
                 match_request.save()
-                print(
+                logger.info(
                     f"✅ MatchRequest {match_request.id} updated - Stage: {match_request.workflow_stage}, Status: {match_request.workflow_status}"
                 )
 
@@ -2812,7 +2926,7 @@ www.verihome.com | soporte@verihome.com
                     timezone.now().isoformat()
                 )
                 match_request.save()
-                print(
+                logger.info(
                     f"🚀 VISIT COMPLETED - MatchRequest {match_request.id} updated - Stage: {match_request.workflow_stage}, Status: {match_request.workflow_status}"
                 )
 
@@ -2851,8 +2965,11 @@ www.verihome.com | soporte@verihome.com
                     }
                 )
                 match_request.save()
-                print(
-                    f"📄 DOCUMENTS REQUESTED - MatchRequest {match_request.id} updated - Stage: {match_request.workflow_stage}, Status: {match_request.workflow_status}"
+                logger.debug(
+                    "📄 DOCUMENTS REQUESTED - MatchRequest %s updated - Stage: %s, Status: %s",
+                    match_request.id,
+                    match_request.workflow_stage,
+                    match_request.workflow_status,
                 )
 
                 # 🔄 SINCRONIZACIÓN CRÍTICA: Actualizar MatchRequest correspondiente
@@ -2866,15 +2983,15 @@ www.verihome.com | soporte@verihome.com
                         property_request.workflow_status = "documents_pending"
                         property_request.workflow_data = match_request.workflow_data
                         property_request.save()
-                        print(
+                        logger.info(
                             f"✅ SYNC SUCCESS - MatchRequest {property_request.id} synced to stage 2"
                         )
                     else:
-                        print(
+                        logger.warning(
                             f"⚠️ SYNC WARNING - No MatchRequest found for tenant {tenant.id} and property {match_request.property.id}"
                         )
                 except Exception as sync_error:
-                    print(f"❌ SYNC ERROR: {sync_error}")
+                    logger.error(f"❌ SYNC ERROR: {sync_error}")
 
                 from users.models import UserActivityLog
 
@@ -2909,7 +3026,7 @@ www.verihome.com | soporte@verihome.com
                     }
                 )
                 match_request.save()
-                print(
+                logger.info(
                     f"✅ DOCUMENTS APPROVED - MatchRequest {match_request.id} updated - Stage: {match_request.workflow_stage}, Status: {match_request.workflow_status}"
                 )
 
@@ -2919,8 +3036,9 @@ www.verihome.com | soporte@verihome.com
                 if property_obj:
                     property_obj.is_available_for_workflow = False
                     property_obj.save()
-                    print(
-                        f"🔒 Property {property_obj.id} marked as unavailable for workflow - removed from public listings"
+                    logger.debug(
+                        "🔒 Property %s marked as unavailable for workflow - removed from public listings",
+                        property_obj.id,
                     )
 
                 # 🎯 NEW: BRIDGE AUTOMÁTICO - Crear contrato automáticamente
@@ -2991,19 +3109,23 @@ www.verihome.com | soporte@verihome.com
                         )
                         match_request.save()
 
-                        print(
-                            f"🎯 AUTO-CONTRACT CREATED: {auto_contract.id} for MatchRequest {match_request.id}"
+                        logger.debug(
+                            "🎯 AUTO-CONTRACT CREATED: %s for MatchRequest %s",
+                            auto_contract.id,
+                            match_request.id,
                         )
 
                         # Actualizar respuesta con datos del contrato
                         result_message = f"✅ Documentos aprobados - Contrato #{auto_contract.id.hex[:8]} creado automáticamente"
 
                     else:
-                        print(f"ℹ️  Contract already exists: {existing_contract.id}")
+                        logger.debug(
+                            "ℹ️  Contract already exists: %s", existing_contract.id
+                        )
                         result_message = f"✅ Documentos aprobados - Contrato existente: #{existing_contract.id.hex[:8]}"
 
                 except Exception as contract_error:
-                    print(f"❌ Error creating auto-contract: {contract_error}")
+                    logger.error(f"❌ Error creating auto-contract: {contract_error}")
                     # No fallar el proceso principal por error en creación de contrato
                     result_message = "✅ Documentos aprobados - Error creando contrato automático (se puede crear manualmente)"
 
@@ -3110,7 +3232,7 @@ www.verihome.com | soporte@verihome.com
                             ).first()
 
                     except Exception as e:
-                        print(f"Error al obtener plantilla de contrato: {e}")
+                        logger.error(f"Error al obtener plantilla de contrato: {e}")
                         template = None
 
                     # Preparar el contexto con todos los datos disponibles - DATOS COMPLETOS AUTO-POBLADOS
@@ -3205,7 +3327,7 @@ www.verihome.com | soporte@verihome.com
                                 Context(template_context)
                             )
                         except Exception as e:
-                            print(f"Error rendering template: {e}")
+                            logger.error(f"Error rendering template: {e}")
                             # Usar contenido por defecto si falla el template
                             contract_content = self._get_default_contract_content(
                                 request.user, tenant, property_obj, template_context
@@ -3278,24 +3400,28 @@ www.verihome.com | soporte@verihome.com
                             # Asociar documentos al contrato
                             if approved_documents.exists():
                                 real_contract.tenant_documents.add(*approved_documents)
-                                print(
+                                logger.info(
                                     f"✅ DOCUMENTS MIGRATED: {approved_documents.count()} documentos asociados al contrato {real_contract.id}"
                                 )
                             else:
-                                print(
+                                logger.warning(
                                     f"⚠️ No approved documents found for migration to contract {real_contract.id}"
                                 )
                         else:
-                            print("⚠️ No MatchRequest found for document migration")
+                            logger.warning(
+                                "⚠️ No MatchRequest found for document migration"
+                            )
 
                     except Exception as doc_migration_error:
-                        print(
+                        logger.error(
                             f"❌ Error migrating documents to contract: {doc_migration_error}"
                         )
                         # No fallar el proceso por error en migración de documentos
 
-                    print(
-                        f"🎯 REAL CONTRACT CREATED: {real_contract.id} for MatchRequest {match_request.id}"
+                    logger.debug(
+                        "🎯 REAL CONTRACT CREATED: %s for MatchRequest %s",
+                        real_contract.id,
+                        match_request.id,
                     )
 
                     # IMPORTANTE: Mantener en etapa 3 hasta que el arrendatario apruebe el contrato
@@ -3350,7 +3476,7 @@ www.verihome.com | soporte@verihome.com
                     }
 
                 except Exception as e:
-                    print(f"❌ Error creating real contract: {str(e)}")
+                    logger.error(f"❌ Error creating real contract: {str(e)}")
                     return JsonResponse(
                         {
                             "success": False,
@@ -3365,8 +3491,10 @@ www.verihome.com | soporte@verihome.com
                 contract_id = contract_data.get("contract_id")
                 tenant = match_request.tenant
 
-                print(
-                    f"🎯 SINCRONIZACIÓN: Contrato {contract_id} creado para match {match_request.id}"
+                logger.debug(
+                    "🎯 SINCRONIZACIÓN: Contrato %s creado para match %s",
+                    contract_id,
+                    match_request.id,
                 )
 
                 # Actualizar el workflow del match request a etapa 4 (Contrato creado)
@@ -3384,7 +3512,7 @@ www.verihome.com | soporte@verihome.com
                 )
                 match_request.save()
 
-                print(
+                logger.info(
                     f"✅ MatchRequest {match_request.id} updated - Stage: {match_request.workflow_stage}, Status: {match_request.workflow_status}"
                 )
 
@@ -3462,19 +3590,21 @@ www.verihome.com | soporte@verihome.com
 
                         # Eliminar Contract si existe
                         Contract.objects.filter(id=contract_id).delete()
-                        print(f"🗑️  Contract {contract_id} eliminado")
+                        logger.info(f"🗑️  Contract {contract_id} eliminado")
 
                         # Eliminar LandlordControlledContract si existe
                         LandlordControlledContract.objects.filter(
                             id=contract_id
                         ).delete()
-                        print(f"🗑️  LandlordControlledContract {contract_id} eliminado")
+                        logger.info(
+                            f"🗑️  LandlordControlledContract {contract_id} eliminado"
+                        )
                     except Exception as e:
-                        print(f"⚠️  Error eliminando contratos: {e}")
+                        logger.warning(f"⚠️  Error eliminando contratos: {e}")
 
                 # Eliminar MatchRequest (esto eliminará automáticamente los TenantDocuments por CASCADE)
                 match_request.delete()
-                print(
+                logger.info(
                     f"🗑️  MatchRequest {match_code} ({match_id}) eliminado completamente"
                 )
 
@@ -3521,7 +3651,7 @@ www.verihome.com | soporte@verihome.com
                             # Marcar como listo para autenticación
                             contract.status = "ready_for_authentication"
                             contract.save()
-                            print(
+                            logger.info(
                                 f"✅ Contract {contract.id} marked as ready for authentication"
                             )
 
@@ -3537,7 +3667,7 @@ www.verihome.com | soporte@verihome.com
                     )
                     match_request.save()
 
-                    print(
+                    logger.info(
                         f"✅ Match {match_request.id} advanced to Stage 4 (Biometric Authentication)"
                     )
 
@@ -3667,14 +3797,16 @@ class TenantContractReviewAPIView(APIView):
         try:
             from django.utils import timezone
 
-            print(
-                f"🔍 TenantContractReview - User: {request.user.email}, Type: {request.user.user_type}"
+            logger.debug(
+                "🔍 TenantContractReview - User: %s, Type: %s",
+                request.user.email,
+                request.user.user_type,
             )
-            print(f"🔍 Request data: {request.data}")
+            logger.debug("🔍 Request data: %s", request.data)
 
             # Solo arrendatarios pueden usar esta vista
             if request.user.user_type not in ["tenant", "candidate"]:
-                print(f"❌ User type {request.user.user_type} not allowed")
+                logger.error(f"❌ User type {request.user.user_type} not allowed")
                 return Response(
                     {"error": "Solo arrendatarios pueden revisar contratos"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -3684,12 +3816,15 @@ class TenantContractReviewAPIView(APIView):
             action = request.data.get("action")  # 'approve' or 'request_changes'
             comments = request.data.get("comments", "")
 
-            print(
-                f"📝 Contract ID: {contract_id}, Action: {action}, Comments: {comments}"
+            logger.debug(
+                "📝 Contract ID: %s, Action: %s, Comments: %s",
+                contract_id,
+                action,
+                comments,
             )
 
             if not contract_id or not action:
-                print(
+                logger.error(
                     f"❌ Missing required fields - contract_id: {contract_id}, action: {action}"
                 )
                 return Response(
@@ -3698,14 +3833,14 @@ class TenantContractReviewAPIView(APIView):
                 )
 
             if action not in ["approve", "request_changes"]:
-                print(f"❌ Invalid action: {action}")
+                logger.error(f"❌ Invalid action: {action}")
                 return Response(
                     {"error": 'action debe ser "approve" o "request_changes"'},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
             if action == "request_changes" and not comments.strip():
-                print("❌ Request changes without comments")
+                logger.error("❌ Request changes without comments")
                 return Response(
                     {
                         "error": "Los comentarios son requeridos cuando se solicitan cambios"
@@ -3715,30 +3850,38 @@ class TenantContractReviewAPIView(APIView):
 
             # Buscar el contrato
             try:
-                print(
-                    f"🔍 Looking for contract {contract_id} with secondary_party={request.user.id}"
+                logger.debug(
+                    "🔍 Looking for contract %s with secondary_party=%s",
+                    contract_id,
+                    request.user.id,
                 )
                 contract = Contract.objects.get(
                     id=contract_id,
                     secondary_party=request.user,  # El arrendatario es secondary_party
                 )
-                print(f"✅ Contract found: {contract.id}")
+                logger.info(f"✅ Contract found: {contract.id}")
             except Contract.DoesNotExist:
-                print(
+                logger.error(
                     f"❌ Contract not found - ID: {contract_id}, User: {request.user.id}"
                 )
                 # Intentar buscar sin filtro de usuario para debug
                 try:
                     debug_contract = Contract.objects.get(id=contract_id)
-                    print("🔍 Contract exists but with different parties:")
-                    print(
-                        f"   - Primary party: {debug_contract.primary_party.email if debug_contract.primary_party else 'None'}"
+                    logger.debug("🔍 Contract exists but with different parties:")
+                    logger.debug(
+                        "   - Primary party: %s",
+                        debug_contract.primary_party.email
+                        if debug_contract.primary_party
+                        else "None",
                     )
-                    print(
-                        f"   - Secondary party: {debug_contract.secondary_party.email if debug_contract.secondary_party else 'None'}"
+                    logger.debug(
+                        "   - Secondary party: %s",
+                        debug_contract.secondary_party.email
+                        if debug_contract.secondary_party
+                        else "None",
                     )
                 except Exception:
-                    print(f"❌ Contract {contract_id} does not exist at all")
+                    logger.error(f"❌ Contract {contract_id} does not exist at all")
 
                 return Response(
                     {"error": "Contrato no encontrado o no autorizado"},
@@ -3746,7 +3889,7 @@ class TenantContractReviewAPIView(APIView):
                 )
 
             # Verificar que el contrato esté en estado de revisión
-            print(f"📋 Contract status: {contract.status}")
+            logger.debug("📋 Contract status: %s", contract.status)
             # BUG-E2E-01: incluir estados del flujo biométrico secuencial
             valid_statuses = [
                 "draft",
@@ -3759,10 +3902,12 @@ class TenantContractReviewAPIView(APIView):
                 "pending_guarantor_biometric",
                 "pending_landlord_biometric",
             ]
-            print(f"📋 Valid statuses for review: {valid_statuses}")
+            logger.debug("📋 Valid statuses for review: %s", valid_statuses)
 
             if contract.status not in valid_statuses:
-                print(f"❌ Invalid contract status for review: {contract.status}")
+                logger.error(
+                    f"❌ Invalid contract status for review: {contract.status}"
+                )
                 return Response(
                     {
                         "error": f"El contrato no puede ser revisado en su estado actual: {contract.status}"
@@ -3772,10 +3917,10 @@ class TenantContractReviewAPIView(APIView):
 
             # Procesar la acción
             if action == "approve":
-                print(f"🚀 Processing APPROVE action for contract {contract.id}")
-                print(f"   Current status: {contract.status}")
-                print(
-                    f"   Current tenant_review_status: {contract.tenant_review_status}"
+                logger.info(f"🚀 Processing APPROVE action for contract {contract.id}")
+                logger.debug("   Current status: %s", contract.status)
+                logger.debug(
+                    "   Current tenant_review_status: %s", contract.tenant_review_status
                 )
 
                 # Arrendatario aprueba el borrador
@@ -3786,14 +3931,14 @@ class TenantContractReviewAPIView(APIView):
                 # Manejar diferentes estados
                 if contract.status == "pending_biometric":
                     # Ya está en biométrico, no hacer cambios
-                    print(
+                    logger.debug(
                         "   ℹ️ Contract already in biometric phase, no status change needed"
                     )
                     result_message = "ℹ️ El contrato ya fue aprobado y está en fase de autenticación biométrica."
                 elif contract.status == "ready_for_authentication":
                     # Ya está aprobado, avanzar a firma biométrica
                     contract.status = "pending_biometric"
-                    print(
+                    logger.info(
                         f"   ✅ Contract already approved, advancing to biometric: {contract.status}"
                     )
                     result_message = (
@@ -3802,7 +3947,9 @@ class TenantContractReviewAPIView(APIView):
                 else:
                     # Aprobar por primera vez
                     contract.status = "ready_for_authentication"
-                    print(f"   ✅ Contract approved, status set to: {contract.status}")
+                    logger.info(
+                        f"   ✅ Contract approved, status set to: {contract.status}"
+                    )
                     result_message = "✅ Borrador aprobado exitosamente. El proceso avanza a autenticación."
 
                 # Avanzar el workflow a etapa 4 (Autenticación)
@@ -3825,7 +3972,7 @@ class TenantContractReviewAPIView(APIView):
                             "contract_id": str(contract.id),
                         }
                         property_request.save()
-                        print(
+                        logger.info(
                             f"✅ MatchRequest {property_request.id} advanced to stage 4 (Authentication)"
                         )
 
@@ -3861,16 +4008,16 @@ class TenantContractReviewAPIView(APIView):
                                 ]
 
                         match_request.save()
-                        print(
+                        logger.info(
                             f"✅ MatchRequest {match_request.id} advanced to stage 4 - Tenant approved contract"
                         )
                     else:
-                        print(
+                        logger.warning(
                             f"⚠️ No MatchRequest found for tenant {request.user.id} and property {contract.property.id}"
                         )
 
                 except Exception as e:
-                    print(f"⚠️ Error updating workflow: {e}")
+                    logger.warning(f"⚠️ Error updating workflow: {e}")
 
             elif action == "request_changes":
                 # Arrendatario solicita cambios
@@ -3925,14 +4072,16 @@ www.verihome.com
                         recipient_list=[landlord.email],
                         fail_silently=True,
                     )
-                    print(f"✅ Email de cambios solicitados enviado a {landlord.email}")
+                    logger.info(
+                        f"✅ Email de cambios solicitados enviado a {landlord.email}"
+                    )
 
                 except Exception as e:
-                    print(f"❌ Error enviando email: {str(e)}")
+                    logger.error(f"❌ Error enviando email: {str(e)}")
 
             # Guardar cambios
             contract.save()
-            print(f"💾 Contract saved with status: {contract.status}")
+            logger.info(f"💾 Contract saved with status: {contract.status}")
 
             # Registrar actividad
             from users.models import UserActivityLog
@@ -3951,7 +4100,7 @@ www.verihome.com
                 user_agent=request.META.get("HTTP_USER_AGENT", "")[:255],
             )
 
-            print(
+            logger.info(
                 f"✅ FINAL RESPONSE - Success: True, Contract Status: {contract.status}, Review Status: {contract.tenant_review_status}"
             )
 
@@ -4037,7 +4186,7 @@ El Equipo VeriHome
             )
 
         except Exception as email_error:
-            print(f"Error sending email: {str(email_error)}")
+            logger.error(f"Error sending email: {str(email_error)}")
 
         # Registrar actividad
         from users.models import UserActivityLog
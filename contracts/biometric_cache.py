@@ -0,0 +1,324 @@
+"""Cache de análisis biométricos direccionada por contenido.
+
+Rostro, documento y voz se analizan varias veces por captura dentro de
+un mismo flujo (`_process_document_image` y `_extract_document_info`
+piden el mismo OCR, la captura frontal se relee en la fase combinada,
+un reintento del cliente reenvía la misma imagen) y cada análisis local
+cuesta segundos de CPU. Antes cada `BiometricAuthenticationService`
+tenía dicts FIFO propios que morían con la instancia y no se
+compartían entre workers de gunicorn.
+
+Piezas:
+
+- Clave: SHA-256 de los bytes decodificados (no del string base64, que
+  cambia con el prefijo data-url) + parámetros del análisis + nombre del
+  proveedor. Sólo se cachean proveedores con `name` estable (str): los
+  stubs de tests no se cachean.
+- Nivel local: LRU con TTL por proceso; guarda los dataclasses tal cual.
+- Nivel compartido: cache `default` de Django (Redis en producción) con
+  los análisis serializados como en `biometric_worker`. Entradas de más
+  de `BIOMETRIC_ANALYSIS_CACHE_MAX_ENTRY_BYTES` no suben. Con
+  django-redis un ZSET por namespace lleva el orden LRU y recorta a
+  `BIOMETRIC_ANALYSIS_CACHE_SHARED_MAX_ENTRIES`; con LocMem manda su
+  propio MAX_ENTRIES.
+- Métricas: contadores por proceso (`stats()`) y agregados en el cache
+  compartido (`shared_stats()`, `manage.py biometric_cache_stats`).
+
+`BIOMETRIC_ANALYSIS_CACHE_TTL = 0` desactiva la cache.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .biometric_providers._payload import content_digest, payload_bytes
+from .biometric_worker import decode, encode
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = ("face", "document", "voice")
+EVENTS = ("hits_local", "hits_shared", "misses", "stores", "oversize", "evictions")
+
+# Subir al cambiar la forma de los análisis cacheados.
+_KEY_VERSION = 1
+_ENTRY_KEY = "biometric_cache:{namespace}:v{version}:{digest}"
+_INDEX_KEY = "biometric_cache:{namespace}:lru"
+_STATS_KEY = "biometric_cache:{namespace}:stats:{event}"
+_STATS_TTL = 7 * 24 * 3600
+
+
+class _TTLLRU:
+    """LRU acotada con expiración por entrada, thread-safe."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> int:
+        """Guarda `value`; devuelve cuántas entradas se desalojaron."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            evicted = 0
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class BiometricAnalysisCache:
+    """Cache de dos niveles para los análisis de un tipo (`namespace`)."""
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        ttl: int = 900,
+        local_max: int = 64,
+        shared_max_entries: int = 5000,
+        max_entry_bytes: int = 64 * 1024,
+        alias: str = "default",
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.shared_max_entries = shared_max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self.alias = alias
+        self._local = _TTLLRU(local_max, ttl)
+        self._counters: Counter[str] = Counter()
+        self._counters_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def _shared(self):
+        return caches[self.alias]
+
+    # ------------------------------------------------------------------
+    # Claves
+    # ------------------------------------------------------------------
+
+    def key_for(self, provider: Any, payload: str, *parts: Any) -> str | None:
+        """Clave de la captura para `provider`; None si no es cacheable."""
+        name = getattr(provider, "name", None)
+        raw = payload_bytes(payload)
+        if not self.enabled or not isinstance(name, str) or raw is None:
+            return None
+        params = "\x1f".join(str(part or "") for part in (name, *parts))
+        digest = content_digest(content_digest(raw).encode() + params.encode())
+        return _ENTRY_KEY.format(
+            namespace=self.namespace, version=_KEY_VERSION, digest=digest
+        )
+
+    # ------------------------------------------------------------------
+    # Lectura / escritura
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Any | None:
+        value = self._local.get(key)
+        if value is not None:
+            self._record("hits_local")
+            return value
+        stored = self._shared.get(key) if self.shared_max_entries else None
+        if stored is None:
+            self._record("misses")
+            return None
+        value = decode(stored)
+        self._touch(key)
+        self._local.set(key, value)
+        self._record("hits_shared")
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self._local.set(key, value):
+            self._record("evictions")
+        if not self.shared_max_entries:
+            return
+        stored = encode(value)
+        if len(json.dumps(stored, default=str)) > self.max_entry_bytes:
+            self._record("oversize")
+            return
+        self._shared.set(key, stored, self.ttl)
+        self._touch(key, trim=True)
+        self._record("stores")
+
+    def get_or_compute(
+        self,
+        provider: Any,
+        payload: str,
+        parts: tuple[Any, ...],
+        compute: Callable[[], Any],
+        on_hit: Callable[[Any], None] | None = None,
+    ) -> Any:
+        """Análisis cacheado de `payload`; si falta, `compute()` y guarda.
+
+        `on_hit(value)` corre sólo cuando el análisis sale de la cache,
+        para que el proveedor recupere lo que `compute()` le habría dejado.
+        """
+        key = self.key_for(provider, payload, *parts)
+        if key is None:
+            return compute()
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        elif on_hit is not None:
+            on_hit(value)
+        return value
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    # ------------------------------------------------------------------
+    # Índice LRU del nivel compartido (sólo django-redis)
+    # ------------------------------------------------------------------
+
+    def _redis(self):
+        client = getattr(self._shared, "client", None)
+        if client is None or not hasattr(client, "get_client"):
+            return None
+        return client.get_client(write=True)
+
+    def _touch(self, key: str, trim: bool = False) -> None:
+        """Marca `key` como recién usada y, al escribir, recorta el tier."""
+        try:
+            redis = self._redis()
+            if redis is None:
+                return
+            index = self._shared.make_key(_INDEX_KEY.format(namespace=self.namespace))
+            now = time.time()
+            pipe = redis.pipeline()
+            pipe.zadd(index, {key: now})
+            pipe.expire(index, self.ttl)
+            if trim:
+                # Lo no tocado en `ttl` ya expiró en Redis.
+                pipe.zremrangebyscore(index, "-inf", now - self.ttl)
+                pipe.zcard(index)
+            results = pipe.execute()
+            if not trim:
+                return
+            overflow = results[-1] - self.shared_max_entries
+            if overflow > 0:
+                stale = [
+                    member.decode() if isinstance(member, bytes) else member
+                    for member, _ in redis.zpopmin(index, overflow)
+                ]
+                self._shared.delete_many(stale)
+                self._record("evictions", len(stale))
+        except Exception as exc:  # noqa: BLE001 — Redis caído no rompe el flujo
+            logger.warning(f"Índice LRU de biometric_cache no disponible: {exc}")
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def _record(self, event: str, amount: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[event] += amount
+        key = _STATS_KEY.format(namespace=self.namespace, event=event)
+        shared = self._shared
+        try:
+            shared.incr(key, amount)
+        except ValueError:
+            # Primer evento (o el contador expiró); si otro proceso lo
+            # creó entre medio, `add` falla y se vuelve a incrementar.
+            if not shared.add(key, amount, _STATS_TTL):
+                shared.incr(key, amount)
+
+    def stats(self) -> dict[str, Any]:
+        """Contadores de este proceso."""
+        with self._counters_lock:
+            counters = {event: self._counters[event] for event in EVENTS}
+        return {
+            **counters,
+            "hit_ratio": _hit_ratio(counters),
+            "local_entries": len(self._local),
+        }
+
+    def shared_stats(self) -> dict[str, Any]:
+        """Contadores agregados de todos los procesos."""
+        keys = {
+            event: _STATS_KEY.format(namespace=self.namespace, event=event)
+            for event in EVENTS
+        }
+        found = self._shared.get_many(list(keys.values()))
+        counters = {event: int(found.get(key) or 0) for event, key in keys.items()}
+        return {**counters, "hit_ratio": _hit_ratio(counters)}
+
+    def reset_shared_stats(self) -> None:
+        self._shared.delete_many(
+            [
+                _STATS_KEY.format(namespace=self.namespace, event=event)
+                for event in EVENTS
+            ]
+        )
+
+
+def _hit_ratio(counters: dict[str, int]) -> float:
+    hits = counters["hits_local"] + counters["hits_shared"]
+    total = hits + counters["misses"]
+    return round(hits / total, 4) if total else 0.0
+
+
+_caches: dict[str, BiometricAnalysisCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_analysis_cache(namespace: str) -> BiometricAnalysisCache:
+    """Cache del proceso para `namespace`, configurada desde settings."""
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = BiometricAnalysisCache(
+                namespace,
+                ttl=int(getattr(settings, "BIOMETRIC_ANALYSIS_CACHE_TTL", 900)),
+                local_max=int(
+                    getattr(settings, "BIOMETRIC_ANALYSIS_CACHE_LOCAL_MAX", 64)
+                ),
+                shared_max_entries=int(
+                    getattr(
+                        settings, "BIOMETRIC_ANALYSIS_CACHE_SHARED_MAX_ENTRIES", 5000
+                    )
+                ),
+                max_entry_bytes=int(
+                    getattr(settings, "BIOMETRIC_ANALYSIS_CACHE_MAX_ENTRY_BYTES", 65536)
+                ),
+            )
+        return _caches[namespace]
+
+
+def reset_analysis_caches() -> None:
+    """Descarta las caches del proceso (tests / cambio de settings)."""
+    with _caches_lock:
+        _caches.clear()
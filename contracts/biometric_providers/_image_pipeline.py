@@ -0,0 +1,141 @@
+"""Pipeline de imagen compartido por los proveedores biométricos locales.
+
+Centraliza lo que `LocalFacialProvider` y `LocalDocumentProvider`
+hacían cada uno por su lado:
+
+- Decodificar base64/data-url una sola vez por captura y derivar las
+  vistas (RGB, gris) perezosamente, sin repetir `cvtColor`.
+- Identificar la captura por el SHA-256 de los bytes decodificados
+  (no del string base64): la captura frontal que llega como data-url
+  en `process_face_capture` y la que se relee de disco en la fase
+  combinada producen el mismo digest.
+- Reducir la imagen para detección (fotos de celular de 12 MP hacen
+  que HOG tarde segundos) y re-escalar las cajas a la resolución
+  original, donde se calculan landmarks y embeddings.
+- Una LRU thread-safe pequeña para memoizar resultados por digest.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Generic, TypeVar
+
+import cv2
+import numpy as np
+
+from ._payload import content_digest, payload_bytes
+
+# Lado mayor (px) de la copia sobre la que corren los detectores. 640
+# conserva rostros de >= ~40 px en selfies a distancia de brazo y deja
+# HOG en decenas de ms.
+DETECTION_MAX_SIDE = 640
+
+Box = tuple[int, int, int, int]  # (top, right, bottom, left), estilo dlib
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class DecodedCapture:
+    """Imagen decodificada una vez; las vistas derivadas se memoizan."""
+
+    digest: str
+    bgr: np.ndarray
+
+    @cached_property
+    def rgb(self) -> np.ndarray:
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+
+    @cached_property
+    def gray(self) -> np.ndarray:
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.bgr.shape[0], self.bgr.shape[1]
+
+
+def decode_capture(image_data: str) -> DecodedCapture | None:
+    """Decodifica base64/data-url a `DecodedCapture`; None si es inválida."""
+    raw = payload_bytes(image_data)
+    if raw is None:
+        return None
+    return decode_bytes(raw)
+
+
+def decode_bytes(raw: bytes) -> DecodedCapture | None:
+    """Bytes de imagen (JPEG/PNG/...) → `DecodedCapture`; None si no decodifica."""
+    image = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None or image.size == 0:
+        return None
+    return DecodedCapture(digest=content_digest(raw), bgr=image)
+
+
+def downscale(
+    image: np.ndarray, max_side: int | None = DETECTION_MAX_SIDE
+) -> tuple[np.ndarray, float]:
+    """Copia reducida para detección y el factor aplicado (<= 1.0).
+
+    Imágenes ya pequeñas (o `max_side` None) se devuelven tal cual con
+    factor 1.0, sin copiar.
+    """
+    height, width = image.shape[:2]
+    longest = max(height, width)
+    if not max_side or longest <= max_side:
+        return image, 1.0
+    scale = max_side / float(longest)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA), scale
+
+
+def rescale_box(box: Box, scale: float, shape: tuple[int, int]) -> Box:
+    """Lleva una caja detectada en la copia reducida a la imagen original."""
+    if scale == 1.0:
+        return box
+    height, width = shape
+    top, right, bottom, left = (round(v / scale) for v in box)
+    return (
+        max(0, top),
+        min(width, right),
+        min(height, bottom),
+        max(0, left),
+    )
+
+
+class LRUCache(Generic[K, V]):
+    """LRU acotada y thread-safe (OrderedDict + lock)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
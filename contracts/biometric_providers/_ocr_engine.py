@@ -0,0 +1,187 @@
+"""Motores OCR para `LocalDocumentProvider`.
+
+`pytesseract` lanza el binario `tesseract` en cada llamada: spawn del
+proceso + carga del modelo de idioma (~decenas de MB) por documento,
+antes de reconocer una sola línea. `TesserocrEngine` usa las bindings
+C++ (`tesserocr`) y mantiene una instancia `PyTessBaseAPI` viva por
+hilo: el modelo se carga una vez por proceso worker y cada documento
+sólo paga el reconocimiento. Además permite fijar la imagen una vez y
+reconocer varias regiones (`SetRectangle`), que es lo que usa el OCR
+por campos de la cédula.
+
+`get_ocr_engine()` elige el motor según `BIOMETRIC_OCR_ENGINE`
+(`auto` | `tesserocr` | `pytesseract`); `auto` prefiere tesserocr y
+cae a pytesseract si las bindings o el tessdata no están disponibles.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENGINE_AUTO = "auto"
+ENGINE_TESSEROCR = "tesserocr"
+ENGINE_PYTESSERACT = "pytesseract"
+_VALID_ENGINES = {ENGINE_AUTO, ENGINE_TESSEROCR, ENGINE_PYTESSERACT}
+
+# (x, y, w, h) en píxeles de la imagen pasada a `recognize_regions`.
+Region = tuple[int, int, int, int]
+
+
+class OCREngine(ABC):
+    """Interfaz mínima: texto de una imagen en gris (uint8, 2D)."""
+
+    name = "base"
+
+    def __init__(self, lang: str = "spa"):
+        self.lang = lang
+
+    @abstractmethod
+    def recognize(self, gray: np.ndarray) -> str:
+        """Texto de la imagen completa (segmentación automática de página)."""
+
+    @abstractmethod
+    def recognize_line(self, gray: np.ndarray) -> str:
+        """Texto de una imagen que contiene una sola línea."""
+
+    def recognize_regions(
+        self, gray: np.ndarray, regions: Sequence[Region]
+    ) -> list[str]:
+        """Una línea de texto por región (recorte + `recognize_line`)."""
+        return [
+            self.recognize_line(gray[y : y + h, x : x + w]) for x, y, w, h in regions
+        ]
+
+    def warm_up(self) -> None:
+        """Inicializa el motor en el hilo actual (carga del modelo)."""
+        self.recognize_line(np.full((32, 128), 255, dtype=np.uint8))
+
+
+class PytesseractEngine(OCREngine):
+    """Un proceso `tesseract` por llamada (comportamiento histórico)."""
+
+    name = ENGINE_PYTESSERACT
+
+    def _run(self, gray: np.ndarray, psm: int) -> str:
+        import pytesseract  # import perezoso: solo cuando se usa el provider real
+        from PIL import Image
+
+        return pytesseract.image_to_string(
+            Image.fromarray(gray), lang=self.lang, config=f"--psm {psm}"
+        )
+
+    def recognize(self, gray: np.ndarray) -> str:
+        return self._run(gray, 3)
+
+    def recognize_line(self, gray: np.ndarray) -> str:
+        return self._run(gray, 7)
+
+
+class TesserocrEngine(OCREngine):
+    """Instancia `PyTessBaseAPI` persistente por hilo (tesserocr).
+
+    `PyTessBaseAPI` no es thread-safe; con una por hilo el provider puede
+    compartirse entre los hilos de gunicorn/celery sin locks.
+    """
+
+    name = ENGINE_TESSEROCR
+
+    def __init__(self, lang: str = "spa", path: str | None = None):
+        super().__init__(lang)
+        self.path = path
+        self._local = threading.local()
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            import tesserocr
+
+            kwargs = {"lang": self.lang}
+            if self.path:
+                kwargs["path"] = self.path
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+            self._local.api = api
+        return api
+
+    @staticmethod
+    def _set_image(api, gray: np.ndarray) -> None:
+        gray = np.ascontiguousarray(gray, dtype=np.uint8)
+        height, width = gray.shape[:2]
+        api.SetImageBytes(gray.tobytes(), width, height, 1, width)
+
+    def _text(self, gray: np.ndarray, psm) -> str:
+        api = self._api()
+        api.SetPageSegMode(psm)
+        self._set_image(api, gray)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def recognize(self, gray: np.ndarray) -> str:
+        import tesserocr
+
+        return self._text(gray, tesserocr.PSM.AUTO)
+
+    def recognize_line(self, gray: np.ndarray) -> str:
+        import tesserocr
+
+        return self._text(gray, tesserocr.PSM.SINGLE_LINE)
+
+    def recognize_regions(
+        self, gray: np.ndarray, regions: Sequence[Region]
+    ) -> list[str]:
+        import tesserocr
+
+        api = self._api()
+        api.SetPageSegMode(tesserocr.PSM.SINGLE_LINE)
+        # La imagen se copia a Leptonica una sola vez para todas las regiones.
+        self._set_image(api, gray)
+        try:
+            texts = []
+            for x, y, w, h in regions:
+                api.SetRectangle(x, y, w, h)
+                texts.append(api.GetUTF8Text())
+            return texts
+        finally:
+            api.Clear()
+
+
+def _build_tesserocr(lang: str, path: str | None) -> TesserocrEngine:
+    engine = TesserocrEngine(lang=lang, path=path)
+    # Falla aquí (ImportError / RuntimeError sin tessdata) y no en la
+    # primera cédula real.
+    engine._api()
+    return engine
+
+
+@lru_cache(maxsize=4)
+def get_ocr_engine(
+    preference: str = ENGINE_AUTO, lang: str = "spa", path: str | None = None
+) -> OCREngine:
+    """Motor OCR memoizado por proceso."""
+    preference = (preference or ENGINE_AUTO).strip().lower()
+    if preference not in _VALID_ENGINES:
+        logger.warning("BIOMETRIC_OCR_ENGINE=%r no reconocido, usando auto", preference)
+        preference = ENGINE_AUTO
+
+    if preference == ENGINE_PYTESSERACT:
+        return PytesseractEngine(lang=lang)
+    try:
+        return _build_tesserocr(lang, path)
+    except (ImportError, RuntimeError) as exc:
+        if preference == ENGINE_TESSEROCR:
+            raise
+        logger.warning(
+            "tesserocr no disponible (%s); OCR con pytesseract (un proceso "
+            "por documento)",
+            exc,
+        )
+        return PytesseractEngine(lang=lang)
@@ -0,0 +1,29 @@
+"""Decodificación e identidad de capturas biométricas sin dependencias.
+
+Separado de `_image_pipeline` para que el servicio (y su cache de
+análisis) puedan direccionar capturas por contenido sin importar
+opencv, que sólo necesitan los proveedores locales.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+
+
+def payload_bytes(image_data: str) -> bytes | None:
+    """base64 o data-url → bytes crudos; None si no es base64 válido."""
+    if not image_data:
+        return None
+    if "," in image_data and image_data.strip().startswith("data:"):
+        image_data = image_data.split(",", 1)[1]
+    try:
+        raw = base64.b64decode(image_data)
+    except (binascii.Error, ValueError):
+        return None
+    return raw or None
+
+
+def content_digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
@@ -70,3 +70,10 @@ class FacialProvider(ABC):
     def is_demo(self) -> bool:
         """True cuando el proveedor devuelve scores simulados."""
         return False
+
+    def remember_analysis(self, image_data: str, analysis: FaceAnalysis) -> None:
+        """Recibe un análisis de `image_data` servido desde la cache.
+
+        Permite al proveedor rehidratar estado derivado (embeddings) que
+        `analyze_face` habría dejado listo. Por defecto no hace nada.
+        """
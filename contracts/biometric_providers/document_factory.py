@@ -44,5 +44,8 @@ def get_document_provider() -> DocumentProvider:
         # Import perezoso: pytesseract/cv2 solo se cargan con el provider real.
         from .local_document import LocalDocumentProvider
 
-        return LocalDocumentProvider()
+        return LocalDocumentProvider(
+            engine_preference=getattr(settings, "BIOMETRIC_OCR_ENGINE", "auto"),
+            roi=getattr(settings, "BIOMETRIC_OCR_ROI", True),
+        )
     return DemoDocumentProvider()
@@ -46,9 +46,14 @@ def get_facial_provider() -> FacialProvider:
     name = _resolve_provider_name()
     if name == _PROVIDER_LOCAL:
         try:
+            from ._image_pipeline import DETECTION_MAX_SIDE
             from .local import LocalFacialProvider
 
-            return LocalFacialProvider()
+            return LocalFacialProvider(
+                detection_max_side=getattr(
+                    settings, "BIOMETRIC_DETECTION_MAX_SIDE", DETECTION_MAX_SIDE
+                )
+            )
         except ImportError as exc:
             logger.error(
                 "BIOMETRIC_FACIAL_PROVIDER=local pero faltan dependencias "
@@ -21,15 +21,26 @@ frontal vs lateral sin re-procesar las imágenes.
 
 from __future__ import annotations
 
-import base64
 import logging
 import math
-from typing import Any
+import threading
 
 import cv2
 import face_recognition
 import numpy as np
 
+from ._image_pipeline import (
+    DETECTION_MAX_SIDE,
+    Box,
+    DecodedCapture,
+    LRUCache,
+    content_digest,
+    decode_bytes,
+    decode_capture,
+    downscale,
+    payload_bytes,
+    rescale_box,
+)
 from .base import FaceAnalysis, FacialProvider
 
 logger = logging.getLogger(__name__)
@@ -45,6 +56,9 @@ _SIMILARITY_AT_THRESHOLD = 0.65
 # superar 100-300; por debajo de ~50 está visiblemente borrosa.
 _SHARPNESS_SATURATION = 250.0
 
+# Embeddings frontales memoizados por captura (128 floats c/u ≈ 1 KB).
+_ENCODING_CACHE_MAX = 256
+
 
 def distance_to_similarity(distance: float) -> float:
     """Mapea distancia euclidiana de dlib a similitud 0.0-1.0.
@@ -66,6 +80,10 @@ def _sharpness_score(gray: np.ndarray) -> float:
     return min(1.0, variance / _SHARPNESS_SATURATION)
 
 
+def _serialize_encoding(encoding: np.ndarray) -> list[float]:
+    return [round(float(v), 6) for v in encoding]
+
+
 def _brightness_score(gray: np.ndarray) -> tuple[float, float]:
     """(score 0-1, brillo medio 0-255). Ideal: 80-180; penaliza extremos."""
     mean = float(gray.mean())
@@ -76,74 +94,136 @@ def _brightness_score(gray: np.ndarray) -> tuple[float, float]:
     return max(0.0, (255.0 - mean) / 75.0), mean
 
 
+def _box_area(box: Box) -> int:
+    top, right, bottom, left = box
+    return (bottom - top) * (right - left)
+
+
+# `CascadeClassifier` lee y parsea el XML del disco al construirse; se
+# carga una vez por hilo (la instancia no es segura para usarse desde
+# varios hilos a la vez con gunicorn gthread).
+_cascades = threading.local()
+
+
+def _profile_cascade() -> cv2.CascadeClassifier:
+    cascade = getattr(_cascades, "profile", None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_profileface.xml"
+        )
+        _cascades.profile = cascade
+    return cascade
+
+
 class LocalFacialProvider(FacialProvider):
     name = "local"
 
+    def __init__(self, detection_max_side: int | None = DETECTION_MAX_SIDE):
+        # Lado mayor de la copia reducida sobre la que corren HOG y el
+        # cascade; None detecta a resolución completa (comportamiento
+        # previo, útil como línea base en el benchmark).
+        self.detection_max_side = detection_max_side
+        # digest de la captura → embedding de su rostro frontal (HOG), o
+        # None si HOG no encontró rostro. Lo llena `analyze_face` y lo
+        # consume `compare_faces`, que así no re-decodifica ni re-detecta
+        # capturas ya analizadas (frontal de `process_face_capture`,
+        # combinada de `_extract_face_from_combined`).
+        self._frontal_encodings: LRUCache[str, list[float] | None] = LRUCache(
+            _ENCODING_CACHE_MAX
+        )
+
     # ------------------------------------------------------------------
-    # Decodificación
+    # Decodificación y detección
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _decode_image(image_data: str) -> np.ndarray | None:
-        """Decodifica base64/data-url a imagen BGR; None si es inválida."""
+    def _decode_image(image_data: str) -> DecodedCapture | None:
+        """Decodifica base64/data-url a `DecodedCapture`; None si es inválida."""
         try:
-            if "," in image_data and image_data.strip().startswith("data:"):
-                image_data = image_data.split(",", 1)[1]
-            buffer = np.frombuffer(base64.b64decode(image_data), dtype=np.uint8)
-            image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
-            if image is None or image.size == 0:
-                return None
-            return image
-        except Exception as exc:
+            return decode_capture(image_data)
+        except Exception as exc:  # noqa: BLE001
             logger.warning("LocalFacialProvider: imagen indecodificable: %s", exc)
             return None
 
-    @staticmethod
-    def _largest_face(rgb: np.ndarray, face_type: str) -> tuple[int, int, int, int] | None:
-        """Bounding box (top, right, bottom, left) del rostro más grande.
+    def _largest_face(
+        self, capture: DecodedCapture, face_type: str
+    ) -> tuple[Box | None, str | None]:
+        """(bounding box, detector) del rostro más grande.
 
+        La caja viene en coordenadas de la imagen original (top, right,
+        bottom, left) aunque la detección corra sobre la copia reducida.
         HOG de dlib es frontal; para `lateral` cae al cascade de perfil
         de OpenCV (probando también la imagen espejada, porque el
         cascade sólo detecta perfiles mirando a la izquierda).
         """
-        locations = face_recognition.face_locations(rgb, model="hog")
+        small, scale = downscale(capture.rgb, self.detection_max_side)
+        locations = face_recognition.face_locations(small, model="hog")
         if locations:
-            return max(locations, key=lambda b: (b[2] - b[0]) * (b[1] - b[3]))
+            box = max(locations, key=_box_area)
+            return rescale_box(box, scale, capture.shape), "hog"
 
         if face_type != "lateral":
-            return None
+            return None, None
 
-        cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_profileface.xml"
-        )
-        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        gray, scale = downscale(capture.gray, self.detection_max_side)
+        # minSize de 60 px referido a la imagen original.
+        min_side = max(24, round(60 * scale))
+        cascade = _profile_cascade()
         width = gray.shape[1]
         for flipped in (False, True):
             frame = cv2.flip(gray, 1) if flipped else gray
-            detections = cascade.detectMultiScale(frame, 1.1, 5, minSize=(60, 60))
+            detections = cascade.detectMultiScale(
+                frame, 1.1, 5, minSize=(min_side, min_side)
+            )
             if len(detections):
-                x, y, w, h = max(detections, key=lambda d: d[2] * d[3])
+                x, y, w, h = (
+                    int(v) for v in max(detections, key=lambda d: d[2] * d[3])
+                )
                 if flipped:
                     x = width - x - w
-                return (y, x + w, y + h, x)
-        return None
+                box = (y, x + w, y + h, x)
+                return rescale_box(box, scale, capture.shape), "profile_cascade"
+        return None, None
+
+    def _frontal_encoding(self, image_data: str) -> tuple[bool, list[float] | None]:
+        """(decodificable, embedding frontal) reutilizando `analyze_face`.
+
+        El embedding es el mismo que `analyze_face` guarda en
+        `FaceAnalysis.raw["encoding"]` cuando el rostro lo detectó HOG.
+        """
+        raw = payload_bytes(image_data)
+        if raw is None:
+            return False, None
+        digest = content_digest(raw)
+        if digest in self._frontal_encodings:
+            return True, self._frontal_encodings.get(digest)
+
+        capture = decode_bytes(raw)
+        if capture is None:
+            return False, None
+        box, _ = self._largest_face(capture, "frontal")
+        found = face_recognition.face_encodings(capture.rgb, [box]) if box else []
+        encoding = _serialize_encoding(found[0]) if len(found) else None
+        self._frontal_encodings.set(digest, encoding)
+        return True, encoding
 
     # ------------------------------------------------------------------
     # Interfaz FacialProvider
     # ------------------------------------------------------------------
 
     def analyze_face(self, image_data: str, face_type: str) -> FaceAnalysis:
-        image = self._decode_image(image_data)
-        if image is None:
+        capture = self._decode_image(image_data)
+        if capture is None:
             return self._not_detected(face_type, reason="undecodable_image")
 
-        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        box = self._largest_face(rgb, face_type)
+        box, detector = self._largest_face(capture, face_type)
+        if detector != "hog":
+            self._frontal_encodings.set(capture.digest, None)
         if box is None:
             return self._not_detected(face_type, reason="no_face_found")
 
         top, right, bottom, left = box
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = capture.gray
         face_gray = gray[max(0, top):bottom, max(0, left):right]
         if face_gray.size == 0:
             return self._not_detected(face_type, reason="empty_face_crop")
@@ -157,14 +237,19 @@ class LocalFacialProvider(FacialProvider):
             0.45 * sharpness + 0.30 * brightness_score + 0.25 * size_score, 4
         )
 
+        rgb = capture.rgb
         landmarks = face_recognition.face_landmarks(rgb, [box])
         landmark_points = sum(len(v) for v in landmarks[0].values()) if landmarks else 0
         pose = self._estimate_pose(landmarks[0]) if landmarks else {}
 
         encodings = face_recognition.face_encodings(rgb, [box])
-        encoding = [round(float(v), 6) for v in encodings[0]] if len(encodings) else None
+        encoding = _serialize_encoding(encodings[0]) if len(encodings) else None
+        if detector == "hog":
+            self._frontal_encodings.set(capture.digest, encoding)
 
-        liveness = self._liveness_heuristic(image, face_gray, sharpness, brightness_score)
+        liveness = self._liveness_heuristic(
+            capture.bgr, face_gray, sharpness, brightness_score
+        )
 
         return FaceAnalysis(
             face_detected=True,
@@ -177,6 +262,7 @@ class LocalFacialProvider(FacialProvider):
                 "face_type": face_type,
                 "encoding": encoding,
                 "face_box": list(box),
+                "detector": detector,
                 "sharpness": round(sharpness, 4),
                 "brightness_mean": round(brightness_mean, 2),
                 "face_area_ratio": round(face_ratio, 4),
@@ -184,20 +270,30 @@ class LocalFacialProvider(FacialProvider):
             },
         )
 
+    def remember_analysis(self, image_data: str, analysis: FaceAnalysis) -> None:
+        # Mismo llenado que `analyze_face`, desde el análisis cacheado.
+        raw = payload_bytes(image_data)
+        if raw is None:
+            return
+        if analysis.raw.get("detector") == "hog":
+            encoding = analysis.raw.get("encoding")
+        elif analysis.face_detected or analysis.raw.get("reason") == "no_face_found":
+            encoding = None
+        else:
+            return
+        self._frontal_encodings.set(content_digest(raw), encoding)
+
     def compare_faces(self, source_image: str, target_image: str) -> float:
         encodings = []
         for label, data in (("source", source_image), ("target", target_image)):
-            image = self._decode_image(data)
-            if image is None:
+            decodable, encoding = self._frontal_encoding(data)
+            if not decodable:
                 logger.warning("compare_faces: imagen %s indecodificable", label)
                 return 0.0
-            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            box = self._largest_face(rgb, "frontal")
-            found = face_recognition.face_encodings(rgb, [box]) if box else []
-            if not len(found):
+            if encoding is None:
                 logger.warning("compare_faces: sin rostro en imagen %s", label)
                 return 0.0
-            encodings.append(found[0])
+            encodings.append(np.asarray(encoding))
 
         distance = float(face_recognition.face_distance([encodings[0]], encodings[1])[0])
         return round(distance_to_similarity(distance), 4)
@@ -1,9 +1,20 @@
-"""DocumentProvider REAL con OCR local (pytesseract + parser CO).
+"""DocumentProvider REAL con OCR local (Tesseract + parser CO).
 
 Espeja a LocalFacialProvider: corre en el servidor, sin APIs pagas. Decodifica
 la imagen de la cédula, extrae texto con Tesseract (español) y lo pasa al parser
 `parse_colombian_id` para obtener número de documento, nombre y fechas.
 
+Pipeline por documento (cada etapa se mide y queda en `raw["timings_ms"]`):
+
+1. `decode`: base64 → `DecodedCapture` (una sola decodificación).
+2. `card_detect` / `line_detect`: localiza y rectifica la tarjeta y sus
+   franjas de texto (`_document_roi`).
+3. `ocr_roi`: reconoce sólo esas franjas como líneas sueltas, con el
+   motor persistente (`_ocr_engine`: tesserocr, modelo cargado una vez
+   por proceso).
+4. `ocr_full`: si no hubo tarjeta o el parser no encontró el número, OCR
+   de la imagen completa (comportamiento anterior).
+
 Robusto: si Tesseract no está instalado o la imagen es indecodificable, devuelve
 un análisis "no detectado" (no lanza), para que el onboarding no se caiga.
 Requiere el paquete de SO `tesseract-ocr` + `tesseract-ocr-spa` (ver Dockerfile).
@@ -11,53 +22,116 @@ Requiere el paquete de SO `tesseract-ocr` + `tesseract-ocr-spa` (ver Dockerfile)
 
 from __future__ import annotations
 
-import base64
 import logging
+import time
+from contextlib import contextmanager
 
 import cv2
 import numpy as np
 
-from ._colombian_id_parser import parse_colombian_id
+from ._colombian_id_parser import ParsedColombianID, parse_colombian_id
+from ._document_roi import find_card, text_line_regions
+from ._image_pipeline import DecodedCapture, decode_capture
+from ._ocr_engine import ENGINE_AUTO, OCREngine, get_ocr_engine
 from .document_base import DocumentAnalysis, DocumentProvider
 
 logger = logging.getLogger(__name__)
 
 
+class _StageTimings(dict):
+    """Duración (ms) por etapa del análisis de un documento."""
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self[name] = round((time.perf_counter() - start) * 1000.0, 2)
+
+
+def _split_lines(text: str) -> list[str]:
+    return [ln.strip() for ln in text.splitlines() if ln.strip()]
+
+
 class LocalDocumentProvider(DocumentProvider):
     name = "local"
 
+    def __init__(
+        self,
+        engine: OCREngine | None = None,
+        *,
+        engine_preference: str = ENGINE_AUTO,
+        roi: bool = True,
+    ):
+        self._engine = engine
+        self._engine_preference = engine_preference
+        self.roi = roi
+
+    @property
+    def engine(self) -> OCREngine:
+        # Perezoso: construir el provider no exige Tesseract instalado.
+        if self._engine is None:
+            self._engine = get_ocr_engine(self._engine_preference)
+        return self._engine
+
     @staticmethod
-    def _decode_image(image_data: str) -> np.ndarray | None:
-        """base64/data-url → imagen BGR; None si es inválida."""
+    def _decode_image(image_data: str) -> DecodedCapture | None:
+        """base64/data-url → `DecodedCapture`; None si es inválida."""
         try:
-            if "," in image_data and image_data.strip().startswith("data:"):
-                image_data = image_data.split(",", 1)[1]
-            buffer = np.frombuffer(base64.b64decode(image_data), dtype=np.uint8)
-            image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
-            if image is None or image.size == 0:
-                return None
-            return image
+            return decode_capture(image_data)
         except Exception as exc:  # noqa: BLE001
             logger.warning("LocalDocumentProvider: imagen indecodificable: %s", exc)
             return None
 
-    @staticmethod
-    def _ocr_lines(image: np.ndarray) -> list[str]:
-        """Texto de la imagen con Tesseract (español). Lista de líneas."""
-        import pytesseract  # import perezoso: solo cuando se usa el provider real
-        from PIL import Image
-
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        # Umbral adaptativo ayuda con iluminación despareja de fotos de cédula.
+    def _ocr_lines(self, gray: np.ndarray) -> list[str]:
+        """Texto de la imagen completa (gris) con Tesseract. Lista de líneas."""
+        # El filtro bilateral suaviza el fondo de seguridad sin perder bordes
+        # de los caracteres (fotos de cédula con iluminación despareja).
         gray = cv2.bilateralFilter(gray, 9, 75, 75)
-        text = pytesseract.image_to_string(Image.fromarray(gray), lang="spa")
-        return [ln.strip() for ln in text.splitlines() if ln.strip()]
+        return _split_lines(self.engine.recognize(gray))
+
+    def _ocr_card_lines(
+        self, gray: np.ndarray, timings: _StageTimings
+    ) -> list[str] | None:
+        """Líneas de las franjas de texto de la tarjeta; None si no se localizó."""
+        with timings.stage("card_detect"):
+            card = find_card(gray)
+        if card is None:
+            return None
+        with timings.stage("line_detect"):
+            regions = text_line_regions(card)
+        if not regions:
+            return None
+        with timings.stage("ocr_roi"):
+            texts = self.engine.recognize_regions(card, regions)
+        return [line for text in texts for line in _split_lines(text)]
+
+    def _read_document(
+        self, capture: DecodedCapture, timings: _StageTimings
+    ) -> tuple[list[str], ParsedColombianID, str]:
+        """(líneas, campos parseados, modo "roi" | "full")."""
+        if self.roi:
+            lines = self._ocr_card_lines(capture.gray, timings)
+            if lines:
+                with timings.stage("parse"):
+                    parsed = parse_colombian_id(lines)
+                if parsed.document_number:
+                    return lines, parsed, "roi"
+
+        with timings.stage("ocr_full"):
+            lines = self._ocr_lines(capture.gray)
+        with timings.stage("parse"):
+            parsed = parse_colombian_id(lines)
+        return lines, parsed, "full"
 
     def analyze_document(
         self, image_data: str, document_type: str
     ) -> DocumentAnalysis:
-        image = self._decode_image(image_data)
-        if image is None:
+        timings = _StageTimings()
+        with timings.stage("decode"):
+            capture = self._decode_image(image_data)
+        if capture is None:
             return DocumentAnalysis(
                 document_detected=False,
                 provider=self.name,
@@ -65,7 +139,7 @@ class LocalDocumentProvider(DocumentProvider):
             )
 
         try:
-            lines = self._ocr_lines(image)
+            lines, parsed, ocr_mode = self._read_document(capture, timings)
         except Exception as exc:  # noqa: BLE001 - tesseract ausente / error OCR
             logger.warning("LocalDocumentProvider: OCR falló: %s", exc)
             return DocumentAnalysis(
@@ -74,11 +148,9 @@ class LocalDocumentProvider(DocumentProvider):
                 raw={"reason": "ocr_error", "error": str(exc)},
             )
 
-        parsed = parse_colombian_id(lines)
-
         # Calidad simple de imagen (nitidez por Laplaciano).
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        with timings.stage("quality"):
+            sharpness = float(cv2.Laplacian(capture.gray, cv2.CV_64F).var())
         quality = max(0.0, min(1.0, sharpness / 500.0))
 
         has_number = bool(parsed.document_number)
@@ -116,5 +188,10 @@ class LocalDocumentProvider(DocumentProvider):
                 4,
             ),
             provider=self.name,
-            raw={"lines": lines[:25]},
+            raw={
+                "lines": lines[:25],
+                "ocr_mode": ocr_mode,
+                "ocr_engine": self.engine.name,
+                "timings_ms": dict(timings),
+            },
         )
@@ -4,14 +4,16 @@ Implementa verificación facial, documento de identidad, y grabación de voz con
 """
 
 import base64
-import hashlib
+import time
 from typing import Dict, Any
 import logging
 
+from django.conf import settings
 from django.utils import timezone
 from django.core.files.base import ContentFile
 from django.db import transaction
 
+from .biometric_cache import get_analysis_cache
 from .biometric_providers import (
     DocumentAnalysis,
     DocumentProvider,
@@ -19,17 +21,18 @@ from .biometric_providers import (
     FacialProvider,
     VoiceAnalysis,
     VoiceProvider,
-    get_document_provider,
-    get_facial_provider,
     get_voice_provider,
 )
+from .biometric_worker import (
+    BiometricQueueFull,
+    resolve_document_provider,
+    resolve_facial_provider,
+)
+from .face_index import get_face_store
 from .models import Contract, BiometricAuthentication
 
 logger = logging.getLogger(__name__)
 
-_DOC_CACHE_MAX = 8
-_VOICE_CACHE_MAX = 8
-
 
 class BiometricAuthenticationService:
     """Servicio completo de autenticación biométrica para contratos digitales."""
@@ -46,18 +49,21 @@ class BiometricAuthenticationService:
         self.voice_duration_max = 30  # segundos máximos
         # P0.1: análisis facial delegado a `contracts.biometric_providers`.
         # Por defecto se selecciona según `BIOMETRIC_FACIAL_PROVIDER`; los
-        # tests pueden inyectar un stub.
-        self._facial_provider: FacialProvider = facial_provider or get_facial_provider()
+        # tests pueden inyectar un stub. Con BIOMETRIC_EXECUTION_BACKEND
+        # = "celery" facial y documento corren en el worker biométrico.
+        self._facial_provider: FacialProvider = (
+            facial_provider or resolve_facial_provider()
+        )
         # P0.2: análisis de documento delegado al DocumentProvider activo.
         self._document_provider: DocumentProvider = (
-            document_provider or get_document_provider()
+            document_provider or resolve_document_provider()
         )
         # P0.3: análisis de voz delegado al VoiceProvider activo.
         self._voice_provider: VoiceProvider = voice_provider or get_voice_provider()
-        # Caches por sesión para evitar llamadas duplicadas al provider
-        # desde los 3 métodos que consumen el mismo análisis.
-        self._document_cache: Dict[str, DocumentAnalysis] = {}
-        self._voice_cache: Dict[str, VoiceAnalysis] = {}
+        # Los análisis se cachean por contenido entre instancias y workers
+        # (contracts/biometric_cache.py). La voz se consume en 3 métodos
+        # que reciben otro dict; el último análisis queda a mano aquí.
+        self._last_voice_analysis: VoiceAnalysis | None = None
 
     def initiate_authentication(
         self, contract: Contract, user, request
@@ -211,6 +217,10 @@ class BiometricAuthenticationService:
                 },
             }
 
+            # 1:N: ¿este rostro ya se autenticó con otra cuenta?
+            duplicate_check = self._check_duplicate_identity(auth, front_analysis)
+            auth.security_checks["duplicate_identity"] = duplicate_check
+
             # Actualizar estado
             if auth.status == "pending":
                 auth.status = "in_progress"
@@ -221,6 +231,7 @@ class BiometricAuthenticationService:
                 "success": True,
                 "face_confidence_score": face_confidence,
                 "quality_metrics": auth.facial_analysis["quality_metrics"],
+                "duplicate_identity_suspected": duplicate_check.get("suspected", False),
                 "next_step": "document_capture",
                 "overall_progress": auth.get_progress_percentage(),
             }
@@ -819,7 +830,15 @@ class BiometricAuthenticationService:
     # Voz + documento siguen siendo stubs; migrarán en fases P0.2 y P0.3.
     def _process_face_image(self, image_data: str, face_type: str) -> Dict[str, Any]:
         """Analiza una captura facial vía el proveedor activo."""
-        analysis = self._facial_provider.analyze_face(image_data, face_type)
+        analysis = get_analysis_cache("face").get_or_compute(
+            self._facial_provider,
+            image_data,
+            (face_type,),
+            lambda: self._facial_provider.analyze_face(image_data, face_type),
+            on_hit=lambda cached: self._facial_provider.remember_analysis(
+                image_data, cached
+            ),
+        )
         return {
             "face_detected": analysis.face_detected,
             "quality_score": analysis.quality_score,
@@ -829,7 +848,51 @@ class BiometricAuthenticationService:
             "face_type": face_type,
             "provider": analysis.provider,
             "processed_at": timezone.now().isoformat(),
-            "_raw": analysis.raw,
+            "_raw": dict(analysis.raw),
+        }
+
+    def _check_duplicate_identity(
+        self, auth: BiometricAuthentication, front_analysis: Dict
+    ) -> Dict[str, Any]:
+        """Busca el embedding frontal entre las autenticaciones anteriores.
+
+        Sólo marca la sospecha en `security_checks` (no bloquea la firma):
+        un falso positivo se revisa a mano. Sin embedding (provider demo)
+        o con `BIOMETRIC_DUPLICATE_CHECK` apagado no hace nada.
+        """
+        encoding = (front_analysis.get("_raw") or {}).get("encoding")
+        if not encoding or not getattr(settings, "BIOMETRIC_DUPLICATE_CHECK", True):
+            return {"checked": False}
+
+        max_distance = float(
+            getattr(settings, "BIOMETRIC_DUPLICATE_MAX_DISTANCE", 0.45)
+        )
+        store = get_face_store()
+        try:
+            start = time.perf_counter()
+            matches = store.find_duplicates(
+                encoding, exclude_user_id=auth.user_id, max_distance=max_distance
+            )
+            search_ms = (time.perf_counter() - start) * 1000.0
+            store.register(
+                auth, encoding, provider=front_analysis.get("provider", "local")
+            )
+        except ValueError as exc:  # embedding con dimensión inesperada
+            logger.warning(f"Embedding facial inválido para {auth.id}: {exc}")
+            return {"checked": False, "error": str(exc)}
+
+        if matches:
+            logger.warning(
+                f"Posible identidad duplicada en autenticación {auth.id}: "
+                f"{len(matches)} coincidencia(s) con otros usuarios"
+            )
+        return {
+            "checked": True,
+            "suspected": bool(matches),
+            "matches": matches,
+            "max_distance": max_distance,
+            "index_size": len(store),
+            "search_ms": round(search_ms, 2),
         }
 
     def _analyze_face_coherence(
@@ -919,42 +982,26 @@ class BiometricAuthenticationService:
     def _get_document_analysis(
         self, image_data: str, document_type: str
     ) -> DocumentAnalysis:
-        """Invoca el DocumentProvider cacheando por (image_data, doc_type)."""
-        key = self._document_cache_key(image_data, document_type)
-        cached = self._document_cache.get(key)
-        if cached is not None:
-            return cached
-        analysis = self._document_provider.analyze_document(image_data, document_type)
-        if len(self._document_cache) >= _DOC_CACHE_MAX:
-            self._document_cache.pop(next(iter(self._document_cache)))
-        self._document_cache[key] = analysis
-        return analysis
-
-    @staticmethod
-    def _document_cache_key(image_data: str, document_type: str) -> str:
-        blob = f"{document_type}:{image_data or ''}".encode("utf-8", errors="ignore")
-        return hashlib.sha256(blob).hexdigest()
+        """Invoca el DocumentProvider cacheando por (contenido, doc_type)."""
+        return get_analysis_cache("document").get_or_compute(
+            self._document_provider,
+            image_data,
+            (document_type,),
+            lambda: self._document_provider.analyze_document(image_data, document_type),
+        )
 
     def _get_voice_analysis(
         self, audio_data: str, expected_text: str | None = None
     ) -> VoiceAnalysis:
-        """Invoca el VoiceProvider cacheando por (audio_data, expected_text)."""
-        key = self._voice_cache_key(audio_data, expected_text)
-        cached = self._voice_cache.get(key)
-        if cached is not None:
-            return cached
-        analysis = self._voice_provider.analyze_voice(audio_data, expected_text)
-        if len(self._voice_cache) >= _VOICE_CACHE_MAX:
-            self._voice_cache.pop(next(iter(self._voice_cache)))
-        self._voice_cache[key] = analysis
-        return analysis
-
-    @staticmethod
-    def _voice_cache_key(audio_data: str, expected_text: str | None) -> str:
-        blob = f"{expected_text or ''}::{audio_data or ''}".encode(
-            "utf-8", errors="ignore"
+        """Invoca el VoiceProvider cacheando por (contenido, expected_text)."""
+        analysis = get_analysis_cache("voice").get_or_compute(
+            self._voice_provider,
+            audio_data,
+            (expected_text,),
+            lambda: self._voice_provider.analyze_voice(audio_data, expected_text),
         )
-        return hashlib.sha256(blob).hexdigest()
+        self._last_voice_analysis = analysis
+        return analysis
 
     def _calculate_document_confidence(
         self, document_analysis: Dict, ocr_results: Dict, validation_results: Dict
@@ -994,6 +1041,9 @@ class BiometricAuthenticationService:
                 "pose_estimation": analysis.pose_estimation,
                 "provider": analysis.provider,
             }
+        except BiometricQueueFull:
+            # Saturación no es un rostro ausente: el endpoint responde 503.
+            raise
         except Exception as exc:
             logger.warning(
                 "facial_provider.analyze_face(combined) falló: %s — fallback no-detected",
@@ -1042,6 +1092,8 @@ class BiometricAuthenticationService:
             return self._facial_provider.compare_faces(
                 source_image_data, target_image_data
             )
+        except BiometricQueueFull:
+            raise
         except Exception as exc:
             logger.warning(
                 "facial_provider.compare_faces falló: %s — fallback 0.0", exc
@@ -1099,7 +1151,7 @@ class BiometricAuthenticationService:
         provider ya calculó quality/clarity/noise en el mismo llamado.
         """
         del voice_analysis
-        cached = next(iter(self._voice_cache.values()), None)
+        cached = self._last_voice_analysis
         if cached is None:
             return {
                 "score": 0.0,
@@ -1138,7 +1190,7 @@ class BiometricAuthenticationService:
         ya calculó pitch/tono/rate/uniqueness en el mismo llamado.
         """
         del voice_analysis  # shape por compat; el cache evita doble llamada
-        cached = next(iter(self._voice_cache.values()), None)
+        cached = self._last_voice_analysis
         if cached is None:
             # Nunca debería pasar si el flujo llama primero process_voice,
             # pero fallback defensivo: retorna shape vacía.
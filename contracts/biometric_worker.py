@@ -0,0 +1,393 @@
+"""Backend de ejecución biométrica fuera del worker web.
+
+Los proveedores locales (dlib para rostro, Tesseract para cédula) son
+CPU-bound y tardan segundos por captura; corriendo inline ocupan un
+hilo de gunicorn y serializan a los firmantes concurrentes por el GIL.
+Con `BIOMETRIC_EXECUTION_BACKEND = "celery"` cada llamada a un
+provider se despacha a la cola Celery dedicada `biometrics`, servida
+por un worker propio que precarga los modelos al arrancar
+(`BIOMETRIC_WORKER_WARMUP=1`, ver `contracts.tasks`).
+
+Piezas:
+
+- `submit()` registra el análisis (estado en cache, JSON), aplica
+  backpressure contra `BIOMETRIC_MAX_PENDING_ANALYSES` y encola la
+  tarea; devuelve el `analysis_id`.
+- `get_analysis()` / `wait_for()` consultan el estado (polling).
+- `QueuedFacialProvider` / `QueuedDocumentProvider` implementan las
+  interfaces `FacialProvider` / `DocumentProvider` enviando cada método
+  al worker, donde se ejecuta el provider real sin cambios. El
+  servicio biométrico no sabe si corre inline o encolado.
+- `submit_service_operation()` encola un paso completo del flujo
+  (`process_face_capture`, `process_document_verification`) para los
+  endpoints que responden 202 + `analysis_id` y dejan al cliente
+  consultar el resultado.
+
+Con el backend `inline` (default, dev/CI) nada de esto interviene.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import time
+import uuid
+from datetime import date
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .biometric_providers import (
+    DocumentAnalysis,
+    DocumentProvider,
+    FaceAnalysis,
+    FacialProvider,
+    VoiceAnalysis,
+    get_document_provider,
+    get_facial_provider,
+)
+
+logger = logging.getLogger(__name__)
+
+BIOMETRIC_QUEUE = "biometrics"
+BACKEND_INLINE = "inline"
+BACKEND_CELERY = "celery"
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_ANALYSIS_KEY = "biometric_analysis:{}"
+_PENDING_KEY = "biometric_analysis:pending"
+# Un análisis no reclamado expira; también acota la deriva del contador
+# de pendientes si un worker muere a mitad de tarea.
+_RESULT_TTL = 15 * 60
+
+# Operaciones que el worker acepta: (tipo, método).
+_PROVIDER_OPERATIONS = {
+    ("facial", "analyze_face"),
+    ("facial", "compare_faces"),
+    ("facial", "check_coherence"),
+    ("document", "analyze_document"),
+}
+_SERVICE_OPERATIONS = {
+    ("service", "process_face_capture"),
+    ("service", "process_document_verification"),
+}
+
+
+class BiometricQueueFull(Exception):
+    """Hay demasiados análisis pendientes; el cliente debe reintentar."""
+
+
+class BiometricAnalysisTimeout(Exception):
+    """El análisis no terminó dentro del tiempo de espera."""
+
+
+class BiometricAnalysisFailed(Exception):
+    """El worker ejecutó el análisis y éste lanzó una excepción."""
+
+
+def execution_backend() -> str:
+    backend = (
+        getattr(settings, "BIOMETRIC_EXECUTION_BACKEND", BACKEND_INLINE)
+        or BACKEND_INLINE
+    )
+    backend = backend.strip().lower()
+    if backend not in {BACKEND_INLINE, BACKEND_CELERY}:
+        logger.warning(
+            "BIOMETRIC_EXECUTION_BACKEND=%r no reconocido, usando inline", backend
+        )
+        return BACKEND_INLINE
+    return backend
+
+
+def resolve_facial_provider() -> FacialProvider:
+    """Provider facial para el servicio según el backend de ejecución."""
+    if execution_backend() == BACKEND_CELERY:
+        return QueuedFacialProvider()
+    return get_facial_provider()
+
+
+def resolve_document_provider() -> DocumentProvider:
+    """Provider de documento para el servicio según el backend de ejecución."""
+    if execution_backend() == BACKEND_CELERY:
+        return QueuedDocumentProvider()
+    return get_document_provider()
+
+
+# ----------------------------------------------------------------------
+# Serialización (args y resultados viajan como JSON por Celery y cache)
+# ----------------------------------------------------------------------
+
+_DATACLASSES = {
+    "FaceAnalysis": FaceAnalysis,
+    "DocumentAnalysis": DocumentAnalysis,
+    "VoiceAnalysis": VoiceAnalysis,
+}
+_DATE_FIELDS = {"date_of_birth", "expiry_date"}
+
+
+def encode(value: Any) -> Any:
+    if isinstance(value, tuple(_DATACLASSES.values())):
+        payload = {
+            f.name: encode(getattr(value, f.name)) for f in dataclasses.fields(value)
+        }
+        return {"__type__": type(value).__name__, "fields": payload}
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    return value
+
+
+def decode(value: Any) -> Any:
+    if isinstance(value, dict) and value.get("__type__") in _DATACLASSES:
+        fields = dict(value["fields"])
+        for name in _DATE_FIELDS & fields.keys():
+            if fields[name]:
+                fields[name] = date.fromisoformat(fields[name])
+        return _DATACLASSES[value["__type__"]](**fields)
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+
+# ----------------------------------------------------------------------
+# Envío, estado y espera
+# ----------------------------------------------------------------------
+
+
+def _max_pending() -> int:
+    return int(getattr(settings, "BIOMETRIC_MAX_PENDING_ANALYSES", 32))
+
+
+def pending_count() -> int:
+    return int(cache.get(_PENDING_KEY, 0) or 0)
+
+
+def _acquire_slot() -> None:
+    cache.add(_PENDING_KEY, 0, _RESULT_TTL)
+    try:
+        current = cache.incr(_PENDING_KEY)
+    except ValueError:
+        # La clave expiró entre add e incr.
+        cache.set(_PENDING_KEY, 1, _RESULT_TTL)
+        current = 1
+    if current > _max_pending():
+        _release_slot()
+        raise BiometricQueueFull(
+            f"{current - 1} análisis biométricos pendientes (máx. {_max_pending()})"
+        )
+
+
+def _release_slot() -> None:
+    try:
+        if cache.decr(_PENDING_KEY) < 0:
+            cache.set(_PENDING_KEY, 0, _RESULT_TTL)
+    except ValueError:
+        pass
+
+
+def submit(kind: str, method: str, *args: Any, owner_id: str | None = None) -> str:
+    """Encola `kind.method(*args)` en el worker biométrico; devuelve el id.
+
+    Lanza `BiometricQueueFull` si ya hay `BIOMETRIC_MAX_PENDING_ANALYSES`
+    análisis en curso (backpressure: el endpoint responde 503 y el
+    cliente reintenta, en vez de acumular segundos de cola).
+    """
+    if (kind, method) not in _PROVIDER_OPERATIONS | _SERVICE_OPERATIONS:
+        raise ValueError(f"Operación biométrica no soportada: {kind}.{method}")
+
+    _acquire_slot()
+    analysis_id = str(uuid.uuid4())
+    cache.set(
+        _ANALYSIS_KEY.format(analysis_id),
+        {
+            "analysis_id": analysis_id,
+            "status": STATUS_PENDING,
+            "operation": f"{kind}.{method}",
+            "owner_id": owner_id,
+            "submitted_at": timezone.now().isoformat(),
+        },
+        _RESULT_TTL,
+    )
+    from .tasks import run_biometric_analysis
+
+    try:
+        run_biometric_analysis.apply_async(
+            args=(analysis_id, kind, method, encode(list(args))),
+            queue=BIOMETRIC_QUEUE,
+        )
+    except Exception:
+        _release_slot()
+        cache.delete(_ANALYSIS_KEY.format(analysis_id))
+        raise
+    return analysis_id
+
+
+def submit_service_operation(method: str, *args: Any, owner_id: str) -> str:
+    """Encola un paso completo del flujo biométrico a nombre de `owner_id`."""
+    return submit("service", method, *args, owner_id=owner_id)
+
+
+def get_analysis(analysis_id: str) -> dict[str, Any] | None:
+    """Estado del análisis (`pending`/`done`/`failed`) o None si expiró."""
+    return cache.get(_ANALYSIS_KEY.format(analysis_id))
+
+
+def wait_for(analysis_id: str, timeout: float | None = None) -> Any:
+    """Bloquea hasta que el análisis termina y devuelve su resultado.
+
+    Espera con backoff corto (50 ms → 250 ms): el hilo web queda
+    dormido, sin CPU, mientras el worker biométrico procesa.
+    """
+    if timeout is None:
+        timeout = float(getattr(settings, "BIOMETRIC_ANALYSIS_TIMEOUT", 60))
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while True:
+        record = get_analysis(analysis_id)
+        if record is None:
+            raise BiometricAnalysisFailed(
+                f"Análisis {analysis_id} expirado o inexistente"
+            )
+        if record["status"] == STATUS_DONE:
+            return decode(record.get("result"))
+        if record["status"] == STATUS_FAILED:
+            raise BiometricAnalysisFailed(record.get("error") or "error desconocido")
+        if time.monotonic() >= deadline:
+            raise BiometricAnalysisTimeout(
+                f"Análisis {analysis_id} sin terminar tras {timeout:.0f}s"
+            )
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+
+
+# ----------------------------------------------------------------------
+# Lado worker
+# ----------------------------------------------------------------------
+
+
+def _execute(kind: str, method: str, args: list[Any]) -> Any:
+    if kind == "facial":
+        return getattr(get_facial_provider(), method)(*args)
+    if kind == "document":
+        return getattr(get_document_provider(), method)(*args)
+    from .biometric_service import BiometricAuthenticationService
+
+    # Dentro del worker se usan los providers reales: un servicio con
+    # providers encolados se esperaría a sí mismo.
+    service = BiometricAuthenticationService(
+        facial_provider=get_facial_provider(),
+        document_provider=get_document_provider(),
+    )
+    return getattr(service, method)(*args)
+
+
+def run_analysis(analysis_id: str, kind: str, method: str, args: list[Any]) -> None:
+    """Ejecuta el análisis y publica el resultado (lo llama la tarea Celery)."""
+    key = _ANALYSIS_KEY.format(analysis_id)
+    record = get_analysis(analysis_id) or {
+        "analysis_id": analysis_id,
+        "operation": f"{kind}.{method}",
+    }
+    started = time.perf_counter()
+    try:
+        if (kind, method) not in _PROVIDER_OPERATIONS | _SERVICE_OPERATIONS:
+            raise ValueError(f"Operación biométrica no soportada: {kind}.{method}")
+        result = _execute(kind, method, decode(args))
+        record.update(status=STATUS_DONE, result=encode(result))
+    except Exception as exc:  # noqa: BLE001 - se reporta al que espera
+        logger.exception(
+            "Análisis biométrico %s (%s.%s) falló", analysis_id, kind, method
+        )
+        record.update(status=STATUS_FAILED, error=str(exc))
+    finally:
+        record["finished_at"] = timezone.now().isoformat()
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+        cache.set(key, record, _RESULT_TTL)
+        _release_slot()
+
+
+def warm_up() -> None:
+    """Precarga providers y modelos en el proceso worker.
+
+    `face_recognition` carga los modelos dlib al importarse, OpenCV
+    inicializa sus kernels en la primera llamada y el motor OCR
+    persistente carga el modelo de idioma al crear su API; una pasada
+    sobre una imagen vacía deja ese costo fuera de la primera firma real.
+    """
+    facial = get_facial_provider()
+    document = get_document_provider()
+    if facial.is_demo() and document.is_demo():
+        return
+    try:
+        import base64
+
+        import cv2
+        import numpy as np
+
+        ok, buffer = cv2.imencode(".png", np.full((64, 64, 3), 128, dtype=np.uint8))
+        blank = base64.b64encode(buffer.tobytes()).decode("ascii")
+        if not facial.is_demo():
+            facial.analyze_face(blank, "frontal")
+        if not document.is_demo():
+            document.analyze_document(blank, "cedula_ciudadania")
+    except Exception as exc:  # noqa: BLE001 - warm-up nunca tumba el worker
+        logger.warning("Warm-up biométrico incompleto: %s", exc)
+
+
+# ----------------------------------------------------------------------
+# Providers encolados
+# ----------------------------------------------------------------------
+
+
+def _call(kind: str, method: str, *args: Any) -> Any:
+    return wait_for(submit(kind, method, *args))
+
+
+class QueuedFacialProvider(FacialProvider):
+    """`FacialProvider` que ejecuta el provider real en el worker biométrico."""
+
+    def __init__(self):
+        self.name = (
+            (getattr(settings, "BIOMETRIC_FACIAL_PROVIDER", "demo") or "demo")
+            .strip()
+            .lower()
+        )
+
+    def analyze_face(self, image_data: str, face_type: str) -> FaceAnalysis:
+        return _call("facial", "analyze_face", image_data, face_type)
+
+    def compare_faces(self, source_image: str, target_image: str) -> float:
+        return _call("facial", "compare_faces", source_image, target_image)
+
+    def check_coherence(
+        self, front: FaceAnalysis, side: FaceAnalysis
+    ) -> dict[str, float]:
+        return _call("facial", "check_coherence", front, side)
+
+    def is_demo(self) -> bool:
+        return self.name == "demo"
+
+
+class QueuedDocumentProvider(DocumentProvider):
+    """`DocumentProvider` que ejecuta el provider real en el worker biométrico."""
+
+    def __init__(self):
+        self.name = (
+            (getattr(settings, "BIOMETRIC_DOCUMENT_PROVIDER", "demo") or "demo")
+            .strip()
+            .lower()
+        )
+
+    def analyze_document(self, image_data: str, document_type: str) -> DocumentAnalysis:
+        return _call("document", "analyze_document", image_data, document_type)
+
+    def is_demo(self) -> bool:
+        return self.name == "demo"
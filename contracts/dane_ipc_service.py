@@ -10,7 +10,8 @@ Endpoint DANE (IPC mensual):
 
 Estrategia de resiliencia:
     1. Consulta la API del DANE.
-    2. Cachea el resultado 24 horas (Django cache framework).
+    2. Cachea el resultado 24 horas (Django cache framework); las
+       respuestas crudas de la API también, en el cliente HTTP compartido.
     3. Si la API no responde, usa una tasa por defecto configurable.
 """
 
@@ -21,6 +22,8 @@ from typing import Optional
 import requests
 from django.core.cache import cache
 
+from core.http_client import get_client
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -43,6 +46,9 @@ DEFAULT_IPC_RATE = Decimal("5.20")
 # Timeout para peticiones HTTP (segundos)
 REQUEST_TIMEOUT = 10
 
+# Sesión keep-alive, reintentos y circuit breaker compartidos (core.http_client).
+http = get_client("dane", timeout=(5, REQUEST_TIMEOUT))
+
 
 # ---------------------------------------------------------------------------
 # Servicio principal
@@ -189,14 +195,12 @@ class DaneIPCService:
             Lista de registros JSON o ``None`` si hubo error.
         """
         try:
-            response = requests.get(
+            data = http.get_json(
                 DANE_IPC_API_URL,
                 params=params,
-                timeout=REQUEST_TIMEOUT,
                 headers={"Accept": "application/json"},
+                cache_ttl=CACHE_TTL,
             )
-            response.raise_for_status()
-            data = response.json()
             if isinstance(data, list) and len(data) > 0:
                 return data
             logger.info("La API del DANE retornó una lista vacía. Params: %s", params)
@@ -0,0 +1,464 @@
+"""Índice de embeddings faciales para detección 1:N de identidades duplicadas.
+
+El provider local ya calcula el embedding de 128 dimensiones de la
+captura frontal (`FaceAnalysis.raw["encoding"]`), pero sólo se usaba
+para la comparación 1:1 frontal/lateral. Aquí cada embedding se guarda
+en la tabla compacta `FaceEmbedding` (512 bytes float32 por fila) y se
+busca contra todas las autenticaciones anteriores para detectar el
+mismo rostro firmando con otra cuenta (suplantación o cuentas
+duplicadas).
+
+Todo corre en el servidor (Ley 1581: los datos biométricos no salen a
+servicios externos):
+
+- `FlatIndex`: búsqueda exacta por fuerza bruta con NumPy
+  (‖x−q‖² = ‖x‖² − 2·x·q + ‖q‖², una multiplicación matriz-vector).
+- `IVFIndex`: cuantizador grueso k-means + listas invertidas; sólo
+  recorre las `nprobe` listas más cercanas (aproximado, para millones).
+- Ambos se guardan como `.npy` y se cargan con memory-map: los procesos
+  de un mismo host comparten las páginas del snapshot
+  (`BIOMETRIC_FACE_INDEX_PATH`, ver `manage.py build_face_index`).
+- `FaceEmbeddingStore` carga el snapshot y se pone al día con las filas
+  nuevas de la tabla (id incremental) antes de cada búsqueda, así que
+  todos los workers ven los registros de los demás.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 128
+_DTYPE = np.float32
+_META_FILE = "meta.json"
+_REFRESH_BATCH = 5000
+
+
+def to_bytes(vector) -> bytes:
+    """Embedding (lista o array de 128 floats) → 512 bytes float32."""
+    array = np.asarray(vector, dtype=_DTYPE).reshape(-1)
+    if array.shape != (EMBEDDING_DIM,):
+        raise ValueError(
+            f"Embedding de dimensión {array.shape[0]}, se esperaba {EMBEDDING_DIM}"
+        )
+    return array.tobytes()
+
+
+def from_bytes(raw: bytes) -> np.ndarray:
+    return np.frombuffer(bytes(raw), dtype=_DTYPE)
+
+
+@dataclass(frozen=True)
+class Match:
+    embedding_id: int
+    distance: float
+
+
+def _select(ids: np.ndarray, d2: np.ndarray, k: int, max_distance) -> list[Match]:
+    """Los `k` más cercanos (opcionalmente dentro de `max_distance`)."""
+    if max_distance is not None:
+        keep = np.flatnonzero(d2 <= max_distance * max_distance)
+        ids, d2 = ids[keep], d2[keep]
+    if len(d2) > k:
+        top = np.argpartition(d2, k)[:k]
+        ids, d2 = ids[top], d2[top]
+    order = np.argsort(d2, kind="stable")
+    return [Match(int(ids[i]), float(np.sqrt(max(float(d2[i]), 0.0)))) for i in order]
+
+
+class _GrowableMatrix:
+    """Filas float32 con capacidad amortizada (append O(1)).
+
+    Si se construye sobre un array memory-mapped (read-only), la primera
+    inserción lo copia a memoria propia.
+    """
+
+    def __init__(self, rows: np.ndarray | None = None, width: int = EMBEDDING_DIM):
+        self._data = rows if rows is not None else np.empty((0, width), dtype=_DTYPE)
+        self._size = len(self._data)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def view(self) -> np.ndarray:
+        return self._data[: self._size]
+
+    def extend(self, rows: np.ndarray) -> None:
+        needed = self._size + len(rows)
+        if needed > len(self._data) or not self._data.flags.writeable:
+            capacity = max(needed, 2 * len(self._data), 1024)
+            grown = np.empty((capacity,) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+        self._data[self._size : needed] = rows
+        self._size = needed
+
+
+class FlatIndex:
+    """Búsqueda exacta por fuerza bruta."""
+
+    kind = "flat"
+
+    def __init__(self):
+        self._vectors = _GrowableMatrix()
+        self._norms = _GrowableMatrix(np.empty((0,), dtype=_DTYPE), width=0)
+        self._ids = _GrowableMatrix(np.empty((0,), dtype=np.int64), width=0)
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def add(self, ids, vectors) -> None:
+        vectors = np.asarray(vectors, dtype=_DTYPE).reshape(-1, EMBEDDING_DIM)
+        self._vectors.extend(vectors)
+        self._norms.extend(np.einsum("ij,ij->i", vectors, vectors))
+        self._ids.extend(np.asarray(ids, dtype=np.int64))
+
+    def search(
+        self, query, k: int = 10, max_distance: float | None = None
+    ) -> list[Match]:
+        if not len(self):
+            return []
+        query = np.asarray(query, dtype=_DTYPE).reshape(EMBEDDING_DIM)
+        d2 = self._norms.view - 2.0 * (self._vectors.view @ query) + query @ query
+        return _select(self._ids.view, d2, k, max_distance)
+
+    def save(self, path: str | Path, **meta) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "vectors.npy", self._vectors.view)
+        np.save(path / "ids.npy", self._ids.view)
+        _write_meta(path, kind=self.kind, size=len(self), **meta)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> FlatIndex:
+        mode = "r" if mmap else None
+        path = Path(path)
+        index = cls()
+        vectors = np.load(path / "vectors.npy", mmap_mode=mode)
+        index._vectors = _GrowableMatrix(vectors)
+        index._ids = _GrowableMatrix(np.load(path / "ids.npy", mmap_mode=mode), 0)
+        # Las normas se recalculan (4 bytes/fila, una pasada secuencial).
+        index._norms = _GrowableMatrix(np.einsum("ij,ij->i", vectors, vectors), 0)
+        return index
+
+
+def _kmeans(sample: np.ndarray, nlist: int, iterations: int, seed: int) -> np.ndarray:
+    """Centroides k-means (Lloyd) sobre una muestra de entrenamiento."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _nearest_centroid(sample, centroids)
+        counts = np.bincount(assignment, minlength=nlist)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # Listas vacías: se re-siembran con puntos al azar de la muestra.
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty))]
+    return centroids
+
+
+def _nearest_centroid(
+    vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65536
+) -> np.ndarray:
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk):
+        block = vectors[start : start + chunk]
+        out[start : start + chunk] = np.argmin(
+            centroid_norms - 2.0 * (block @ centroids.T), axis=1
+        )
+    return out
+
+
+class IVFIndex:
+    """Listas invertidas sobre un cuantizador k-means (aproximado).
+
+    Cada vector vive en la lista de su centroide más cercano; una
+    búsqueda recorre sólo las `nprobe` listas más cercanas a la consulta,
+    es decir ~`nprobe / nlist` de la colección.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = 16):
+        self.centroids = np.asarray(centroids, dtype=_DTYPE)
+        self.nprobe = nprobe
+        self._centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        nlist = len(self.centroids)
+        self._vectors = [_GrowableMatrix() for _ in range(nlist)]
+        self._norms = [
+            _GrowableMatrix(np.empty((0,), dtype=_DTYPE), 0) for _ in range(nlist)
+        ]
+        self._ids = [
+            _GrowableMatrix(np.empty((0,), dtype=np.int64), 0) for _ in range(nlist)
+        ]
+
+    @classmethod
+    def train(
+        cls,
+        sample,
+        nlist: int,
+        nprobe: int = 16,
+        iterations: int = 10,
+        seed: int = 0,
+        max_training_points: int = 256,
+    ) -> IVFIndex:
+        """Entrena el cuantizador con hasta `max_training_points·nlist` puntos."""
+        sample = np.asarray(sample, dtype=_DTYPE).reshape(-1, EMBEDDING_DIM)
+        if len(sample) < nlist:
+            raise ValueError(f"Se necesitan al menos {nlist} vectores para entrenar")
+        limit = max_training_points * nlist
+        if len(sample) > limit:
+            rng = np.random.default_rng(seed)
+            sample = sample[rng.choice(len(sample), limit, replace=False)]
+        return cls(_kmeans(sample, nlist, iterations, seed), nprobe=nprobe)
+
+    def __len__(self) -> int:
+        return sum(len(lst) for lst in self._vectors)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def add(self, ids, vectors) -> None:
+        vectors = np.asarray(vectors, dtype=_DTYPE).reshape(-1, EMBEDDING_DIM)
+        ids = np.asarray(ids, dtype=np.int64)
+        assignment = _nearest_centroid(vectors, self.centroids)
+        order = np.argsort(assignment, kind="stable")
+        lists, starts = np.unique(assignment[order], return_index=True)
+        bounds = list(starts[1:]) + [len(order)]
+        norms = np.einsum("ij,ij->i", vectors, vectors)
+        for list_no, start, end in zip(lists, starts, bounds):
+            members = order[start:end]
+            self._vectors[list_no].extend(vectors[members])
+            self._norms[list_no].extend(norms[members])
+            self._ids[list_no].extend(ids[members])
+
+    def search(
+        self,
+        query,
+        k: int = 10,
+        max_distance: float | None = None,
+        nprobe: int | None = None,
+    ) -> list[Match]:
+        query = np.asarray(query, dtype=_DTYPE).reshape(EMBEDDING_DIM)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        coarse = self._centroid_norms - 2.0 * (self.centroids @ query)
+        probes = np.argpartition(coarse, nprobe - 1)[:nprobe]
+        ids, d2 = [], []
+        q2 = query @ query
+        for list_no in probes:
+            if not len(self._vectors[list_no]):
+                continue
+            vectors = self._vectors[list_no].view
+            d2.append(self._norms[list_no].view - 2.0 * (vectors @ query) + q2)
+            ids.append(self._ids[list_no].view)
+        if not ids:
+            return []
+        return _select(np.concatenate(ids), np.concatenate(d2), k, max_distance)
+
+    def save(self, path: str | Path, **meta) -> None:
+        """Listas concatenadas en un solo `.npy` + offsets (mmap-friendly)."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        sizes = np.array([len(lst) for lst in self._vectors], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        np.save(path / "centroids.npy", self.centroids)
+        np.save(path / "offsets.npy", offsets)
+        np.save(
+            path / "vectors.npy",
+            np.concatenate([lst.view for lst in self._vectors])
+            if len(self)
+            else np.empty((0, EMBEDDING_DIM), dtype=_DTYPE),
+        )
+        np.save(
+            path / "ids.npy",
+            np.concatenate([lst.view for lst in self._ids]).astype(np.int64),
+        )
+        _write_meta(path, kind=self.kind, size=len(self), nprobe=self.nprobe, **meta)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True, nprobe: int | None = None):
+        mode = "r" if mmap else None
+        path = Path(path)
+        meta = read_meta(path)
+        index = cls(np.load(path / "centroids.npy"), nprobe or meta.get("nprobe", 16))
+        offsets = np.load(path / "offsets.npy")
+        vectors = np.load(path / "vectors.npy", mmap_mode=mode)
+        ids = np.load(path / "ids.npy", mmap_mode=mode)
+        for list_no in range(index.nlist):
+            start, end = offsets[list_no], offsets[list_no + 1]
+            block = vectors[start:end]
+            index._vectors[list_no] = _GrowableMatrix(block)
+            index._ids[list_no] = _GrowableMatrix(ids[start:end], 0)
+            index._norms[list_no] = _GrowableMatrix(
+                np.einsum("ij,ij->i", block, block), 0
+            )
+        return index
+
+
+def _write_meta(path: Path, **meta) -> None:
+    (path / _META_FILE).write_text(json.dumps(meta))
+
+
+def read_meta(path: str | Path) -> dict:
+    return json.loads((Path(path) / _META_FILE).read_text())
+
+
+def load_index(path: str | Path, mmap: bool = True) -> FlatIndex | IVFIndex:
+    """Carga un snapshot guardado con `save()` según su `kind`."""
+    kind = read_meta(path)["kind"]
+    if kind == IVFIndex.kind:
+        return IVFIndex.load(path, mmap=mmap)
+    return FlatIndex.load(path, mmap=mmap)
+
+
+# ----------------------------------------------------------------------
+# Store respaldado por la tabla FaceEmbedding
+# ----------------------------------------------------------------------
+
+
+class FaceEmbeddingStore:
+    """Índice del proceso + sincronización incremental con `FaceEmbedding`."""
+
+    def __init__(self, snapshot_path: str | None = None):
+        self._lock = threading.Lock()
+        self._index: FlatIndex | IVFIndex = FlatIndex()
+        self._last_id = 0
+        if snapshot_path and (Path(snapshot_path) / _META_FILE).exists():
+            try:
+                self._index = load_index(snapshot_path)
+                self._last_id = int(read_meta(snapshot_path).get("last_id", 0))
+            except (OSError, ValueError, KeyError) as exc:
+                logger.warning(
+                    "Snapshot de embeddings inválido en %s (%s); se reconstruye "
+                    "desde la base de datos",
+                    snapshot_path,
+                    exc,
+                )
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def refresh(self) -> int:
+        """Agrega al índice las filas nuevas de la tabla; devuelve cuántas."""
+        from .models import FaceEmbedding
+
+        added = 0
+        with self._lock:
+            while True:
+                rows = list(
+                    FaceEmbedding.objects.filter(id__gt=self._last_id)
+                    .order_by("id")
+                    .values_list("id", "vector")[:_REFRESH_BATCH]
+                )
+                if not rows:
+                    return added
+                ids = np.fromiter((row[0] for row in rows), dtype=np.int64)
+                vectors = np.frombuffer(
+                    b"".join(bytes(row[1]) for row in rows), dtype=_DTYPE
+                )
+                self._index.add(ids, vectors)
+                self._last_id = int(ids[-1])
+                added += len(rows)
+
+    def find_duplicates(
+        self,
+        vector,
+        *,
+        exclude_user_id=None,
+        max_distance: float,
+        limit: int = 5,
+    ) -> list[dict]:
+        """Autenticaciones de OTROS usuarios con un rostro a ≤ `max_distance`."""
+        from .models import FaceEmbedding
+
+        self.refresh()
+        # Se piden más candidatos de los que se devuelven: los del mismo
+        # usuario (otros contratos) y las filas borradas se filtran abajo.
+        matches = self._index.search(vector, k=limit * 4, max_distance=max_distance)
+        if not matches:
+            return []
+        distances = {m.embedding_id: m.distance for m in matches}
+        rows = FaceEmbedding.objects.filter(id__in=distances.keys())
+        if exclude_user_id is not None:
+            rows = rows.exclude(user_id=exclude_user_id)
+        found = [
+            {
+                "authentication_id": row["authentication_id"],
+                "user_id": str(row["user_id"]),
+                "distance": round(distances[row["id"]], 4),
+            }
+            for row in rows.values("id", "authentication_id", "user_id")
+        ]
+        return sorted(found, key=lambda item: item["distance"])[:limit]
+
+    @staticmethod
+    def register(authentication, vector, provider: str = "local"):
+        """Guarda (o reemplaza) el embedding de la autenticación.
+
+        Una recaptura crea una fila nueva (id mayor) para que el refresh
+        incremental de los demás procesos la vea; la anterior se borra y
+        deja de resolverse en `find_duplicates`.
+        """
+        from .models import FaceEmbedding
+
+        FaceEmbedding.objects.filter(authentication=authentication).delete()
+        return FaceEmbedding.objects.create(
+            authentication=authentication,
+            user_id=authentication.user_id,
+            vector=to_bytes(vector),
+            provider=provider,
+        )
+
+
+_store: FaceEmbeddingStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_face_store() -> FaceEmbeddingStore:
+    """Store memoizado por proceso (snapshot en `BIOMETRIC_FACE_INDEX_PATH`)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FaceEmbeddingStore(
+                    getattr(settings, "BIOMETRIC_FACE_INDEX_PATH", "") or None
+                )
+    return _store
+
+
+def reset_face_store() -> None:
+    """Descarta el store del proceso (tests y tras reconstruir el snapshot)."""
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def write_snapshot(index: FlatIndex | IVFIndex, path: str | Path, last_id: int):
+    """Guarda el snapshot de forma atómica (directorio temporal + rename)."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    index.save(tmp, last_id=last_id)
+    if path.exists():
+        old = path.with_name(f".{path.name}.old-{os.getpid()}")
+        path.rename(old)
+        tmp.rename(path)
+        for child in old.iterdir():
+            child.unlink()
+        old.rmdir()
+    else:
+        tmp.rename(path)
@@ -4,6 +4,7 @@ Maneja tokens seguros, notificaciones por email/SMS y validación de invitacione
 Incluye sistema de seguimiento, reenvío automático y expiración de tokens
 """
 
+import logging
 import secrets
 import hashlib
 from datetime import timedelta
@@ -23,6 +24,8 @@ from .landlord_contract_models import (
 )
 from core.notification_service import NotificationService
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 
@@ -170,7 +173,7 @@ class ContractInvitationService:
                 )
 
         except Exception as e:
-            print(f"Error enviando invitación: {e}")
+            logger.error(f"Error enviando invitación: {e}")
             return False
 
     def _send_email_invitation(
@@ -202,7 +205,7 @@ class ContractInvitationService:
             return True
 
         except Exception as e:
-            print(f"Error enviando email: {e}")
+            logger.error(f"Error enviando email: {e}")
             invitation.status = "failed"
             invitation.error_message = str(e)
             invitation.save()
@@ -240,7 +243,7 @@ class ContractInvitationService:
                 return False
 
         except Exception as e:
-            print(f"Error enviando SMS: {e}")
+            logger.error(f"Error enviando SMS: {e}")
             invitation.status = "failed"
             invitation.error_message = str(e)
             invitation.save()
@@ -278,7 +281,7 @@ class ContractInvitationService:
                 return False
 
         except Exception as e:
-            print(f"Error enviando WhatsApp: {e}")
+            logger.error(f"Error enviando WhatsApp: {e}")
             invitation.status = "failed"
             invitation.error_message = str(e)
             invitation.save()
@@ -290,7 +293,7 @@ class ContractInvitationService:
         En producción integrar con Twilio, AWS SNS, etc.
         """
         # Simulación para desarrollo
-        print(f"SMS to {phone}: {message}")
+        logger.debug("SMS to %s: %s", phone, message)
         return True
 
     def _send_whatsapp(self, phone: str, message: str) -> bool:
@@ -299,7 +302,7 @@ class ContractInvitationService:
         En producción integrar con WhatsApp Business API
         """
         # Simulación para desarrollo
-        print(f"WhatsApp to {phone}: {message}")
+        logger.debug("WhatsApp to %s: %s", phone, message)
         return True
 
     def verify_invitation_token(self, token: str) -> Dict[str, Any]:
@@ -459,7 +462,7 @@ class ContractInvitationService:
             )
 
         except Exception as e:
-            print(f"Error enviando notificación de aceptación: {e}")
+            logger.error(f"Error enviando notificación de aceptación: {e}")
 
     def resend_invitation(self, contract_id: str, landlord: User) -> bool:
         """
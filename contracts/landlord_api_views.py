@@ -109,14 +109,14 @@ class LandlordContractViewSet(viewsets.ModelViewSet):
         Crear nuevo contrato con datos completos del formulario.
         Procesa todos los datos: propiedad, arrendador, términos, garantías y codeudor.
         """
-        print(f"🏠 Contract creation request from user: {request.user.email}")
-        print(f"📝 Request data keys: {list(request.data.keys())}")
-        print(f"📝 Request data: {request.data}")
+        logger.debug("🏠 Contract creation request from user: %s", request.user.email)
+        logger.debug("📝 Request data keys: %s", list(request.data.keys()))
+        logger.debug("📝 Request data: %s", request.data)
 
         serializer = self.get_serializer(data=request.data)
 
         if not serializer.is_valid():
-            print(f"❌ Serializer validation failed: {serializer.errors}")
+            logger.error(f"❌ Serializer validation failed: {serializer.errors}")
 
         serializer.is_valid(raise_exception=True)
 
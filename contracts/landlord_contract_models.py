@@ -377,12 +377,8 @@ class LandlordControlledContract(models.Model):
     created_at = models.DateTimeField("Creado el", auto_now_add=True)
     updated_at = models.DateTimeField("Actualizado el", auto_now=True)
 
-    # Datos para auditoría y logs
-    workflow_history = models.JSONField(
-        "Historial del workflow",
-        default=list,
-        help_text="Registro de cambios de estado y acciones",
-    )
+    # El historial del workflow vive en ContractWorkflowHistory
+    # (`history_entries`); ver `get_workflow_history()`.
 
     class Meta:
         verbose_name = "Contrato Controlado por Arrendador"
@@ -418,7 +414,6 @@ class LandlordControlledContract(models.Model):
                     # Campos permitidos de modificar en contratos bloqueados
                     allowed_fields = {
                         "current_state",  # Transiciones de estado (ACTIVE → EXPIRED)
-                        "workflow_history",  # Historial de auditoría (siempre se puede agregar)
                         "updated_at",  # Timestamp automático
                     }
 
@@ -494,6 +489,32 @@ class LandlordControlledContract(models.Model):
 
         return f"VH-{year}-{yearly_count:06d}"
 
+    def get_workflow_history(self):
+        """Historial con la forma del antiguo JSONField `workflow_history`.
+
+        (Método y no propiedad: `property` es un campo de este modelo.)
+        Sólo lectura; los eventos se agregan con `add_workflow_entry` /
+        `add_workflow_event`. Usa `prefetch_related("history_entries")` si
+        está disponible.
+        """
+        if self._state.adding:
+            return []
+        entries = sorted(self.history_entries.all(), key=lambda e: e.timestamp)
+        return [
+            {
+                "action": entry.action_type,
+                "description": entry.action_description,
+                "user_id": str(entry.performed_by_id)
+                if entry.performed_by_id
+                else None,
+                "old_state": entry.old_state,
+                "new_state": entry.new_state,
+                "details": entry.changes_made,
+                "timestamp": entry.timestamp.isoformat(),
+            }
+            for entry in entries
+        ]
+
     def add_workflow_entry(
         self, action: str, user: User, details: Dict[str, Any] = None
     ):
@@ -501,8 +522,7 @@ class LandlordControlledContract(models.Model):
 
         1.9.2: antes escribía al JSONField legacy ``workflow_history``. Ahora
         delega en el modelo ``ContractWorkflowHistory`` para unificar la
-        trazabilidad. El JSONField permanece en la tabla (sin escritura nueva)
-        hasta su drop diferido.
+        trazabilidad. El JSONField se eliminó en contracts 0026.
         """
         from contracts.landlord_contract_models import ContractWorkflowHistory
 
@@ -0,0 +1,417 @@
+"""Benchmark de los proveedores biométricos locales.
+
+Mide, etapa por etapa, el camino que recorre una firma en
+`BiometricAuthenticationService` con imágenes de muestra reales (no
+toca BD ni storage: sólo el análisis delegado a los providers).
+
+Uso:
+
+    # Captura facial + fase combinada (process_face_capture + compare)
+    python manage.py benchmark_biometrics face \\
+        --front muestras/frontal.jpg --side muestras/lateral.jpg \\
+        --combined muestras/cedula_y_rostro.jpg --iterations 20
+
+    # Línea base previa al pipeline: detección a resolución completa y
+    # sin reutilizar embeddings entre llamadas.
+    python manage.py benchmark_biometrics face --front ... --side ... \\
+        --detection-max-side 0 --cold
+
+    # OCR de cédula: docs/s por núcleo con el motor persistente y ROI...
+    python manage.py benchmark_biometrics ocr --image muestras/cedula.jpg
+
+    # ...frente al camino anterior (un proceso tesseract por documento y
+    # OCR de la imagen completa).
+    python manage.py benchmark_biometrics ocr --image muestras/cedula.jpg \\
+        --engine pytesseract --no-roi
+
+    # Índice 1:N de embeddings: latencia y recall@k (IVF vs exacto) con
+    # embeddings sintéticos (4 capturas por identidad).
+    python manage.py benchmark_biometrics index --size 1000000 \\
+        --nlist 1024 --nprobe 8 --nprobe 16 --nprobe 32
+
+`face` requiere opencv + face_recognition; `ocr` requiere opencv +
+Tesseract (los mismos de los providers `local`); `index` sólo NumPy.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import mimetypes
+import os
+import statistics
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _data_url(path: str) -> str:
+    file_path = Path(path)
+    if not file_path.is_file():
+        raise CommandError(f"No existe la imagen de muestra: {path}")
+    mime = mimetypes.guess_type(file_path.name)[0] or "image/jpeg"
+    encoded = base64.b64encode(file_path.read_bytes()).decode("ascii")
+    return f"data:{mime};base64,{encoded}"
+
+
+class StageTimer:
+    """Acumula duraciones (ms) por etapa a lo largo de las iteraciones."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def measure(self, stage: str, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.samples[stage].append((time.perf_counter() - start) * 1000.0)
+        return result
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        report = {}
+        for stage, values in self.samples.items():
+            ordered = sorted(values)
+            p95_index = min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))
+            report[stage] = {
+                "n": len(ordered),
+                "mean_ms": round(statistics.fmean(ordered), 2),
+                "p50_ms": round(statistics.median(ordered), 2),
+                "p95_ms": round(ordered[p95_index], 2),
+            }
+        return report
+
+
+class Command(BaseCommand):
+    help = "Benchmark de los proveedores biométricos locales con imágenes de muestra."
+
+    def add_arguments(self, parser):
+        targets = parser.add_subparsers(dest="target", required=True)
+
+        face = self._add_target(
+            targets, "face", "process_face_capture + comparación de la fase combinada"
+        )
+        face.add_argument("--front", required=True, help="Imagen frontal de muestra")
+        face.add_argument("--side", required=True, help="Imagen lateral de muestra")
+        face.add_argument(
+            "--combined",
+            help="Imagen documento+rostro (default: la frontal)",
+        )
+        face.add_argument(
+            "--detection-max-side",
+            type=int,
+            default=None,
+            help="Lado mayor para detección; 0 = resolución completa "
+            "(default: BIOMETRIC_DETECTION_MAX_SIDE).",
+        )
+        face.add_argument(
+            "--cold",
+            action="store_true",
+            help="Provider nuevo por iteración (sin embeddings memoizados).",
+        )
+
+        ocr = self._add_target(
+            targets, "ocr", "analyze_document de LocalDocumentProvider por etapa"
+        )
+        ocr.add_argument(
+            "--image",
+            action="append",
+            required=True,
+            help="Imagen de cédula de muestra (repetible).",
+        )
+        ocr.add_argument(
+            "--document-type", default="cedula_ciudadania", help="Tipo esperado"
+        )
+        ocr.add_argument(
+            "--engine",
+            choices=["auto", "tesserocr", "pytesseract"],
+            default=None,
+            help="Motor OCR (default: BIOMETRIC_OCR_ENGINE).",
+        )
+        ocr.add_argument(
+            "--no-roi",
+            action="store_true",
+            help="OCR de la imagen completa, sin localizar la tarjeta.",
+        )
+
+        index = self._add_target(
+            targets, "index", "búsqueda 1:N en el índice de embeddings faciales"
+        )
+        index.add_argument(
+            "--size", type=int, default=1_000_000, help="Embeddings indexados"
+        )
+        index.add_argument(
+            "--queries", type=int, default=200, help="Consultas por configuración"
+        )
+        index.add_argument("--k", type=int, default=10, help="Vecinos por consulta")
+        index.add_argument(
+            "--nlist", type=int, default=1024, help="Listas IVF (0 = sólo exacto)"
+        )
+        index.add_argument(
+            "--nprobe",
+            type=int,
+            action="append",
+            help="Listas recorridas (repetible; default: 8, 16, 32).",
+        )
+        index.add_argument(
+            "--max-distance",
+            type=float,
+            default=0.45,
+            help="Umbral de duplicado (default: 0.45, como el servicio).",
+        )
+        index.add_argument("--seed", type=int, default=0)
+
+    @staticmethod
+    def _add_target(targets, name: str, help_text: str):
+        target = targets.add_parser(name, help=help_text)
+        target.add_argument(
+            "--iterations", type=int, default=10, help="Repeticiones (default: 10)"
+        )
+        target.add_argument(
+            "--json", action="store_true", help="Salida JSON (útil para comparar runs)."
+        )
+        return target
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations debe ser >= 1")
+        handler = getattr(self, f"_bench_{options['target']}")
+        report = handler(options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"═══ {report['title']} ═══"))
+        for key, value in report.get("config", {}).items():
+            self.stdout.write(f"  {key}: {value}")
+        self.stdout.write("")
+        self.stdout.write(
+            f"  {'etapa':<28}{'n':>5}{'mean ms':>12}{'p50 ms':>12}{'p95 ms':>12}"
+        )
+        for stage, stats in report["stages"].items():
+            self.stdout.write(
+                f"  {stage:<28}{stats['n']:>5}{stats['mean_ms']:>12}"
+                f"{stats['p50_ms']:>12}{stats['p95_ms']:>12}"
+            )
+
+    # ------------------------------------------------------------------
+    # Targets
+    # ------------------------------------------------------------------
+
+    def _bench_face(self, options) -> dict:
+        from django.conf import settings
+
+        try:
+            from contracts.biometric_providers.local import LocalFacialProvider
+        except ImportError as exc:
+            raise CommandError(
+                f"Faltan dependencias del provider local (opencv/face_recognition): {exc}"
+            ) from exc
+        from contracts.biometric_providers import (
+            DemoDocumentProvider,
+            DemoVoiceProvider,
+        )
+        from contracts.biometric_service import BiometricAuthenticationService
+
+        max_side = options["detection_max_side"]
+        if max_side is None:
+            max_side = getattr(settings, "BIOMETRIC_DETECTION_MAX_SIDE", 640)
+        max_side = max_side or None
+
+        front = _data_url(options["front"])
+        side = _data_url(options["side"])
+        combined = _data_url(options["combined"]) if options["combined"] else front
+        # La fase combinada relee la frontal de disco: llega sin prefijo data-url.
+        front_from_disk = front.split(",", 1)[1]
+
+        timer = StageTimer()
+        provider = LocalFacialProvider(detection_max_side=max_side)
+        for _ in range(options["iterations"]):
+            if options["cold"]:
+                provider = LocalFacialProvider(detection_max_side=max_side)
+            service = BiometricAuthenticationService(
+                facial_provider=provider,
+                document_provider=DemoDocumentProvider(),
+                voice_provider=DemoVoiceProvider(),
+            )
+            start = time.perf_counter()
+            front_analysis = timer.measure(
+                "analyze_front", service._process_face_image, front, "frontal"
+            )
+            side_analysis = timer.measure(
+                "analyze_side", service._process_face_image, side, "lateral"
+            )
+            timer.measure(
+                "coherence",
+                service._analyze_face_coherence,
+                front_analysis,
+                side_analysis,
+            )
+            timer.samples["process_face_capture"].append(
+                (time.perf_counter() - start) * 1000.0
+            )
+            timer.measure(
+                "analyze_combined", service._extract_face_from_combined, combined
+            )
+            timer.measure(
+                "compare_faces", service._compare_faces, front_from_disk, combined
+            )
+            timer.samples["total"].append((time.perf_counter() - start) * 1000.0)
+
+        return {
+            "title": "Biometría facial local",
+            "config": {
+                "iterations": options["iterations"],
+                "detection_max_side": max_side or "full",
+                "cold": options["cold"],
+                "front_face_detected": front_analysis["face_detected"],
+                "side_face_detected": side_analysis["face_detected"],
+            },
+            "stages": timer.summary(),
+        }
+
+    def _bench_ocr(self, options) -> dict:
+        from django.conf import settings
+
+        try:
+            from contracts.biometric_providers._ocr_engine import get_ocr_engine
+            from contracts.biometric_providers.local_document import (
+                LocalDocumentProvider,
+            )
+        except ImportError as exc:
+            raise CommandError(
+                f"Faltan dependencias del provider local (opencv): {exc}"
+            ) from exc
+
+        preference = options["engine"] or getattr(
+            settings, "BIOMETRIC_OCR_ENGINE", "auto"
+        )
+        try:
+            engine = get_ocr_engine(preference)
+            # La carga del modelo es costo de arranque del worker, no del
+            # documento: queda fuera de la medición.
+            engine.warm_up()
+        except Exception as exc:
+            raise CommandError(f"No se pudo inicializar Tesseract: {exc}") from exc
+        provider = LocalDocumentProvider(engine, roi=not options["no_roi"])
+        images = [_data_url(path) for path in options["image"]]
+
+        timer = StageTimer()
+        modes: dict[str, int] = defaultdict(int)
+        documents = 0
+        wall_start = time.perf_counter()
+        cpu_start = os.times()
+        for _ in range(options["iterations"]):
+            for image in images:
+                start = time.perf_counter()
+                analysis = provider.analyze_document(image, options["document_type"])
+                timer.samples["total"].append((time.perf_counter() - start) * 1000.0)
+                for stage, elapsed in analysis.raw.get("timings_ms", {}).items():
+                    timer.samples[stage].append(elapsed)
+                modes[analysis.raw.get("ocr_mode", analysis.raw.get("reason"))] += 1
+                documents += 1
+        wall = time.perf_counter() - wall_start
+        cpu_end = os.times()
+        # CPU propia + de hijos: con pytesseract el trabajo ocurre en el
+        # subproceso `tesseract`, que process_time() no vería.
+        cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+        cpu += (cpu_end.children_user - cpu_start.children_user) + (
+            cpu_end.children_system - cpu_start.children_system
+        )
+
+        return {
+            "title": "OCR de cédula local",
+            "config": {
+                "iterations": options["iterations"],
+                "images": len(images),
+                "engine": engine.name,
+                "roi": not options["no_roi"],
+                "modes": dict(modes),
+                "last_document_number": analysis.document_number,
+                "docs_per_second": round(documents / wall, 2),
+                "docs_per_core_second": round(documents / cpu, 2) if cpu else None,
+            },
+            "stages": timer.summary(),
+        }
+
+    def _bench_index(self, options) -> dict:
+        import numpy as np
+
+        from contracts.face_index import EMBEDDING_DIM, FlatIndex, IVFIndex
+
+        size, k = options["size"], options["k"]
+        nprobes = options["nprobe"] or [8, 16, 32]
+        rng = np.random.default_rng(options["seed"])
+        # Embeddings dlib: dos personas distintas quedan a ~0.9-1.0 de
+        # distancia euclídea y dos capturas de la misma a ~0.3-0.4.
+        identities = max(1, size // 4)
+        centers = rng.normal(0, 0.06, (identities, EMBEDDING_DIM)).astype(np.float32)
+
+        def captures(owners):
+            noise = rng.normal(0, 0.025, (len(owners), EMBEDDING_DIM))
+            return (centers[owners] + noise).astype(np.float32)
+
+        timer = StageTimer()
+        flat = FlatIndex()
+        ivf = None
+        chunk = 100_000
+        build_start = time.perf_counter()
+        for start in range(0, size, chunk):
+            ids = np.arange(start, min(size, start + chunk))
+            vectors = captures(ids % identities)
+            flat.add(ids, vectors)
+            if options["nlist"]:
+                if ivf is None:
+                    ivf = timer.measure(
+                        "ivf_train", IVFIndex.train, vectors, nlist=options["nlist"]
+                    )
+                timer.measure("ivf_add_100k", ivf.add, ids, vectors)
+        build_seconds = time.perf_counter() - build_start
+
+        queries = captures(rng.integers(0, min(identities, size), options["queries"]))
+        max_distance = options["max_distance"]
+        exact, duplicates = [], []
+        for _ in range(options["iterations"]):
+            found = [timer.measure("flat_search", flat.search, q, k) for q in queries]
+        exact = [{m.embedding_id for m in matches} for matches in found]
+        # Lo que importa para el chequeo 1:N: las capturas de la misma
+        # identidad (dentro del umbral), no los vecinos lejanos del top-k.
+        duplicates = [
+            {m.embedding_id for m in matches if m.distance <= max_distance}
+            for matches in found
+        ]
+
+        recall = {}
+        for nprobe in nprobes if ivf is not None else []:
+            for _ in range(options["iterations"]):
+                found = [
+                    timer.measure(
+                        f"ivf_search_nprobe{nprobe}", ivf.search, q, k, None, nprobe
+                    )
+                    for q in queries
+                ]
+            ids = [{m.embedding_id for m in matches} for matches in found]
+            hits = sum(len(truth & got) for truth, got in zip(exact, ids))
+            dup_hits = sum(len(truth & got) for truth, got in zip(duplicates, ids))
+            recall[f"recall@{k}_nprobe{nprobe}"] = round(
+                hits / max(1, sum(map(len, exact))), 4
+            )
+            recall[f"duplicate_recall_nprobe{nprobe}"] = round(
+                dup_hits / max(1, sum(map(len, duplicates))), 4
+            )
+
+        return {
+            "title": "Índice 1:N de embeddings faciales",
+            "config": {
+                "size": size,
+                "queries": options["queries"],
+                "k": k,
+                "max_distance": max_distance,
+                "nlist": options["nlist"] or "-",
+                "index_mb": round(size * EMBEDDING_DIM * 4 / 2**20, 1),
+                "build_seconds": round(build_seconds, 2),
+                **recall,
+            },
+            "stages": timer.summary(),
+        }
@@ -0,0 +1,247 @@
+"""Costo de activar un contrato con muchas órdenes de pago en el año.
+
+Al pasar un `LandlordControlledContract` a ACTIVE la señal
+`generate_payment_schedule_on_activation` materializa el plan completo
+(una cuota y una orden por mes). Se miden dos modos sobre una tabla de
+órdenes precargada con ``--existing`` filas del año en curso:
+
+- ``per-row``: el camino previo, mes a mes, con un COUNT(*) de las
+  órdenes del año para armar cada consecutivo y un INSERT por cuota,
+  orden y evento;
+- ``bulk``: la señal actual (bulk_create + bloque de consecutivos).
+
+Todo corre dentro de una transacción que se revierte al final.
+
+Uso:
+
+    python manage.py benchmark_contract_activation
+    python manage.py benchmark_contract_activation --months 60 \\
+        --existing 1000000 --json
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from contracts.landlord_contract_models import LandlordControlledContract
+from contracts.models import Contract
+from contracts.signals import _add_months
+from payments.models import (
+    PaymentInstallment,
+    PaymentOrder,
+    PaymentOrderEvent,
+    PaymentOrderSequence,
+    PaymentPlan,
+    RentPaymentSchedule,
+)
+from properties.models import Property
+
+RENT = Decimal("1500000")
+BATCH = 10_000
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mide la activación de un contrato: plan mes a mes vs bulk_create."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=60,
+            help="Duración del contrato en meses (default: 60).",
+        )
+        parser.add_argument(
+            "--existing",
+            type=int,
+            default=1_000_000,
+            help="Órdenes de pago ya emitidas en el año (default: 1000000).",
+        )
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+
+    def handle(self, *args, **options):
+        months, existing = options["months"], options["existing"]
+        if months < 1 or existing < 0:
+            raise CommandError("Se requiere --months >= 1 y --existing >= 0")
+        report = {}
+        try:
+            with transaction.atomic():
+                report = self._run(months, existing)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"═══ Activación de un contrato de {months} meses "
+                f"({existing} órdenes en el año) ═══"
+            )
+        )
+        for mode in ("per-row", "bulk"):
+            row = report[mode]
+            self.stdout.write(
+                f"  {mode:<8} {row['seconds']:>9.3f} s  queries {row['queries']}"
+            )
+        self.stdout.write(f"  bulk ×{report['speedup']:.0f}")
+
+    def _run(self, months: int, existing: int) -> dict:
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        landlord, tenant = (
+            User.objects.create_user(
+                email=f"bench-{role}-{suffix}@verihome.test",
+                password=None,
+                first_name="Bench",
+                last_name=role,
+                user_type=role,
+            )
+            for role in ("landlord", "tenant")
+        )
+        self._preload(existing, landlord, tenant)
+        start = date(timezone.now().year, 1, 1)
+        end = _add_months(start, months) - timedelta(days=1)
+
+        legacy = self._contract(landlord, tenant, start, end)
+        with CaptureQueriesContext(connection) as queries:
+            began = time.perf_counter()
+            self._per_row(legacy, months)
+            per_row = time.perf_counter() - began
+        per_row_queries = len(queries)
+
+        contract = self._contract(landlord, tenant, start, end)
+        contract.current_state = "ACTIVE"
+        with CaptureQueriesContext(connection) as queries:
+            began = time.perf_counter()
+            contract.save()
+            bulk = time.perf_counter() - began
+        if (
+            PaymentOrder.objects.filter(rent_schedule__contract=contract.pk).count()
+            != months
+        ):
+            raise CommandError("La activación no generó una orden por mes")
+
+        return {
+            "months": months,
+            "existing_orders": existing,
+            "per-row": {"seconds": per_row, "queries": per_row_queries},
+            "bulk": {"seconds": bulk, "queries": len(queries)},
+            "speedup": per_row / bulk if bulk else 0.0,
+        }
+
+    def _preload(self, existing: int, landlord, tenant) -> None:
+        (first,) = PaymentOrderSequence.reserve(1)
+        year, number = first.split("-")[1], int(first.rsplit("-", 1)[1])
+        for offset in range(0, existing, BATCH):
+            PaymentOrder.objects.bulk_create(
+                PaymentOrder(
+                    order_number=f"PO-{year}-{number + n:08d}",
+                    order_type="service",
+                    payer=tenant,
+                    payee=landlord,
+                    created_by=landlord,
+                    amount=RENT,
+                    date_due=date.today(),
+                )
+                for n in range(offset, min(offset + BATCH, existing))
+            )
+        PaymentOrderSequence.objects.filter(year=int(year)).update(
+            last_number=number + existing
+        )
+
+    def _contract(self, landlord, tenant, start, end):
+        prop = Property.objects.create(
+            landlord=landlord,
+            title="Benchmark",
+            description="x",
+            property_type="apartment",
+            listing_type="rent",
+            rent_price=RENT,
+            total_area=60,
+            bedrooms=2,
+            bathrooms=1,
+            city="Bucaramanga",
+            state="Santander",
+            address="X",
+        )
+        contract = LandlordControlledContract.objects.create(
+            landlord=landlord,
+            tenant=tenant,
+            property=prop,
+            current_state="DRAFT",
+            start_date=start,
+            end_date=end,
+            economic_terms={"monthly_rent": str(RENT)},
+        )
+        Contract.objects.create(
+            id=contract.id,
+            primary_party=landlord,
+            secondary_party=tenant,
+            property=prop,
+            contract_type="rental_urban",
+            title="Benchmark",
+            monthly_rent=RENT,
+            start_date=start,
+            end_date=end,
+        )
+        return contract
+
+    def _per_row(self, contract, months: int) -> None:
+        """Camino previo de la señal: una cuota y una orden por mes."""
+        legacy = Contract.objects.get(pk=contract.pk)
+        schedule = RentPaymentSchedule.objects.create(
+            contract=legacy,
+            tenant=contract.tenant,
+            landlord=contract.landlord,
+            rent_amount=RENT,
+            due_date=contract.start_date.day,
+            start_date=contract.start_date,
+            end_date=contract.end_date,
+        )
+        plan = PaymentPlan.objects.create(
+            user=contract.tenant,
+            plan_name="Benchmark",
+            total_amount=RENT * months,
+            installment_amount=RENT,
+            number_of_installments=months,
+            frequency="monthly",
+            start_date=contract.start_date,
+            end_date=contract.end_date,
+        )
+        year = timezone.now().year
+        current = contract.start_date
+        for n in range(1, months + 1):
+            installment = PaymentInstallment.objects.create(
+                payment_plan=plan, installment_number=n, amount=RENT, due_date=current
+            )
+            count = PaymentOrder.objects.filter(created_at__year=year).count() + 1
+            order = PaymentOrder.objects.create(
+                order_number=f"PO-{year}-B{count:08d}",
+                order_type="rent",
+                payer=contract.tenant,
+                payee=contract.landlord,
+                created_by=contract.landlord,
+                amount=RENT,
+                date_due=current,
+                rent_schedule=schedule,
+                installment=installment,
+            )
+            PaymentOrderEvent.objects.create(
+                order=order, event_type="auto_generated", actor=contract.landlord
+            )
+            current = _add_months(current, 1)
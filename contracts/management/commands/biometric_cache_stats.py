@@ -0,0 +1,58 @@
+"""Métricas de la cache de análisis biométricos.
+
+Los contadores se agregan en el cache compartido (Redis) desde todos los
+procesos web y del worker biométrico.
+
+Uso:
+
+    python manage.py biometric_cache_stats
+    python manage.py biometric_cache_stats --json
+    python manage.py biometric_cache_stats --reset
+"""
+
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from contracts.biometric_cache import EVENTS, NAMESPACES, get_analysis_cache
+
+
+class Command(BaseCommand):
+    help = "Muestra hits/misses de la cache de análisis biométricos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+        parser.add_argument(
+            "--reset", action="store_true", help="Pone los contadores en cero."
+        )
+
+    def handle(self, *args, **options):
+        caches = {namespace: get_analysis_cache(namespace) for namespace in NAMESPACES}
+        if options["reset"]:
+            for analysis_cache in caches.values():
+                analysis_cache.reset_shared_stats()
+            self.stdout.write(self.style.SUCCESS("Contadores reiniciados."))
+            return
+
+        report = {
+            namespace: analysis_cache.shared_stats()
+            for namespace, analysis_cache in caches.items()
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING("═══ Cache de análisis biométricos ═══")
+        )
+        columns = (*EVENTS, "hit_ratio")
+        self.stdout.write(
+            f"  {'tipo':<10}" + "".join(f"{column:>13}" for column in columns)
+        )
+        for namespace, stats in report.items():
+            self.stdout.write(
+                f"  {namespace:<10}"
+                + "".join(f"{stats[column]:>13}" for column in columns)
+            )
@@ -0,0 +1,166 @@
+"""Construye el snapshot memory-mapped del índice de embeddings faciales.
+
+Los procesos (gunicorn / worker biométrico) cargan el snapshot de
+`BIOMETRIC_FACE_INDEX_PATH` con mmap al primer uso y luego sólo leen de
+la tabla `FaceEmbedding` las filas posteriores al snapshot. Reconstruirlo
+periódicamente (p.ej. nocturno) mantiene corto ese arranque.
+
+Uso:
+
+    # Índice exacto (fuerza bruta)
+    python manage.py build_face_index
+
+    # Índice IVF para colecciones grandes (~sqrt(N) listas)
+    python manage.py build_face_index --nlist 1024 --nprobe 16
+
+    # Primero poblar la tabla con los embeddings ya guardados en
+    # BiometricAuthentication.facial_analysis (autenticaciones previas)
+    python manage.py build_face_index --backfill
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from contracts.face_index import (
+    EMBEDDING_DIM,
+    FlatIndex,
+    IVFIndex,
+    to_bytes,
+    write_snapshot,
+)
+from contracts.models import BiometricAuthentication, FaceEmbedding
+
+_BATCH = 5000
+
+
+class Command(BaseCommand):
+    help = "Construye el snapshot del índice de embeddings faciales (1:N)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Directorio del snapshot (default: BIOMETRIC_FACE_INDEX_PATH).",
+        )
+        parser.add_argument(
+            "--nlist",
+            type=int,
+            default=0,
+            help="Listas IVF; 0 = índice exacto de fuerza bruta (default).",
+        )
+        parser.add_argument(
+            "--nprobe",
+            type=int,
+            default=16,
+            help="Listas IVF recorridas por búsqueda (default: 16).",
+        )
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Crea FaceEmbedding desde facial_analysis de autenticaciones previas.",
+        )
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+
+    def handle(self, *args, **options):
+        output = options["output"] or getattr(settings, "BIOMETRIC_FACE_INDEX_PATH", "")
+        if not output:
+            raise CommandError("Definir --output o BIOMETRIC_FACE_INDEX_PATH")
+
+        report = {"backfilled": self._backfill() if options["backfill"] else 0}
+
+        start = time.perf_counter()
+        ids, vectors = self._load_embeddings()
+        if options["nlist"]:
+            if len(vectors) < options["nlist"]:
+                raise CommandError(
+                    f"{len(vectors)} embeddings no alcanzan para {options['nlist']} "
+                    "listas IVF; usar menos listas o el índice exacto"
+                )
+            index = IVFIndex.train(
+                vectors, nlist=options["nlist"], nprobe=options["nprobe"]
+            )
+        else:
+            index = FlatIndex()
+        index.add(ids, vectors)
+        last_id = int(ids[-1]) if len(ids) else 0
+        write_snapshot(index, output, last_id=last_id)
+
+        report.update(
+            {
+                "path": output,
+                "kind": index.kind,
+                "size": len(index),
+                "last_id": last_id,
+                "build_seconds": round(time.perf_counter() - start, 2),
+            }
+        )
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING("═══ Índice de embeddings ═══"))
+        for key, value in report.items():
+            self.stdout.write(f"  {key}: {value}")
+        self.stdout.write(
+            self.style.SUCCESS("Snapshot escrito; los procesos lo cargan al reiniciar.")
+        )
+
+    @staticmethod
+    def _load_embeddings() -> tuple[np.ndarray, np.ndarray]:
+        ids: list[int] = []
+        chunks: list[bytes] = []
+        last_id = 0
+        while True:
+            rows = list(
+                FaceEmbedding.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "vector")[:_BATCH]
+            )
+            if not rows:
+                break
+            ids.extend(row[0] for row in rows)
+            chunks.extend(bytes(row[1]) for row in rows)
+            last_id = rows[-1][0]
+        vectors = np.frombuffer(b"".join(chunks), dtype=np.float32)
+        return (
+            np.asarray(ids, dtype=np.int64),
+            vectors.reshape(-1, EMBEDDING_DIM),
+        )
+
+    @staticmethod
+    def _backfill() -> int:
+        pending = (
+            BiometricAuthentication.objects.filter(face_embedding__isnull=True)
+            .only("id", "user_id", "facial_analysis")
+            .order_by("id")
+        )
+        batch: list[FaceEmbedding] = []
+        created = 0
+        for auth in pending.iterator(chunk_size=500):
+            front = (auth.facial_analysis or {}).get("front_analysis") or {}
+            encoding = (front.get("_raw") or {}).get("encoding")
+            if not encoding:
+                continue
+            try:
+                vector = to_bytes(encoding)
+            except ValueError:
+                continue
+            batch.append(
+                FaceEmbedding(
+                    authentication_id=auth.id,
+                    user_id=auth.user_id,
+                    vector=vector,
+                    provider=front.get("provider", "local"),
+                )
+            )
+            if len(batch) >= 500:
+                created += len(FaceEmbedding.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            created += len(FaceEmbedding.objects.bulk_create(batch))
+        return created
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("contracts", "0024_bio_1_9_2_backfill_workflow_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FaceEmbedding",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "vector",
+                    models.BinaryField(max_length=512, verbose_name="Embedding"),
+                ),
+                (
+                    "provider",
+                    models.CharField(
+                        default="local", max_length=30, verbose_name="Proveedor"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Creado el"),
+                ),
+                (
+                    "authentication",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="face_embedding",
+                        to="contracts.biometricauthentication",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="face_embeddings",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Embedding Facial",
+                "verbose_name_plural": "Embeddings Faciales",
+            },
+        ),
+    ]
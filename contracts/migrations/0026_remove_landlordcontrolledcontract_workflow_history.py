@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Drop diferido del JSONField legacy `workflow_history`.
+
+    Sin escrituras desde 1.9.2; su contenido se copió a
+    ContractWorkflowHistory en 0024.
+    `LandlordControlledContract.get_workflow_history()` conserva la lectura.
+    """
+
+    dependencies = [
+        ('contracts', '0025_face_embedding'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='landlordcontrolledcontract',
+            name='workflow_history',
+        ),
+    ]
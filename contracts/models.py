@@ -1149,6 +1149,35 @@ class BiometricAuthentication(models.Model):
         return (completed_steps / total_steps) * 100
 
 
+class FaceEmbedding(models.Model):
+    """Embedding facial (128 float32) de la captura frontal de una autenticación.
+
+    Tabla compacta (512 bytes por fila) para la búsqueda 1:N de
+    identidades duplicadas en `contracts.face_index`. El id incremental
+    permite que cada proceso sincronice su índice sólo con las filas
+    nuevas. Nunca sale del servidor (Ley 1581).
+    """
+
+    authentication = models.OneToOneField(
+        BiometricAuthentication,
+        on_delete=models.CASCADE,
+        related_name="face_embedding",
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="face_embeddings"
+    )
+    vector = models.BinaryField("Embedding", max_length=512)
+    provider = models.CharField("Proveedor", max_length=30, default="local")
+    created_at = models.DateTimeField("Creado el", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Embedding Facial"
+        verbose_name_plural = "Embeddings Faciales"
+
+    def __str__(self):
+        return f"Embedding facial - autenticación {self.authentication_id}"
+
+
 class ContractDocument(models.Model):
     """Documentos adicionales relacionados con contratos."""
 
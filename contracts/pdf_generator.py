@@ -10,6 +10,7 @@ Características:
 - Número de páginas dinámico
 """
 
+import logging
 import os
 import io
 import base64
@@ -19,6 +20,8 @@ from typing import Dict, Any, List
 from django.conf import settings
 from django.core.files.base import ContentFile
 
+logger = logging.getLogger(__name__)
+
 # Importar modelos de cláusulas editables (Sistema Control Molecular)
 try:
     from .clause_models import ContractTypeTemplate
@@ -496,7 +499,7 @@ class ProfessionalPageTemplate(PageTemplate):
             # Devolver la imagen PIL directamente
             return img
         except Exception as e:
-            print(f"Error generando QR: {e}")
+            logger.error(f"Error generando QR: {e}")
             return None
 
     def _draw_watermark(self, canvas):
@@ -3584,7 +3587,7 @@ class ContractPDFGenerator:
 
             return ReportLabImage(img_buffer, width=1.5 * inch, height=1.5 * inch)
         except Exception as e:
-            print(f"Error generando QR grande: {e}")
+            logger.error(f"Error generando QR grande: {e}")
             return None
 
     def _to_num(self, value, default=0):
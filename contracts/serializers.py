@@ -2,6 +2,7 @@
 Serializers para la aplicación de contratos de VeriHome.
 """
 
+import logging
 from rest_framework import serializers
 from django.utils import timezone
 from .models import (
@@ -17,6 +18,8 @@ from .models import (
     BiometricAuthentication,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class ContractTemplateSerializer(serializers.ModelSerializer):
     """Serializer para plantillas de contratos."""
@@ -115,7 +118,7 @@ class ContractSerializer(serializers.ModelSerializer):
                 }
         except Exception as e:
             # Log el error pero no fallar la serialización
-            print(f"Error en get_property: {e}")
+            logger.error(f"Error en get_property: {e}")
         return None
 
     def get_landlord(self, obj):
@@ -131,7 +134,7 @@ class ContractSerializer(serializers.ModelSerializer):
                     "user_type": getattr(user, "user_type", None),
                 }
         except Exception as e:
-            print(f"Error en get_landlord: {e}")
+            logger.error(f"Error en get_landlord: {e}")
         return None
 
     def get_tenant(self, obj):
@@ -147,7 +150,7 @@ class ContractSerializer(serializers.ModelSerializer):
                     "user_type": getattr(user, "user_type", None),
                 }
         except Exception as e:
-            print(f"Error en get_tenant: {e}")
+            logger.error(f"Error en get_tenant: {e}")
         return None
 
     def create(self, validated_data):
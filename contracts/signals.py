@@ -6,6 +6,10 @@ generar automáticamente:
 - N PaymentInstallment (uno por mes desde start_date hasta end_date)
 - N PaymentOrder enlazadas a cada installment (consecutivo PO-YYYY-NNNNNNNN)
 
+El plan completo se arma en memoria y se guarda con bulk_create dentro
+de la misma transacción; los consecutivos se reservan en un solo bloque
+(`PaymentOrderSequence.reserve`).
+
 El receptor es idempotente: si ya existe schedule para el contrato, no
 duplica nada.
 """
@@ -95,6 +99,8 @@ def generate_payment_schedule_on_activation(sender, instance, created, **kwargs)
         RentPaymentSchedule,
         PaymentInstallment,
         PaymentOrder,
+        PaymentOrderEvent,
+        PaymentOrderSequence,
         PaymentPlan,
     )
 
@@ -166,50 +172,65 @@ def generate_payment_schedule_on_activation(sender, instance, created, **kwargs)
             status="active",
         )
 
-        # 3. Crear N PaymentInstallment + PaymentOrder por cada mes
-        installments_created = []
-        current = date(
-            instance.start_date.year, instance.start_date.month, instance.start_date.day
-        )
-        for n in range(1, plan.number_of_installments + 1):
-            installment = PaymentInstallment.objects.create(
-                payment_plan=plan,
-                installment_number=n,
-                amount=monthly_rent,
-                due_date=current,
-                status="pending",
+        # 3. Armar en memoria N PaymentInstallment + PaymentOrder (una por
+        # mes) y persistirlas con bulk_create: un INSERT por tabla y un
+        # bloque contiguo de consecutivos, en vez de un COUNT(*) por orden.
+        total = plan.number_of_installments
+        installments = []
+        current = instance.start_date
+        for n in range(1, total + 1):
+            installments.append(
+                PaymentInstallment(
+                    payment_plan=plan,
+                    installment_number=n,
+                    amount=monthly_rent,
+                    due_date=current,
+                    status="pending",
+                )
+            )
+            current = _add_months(current, 1)
+        PaymentInstallment.objects.bulk_create(installments)
+
+        orders = []
+        numbers = PaymentOrderSequence.reserve(total)
+        for n, (installment, number) in enumerate(zip(installments, numbers), 1):
+            grace_end = installment.due_date + timedelta(
+                days=schedule.grace_period_days
             )
-            grace_end = current + timedelta(days=schedule.grace_period_days)
             max_overdue = grace_end + timedelta(days=schedule.legal_grace_days_max)
-            order = PaymentOrder.objects.create(
-                order_type="rent",
-                payer=tenant,
-                payee=landlord,
-                created_by=landlord,
-                amount=monthly_rent,
-                date_due=current,
-                date_grace_end=grace_end,
-                date_max_overdue=max_overdue,
-                rent_schedule=schedule,
-                installment=installment,
-                description=f"Canon mes {n}/{plan.number_of_installments} · contrato {instance.id}",
-                status="pending",
+            orders.append(
+                PaymentOrder(
+                    order_number=number,
+                    order_type="rent",
+                    payer=tenant,
+                    payee=landlord,
+                    created_by=landlord,
+                    amount=monthly_rent,
+                    date_due=installment.due_date,
+                    date_grace_end=grace_end,
+                    date_max_overdue=max_overdue,
+                    rent_schedule=schedule,
+                    installment=installment,
+                    description=f"Canon mes {n}/{total} · contrato {instance.id}",
+                    status="pending",
+                )
             )
-            order.add_audit_event(
-                "auto_generated",
-                f"Generada automáticamente al activar contrato {instance.id}",
+        PaymentOrder.objects.bulk_create(orders)
+        PaymentOrderEvent.objects.bulk_create(
+            PaymentOrderEvent(
+                order=order,
+                event_type="auto_generated",
+                message=f"Generada automáticamente al activar contrato {instance.id}",
                 actor=landlord,
-                save=False,
             )
-            order.save()
-            installments_created.append(installment)
-            current = _add_months(current, 1)
+            for order in orders
+        )
 
         logger.info(
             "Contrato %s activado: generadas %d installments y %d PaymentOrders.",
             instance.id,
-            len(installments_created),
-            len(installments_created),
+            len(installments),
+            len(orders),
         )
 
 
@@ -3,6 +3,7 @@ Tareas asíncronas de Celery para el módulo de contratos de VeriHome.
 """
 
 from celery import shared_task
+from celery.signals import worker_process_init
 from celery.utils.log import get_task_logger
 
 logger = get_task_logger(__name__)
@@ -186,3 +187,33 @@ def check_biometric_expiration():
     except Exception:
         logger.exception("Error ejecutando check_biometric_expiration")
         raise
+
+
+@shared_task(acks_late=True)
+def run_biometric_analysis(analysis_id, kind, method, args):
+    """
+    Ejecuta un análisis biométrico (provider facial/documento o un paso
+    completo del flujo) en el worker de la cola `biometrics`.
+
+    El estado y el resultado quedan en cache bajo el `analysis_id`;
+    ver `contracts.biometric_worker`.
+    """
+    from contracts.biometric_worker import run_analysis
+
+    run_analysis(analysis_id, kind, method, args)
+
+
+@worker_process_init.connect
+def warm_biometric_models(**kwargs):
+    """Precarga los modelos biométricos en cada proceso del worker dedicado.
+
+    Sólo actúa con `BIOMETRIC_WORKER_WARMUP=1` (el contenedor
+    `celery_biometrics`); los workers generales no cargan dlib.
+    """
+    from django.conf import settings
+
+    if not getattr(settings, "BIOMETRIC_WORKER_WARMUP", False):
+        return
+    from contracts.biometric_worker import warm_up
+
+    warm_up()
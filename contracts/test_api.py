@@ -9,6 +9,7 @@ and permission checks.
 import uuid
 from datetime import date, timedelta
 from decimal import Decimal
+from unittest import mock
 
 from django.test import TestCase, override_settings
 from django.utils import timezone
@@ -496,6 +497,66 @@ class BiometricAuthenticationAPITests(APITestCase):
         )
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def _make_in_progress_auth(self):
+        return BiometricAuthentication.objects.create(
+            contract=self.contract,
+            user=self.tenant,
+            status="in_progress",
+            document_type="cedula_ciudadania",
+            voice_text="Texto de prueba",
+            expires_at=timezone.now() + timedelta(hours=1),
+            ip_address="127.0.0.1",
+            user_agent="TestAgent/1.0",
+        )
+
+    @mock.patch("contracts.tasks.run_biometric_analysis.apply_async")
+    def test_face_capture_async_returns_analysis_id(self, apply_async):
+        """async=true encola el paso y el dueño puede consultar su estado."""
+        self._make_in_progress_auth()
+        self.client.force_authenticate(user=self.tenant)
+        url = f"/api/v1/contracts/{self.contract.id}/auth/face-capture/"
+        resp = self.client.post(
+            url,
+            {
+                "face_front_image": "data:image/png;base64,aGVsbG8=",
+                "face_side_image": "data:image/png;base64,aGVsbG8=",
+                "async": True,
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs["queue"], "biometrics")
+
+        poll = self.client.get(resp.json()["status_url"])
+        self.assertEqual(poll.status_code, status.HTTP_200_OK)
+        self.assertEqual(poll.json()["status"], "pending")
+
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(
+            self.client.get(resp.json()["status_url"]).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    @override_settings(BIOMETRIC_MAX_PENDING_ANALYSES=0)
+    @mock.patch("contracts.tasks.run_biometric_analysis.apply_async")
+    def test_face_capture_async_queue_full_returns_503(self, apply_async):
+        self._make_in_progress_auth()
+        self.client.force_authenticate(user=self.tenant)
+        url = f"/api/v1/contracts/{self.contract.id}/auth/face-capture/"
+        resp = self.client.post(
+            url,
+            {
+                "face_front_image": "data:image/png;base64,aGVsbG8=",
+                "face_side_image": "data:image/png;base64,aGVsbG8=",
+                "async": True,
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(resp["Retry-After"], "5")
+        apply_async.assert_not_called()
+
 
 @override_settings(CACHES=_TEST_CACHES)
 class ContractPDFPreviewAPITests(APITestCase):
@@ -0,0 +1,250 @@
+"""Tests de la cache de análisis biométricos (`contracts.biometric_cache`).
+
+El nivel compartido corre sobre LocMem: dos `BiometricAnalysisCache`
+del mismo namespace hacen de dos workers de gunicorn que comparten el
+cache `default`.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from contracts import biometric_cache
+from contracts.biometric_cache import (
+    _TTLLRU,
+    BiometricAnalysisCache,
+    get_analysis_cache,
+    reset_analysis_caches,
+)
+from contracts.biometric_providers import (
+    DemoDocumentProvider,
+    DemoVoiceProvider,
+    DocumentAnalysis,
+    FaceAnalysis,
+)
+from contracts.biometric_service import BiometricAuthenticationService
+
+_LOCMEM = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "biometric-analysis-cache-tests",
+    }
+}
+
+_IMAGE = base64.b64encode(b"\x89PNG captura de prueba").decode()
+_OTHER_IMAGE = base64.b64encode(b"\x89PNG otra captura").decode()
+
+
+def _provider(name="local", analysis=None):
+    provider = mock.MagicMock()
+    provider.name = name
+    provider.analyze_document.return_value = analysis or DocumentAnalysis(
+        document_detected=True, document_number="1098765432", provider=name
+    )
+    return provider
+
+
+class TTLLRUTests(SimpleTestCase):
+    def test_least_recently_used_is_evicted(self):
+        lru = _TTLLRU(maxsize=2, ttl=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        self.assertEqual(lru.set("c", 3), 1)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual((lru.get("a"), lru.get("c")), (1, 3))
+
+    def test_entries_expire(self):
+        lru = _TTLLRU(maxsize=2, ttl=10)
+        with mock.patch.object(biometric_cache.time, "monotonic", return_value=100.0):
+            lru.set("a", 1)
+        with mock.patch.object(biometric_cache.time, "monotonic", return_value=111.0):
+            self.assertIsNone(lru.get("a"))
+        self.assertEqual(len(lru), 0)
+
+
+class CacheKeyTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = BiometricAnalysisCache("document")
+        self.provider = _provider()
+
+    def test_data_url_and_plain_base64_share_key(self):
+        self.assertEqual(
+            self.cache.key_for(self.provider, f"data:image/png;base64,{_IMAGE}", "cc"),
+            self.cache.key_for(self.provider, _IMAGE, "cc"),
+        )
+
+    def test_parameters_and_provider_are_part_of_key(self):
+        key = self.cache.key_for(self.provider, _IMAGE, "cedula_ciudadania")
+        self.assertNotEqual(key, self.cache.key_for(self.provider, _IMAGE, "pasaporte"))
+        self.assertNotEqual(
+            key, self.cache.key_for(_provider("aws"), _IMAGE, "cedula_ciudadania")
+        )
+        self.assertNotEqual(
+            key, self.cache.key_for(self.provider, _OTHER_IMAGE, "cedula_ciudadania")
+        )
+
+    def test_uncacheable_inputs(self):
+        self.assertIsNone(self.cache.key_for(self.provider, "no-es-base64!", "cc"))
+        self.assertIsNone(self.cache.key_for(mock.MagicMock(), _IMAGE, "cc"))
+        disabled = BiometricAnalysisCache("document", ttl=0)
+        self.assertIsNone(disabled.key_for(self.provider, _IMAGE, "cc"))
+
+
+@override_settings(CACHES=_LOCMEM)
+class SharedTierTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.provider = _provider()
+
+    def _lookup(self, analysis_cache, image=_IMAGE):
+        return analysis_cache.get_or_compute(
+            self.provider,
+            image,
+            ("cedula_ciudadania",),
+            lambda: self.provider.analyze_document(image, "cedula_ciudadania"),
+        )
+
+    def test_other_worker_reuses_analysis(self):
+        worker_a = BiometricAnalysisCache("document")
+        worker_b = BiometricAnalysisCache("document")
+        first = self._lookup(worker_a)
+        second = self._lookup(worker_b)
+        self._lookup(worker_b)
+
+        self.provider.analyze_document.assert_called_once()
+        self.assertIsInstance(second, DocumentAnalysis)
+        self.assertEqual(second.document_number, first.document_number)
+        self.assertEqual(worker_a.stats()["misses"], 1)
+        self.assertEqual(worker_a.stats()["stores"], 1)
+        self.assertEqual(worker_b.stats()["hits_shared"], 1)
+        self.assertEqual(worker_b.stats()["hits_local"], 1)
+
+        shared = worker_a.shared_stats()
+        self.assertEqual((shared["misses"], shared["hits_shared"]), (1, 1))
+        self.assertEqual(shared["hit_ratio"], round(2 / 3, 4))
+
+    def test_oversize_entries_stay_local(self):
+        self.provider.analyze_document.return_value = DocumentAnalysis(
+            provider="local", raw={"lines": ["x" * 100] * 50}
+        )
+        worker_a = BiometricAnalysisCache("document", max_entry_bytes=1024)
+        worker_b = BiometricAnalysisCache("document", max_entry_bytes=1024)
+        self._lookup(worker_a)
+        self._lookup(worker_a)
+        self._lookup(worker_b)
+
+        self.assertEqual(self.provider.analyze_document.call_count, 2)
+        self.assertEqual(worker_a.stats()["oversize"], 1)
+        self.assertEqual(worker_a.stats()["hits_local"], 1)
+
+    def test_shared_tier_can_be_disabled(self):
+        self._lookup(BiometricAnalysisCache("document", shared_max_entries=0))
+        self._lookup(BiometricAnalysisCache("document", shared_max_entries=0))
+        self.assertEqual(self.provider.analyze_document.call_count, 2)
+
+    def test_redis_index_trims_least_recently_used(self):
+        redis = mock.MagicMock()
+        pipe = redis.pipeline.return_value
+        pipe.execute.return_value = [1, True, 0, 5]
+        redis.zpopmin.return_value = [(b"biometric_cache:viejo", 1.0), (b"otro", 2.0)]
+        analysis_cache = BiometricAnalysisCache("document", shared_max_entries=3)
+        cache.set("biometric_cache:viejo", "x")
+
+        with mock.patch.object(analysis_cache, "_redis", return_value=redis):
+            self._lookup(analysis_cache)
+
+        self.assertEqual(redis.zpopmin.call_args.args[1], 2)
+        self.assertIsNone(cache.get("biometric_cache:viejo"))
+        self.assertEqual(analysis_cache.stats()["evictions"], 2)
+
+    def test_redis_errors_do_not_break_analysis(self):
+        analysis_cache = BiometricAnalysisCache("document")
+        with mock.patch.object(
+            analysis_cache, "_redis", side_effect=ConnectionError("redis caído")
+        ):
+            result = self._lookup(analysis_cache)
+        self.assertEqual(result.document_number, "1098765432")
+
+
+@override_settings(CACHES=_LOCMEM)
+class ServiceIntegrationTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset_analysis_caches()
+        self.addCleanup(reset_analysis_caches)
+
+    def test_document_is_analyzed_once_across_service_instances(self):
+        provider = _provider()
+        for _ in range(2):
+            service = BiometricAuthenticationService(
+                facial_provider=mock.MagicMock(), document_provider=provider
+            )
+            service._process_document_image(_IMAGE, "cedula_ciudadania")
+            service._extract_document_info(_IMAGE, "cedula_ciudadania")
+        provider.analyze_document.assert_called_once_with(_IMAGE, "cedula_ciudadania")
+
+    def test_face_analysis_is_cached_per_face_type(self):
+        provider = mock.MagicMock()
+        provider.name = "local"
+        provider.analyze_face.return_value = FaceAnalysis(
+            face_detected=True,
+            quality_score=0.9,
+            liveness_score=0.9,
+            provider="local",
+            raw={"encoding": [0.1]},
+        )
+        service = BiometricAuthenticationService(
+            facial_provider=provider, document_provider=DemoDocumentProvider()
+        )
+        first = service._process_face_image(_IMAGE, "front")
+        second = service._process_face_image(_IMAGE, "front")
+        service._process_face_image(_IMAGE, "side")
+
+        self.assertEqual(provider.analyze_face.call_count, 2)
+        self.assertEqual(first["_raw"], second["_raw"])
+        self.assertIsNot(first["_raw"], second["_raw"])
+
+    def test_voice_helpers_use_last_analysis(self):
+        service = BiometricAuthenticationService(
+            facial_provider=mock.MagicMock(),
+            document_provider=DemoDocumentProvider(),
+            voice_provider=DemoVoiceProvider(),
+        )
+        self.assertFalse(service._analyze_audio_quality({})["acceptable"])
+        service._process_voice_recording(_IMAGE)
+        self.assertEqual(service._analyze_audio_quality({})["score"], 0.84)
+
+    @override_settings(BIOMETRIC_ANALYSIS_CACHE_TTL=0)
+    def test_disabled_by_settings(self):
+        provider = _provider()
+        service = BiometricAuthenticationService(
+            facial_provider=mock.MagicMock(), document_provider=provider
+        )
+        service._process_document_image(_IMAGE, "cedula_ciudadania")
+        service._extract_document_info(_IMAGE, "cedula_ciudadania")
+        self.assertEqual(provider.analyze_document.call_count, 2)
+
+    def test_stats_command(self):
+        provider = _provider()
+        service = BiometricAuthenticationService(
+            facial_provider=mock.MagicMock(), document_provider=provider
+        )
+        service._process_document_image(_IMAGE, "cedula_ciudadania")
+        service._extract_document_info(_IMAGE, "cedula_ciudadania")
+
+        out = StringIO()
+        call_command("biometric_cache_stats", "--json", stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["document"]["misses"], 1)
+        self.assertEqual(report["document"]["hits_local"], 1)
+
+        call_command("biometric_cache_stats", "--reset", stdout=StringIO())
+        self.assertEqual(get_analysis_cache("document").shared_stats()["misses"], 0)
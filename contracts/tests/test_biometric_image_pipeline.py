@@ -0,0 +1,117 @@
+"""Tests del pipeline de imagen compartido por los providers locales.
+
+Sólo requiere opencv (no dlib): decodificación única, digest por bytes,
+reducción para detección con re-escalado de cajas y la LRU.
+"""
+
+from __future__ import annotations
+
+import base64
+import unittest
+
+from django.test import SimpleTestCase
+
+try:
+    import cv2
+    import numpy as np
+
+    from contracts.biometric_providers._image_pipeline import (
+        LRUCache,
+        decode_capture,
+        downscale,
+        payload_bytes,
+        rescale_box,
+    )
+
+    CV_AVAILABLE = True
+except ImportError:
+    CV_AVAILABLE = False
+
+
+def _png_bytes(image) -> bytes:
+    ok, buffer = cv2.imencode(".png", image)
+    assert ok
+    return buffer.tobytes()
+
+
+@unittest.skipUnless(CV_AVAILABLE, "requiere opencv")
+class DecodeCaptureTests(SimpleTestCase):
+    def setUp(self):
+        self.image = np.full((60, 80, 3), (10, 20, 30), dtype=np.uint8)
+        self.raw = _png_bytes(self.image)
+        self.b64 = base64.b64encode(self.raw).decode()
+
+    def test_invalid_payload_returns_none(self):
+        self.assertIsNone(decode_capture("esto-no-es-base64!!"))
+        self.assertIsNone(decode_capture(""))
+        self.assertIsNone(payload_bytes(""))
+
+    def test_non_image_bytes_return_none(self):
+        self.assertIsNone(decode_capture(base64.b64encode(b"not an image").decode()))
+
+    def test_data_url_and_plain_base64_share_digest(self):
+        plain = decode_capture(self.b64)
+        data_url = decode_capture("data:image/png;base64," + self.b64)
+        self.assertEqual(plain.digest, data_url.digest)
+        self.assertEqual(plain.shape, (60, 80))
+
+    def test_derived_views_are_memoized(self):
+        capture = decode_capture(self.b64)
+        self.assertIs(capture.gray, capture.gray)
+        self.assertIs(capture.rgb, capture.rgb)
+        self.assertEqual(tuple(capture.rgb[0, 0]), (30, 20, 10))
+
+
+@unittest.skipUnless(CV_AVAILABLE, "requiere opencv")
+class DownscaleTests(SimpleTestCase):
+    def test_small_image_is_untouched(self):
+        image = np.zeros((300, 400, 3), dtype=np.uint8)
+        small, scale = downscale(image, 640)
+        self.assertIs(small, image)
+        self.assertEqual(scale, 1.0)
+
+    def test_none_disables_downscaling(self):
+        image = np.zeros((3000, 4000), dtype=np.uint8)
+        small, scale = downscale(image, None)
+        self.assertIs(small, image)
+        self.assertEqual(scale, 1.0)
+
+    def test_large_image_longest_side_is_capped(self):
+        image = np.zeros((3000, 4000, 3), dtype=np.uint8)
+        small, scale = downscale(image, 640)
+        self.assertEqual(small.shape[:2], (480, 640))
+        self.assertAlmostEqual(scale, 0.16)
+
+    def test_rescale_box_round_trip(self):
+        box = (48, 320, 128, 240)
+        self.assertEqual(rescale_box(box, 0.16, (3000, 4000)), (300, 2000, 800, 1500))
+
+    def test_rescale_box_clamps_to_image(self):
+        self.assertEqual(
+            rescale_box((-2, 650, 490, -1), 0.16, (3000, 4000)),
+            (0, 4000, 3000, 0),
+        )
+
+    def test_rescale_box_identity_scale(self):
+        box = (1, 2, 3, 4)
+        self.assertIs(rescale_box(box, 1.0, (10, 10)), box)
+
+
+@unittest.skipUnless(CV_AVAILABLE, "requiere opencv")
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" pasa a ser el menos reciente
+        cache.set("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_none_values_are_cached(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("no-face", None)
+        self.assertIn("no-face", cache)
+        self.assertIsNone(cache.get("no-face", "miss"))
+        self.assertEqual(cache.get("other", "miss"), "miss")
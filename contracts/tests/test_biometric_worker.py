@@ -0,0 +1,174 @@
+"""Tests del backend de ejecución biométrica (cola `biometrics`).
+
+La tarea Celery se reemplaza por una ejecución síncrona de
+`run_analysis` (o por un no-op para simular un worker ocupado), de modo
+que se prueba el ciclo completo submit → estado en cache → resultado
+sin broker.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from contracts import biometric_worker
+from contracts.biometric_providers import (
+    DemoDocumentProvider,
+    DemoFacialProvider,
+    DocumentAnalysis,
+    FaceAnalysis,
+)
+from contracts.biometric_service import BiometricAuthenticationService
+from contracts.biometric_worker import (
+    BiometricAnalysisFailed,
+    BiometricAnalysisTimeout,
+    BiometricQueueFull,
+    QueuedDocumentProvider,
+    QueuedFacialProvider,
+)
+
+_LOCMEM = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "biometric-worker-tests",
+    }
+}
+
+
+def _run_inline(args, queue):
+    biometric_worker.run_analysis(*args)
+
+
+@override_settings(CACHES=_LOCMEM)
+class _WorkerTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch(
+            "contracts.tasks.run_biometric_analysis.apply_async",
+            side_effect=_run_inline,
+        )
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class SerializationTests(SimpleTestCase):
+    def test_face_analysis_round_trip(self):
+        analysis = DemoFacialProvider().analyze_face("x", "frontal")
+        self.assertEqual(
+            biometric_worker.decode(biometric_worker.encode(analysis)), analysis
+        )
+
+    def test_document_analysis_dates_round_trip(self):
+        analysis = DocumentAnalysis(
+            document_detected=True,
+            document_number="1098765432",
+            date_of_birth=date(1990, 5, 17),
+            provider="local",
+        )
+        encoded = biometric_worker.encode(analysis)
+        self.assertEqual(encoded["fields"]["date_of_birth"], "1990-05-17")
+        self.assertEqual(biometric_worker.decode(encoded), analysis)
+
+
+class QueuedProviderTests(_WorkerTestCase):
+    def test_facial_methods_run_real_provider_in_worker(self):
+        provider = QueuedFacialProvider()
+        demo = DemoFacialProvider()
+
+        front = provider.analyze_face("img", "frontal")
+        self.assertIsInstance(front, FaceAnalysis)
+        self.assertEqual(front, demo.analyze_face("img", "frontal"))
+        self.assertEqual(provider.compare_faces("a", "b"), demo.compare_faces("a", "b"))
+        self.assertEqual(
+            provider.check_coherence(front, front), demo.check_coherence(front, front)
+        )
+        self.assertEqual(self.apply_async.call_count, 3)
+        self.assertEqual(biometric_worker.pending_count(), 0)
+
+    def test_document_provider(self):
+        result = QueuedDocumentProvider().analyze_document("img", "cedula_ciudadania")
+        self.assertEqual(
+            result,
+            DemoDocumentProvider().analyze_document("img", "cedula_ciudadania"),
+        )
+
+    def test_provider_exception_surfaces_as_failed(self):
+        with (
+            mock.patch.object(
+                DemoFacialProvider, "compare_faces", side_effect=RuntimeError("boom")
+            ),
+            self.assertRaisesMessage(BiometricAnalysisFailed, "boom"),
+        ):
+            QueuedFacialProvider().compare_faces("a", "b")
+        self.assertEqual(biometric_worker.pending_count(), 0)
+
+
+class SubmitTests(_WorkerTestCase):
+    def test_unknown_operation_is_rejected(self):
+        with self.assertRaises(ValueError):
+            biometric_worker.submit("facial", "delete_everything")
+        self.apply_async.assert_not_called()
+
+    def test_service_operation_records_owner_and_result(self):
+        with mock.patch.object(
+            BiometricAuthenticationService,
+            "process_face_capture",
+            return_value={"success": True, "face_confidence_score": 0.9},
+        ) as process:
+            analysis_id = biometric_worker.submit_service_operation(
+                "process_face_capture", "auth-1", "front", "side", owner_id="user-1"
+            )
+        process.assert_called_once_with("auth-1", "front", "side")
+        record = biometric_worker.get_analysis(analysis_id)
+        self.assertEqual(record["status"], biometric_worker.STATUS_DONE)
+        self.assertEqual(record["owner_id"], "user-1")
+        self.assertEqual(record["result"]["face_confidence_score"], 0.9)
+
+    @override_settings(BIOMETRIC_MAX_PENDING_ANALYSES=2)
+    def test_backpressure_when_queue_is_full(self):
+        self.apply_async.side_effect = None  # worker ocupado: nada termina
+        first = biometric_worker.submit("facial", "compare_faces", "a", "b")
+        biometric_worker.submit("facial", "compare_faces", "a", "b")
+        with self.assertRaises(BiometricQueueFull):
+            biometric_worker.submit("facial", "compare_faces", "a", "b")
+        self.assertEqual(biometric_worker.pending_count(), 2)
+
+        # Al terminar un análisis se libera un cupo.
+        biometric_worker.run_analysis(first, "facial", "compare_faces", ["a", "b"])
+        biometric_worker.submit("facial", "compare_faces", "a", "b")
+
+    def test_broker_error_releases_slot(self):
+        self.apply_async.side_effect = ConnectionError("broker down")
+        with self.assertRaises(ConnectionError):
+            biometric_worker.submit("facial", "compare_faces", "a", "b")
+        self.assertEqual(biometric_worker.pending_count(), 0)
+
+    def test_wait_for_times_out_while_pending(self):
+        self.apply_async.side_effect = None
+        analysis_id = biometric_worker.submit("facial", "compare_faces", "a", "b")
+        with self.assertRaises(BiometricAnalysisTimeout):
+            biometric_worker.wait_for(analysis_id, timeout=0)
+
+    def test_wait_for_expired_analysis(self):
+        with self.assertRaises(BiometricAnalysisFailed):
+            biometric_worker.wait_for("no-existe", timeout=0)
+
+
+class BackendSelectionTests(SimpleTestCase):
+    @override_settings(BIOMETRIC_EXECUTION_BACKEND="celery")
+    def test_celery_backend_wires_queued_providers(self):
+        service = BiometricAuthenticationService()
+        self.assertIsInstance(service._facial_provider, QueuedFacialProvider)
+        self.assertIsInstance(service._document_provider, QueuedDocumentProvider)
+
+    @override_settings(BIOMETRIC_EXECUTION_BACKEND="inline")
+    def test_inline_backend_uses_providers_directly(self):
+        service = BiometricAuthenticationService()
+        self.assertNotIsInstance(service._facial_provider, QueuedFacialProvider)
+
+    @override_settings(BIOMETRIC_EXECUTION_BACKEND="kubernetes")
+    def test_unknown_backend_falls_back_to_inline(self):
+        self.assertEqual(biometric_worker.execution_backend(), "inline")
@@ -0,0 +1,291 @@
+"""Tests del índice 1:N de embeddings faciales (`contracts.face_index`)."""
+
+from __future__ import annotations
+
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from contracts.biometric_providers import FaceAnalysis
+from contracts.biometric_service import BiometricAuthenticationService
+from contracts.face_index import (
+    EMBEDDING_DIM,
+    FaceEmbeddingStore,
+    FlatIndex,
+    IVFIndex,
+    load_index,
+    reset_face_store,
+    to_bytes,
+    write_snapshot,
+)
+from contracts.models import BiometricAuthentication, Contract, FaceEmbedding
+
+User = get_user_model()
+
+
+def _vectors(n, seed=0):
+    return (
+        np.random.default_rng(seed)
+        .normal(0, 0.06, (n, EMBEDDING_DIM))
+        .astype(np.float32)
+    )
+
+
+def _brute_force(vectors, query, k):
+    distances = np.linalg.norm(vectors - query, axis=1)
+    return list(np.argsort(distances)[:k])
+
+
+class FlatIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.vectors = _vectors(500)
+        self.index = FlatIndex()
+        self.index.add(np.arange(500), self.vectors)
+
+    def test_matches_brute_force(self):
+        query = self.vectors[42] + 0.001
+        found = self.index.search(query, k=5)
+        self.assertEqual(
+            [m.embedding_id for m in found], _brute_force(self.vectors, query, 5)
+        )
+        self.assertEqual(found[0].embedding_id, 42)
+        self.assertAlmostEqual(
+            found[0].distance, float(np.linalg.norm(self.vectors[42] - query)), 4
+        )
+
+    def test_max_distance_filters_far_vectors(self):
+        found = self.index.search(self.vectors[7], k=10, max_distance=0.05)
+        self.assertEqual([m.embedding_id for m in found], [7])
+
+    def test_empty_index(self):
+        self.assertEqual(FlatIndex().search(self.vectors[0]), [])
+
+    def test_incremental_add_grows_past_initial_capacity(self):
+        index = FlatIndex()
+        for start in range(0, 500, 100):
+            index.add(np.arange(start, start + 100), self.vectors[start : start + 100])
+        self.assertEqual(len(index), 500)
+        self.assertEqual(index.search(self.vectors[499], k=1)[0].embedding_id, 499)
+
+    def test_snapshot_round_trip_is_memory_mapped_and_appendable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_snapshot(self.index, f"{tmp}/faces", last_id=499)
+            loaded = load_index(f"{tmp}/faces")
+            self.assertIsInstance(loaded._vectors.view, np.memmap)
+            self.assertEqual(loaded.search(self.vectors[3], k=1)[0].embedding_id, 3)
+
+            extra = _vectors(1, seed=9)
+            loaded.add([1000], extra)
+            self.assertEqual(loaded.search(extra[0], k=1)[0].embedding_id, 1000)
+            self.assertEqual(len(loaded), 501)
+
+    def test_rejects_wrong_dimension(self):
+        with self.assertRaises(ValueError):
+            to_bytes([0.1] * 64)
+
+
+class IVFIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.vectors = _vectors(2000)
+        self.index = IVFIndex.train(self.vectors, nlist=16, nprobe=4)
+        self.index.add(np.arange(2000), self.vectors)
+
+    def test_probing_every_list_is_exact(self):
+        query = self.vectors[10] + 0.002
+        found = self.index.search(query, k=5, nprobe=16)
+        self.assertEqual(
+            [m.embedding_id for m in found], _brute_force(self.vectors, query, 5)
+        )
+
+    def test_near_duplicate_found_with_few_probes(self):
+        found = self.index.search(self.vectors[1234] + 0.001, k=1, nprobe=2)
+        self.assertEqual(found[0].embedding_id, 1234)
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_snapshot(self.index, f"{tmp}/faces", last_id=1999)
+            loaded = load_index(f"{tmp}/faces")
+            self.assertIsInstance(loaded, IVFIndex)
+            self.assertEqual(len(loaded), 2000)
+            self.assertEqual(loaded.nprobe, 4)
+            self.assertEqual(
+                loaded.search(self.vectors[5], k=1)[0].embedding_id,
+                self.index.search(self.vectors[5], k=1)[0].embedding_id,
+            )
+
+    def test_training_needs_enough_vectors(self):
+        with self.assertRaises(ValueError):
+            IVFIndex.train(self.vectors[:8], nlist=16)
+
+
+def _make_auth(user, landlord):
+    contract = Contract.objects.create(
+        contract_type="rental_urban",
+        primary_party=landlord,
+        secondary_party=user,
+        title="Contrato",
+        description="Contrato de prueba",
+        content="Contenido",
+        start_date=date.today(),
+        end_date=date.today() + timedelta(days=365),
+        monthly_rent=Decimal("1500000.00"),
+        security_deposit=Decimal("1500000.00"),
+    )
+    return BiometricAuthentication.objects.create(
+        contract=contract,
+        user=user,
+        status="in_progress",
+        document_type="cedula_ciudadania",
+        voice_text="Texto de prueba",
+        expires_at=timezone.now() + timedelta(hours=1),
+        ip_address="127.0.0.1",
+        user_agent="TestAgent/1.0",
+    )
+
+
+class _StoreTestCase(TestCase):
+    def setUp(self):
+        reset_face_store()
+        self.addCleanup(reset_face_store)
+        self.landlord = User.objects.create_user(
+            email="face_landlord@verihome.co", password="x", user_type="landlord"
+        )
+        self.alice = User.objects.create_user(
+            email="face_alice@verihome.co", password="x", user_type="tenant"
+        )
+        self.bob = User.objects.create_user(
+            email="face_bob@verihome.co", password="x", user_type="tenant"
+        )
+        self.face = _vectors(1, seed=1)[0]
+        self.other_face = _vectors(1, seed=2)[0]
+
+
+class FaceEmbeddingStoreTests(_StoreTestCase):
+    def test_finds_same_face_registered_by_another_user(self):
+        store = FaceEmbeddingStore()
+        alice_auth = _make_auth(self.alice, self.landlord)
+        store.register(alice_auth, self.face)
+
+        matches = store.find_duplicates(
+            self.face + 0.001, exclude_user_id=self.bob.id, max_distance=0.45
+        )
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["authentication_id"], alice_auth.id)
+        self.assertEqual(matches[0]["user_id"], str(self.alice.id))
+
+    def test_own_previous_authentications_are_not_duplicates(self):
+        store = FaceEmbeddingStore()
+        store.register(_make_auth(self.alice, self.landlord), self.face)
+        self.assertEqual(
+            store.find_duplicates(
+                self.face, exclude_user_id=self.alice.id, max_distance=0.45
+            ),
+            [],
+        )
+
+    def test_different_face_is_not_a_duplicate(self):
+        store = FaceEmbeddingStore()
+        store.register(_make_auth(self.alice, self.landlord), self.face)
+        self.assertEqual(
+            store.find_duplicates(
+                self.other_face, exclude_user_id=self.bob.id, max_distance=0.45
+            ),
+            [],
+        )
+
+    def test_other_processes_see_new_rows_incrementally(self):
+        reader = FaceEmbeddingStore()
+        reader.refresh()
+        FaceEmbeddingStore.register(_make_auth(self.alice, self.landlord), self.face)
+        self.assertEqual(reader.refresh(), 1)
+        self.assertEqual(reader.refresh(), 0)
+        self.assertEqual(len(reader), 1)
+
+    def test_recapture_replaces_embedding(self):
+        store = FaceEmbeddingStore()
+        auth = _make_auth(self.alice, self.landlord)
+        store.register(auth, self.face)
+        store.refresh()
+        store.register(auth, self.other_face)
+        self.assertEqual(FaceEmbedding.objects.filter(authentication=auth).count(), 1)
+        # El vector viejo sigue en el índice en memoria pero ya no resuelve.
+        self.assertEqual(
+            store.find_duplicates(
+                self.face, exclude_user_id=self.bob.id, max_distance=0.05
+            ),
+            [],
+        )
+
+    def test_loads_snapshot_then_catches_up_from_table(self):
+        FaceEmbeddingStore.register(_make_auth(self.alice, self.landlord), self.face)
+        snapshot = FlatIndex()
+        row = FaceEmbedding.objects.get()
+        snapshot.add([row.id], [self.face])
+        with tempfile.TemporaryDirectory() as tmp:
+            write_snapshot(snapshot, f"{tmp}/faces", last_id=row.id)
+            FaceEmbeddingStore.register(
+                _make_auth(self.bob, self.landlord), self.other_face
+            )
+            store = FaceEmbeddingStore(f"{tmp}/faces")
+            self.assertEqual(len(store), 1)
+            self.assertEqual(store.refresh(), 1)
+            self.assertEqual(len(store), 2)
+
+
+class DuplicateIdentityCheckTests(_StoreTestCase):
+    def _service(self, encoding):
+        provider = mock.MagicMock()
+        provider.name = "mock"
+        provider.analyze_face.return_value = FaceAnalysis(
+            face_detected=True,
+            quality_score=0.9,
+            liveness_score=0.9,
+            provider="local",
+            raw={"encoding": [float(v) for v in encoding]},
+        )
+        provider.check_coherence.return_value = {"same_person_confidence": 0.9}
+        return BiometricAuthenticationService(facial_provider=provider)
+
+    @mock.patch.object(
+        BiometricAuthenticationService, "_save_base64_image", return_value=None
+    )
+    def test_second_account_with_same_face_is_flagged(self, _save):
+        alice_auth = _make_auth(self.alice, self.landlord)
+        bob_auth = _make_auth(self.bob, self.landlord)
+
+        first = self._service(self.face).process_face_capture(
+            str(alice_auth.id), "front", "side"
+        )
+        self.assertFalse(first["duplicate_identity_suspected"])
+
+        second = self._service(self.face + 0.001).process_face_capture(
+            str(bob_auth.id), "front", "side"
+        )
+        self.assertTrue(second["duplicate_identity_suspected"])
+        bob_auth.refresh_from_db()
+        check = bob_auth.security_checks["duplicate_identity"]
+        self.assertEqual(check["matches"][0]["authentication_id"], alice_auth.id)
+        self.assertEqual(FaceEmbedding.objects.count(), 2)
+
+    def test_without_encoding_nothing_is_checked(self):
+        service = BiometricAuthenticationService(facial_provider=mock.MagicMock())
+        auth = _make_auth(self.alice, self.landlord)
+        self.assertEqual(
+            service._check_duplicate_identity(auth, {"_raw": {}}), {"checked": False}
+        )
+        self.assertFalse(FaceEmbedding.objects.exists())
+
+    @override_settings(BIOMETRIC_DUPLICATE_CHECK=False)
+    def test_can_be_disabled(self):
+        service = BiometricAuthenticationService(facial_provider=mock.MagicMock())
+        auth = _make_auth(self.alice, self.landlord)
+        result = service._check_duplicate_identity(
+            auth, {"_raw": {"encoding": list(self.face)}}
+        )
+        self.assertEqual(result, {"checked": False})
@@ -379,6 +379,17 @@ class LandlordContractWorkflowTest(TestCase):
         self.assertIn("APPROVE", action_types)
         self.assertIn("SIGN", action_types)
 
+    def test_get_workflow_history_reads_relational_entries(self):
+        """El historial legacy se arma desde ContractWorkflowHistory, en orden."""
+        contract = self._create_contract(state="DRAFT")
+        contract.add_workflow_entry(action="APPROVE", user=self.landlord)
+        contract.add_workflow_entry(action="SIGN", user=self.tenant)
+
+        history = contract.get_workflow_history()
+        self.assertEqual([e["action"] for e in history][-2:], ["APPROVE", "SIGN"])
+        self.assertEqual(history[-1]["user_id"], str(self.tenant.id))
+        self.assertEqual(history, sorted(history, key=lambda e: e["timestamp"]))
+
     # ------------------------------------------------------------------
     # Test: Cancelacion desde cualquier estado editable
     # ------------------------------------------------------------------
@@ -0,0 +1,269 @@
+"""Tests del LocalDocumentProvider: ROI de la cédula y motores OCR.
+
+Sólo requieren opencv. Tesseract se reemplaza por un motor falso (o un
+módulo `tesserocr` falso) para probar el pipeline sin el binario ni el
+tessdata: qué se reconoce, cuándo se cae a la imagen completa y que
+cada etapa quede medida.
+"""
+
+from __future__ import annotations
+
+import base64
+import sys
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from contracts.biometric_providers import get_document_provider
+
+try:
+    import cv2
+    import numpy as np
+
+    from contracts.biometric_providers import _ocr_engine
+    from contracts.biometric_providers._document_roi import (
+        CARD_HEIGHT,
+        CARD_WIDTH,
+        find_card,
+        text_line_regions,
+    )
+    from contracts.biometric_providers._ocr_engine import (
+        OCREngine,
+        PytesseractEngine,
+        TesserocrEngine,
+        get_ocr_engine,
+    )
+    from contracts.biometric_providers.local_document import LocalDocumentProvider
+
+    CV_AVAILABLE = True
+except ImportError:
+    CV_AVAILABLE = False
+
+_CARD_LINES = (
+    "REPUBLICA DE COLOMBIA",
+    "CEDULA DE CIUDADANIA",
+    "NUMERO 1098765432",
+    "PEREZ GOMEZ",
+    "JUAN CARLOS",
+    "NACIMIENTO 17-05-1990",
+)
+
+
+def _synthetic_card():
+    card = np.full((CARD_HEIGHT, CARD_WIDTH), 235, dtype=np.uint8)
+    cv2.rectangle(card, (40, 120), (300, 460), 90, -1)  # foto
+    for index, text in enumerate(_CARD_LINES):
+        cv2.putText(
+            card, text, (340, 70 + index * 80), cv2.FONT_HERSHEY_SIMPLEX, 1.1, 20, 2
+        )
+    return card
+
+
+def _photo_of_card():
+    """La tarjeta sobre una mesa oscura, girada y en perspectiva."""
+    src = np.float32(
+        [
+            [0, 0],
+            [CARD_WIDTH - 1, 0],
+            [CARD_WIDTH - 1, CARD_HEIGHT - 1],
+            [0, CARD_HEIGHT - 1],
+        ]
+    )
+    dst = np.float32([[420, 380], [1580, 430], [1560, 1150], [400, 1110]])
+    photo = np.full((1500, 2000), 40, dtype=np.uint8)
+    return cv2.warpPerspective(
+        _synthetic_card(),
+        cv2.getPerspectiveTransform(src, dst),
+        (2000, 1500),
+        dst=photo,
+        borderMode=cv2.BORDER_TRANSPARENT,
+    )
+
+
+def _png_b64(image) -> str:
+    ok, buffer = cv2.imencode(".png", image)
+    assert ok
+    return base64.b64encode(buffer.tobytes()).decode()
+
+
+class _FakeEngine(OCREngine if CV_AVAILABLE else object):
+    name = "fake"
+
+    def __init__(self, region_texts=(), page_text=""):
+        self.region_texts = list(region_texts)
+        self.page_text = page_text
+        self.region_calls = []
+        self.page_calls = 0
+
+    def recognize(self, gray):
+        self.page_calls += 1
+        return self.page_text
+
+    def recognize_line(self, gray):
+        return ""
+
+    def recognize_regions(self, gray, regions):
+        self.region_calls.append(list(regions))
+        return self.region_texts[: len(regions)]
+
+
+@unittest.skipUnless(CV_AVAILABLE, "requiere opencv")
+class CardRegionTests(SimpleTestCase):
+    def test_card_is_found_and_rectified(self):
+        card = find_card(_photo_of_card())
+        self.assertIsNotNone(card)
+        self.assertEqual(card.shape, (CARD_HEIGHT, CARD_WIDTH))
+
+    def test_no_card_in_flat_image(self):
+        self.assertIsNone(find_card(np.full((600, 800), 128, dtype=np.uint8)))
+
+    def test_text_lines_exclude_photo_and_follow_reading_order(self):
+        regions = text_line_regions(_synthetic_card())
+        rows = sorted({y for _, y, _, _ in regions})
+        self.assertEqual(len(rows), len(_CARD_LINES))
+        # Ninguna franja cae sobre la foto (x < 300).
+        self.assertTrue(all(x >= 300 for x, _, _, _ in regions))
+        self.assertEqual(
+            regions, sorted(regions, key=lambda r: (rows.index(r[1]), r[0]))
+        )
+
+    def test_blank_card_has_no_lines(self):
+        self.assertEqual(
+            text_line_regions(np.full((CARD_HEIGHT, CARD_WIDTH), 235, np.uint8)), []
+        )
+
+
+@unittest.skipUnless(CV_AVAILABLE, "requiere opencv")
+class LocalDocumentProviderTests(SimpleTestCase):
+    def setUp(self):
+        self.card_photo = _png_b64(_photo_of_card())
+
+    def test_roi_path_only_ocrs_text_lines(self):
+        engine = _FakeEngine(region_texts=_CARD_LINES)
+        result = LocalDocumentProvider(engine).analyze_document(
+            self.card_photo, "cedula_ciudadania"
+        )
+        self.assertEqual(engine.page_calls, 0)
+        self.assertEqual(len(engine.region_calls), 1)
+        self.assertEqual(result.document_number, "1098765432")
+        self.assertEqual(result.raw["ocr_mode"], "roi")
+        self.assertEqual(result.raw["ocr_engine"], "fake")
+        self.assertLessEqual(
+            {"decode", "card_detect", "line_detect", "ocr_roi", "parse", "quality"},
+            result.raw["timings_ms"].keys(),
+        )
+
+    def test_falls_back_to_full_page_without_number(self):
+        engine = _FakeEngine(
+            region_texts=["REPUBLICA DE COLOMBIA"],
+            page_text="CEDULA DE CIUDADANIA\nNUMERO 1098765432",
+        )
+        result = LocalDocumentProvider(engine).analyze_document(self.card_photo, "")
+        self.assertEqual(engine.page_calls, 1)
+        self.assertEqual(result.raw["ocr_mode"], "full")
+        self.assertEqual(result.document_number, "1098765432")
+
+    def test_full_page_when_no_card(self):
+        engine = _FakeEngine(page_text="NUMERO 1098765432")
+        flat = _png_b64(np.full((600, 800, 3), 128, dtype=np.uint8))
+        result = LocalDocumentProvider(engine).analyze_document(flat, "")
+        self.assertEqual(engine.region_calls, [])
+        self.assertEqual(result.raw["ocr_mode"], "full")
+        self.assertIn("ocr_full", result.raw["timings_ms"])
+
+    def test_roi_disabled_matches_previous_behaviour(self):
+        engine = _FakeEngine(region_texts=_CARD_LINES, page_text="NUMERO 1098765432")
+        result = LocalDocumentProvider(engine, roi=False).analyze_document(
+            self.card_photo, ""
+        )
+        self.assertEqual(engine.region_calls, [])
+        self.assertEqual(engine.page_calls, 1)
+        self.assertNotIn("card_detect", result.raw["timings_ms"])
+
+    def test_ocr_error_is_not_raised(self):
+        engine = _FakeEngine()
+        engine.recognize = mock.Mock(side_effect=RuntimeError("sin tessdata"))
+        result = LocalDocumentProvider(engine, roi=False).analyze_document(
+            self.card_photo, ""
+        )
+        self.assertTrue(result.document_detected)
+        self.assertEqual(result.raw["reason"], "ocr_error")
+
+
+@unittest.skipUnless(CV_AVAILABLE, "requiere opencv")
+class OCREngineSelectionTests(SimpleTestCase):
+    def setUp(self):
+        get_ocr_engine.cache_clear()
+        self.addCleanup(get_ocr_engine.cache_clear)
+
+    def test_pytesseract_on_request(self):
+        self.assertIsInstance(get_ocr_engine("pytesseract"), PytesseractEngine)
+
+    def test_auto_falls_back_when_tesserocr_cannot_start(self):
+        with mock.patch.object(
+            _ocr_engine, "_build_tesserocr", side_effect=RuntimeError("tessdata")
+        ):
+            self.assertIsInstance(get_ocr_engine("auto"), PytesseractEngine)
+
+    def test_explicit_tesserocr_failure_is_raised(self):
+        with (
+            mock.patch.object(
+                _ocr_engine, "_build_tesserocr", side_effect=ImportError("tesserocr")
+            ),
+            self.assertRaises(ImportError),
+        ):
+            get_ocr_engine("tesserocr")
+
+    def test_engine_is_memoized(self):
+        self.assertIs(get_ocr_engine("pytesseract"), get_ocr_engine("pytesseract"))
+
+
+@unittest.skipUnless(CV_AVAILABLE, "requiere opencv")
+class TesserocrEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.api = mock.MagicMock()
+        self.api.GetUTF8Text.side_effect = ["LINEA 1\n", "LINEA 2\n"]
+        fake_module = mock.MagicMock()
+        fake_module.PyTessBaseAPI.return_value = self.api
+        patcher = mock.patch.dict(sys.modules, {"tesserocr": fake_module})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.module = fake_module
+
+    def test_api_is_created_once_per_thread(self):
+        engine = TesserocrEngine(lang="spa")
+        engine.recognize_line(np.zeros((10, 40), np.uint8))
+        engine.recognize_line(np.zeros((10, 40), np.uint8))
+        self.module.PyTessBaseAPI.assert_called_once_with(lang="spa")
+
+    def test_regions_share_a_single_image(self):
+        engine = TesserocrEngine()
+        texts = engine.recognize_regions(
+            np.zeros((100, 200), np.uint8), [(0, 0, 50, 10), (0, 20, 50, 10)]
+        )
+        self.assertEqual(texts, ["LINEA 1\n", "LINEA 2\n"])
+        self.api.SetImageBytes.assert_called_once()
+        self.assertEqual(
+            self.api.SetRectangle.call_args_list,
+            [mock.call(0, 0, 50, 10), mock.call(0, 20, 50, 10)],
+        )
+        self.api.Clear.assert_called_once()
+
+
+@unittest.skipUnless(CV_AVAILABLE, "requiere opencv")
+class FactoryOCRSettingsTests(SimpleTestCase):
+    def setUp(self):
+        get_document_provider.cache_clear()
+        self.addCleanup(get_document_provider.cache_clear)
+
+    @override_settings(
+        BIOMETRIC_DOCUMENT_PROVIDER="local",
+        BIOMETRIC_OCR_ENGINE="pytesseract",
+        BIOMETRIC_OCR_ROI=False,
+    )
+    def test_local_provider_receives_ocr_settings(self):
+        provider = get_document_provider()
+        self.assertIsInstance(provider, LocalDocumentProvider)
+        self.assertFalse(provider.roi)
+        self.assertIsInstance(provider.engine, PytesseractEngine)
@@ -10,19 +10,29 @@ from __future__ import annotations
 
 import base64
 import unittest
+from unittest import mock
 
+from django.core.cache import cache
 from django.test import SimpleTestCase, override_settings
 
-from contracts.biometric_providers import DemoFacialProvider, get_facial_provider
+from contracts.biometric_cache import reset_analysis_caches
+from contracts.biometric_providers import (
+    DemoDocumentProvider,
+    DemoFacialProvider,
+    get_facial_provider,
+)
 from contracts.biometric_providers.base import FaceAnalysis
 from contracts.biometric_providers.factory import _resolve_provider_name
+from contracts.biometric_service import BiometricAuthenticationService
 
 try:
     import cv2
     import numpy as np
 
+    from contracts.biometric_providers import local as local_module
     from contracts.biometric_providers.local import (
         LocalFacialProvider,
+        _profile_cascade,
         distance_to_similarity,
     )
 
@@ -102,6 +112,95 @@ class LocalFacialProviderTests(SimpleTestCase):
     def test_compare_faces_invalid_input_is_zero(self):
         self.assertEqual(self.provider.compare_faces("x", "y"), 0.0)
 
+    def test_compare_faces_reuses_analyzed_captures(self):
+        rng = np.random.default_rng(11)
+        noise = rng.integers(0, 255, size=(200, 200, 3), dtype=np.uint8)
+        b64 = _png_b64(noise)
+        self.provider.analyze_face(b64, "frontal")
+        with mock.patch.object(
+            local_module.face_recognition, "face_locations"
+        ) as face_locations:
+            # Mismos bytes con y sin prefijo data-url: un solo digest.
+            score = self.provider.compare_faces(b64, "data:image/png;base64," + b64)
+        self.assertEqual(score, 0.0)
+        face_locations.assert_not_called()
+
+    def test_cached_analysis_feeds_compare_faces(self):
+        cache.clear()
+        reset_analysis_caches()
+        self.addCleanup(reset_analysis_caches)
+        b64 = _png_b64(np.full((200, 200, 3), 128, dtype=np.uint8))
+        encoding = np.full(128, 0.1)
+        with (
+            mock.patch.object(
+                local_module.face_recognition,
+                "face_locations",
+                return_value=[(50, 150, 150, 50)],
+            ),
+            mock.patch.object(
+                local_module.face_recognition, "face_landmarks", return_value=[]
+            ),
+            mock.patch.object(
+                local_module.face_recognition,
+                "face_encodings",
+                return_value=[encoding],
+            ),
+        ):
+            BiometricAuthenticationService(
+                facial_provider=LocalFacialProvider(),
+                document_provider=DemoDocumentProvider(),
+            )._process_face_image(b64, "frontal")
+
+        # Otro worker: el análisis sale de la cache y `compare_faces`
+        # usa el embedding cacheado sin decodificar la captura.
+        provider = LocalFacialProvider()
+        service = BiometricAuthenticationService(
+            facial_provider=provider, document_provider=DemoDocumentProvider()
+        )
+        with (
+            mock.patch.object(local_module, "decode_capture") as decode_capture,
+            mock.patch.object(local_module, "decode_bytes") as decode_bytes,
+        ):
+            service._process_face_image(b64, "frontal")
+            score = provider.compare_faces(b64, b64)
+        decode_capture.assert_not_called()
+        decode_bytes.assert_not_called()
+        self.assertEqual(score, 1.0)
+
+    def test_detection_runs_on_downscaled_copy(self):
+        flat = np.full((1200, 1600, 3), 128, dtype=np.uint8)
+        provider = LocalFacialProvider(detection_max_side=400)
+        with mock.patch.object(
+            local_module.face_recognition, "face_locations", return_value=[]
+        ) as face_locations:
+            provider.analyze_face(_png_b64(flat), "frontal")
+        detected_on = face_locations.call_args[0][0]
+        self.assertEqual(detected_on.shape[:2], (300, 400))
+
+    def test_detected_box_is_rescaled_to_original(self):
+        flat = np.full((1200, 1600, 3), 128, dtype=np.uint8)
+        provider = LocalFacialProvider(detection_max_side=400)
+        with (
+            mock.patch.object(
+                local_module.face_recognition,
+                "face_locations",
+                return_value=[(50, 250, 150, 150)],
+            ),
+            mock.patch.object(
+                local_module.face_recognition, "face_landmarks", return_value=[]
+            ),
+            mock.patch.object(
+                local_module.face_recognition, "face_encodings", return_value=[]
+            ),
+        ):
+            result = provider.analyze_face(_png_b64(flat), "frontal")
+        self.assertTrue(result.face_detected)
+        self.assertEqual(result.raw["face_box"], [200, 1000, 600, 600])
+        self.assertEqual(result.raw["detector"], "hog")
+
+    def test_profile_cascade_is_loaded_once(self):
+        self.assertIs(_profile_cascade(), _profile_cascade())
+
 
 @unittest.skipUnless(LIBS_AVAILABLE, "requiere opencv + face_recognition")
 class CheckCoherenceTests(SimpleTestCase):
@@ -2,13 +2,16 @@
 
 T1.3: cuando un LandlordControlledContract pasa a ACTIVE, el signal
 genera automáticamente RentPaymentSchedule + PaymentInstallment + PaymentOrder.
+El plan se guarda con bulk_create: las consultas no crecen con los meses.
 """
 
 from datetime import date
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from contracts.landlord_contract_models import LandlordControlledContract
 from contracts.models import Contract
@@ -16,6 +19,8 @@ from payments.models import (
     RentPaymentSchedule,
     PaymentInstallment,
     PaymentOrder,
+    PaymentOrderEvent,
+    PaymentOrderSequence,
 )
 from properties.models import Property
 
@@ -25,7 +30,7 @@ User = get_user_model()
 class AutoSchedulerSignalTests(TestCase):
     """Verifica el signal pre/post_save de LandlordControlledContract."""
 
-    def _setup(self):
+    def _setup(self, end_date=date(2026, 12, 31)):
         landlord = User.objects.create_user(
             email="ll@test.com",
             password="test1234",
@@ -61,7 +66,7 @@ class AutoSchedulerSignalTests(TestCase):
             property=prop,
             current_state="DRAFT",
             start_date=date(2026, 1, 1),
-            end_date=date(2026, 12, 31),
+            end_date=end_date,
             economic_terms={"monthly_rent": "1500000"},
         )
         # Crear Contract legacy con MISMO UUID (convención BIO-02)
@@ -74,7 +79,7 @@ class AutoSchedulerSignalTests(TestCase):
             title="Test",
             monthly_rent=Decimal("1500000"),
             start_date=date(2026, 1, 1),
-            end_date=date(2026, 12, 31),
+            end_date=end_date,
         )
         return landlord, tenant, lcc, legacy
 
@@ -129,6 +134,34 @@ class AutoSchedulerSignalTests(TestCase):
         order = PaymentOrder.objects.first()
         self.assertTrue(any(e["type"] == "auto_generated" for e in order.audit_log))
 
+    def _activation_queries(self, end_date):
+        landlord, tenant, lcc, legacy = self._setup(end_date)
+        lcc.current_state = "ACTIVE"
+        with CaptureQueriesContext(connection) as queries:
+            lcc.save()
+        return len(queries)
+
+    def test_activation_queries_do_not_grow_with_months(self):
+        short = self._activation_queries(date(2026, 3, 31))
+        PaymentOrder.objects.all().delete()
+        PaymentOrderSequence.objects.all().delete()
+        User.objects.all().delete()
+        self.assertEqual(self._activation_queries(date(2027, 12, 31)), short)
+        self.assertEqual(PaymentOrder.objects.count(), 24)
+
+    def test_order_numbers_are_a_contiguous_block(self):
+        landlord, tenant, lcc, legacy = self._setup()
+        lcc.current_state = "ACTIVE"
+        lcc.save()
+
+        orders = PaymentOrder.objects.order_by("date_due")
+        numbers = [int(o.order_number.rsplit("-", 1)[1]) for o in orders]
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 12)))
+        self.assertEqual(
+            [o.installment.installment_number for o in orders], list(range(1, 13))
+        )
+        self.assertEqual(PaymentOrderEvent.objects.count(), 12)
+
     def test_no_schedule_without_dates(self):
         landlord = User.objects.create_user(
             email="ll@test.com",
@@ -26,6 +26,17 @@ urlpatterns = [
     ),
     # FAQ público
     path("faqs/", api_views.FAQListAPIView.as_view(), name="api_faqs"),
+    # Subidas reanudables por partes (videos, documentos)
+    path(
+        "uploads/",
+        api_views.ChunkedUploadCreateAPIView.as_view(),
+        name="api_chunked_upload_create",
+    ),
+    path(
+        "uploads/<uuid:upload_id>/",
+        api_views.ChunkedUploadDetailAPIView.as_view(),
+        name="api_chunked_upload_detail",
+    ),
     # Endpoints de prueba
     path("health/", api_views.health_check, name="health_check"),
     path("test/", api_views.test_connection, name="test_connection"),
@@ -17,6 +17,7 @@ from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle
 from rest_framework.views import APIView
 
+from . import chunked_uploads
 from .audit_service import audit_service
 from .models import (
     Notification,
@@ -523,6 +524,19 @@ class MarkAllNotificationsReadAPIView(APIView):
         )
 
 
+def _parse_log_bound(value):
+    """`(datetime aware, sólo_fecha)` desde un ISO 8601, o None si no aplica."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed, "T" not in value and " " not in value.strip()
+
+
 class GlobalAuditLogAPIView(generics.ListAPIView):
     """
     ADM-04: listar audit trail global (todos los usuarios).
@@ -554,28 +568,33 @@ class GlobalAuditLogAPIView(generics.ListAPIView):
         if model_name:
             qs = qs.filter(model_name=model_name)
 
+        # Los límites de fecha van siempre como `timestamp__gte/__lt` con
+        # datetimes aware: en PostgreSQL la tabla está particionada por
+        # mes sobre `timestamp` y así el planner sólo lee las particiones
+        # del rango (core/log_partitions.py).
+        bounds = []
         days = self.request.query_params.get("days")
         if days:
             try:
-                since = timezone.now() - timedelta(days=int(days))
-                qs = qs.filter(timestamp__gte=since)
+                bounds.append(("gte", timezone.now() - timedelta(days=int(days))))
             except (ValueError, TypeError):
                 pass
 
         # ADM-001: rango explícito de fechas (ISO 8601).
-        date_from = self.request.query_params.get("date_from")
+        date_from = _parse_log_bound(self.request.query_params.get("date_from"))
         if date_from:
-            try:
-                qs = qs.filter(timestamp__gte=datetime.fromisoformat(date_from))
-            except (ValueError, TypeError):
-                pass
+            bounds.append(("gte", date_from[0]))
 
-        date_to = self.request.query_params.get("date_to")
+        date_to = _parse_log_bound(self.request.query_params.get("date_to"))
         if date_to:
-            try:
-                qs = qs.filter(timestamp__lte=datetime.fromisoformat(date_to))
-            except (ValueError, TypeError):
-                pass
+            # Una fecha sin hora incluye el día completo.
+            value, date_only = date_to
+            bounds.append(
+                ("lt", value + timedelta(days=1)) if date_only else ("lte", value)
+            )
+
+        for lookup, value in bounds:
+            qs = qs.filter(**{f"timestamp__{lookup}": value})
 
         return qs.order_by("-timestamp")
 
@@ -1309,3 +1328,100 @@ def maintenance_optimize_db(request):
         return Response({"message": msg})
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# =====================================================================
+# Subidas por partes (core/chunked_uploads.py)
+# =====================================================================
+
+
+def _chunked_upload_response(upload, status_code=status.HTTP_200_OK, body=True):
+    data = None
+    if body:
+        data = {
+            "id": str(upload.id),
+            "purpose": upload.purpose,
+            "filename": upload.filename,
+            "size": upload.size,
+            "offset": upload.offset,
+            "status": upload.status,
+            "chunk_size": chunked_uploads.chunk_size(),
+            "expires_at": upload.expires_at,
+        }
+    return Response(
+        data, status=status_code, headers=chunked_uploads.upload_headers(upload)
+    )
+
+
+def _chunked_upload_error(exc):
+    data = {"error": str(exc)}
+    headers = {"Cache-Control": "no-store"}
+    if exc.offset is not None:
+        data["offset"] = exc.offset
+        headers["Upload-Offset"] = str(exc.offset)
+    return Response(data, status=exc.status_code, headers=headers)
+
+
+class ChunkedUploadCreateAPIView(APIView):
+    """Inicia una subida reanudable (video de propiedad, documento)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        try:
+            upload = chunked_uploads.create_upload(
+                request.user,
+                purpose=request.data.get("purpose"),
+                filename=request.data.get("filename"),
+                size=request.data.get("size"),
+                checksum=request.data.get("checksum", ""),
+                content_type=request.data.get("content_type", ""),
+            )
+        except chunked_uploads.ChunkedUploadError as exc:
+            return _chunked_upload_error(exc)
+        response = _chunked_upload_response(upload, status.HTTP_201_CREATED)
+        response["Location"] = request.build_absolute_uri(f"{upload.id}/")
+        return response
+
+
+class ChunkedUploadDetailAPIView(APIView):
+    """Estado (HEAD/GET), envío de trozos (PATCH) y cancelación (DELETE)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, upload_id):
+        try:
+            upload = chunked_uploads.get_upload(request.user, upload_id)
+        except chunked_uploads.ChunkedUploadError as exc:
+            return _chunked_upload_error(exc)
+        return _chunked_upload_response(upload)
+
+    def head(self, request, upload_id):
+        try:
+            upload = chunked_uploads.get_upload(request.user, upload_id)
+        except chunked_uploads.ChunkedUploadError as exc:
+            return _chunked_upload_error(exc)
+        return _chunked_upload_response(upload, body=False)
+
+    def patch(self, request, upload_id):
+        # El cuerpo se lee del request de Django sin pasar por los
+        # parsers de DRF: el trozo va directo al storage.
+        try:
+            upload = chunked_uploads.get_upload(request.user, upload_id)
+            upload = chunked_uploads.append_chunk(
+                upload,
+                offset=request.headers.get("Upload-Offset"),
+                stream=request._request,
+                length=request.headers.get("Content-Length"),
+            )
+        except chunked_uploads.ChunkedUploadError as exc:
+            return _chunked_upload_error(exc)
+        return _chunked_upload_response(upload, status.HTTP_204_NO_CONTENT, body=False)
+
+    def delete(self, request, upload_id):
+        try:
+            upload = chunked_uploads.get_upload(request.user, upload_id)
+        except chunked_uploads.ChunkedUploadError as exc:
+            return _chunked_upload_error(exc)
+        chunked_uploads.delete_upload(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
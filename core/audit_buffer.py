@@ -0,0 +1,360 @@
+"""Escritura diferida (write-behind) de la auditoría de actividad.
+
+`AuditService.log_user_activity` hacía por llamada dos INSERT
+(`ActivityLog` y `UserActivityLog`) más dos o tres `update_or_create`
+de `SystemMetrics`, todo dentro del request. Ahora cada llamada arma un
+evento y:
+
+- Si la acción es crítica para seguridad (`AUDIT_DURABLE_ACTIONS` o
+  ``durable=True``) o `AUDIT_WRITE_BEHIND` está apagado, se escribe en
+  línea, en la misma transacción del request (modo durable: si el
+  request confirma, el registro existe).
+- Si no, al confirmar la transacción el evento se agrega a una lista de
+  Redis y `flush_events()` (tarea `core.tasks.flush_audit_events`, cada
+  10 s en beat) la vacía con un `bulk_create` por lote y un UPDATE por
+  métrica.
+
+Contrapresión: si al encolar la lista supera `AUDIT_BUFFER_MAX_PENDING`,
+el mismo request vacía un lote antes de responder, así la cola no crece
+sin límite cuando el consumidor se atrasa. Si Redis falla, el evento se
+escribe en línea.
+
+Sin Redis (desarrollo/tests con LocMem) se usa un buffer en memoria del
+proceso que se vacía en línea al llenarse o envejecer.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ActivityLog, SystemMetrics
+
+User = get_user_model()
+logger = logging.getLogger("verihome.audit")
+
+_BUFFER_KEY = "core:audit:v1:buffer"
+
+DEFAULT_DURABLE_ACTIONS = (
+    "login",
+    "logout",
+    "password_change",
+    "password_reset",
+    "delete",
+    "cleanup",
+    "export",
+    "payment.",
+    "verihome_id.",
+)
+
+
+def write_behind_enabled() -> bool:
+    return getattr(settings, "AUDIT_WRITE_BEHIND", False)
+
+
+def is_durable(action_type: str) -> bool:
+    """Acciones que no pueden quedar en un buffer (prefijos terminan en ".")."""
+    for entry in getattr(settings, "AUDIT_DURABLE_ACTIONS", DEFAULT_DURABLE_ACTIONS):
+        if action_type == entry or (
+            entry.endswith(".") and action_type.startswith(entry)
+        ):
+            return True
+    return False
+
+
+def _dumps(event: dict) -> str:
+    # `details` puede traer Decimal/UUID/fechas de los ViewSets.
+    return json.dumps(event, cls=DjangoJSONEncoder)
+
+
+class _RedisAuditStore:
+    """Buffer en una lista del Redis del cache `default`."""
+
+    def __init__(self, client):
+        self.client = client
+        self.key = cache.make_key(_BUFFER_KEY)
+
+    def push(self, event: dict) -> int:
+        return self.client.rpush(self.key, _dumps(event))
+
+    def drain(self, limit: int) -> list[dict]:
+        # LRANGE+LTRIM en MULTI: dos flushes concurrentes no se pisan.
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(self.key, 0, limit - 1)
+        pipe.ltrim(self.key, limit, -1)
+        raw, _ = pipe.execute()
+        return [json.loads(item) for item in raw]
+
+    def requeue(self, events: list[dict]) -> None:
+        if events:
+            self.client.lpush(self.key, *[_dumps(event) for event in reversed(events)])
+
+    def pending(self) -> int:
+        return self.client.llen(self.key)
+
+    def due(self) -> bool:
+        return False
+
+
+class _LocalAuditStore:
+    """Mismo contrato en memoria del proceso (sin Redis)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._buffer: list[str] = []
+        self._oldest: float | None = None
+
+    def push(self, event: dict) -> int:
+        with self._lock:
+            self._buffer.append(_dumps(event))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            return len(self._buffer)
+
+    def drain(self, limit: int) -> list[dict]:
+        with self._lock:
+            raw, self._buffer = self._buffer[:limit], self._buffer[limit:]
+            if not self._buffer:
+                self._oldest = None
+        return [json.loads(item) for item in raw]
+
+    def requeue(self, events: list[dict]) -> None:
+        with self._lock:
+            self._buffer[:0] = [_dumps(event) for event in events]
+            if self._buffer and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def due(self) -> bool:
+        """Hay que vaciar en línea: no hay beat que lo haga por nosotros."""
+        if self._oldest is None:
+            return False
+        max_size = getattr(settings, "AUDIT_BUFFER_LOCAL_MAX", 100)
+        interval = getattr(settings, "AUDIT_FLUSH_INTERVAL", 10)
+        return (
+            len(self._buffer) >= max_size or time.monotonic() - self._oldest >= interval
+        )
+
+
+_local_store = _LocalAuditStore()
+
+
+def get_store():
+    client = getattr(cache, "client", None)
+    if client is not None and hasattr(client, "get_client"):
+        return _RedisAuditStore(client.get_client(write=True))
+    return _local_store
+
+
+def reset_local_store() -> None:
+    _local_store.reset()
+
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+
+
+def record(
+    user,
+    *,
+    activity: dict | None = None,
+    user_activity: dict | None = None,
+    durable: bool = False,
+    at: datetime | None = None,
+) -> ActivityLog | None:
+    """Registra un evento de auditoría.
+
+    `activity` son los campos de `ActivityLog` y `user_activity` los de
+    `UserActivityLog` (a su `metadata` se le agrega `activity_log_id`
+    al escribir). Retorna el `ActivityLog` guardado si se escribió en
+    línea, o uno sin guardar (``pk=None``) si quedó en el buffer.
+    """
+    event = {
+        "user": str(user.pk) if user is not None else None,
+        "at": (at or timezone.now()).isoformat(),
+        "activity": activity,
+        "user_activity": user_activity,
+    }
+    if durable or not write_behind_enabled():
+        written = write_events([event])
+        return written[0] if written else None
+    transaction.on_commit(lambda: _enqueue(event))
+    if activity is None:
+        return None
+    return _activity_log(event, event["user"])
+
+
+def _enqueue(event: dict) -> None:
+    store = get_store()
+    try:
+        pending = store.push(event)
+    except Exception as exc:  # noqa: BLE001 — sin buffer se escribe en línea
+        logger.warning(
+            "Buffer de auditoría no disponible (%s): escritura en línea", exc
+        )
+        try:
+            write_events([event])
+        except Exception:
+            logger.exception("No se pudo registrar el evento de auditoría")
+        return
+    if pending > getattr(settings, "AUDIT_BUFFER_MAX_PENDING", 10000) or store.due():
+        # Contrapresión: quien encola por encima del límite ayuda a vaciar.
+        try:
+            flush_events(max_batches=1)
+        except Exception:
+            logger.exception("Fallo al vaciar el buffer de auditoría en línea")
+
+
+def flush_events(batch_size: int | None = None, max_batches: int | None = None) -> int:
+    """Persiste el buffer en la base de datos; retorna los eventos escritos."""
+    batch_size = batch_size or getattr(settings, "AUDIT_FLUSH_BATCH", 500)
+    store = get_store()
+    written = batches = 0
+    while max_batches is None or batches < max_batches:
+        events = store.drain(batch_size)
+        if not events:
+            break
+        batches += 1
+        try:
+            write_events(events)
+            written += len(events)
+        except (IntegrityError, DataError):
+            # Un evento inválido no debe bloquear el lote en cada intento.
+            written += _write_one_by_one(events)
+        except Exception:
+            store.requeue(events)
+            raise
+    return written
+
+
+def _write_one_by_one(events: list[dict]) -> int:
+    written = 0
+    for event in events:
+        try:
+            write_events([event])
+            written += 1
+        except (IntegrityError, DataError) as exc:
+            logger.error(
+                "Evento de auditoría descartado: %s",
+                exc,
+                extra={"audit_event": event},
+            )
+    return written
+
+
+def write_events(events: list[dict]) -> list[ActivityLog]:
+    """Escribe `events` con un `bulk_create` por tabla.
+
+    Retorna los `ActivityLog` creados, en el orden de los eventos que
+    los traían.
+    """
+    from users.models import UserActivityLog
+
+    users = {
+        str(pk)
+        for pk in User.objects.filter(
+            pk__in={event["user"] for event in events if event["user"]}
+        ).values_list("pk", flat=True)
+    }
+    with transaction.atomic():
+        with_activity = [event for event in events if event["activity"]]
+        # En PostgreSQL y SQLite >= 3.35 `bulk_create` devuelve los pk.
+        activity_logs = ActivityLog.objects.bulk_create(
+            [
+                _activity_log(event, event["user"] if event["user"] in users else None)
+                for event in with_activity
+            ]
+        )
+        log_ids = {
+            id(event): log.pk for event, log in zip(with_activity, activity_logs)
+        }
+        # `UserActivityLog.user` es obligatorio: si el usuario se borró
+        # mientras el evento esperaba, sólo queda el `ActivityLog`.
+        UserActivityLog.objects.bulk_create(
+            [
+                _user_activity_log(UserActivityLog, event, log_ids.get(id(event)))
+                for event in events
+                if event["user_activity"] and event["user"] in users
+            ]
+        )
+        _bump_metrics(with_activity)
+    return activity_logs
+
+
+def _activity_log(event: dict, user_id) -> ActivityLog:
+    activity = event["activity"]
+    return ActivityLog(
+        user_id=user_id,
+        action_type=activity["action_type"],
+        description=activity["description"],
+        details=activity.get("details") or {},
+        content_type_id=activity.get("content_type"),
+        object_id=activity.get("object_id"),
+        ip_address=activity.get("ip_address"),
+        user_agent=activity.get("user_agent") or "",
+        session_key=activity.get("session_key") or "",
+        success=activity.get("success", True),
+        error_message=activity.get("error_message") or "",
+        created_at=datetime.fromisoformat(event["at"]),
+    )
+
+
+def _user_activity_log(model, event: dict, activity_log_id):
+    fields = dict(event["user_activity"])
+    metadata = dict(fields.pop("metadata", None) or {})
+    if activity_log_id is not None:
+        metadata["activity_log_id"] = str(activity_log_id)
+    return model(
+        user_id=event["user"],
+        metadata=metadata,
+        user_agent=(fields.pop("user_agent", "") or "")[:255],
+        timestamp=datetime.fromisoformat(event["at"]),
+        **fields,
+    )
+
+
+def _bump_metrics(events: list[dict]) -> None:
+    """Un UPDATE por (métrica, día) en vez de dos o tres por evento."""
+    counts = Counter()
+    for event in events:
+        day = timezone.localdate(datetime.fromisoformat(event["at"]))
+        action_type = event["activity"]["action_type"]
+        counts["user_activity", day] += 1
+        counts[f"activity_{action_type}"[:30], day] += 1
+        if not event["activity"].get("success", True):
+            counts["activity_errors", day] += 1
+    try:
+        with transaction.atomic():
+            for (metric_type, day), amount in counts.items():
+                updated = SystemMetrics.objects.filter(
+                    metric_type=metric_type, date=day
+                ).update(count=F("count") + amount)
+                if updated:
+                    continue
+                metric, created = SystemMetrics.objects.get_or_create(
+                    metric_type=metric_type, date=day, defaults={"count": amount}
+                )
+                if not created:
+                    SystemMetrics.objects.filter(pk=metric.pk).update(
+                        count=F("count") + amount
+                    )
+    except Exception as exc:  # noqa: BLE001 — las métricas no tumban el lote
+        logger.error("Failed to update activity metrics: %s", exc)
@@ -9,10 +9,11 @@ from datetime import datetime, timedelta
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
-from django.db.models import Count, F
+from django.db.models import Count
 from django.utils import timezone
 import uuid
 
+from . import audit_buffer, log_partitions
 from .models import ActivityLog, SystemAlert, SystemMetrics
 from users.models import UserActivityLog, AdminActionLog, AdminImpersonationSession
 from users.services import AdminActionLogger
@@ -43,10 +44,15 @@ class AuditService:
         session_key: Optional[str] = "",
         success: bool = True,
         error_message: str = "",
+        durable: bool = False,
     ) -> ActivityLog:
         """
         Registra actividad de usuario en el sistema de auditoría.
 
+        La escritura es diferida (core/audit_buffer.py) salvo para las
+        acciones de `AUDIT_DURABLE_ACTIONS` o con ``durable=True``, que
+        se escriben en la transacción del request.
+
         Args:
             user: Usuario que realiza la acción
             action_type: Tipo de acción (create, update, delete, etc.)
@@ -58,49 +64,26 @@ class AuditService:
             session_key: Clave de sesión
             success: Si la acción fue exitosa
             error_message: Mensaje de error si la acción falló
+            durable: Escribir en línea aunque la acción no sea crítica
 
         Returns:
-            Instancia de ActivityLog creada
+            Instancia de ActivityLog (sin guardar si quedó en el buffer)
         """
         try:
-            # Obtener ContentType si hay objeto target
-            content_type = None
-            object_id = None
-
-            if target_object:
-                content_type = ContentType.objects.get_for_model(target_object)
-                object_id = str(target_object.pk)
-
-            # Crear registro de actividad principal
-            activity_log = ActivityLog.objects.create(
-                user=user,
-                action_type=action_type,
-                description=description,
-                details=details or {},
-                content_type=content_type,
-                object_id=object_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                session_key=session_key,
-                success=success,
-                error_message=error_message,
-            )
-
-            # Crear registro específico de usuario también
-            UserActivityLog.objects.create(
-                user=user,
-                activity_type=action_type,
-                description=description,
-                metadata={
-                    **(details or {}),
-                    "activity_log_id": str(activity_log.id),
-                    "target_object_type": content_type.model if content_type else None,
-                    "target_object_id": object_id,
-                    "success": success,
-                    "error_message": error_message,
-                },
-                ip_address=ip_address,
-                user_agent=user_agent[:255] if user_agent else "",
+            activity_log = audit_buffer.record(
+                user,
+                **self._activity_event(
+                    action_type=action_type,
+                    description=description,
+                    target_object=target_object,
+                    details=details,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    session_key=session_key,
+                    success=success,
+                    error_message=error_message,
+                ),
+                durable=durable or audit_buffer.is_durable(action_type),
             )
 
             # Log estructurado
@@ -110,17 +93,14 @@ class AuditService:
                     "user_id": str(user.id),
                     "action_type": action_type,
                     "description": description,
-                    "target_object": f"{content_type.model}:{object_id}"
-                    if content_type
+                    "target_object": f"{target_object._meta.model_name}:{target_object.pk}"
+                    if target_object
                     else None,
                     "success": success,
                     "ip_address": ip_address,
                 },
             )
 
-            # Actualizar métricas
-            self._update_activity_metrics(action_type, success)
-
             return activity_log
 
         except Exception as e:
@@ -148,17 +128,23 @@ class AuditService:
             Lista de ActivityLog creados
         """
         created_logs = []
+        user_ids = set()
+        for activity_data in activities:
+            try:
+                user_ids.add(uuid.UUID(str(activity_data.get("userId"))))
+            except ValueError:
+                continue
+        # Un solo SELECT de usuarios para todo el lote.
+        users = {str(pk): user for pk, user in User.objects.in_bulk(user_ids).items()}
 
         with transaction.atomic():
             for activity_data in activities:
                 try:
                     # Extraer datos del log del frontend
-                    user_id = activity_data.get("userId")
-                    if not user_id:
+                    user = users.get(str(activity_data.get("userId")))
+                    if user is None:
                         continue
 
-                    user = User.objects.get(id=user_id)
-
                     activity_log = self.log_user_activity(
                         user=user,
                         action_type=activity_data.get("category", "ui"),
@@ -473,18 +459,17 @@ class AuditService:
         """
         cutoff_date = timezone.now() - timedelta(days=retention_days)
 
-        # Contar registros a eliminar
-        activity_logs_count = ActivityLog.objects.filter(
-            created_at__lt=cutoff_date
-        ).count()
-
-        user_activity_logs_count = UserActivityLog.objects.filter(
-            created_at__lt=cutoff_date
-        ).count()
-
-        admin_action_logs_count = AdminActionLog.objects.filter(
-            created_at__lt=cutoff_date
-        ).count()
+        # En PostgreSQL los meses completos se eliminan como particiones
+        # (DETACH + DROP); el resto se borra por lotes (core/log_partitions.py).
+        activity_logs_count = log_partitions.purge_before(
+            ActivityLog, cutoff_date, dry_run=dry_run
+        )
+        user_activity_logs_count = log_partitions.purge_before(
+            UserActivityLog, cutoff_date, dry_run=dry_run
+        )
+        admin_action_logs_count = log_partitions.purge_before(
+            AdminActionLog, cutoff_date, field="timestamp", dry_run=dry_run
+        )
 
         stats = {
             "activity_logs": activity_logs_count,
@@ -496,11 +481,6 @@ class AuditService:
         }
 
         if not dry_run and stats["total"] > 0:
-            with transaction.atomic():
-                ActivityLog.objects.filter(created_at__lt=cutoff_date).delete()
-                UserActivityLog.objects.filter(created_at__lt=cutoff_date).delete()
-                AdminActionLog.objects.filter(created_at__lt=cutoff_date).delete()
-
             logger.info(
                 f"Cleaned up {stats['total']} old log entries",
                 extra={
@@ -514,34 +494,54 @@ class AuditService:
 
     # Métodos privados
 
-    def _update_activity_metrics(self, action_type: str, success: bool):
-        """Actualiza métricas de actividad."""
-        try:
-            today = timezone.localdate()
-
-            # Métrica de actividad general
-            SystemMetrics.objects.update_or_create(
-                metric_type="user_activity",
-                date=today,
-                defaults={"count": F("count") + 1},
-            )
-
-            # Métrica por tipo de acción
-            SystemMetrics.objects.update_or_create(
-                metric_type=f"activity_{action_type}",
-                date=today,
-                defaults={"count": F("count") + 1},
-            )
+    def _activity_event(
+        self,
+        *,
+        action_type: str,
+        description: str,
+        target_object: Optional[Any],
+        details: Optional[Dict[str, Any]],
+        ip_address: Optional[str],
+        user_agent: Optional[str],
+        session_key: Optional[str],
+        success: bool,
+        error_message: str,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Campos de `ActivityLog` y `UserActivityLog` para el buffer."""
+        content_type = None
+        object_id = None
+        if target_object:
+            # `get_for_model` se cachea en el proceso: no consulta la BD.
+            content_type = ContentType.objects.get_for_model(target_object)
+            object_id = str(target_object.pk)
 
-            # Métrica de errores si la acción falló
-            if not success:
-                SystemMetrics.objects.update_or_create(
-                    metric_type="activity_errors",
-                    date=today,
-                    defaults={"count": F("count") + 1},
-                )
-        except Exception as e:
-            logger.error(f"Failed to update activity metrics: {str(e)}")
+        return {
+            "activity": {
+                "action_type": action_type,
+                "description": description,
+                "details": details or {},
+                "content_type": content_type.pk if content_type else None,
+                "object_id": object_id,
+                "ip_address": ip_address,
+                "user_agent": user_agent or "",
+                "session_key": session_key or "",
+                "success": success,
+                "error_message": error_message,
+            },
+            "user_activity": {
+                "activity_type": action_type,
+                "description": description,
+                "metadata": {
+                    **(details or {}),
+                    "target_object_type": content_type.model if content_type else None,
+                    "target_object_id": object_id,
+                    "success": success,
+                    "error_message": error_message,
+                },
+                "ip_address": ip_address,
+                "user_agent": user_agent or "",
+            },
+        }
 
     def _calculate_risk_score(
         self,
@@ -694,6 +694,7 @@ def log_activity(
     target_object: Optional[Any] = None,
     details: Optional[Dict[str, Any]] = None,
     success: bool = True,
+    durable: bool = False,
 ) -> Optional[ActivityLog]:
     """Helper para registrar actividad desde un ViewSet/action.
 
@@ -708,6 +709,7 @@ def log_activity(
         target_object: objeto afectado (Contract, ServiceOrder, etc.).
         details: dict con metadatos adicionales.
         success: ``False`` para errores lógicos (p. ej. validación).
+        durable: escribir en línea en vez de diferir (core/audit_buffer.py).
     """
     try:
         user = getattr(request, "user", None)
@@ -728,6 +730,7 @@ def log_activity(
             user_agent=ua,
             session_key=session_key or "",
             success=success,
+            durable=durable,
         )
     except Exception as exc:  # pragma: no cover — auditoría nunca rompe el flujo
         logger.warning("log_activity failed silently: %s", exc)
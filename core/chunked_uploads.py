@@ -0,0 +1,403 @@
+"""
+Subidas reanudables por partes (protocolo al estilo tus).
+
+Los videos de propiedades y los documentos de inquilinos llegaban en un
+único multipart: el worker los bufferizaba completos y un corte de red
+en el móvil obligaba a empezar de cero (además nginx corta en 20 MB).
+
+Protocolo (`/api/v1/core/uploads/`):
+
+1. `POST uploads/` con `purpose`, `filename`, `size` y opcionalmente
+   `checksum` (SHA-256 hex) -> 201 con `id` y `Upload-Offset: 0`.
+2. `PATCH uploads/<id>/` con el header `Upload-Offset` y los bytes del
+   trozo como cuerpo. Se escribe directo al storage como una parte y se
+   responde 204 con el nuevo `Upload-Offset`. Si el offset no coincide
+   se responde 409 con el offset real.
+3. `HEAD uploads/<id>/` tras un corte: devuelve `Upload-Offset` para
+   reanudar desde ahí.
+4. Finalizar: el endpoint de destino de siempre recibe `upload_id` (y
+   `checksum` si no se declaró al crear) en vez del archivo. Se verifica
+   el SHA-256 y el archivo ensamblado pasa por la misma validación y
+   creación del modelo que un multipart.
+
+Las partes se guardan en `default_storage` bajo `chunked_uploads/<id>/`
+y se borran al consumir la subida o al expirar (`cleanup_chunked_uploads`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import posixpath
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ChunkedUpload
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Límites por destino; la validación de contenido la hace el serializer
+# del destino igual que con un multipart.
+PURPOSES = {
+    "property_video": {
+        "max_size": 500 * MB,
+        "extensions": (".mp4", ".mov", ".m4v", ".webm", ".avi", ".mkv"),
+    },
+    "tenant_document": {
+        "max_size": 10 * MB,
+        "extensions": (".pdf",),
+    },
+}
+
+_PARTS_DIR = "chunked_uploads"
+_READ_SIZE = 64 * 1024
+
+
+class ChunkedUploadError(Exception):
+    """Error del protocolo con el status HTTP a responder."""
+
+    def __init__(self, message: str, status_code: int = 400, offset=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.offset = offset
+
+
+def chunk_size() -> int:
+    """Tamaño de trozo sugerido al cliente."""
+    return getattr(settings, "CHUNKED_UPLOAD_CHUNK_SIZE", 5 * MB)
+
+
+def max_chunk_size() -> int:
+    return getattr(settings, "CHUNKED_UPLOAD_MAX_CHUNK_SIZE", 16 * MB)
+
+
+# ----------------------------------------------------------------------
+# Creación y partes
+# ----------------------------------------------------------------------
+
+
+def create_upload(
+    user, purpose, filename, size, checksum="", content_type=""
+) -> ChunkedUpload:
+    limits = PURPOSES.get(purpose)
+    if limits is None:
+        raise ChunkedUploadError(f'Destino "{purpose}" no válido.')
+    filename = posixpath.basename(str(filename or "").replace("\\", "/"))
+    if not filename.lower().endswith(limits["extensions"]):
+        raise ChunkedUploadError(
+            f"Extensión no permitida. Use: {', '.join(limits['extensions'])}."
+        )
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise ChunkedUploadError("size debe ser un entero.") from None
+    if size <= 0:
+        raise ChunkedUploadError("size debe ser mayor que cero.")
+    if size > limits["max_size"]:
+        raise ChunkedUploadError(
+            f"El archivo no puede ser mayor a {limits['max_size'] // MB}MB.",
+            status_code=413,
+        )
+    checksum = _normalize_checksum(checksum)
+    return ChunkedUpload.objects.create(
+        user=user,
+        purpose=purpose,
+        filename=filename[:255],
+        content_type=(content_type or "")[:100],
+        size=size,
+        checksum=checksum,
+        expires_at=timezone.now()
+        + timedelta(hours=getattr(settings, "CHUNKED_UPLOAD_EXPIRY_HOURS", 24)),
+    )
+
+
+def _normalize_checksum(checksum) -> str:
+    checksum = (checksum or "").strip().lower()
+    if checksum.startswith("sha256:"):
+        checksum = checksum[len("sha256:") :]
+    if checksum and (
+        len(checksum) != 64 or any(c not in "0123456789abcdef" for c in checksum)
+    ):
+        raise ChunkedUploadError("checksum debe ser un SHA-256 en hexadecimal.")
+    return checksum
+
+
+def get_upload(user, upload_id) -> ChunkedUpload:
+    try:
+        return ChunkedUpload.objects.get(
+            pk=upload_id, user=user, expires_at__gt=timezone.now()
+        )
+    except (ChunkedUpload.DoesNotExist, ValidationError, ValueError):
+        raise ChunkedUploadError("Subida no encontrada.", status_code=404) from None
+
+
+class _CountingReader:
+    """Lee el cuerpo del request contando bytes, sin cargarlo entero.
+
+    Un error de lectura (cliente desconectado) termina la parte como si
+    el cuerpo se hubiera acabado; `append_chunk` la descarta por corta.
+    """
+
+    def __init__(self, stream, limit: int):
+        self.stream = stream
+        self.limit = limit
+        self.count = 0
+        self.error = None
+
+    def read(self, size=-1):
+        if self.error is not None:
+            return b""
+        if size is None or size < 0:
+            size = self.limit - self.count
+        try:
+            data = self.stream.read(min(size, self.limit - self.count))
+        except Exception as exc:  # noqa: BLE001
+            self.error = exc
+            return b""
+        self.count += len(data)
+        return data
+
+
+def append_chunk(upload: ChunkedUpload, offset, stream, length) -> ChunkedUpload:
+    """Escribe un trozo en `offset` y avanza la subida.
+
+    Si el cuerpo llega incompleto (cliente cortado) la parte se descarta
+    y el offset no avanza: el cliente reanuda desde `HEAD`.
+    """
+    if upload.status != "uploading":
+        raise ChunkedUploadError(
+            "La subida ya está completa.", status_code=409, offset=upload.offset
+        )
+    try:
+        offset, length = int(offset), int(length)
+    except (TypeError, ValueError):
+        raise ChunkedUploadError(
+            "Se requieren los headers Upload-Offset y Content-Length."
+        ) from None
+    if offset != upload.offset:
+        raise ChunkedUploadError(
+            "Upload-Offset no coincide con lo recibido.",
+            status_code=409,
+            offset=upload.offset,
+        )
+    if length <= 0:
+        raise ChunkedUploadError("El trozo está vacío.")
+    if length > max_chunk_size():
+        raise ChunkedUploadError(
+            f"El trozo no puede ser mayor a {max_chunk_size() // MB}MB.",
+            status_code=413,
+        )
+    if offset + length > upload.size:
+        raise ChunkedUploadError("El trozo excede el tamaño declarado.")
+
+    name = posixpath.join(
+        _PARTS_DIR, str(upload.pk), f"{offset:012d}-{uuid.uuid4().hex[:8]}.part"
+    )
+    reader = _CountingReader(stream, length)
+    name = default_storage.save(name, File(reader, name=posixpath.basename(name)))
+    if reader.count != length:
+        logger.info(
+            "Trozo de %s en %s incompleto (%s/%s bytes): %s",
+            upload.pk,
+            offset,
+            reader.count,
+            length,
+            reader.error,
+        )
+        _delete_paths([name])
+        raise ChunkedUploadError(
+            "El trozo llegó incompleto.", status_code=400, offset=upload.offset
+        )
+
+    new_offset = offset + length
+    parts = [*upload.parts, [offset, name, length]]
+    status = "complete" if new_offset == upload.size else "uploading"
+    # Update condicionado al offset: dos PATCH concurrentes del mismo
+    # trozo no pueden avanzar ambos.
+    updated = ChunkedUpload.objects.filter(
+        pk=upload.pk, offset=offset, status="uploading"
+    ).update(offset=new_offset, parts=parts, status=status, updated_at=timezone.now())
+    if not updated:
+        _delete_paths([name])
+        upload.refresh_from_db()
+        raise ChunkedUploadError(
+            "Upload-Offset no coincide con lo recibido.",
+            status_code=409,
+            offset=upload.offset,
+        )
+    upload.offset, upload.parts, upload.status = new_offset, parts, status
+    return upload
+
+
+# ----------------------------------------------------------------------
+# Ensamblado y consumo
+# ----------------------------------------------------------------------
+
+
+class _PartsStream(io.RawIOBase):
+    """Las partes del storage leídas como un único archivo (con seek)."""
+
+    def __init__(self, parts, storage=None):
+        self.storage = storage or default_storage
+        self.parts = [(int(start), name, int(length)) for start, name, length in parts]
+        self.size = sum(length for _, _, length in self.parts)
+        self.position = 0
+        self._index = None
+        self._handle = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, min(offset, self.size))
+        self._close_handle()
+        return self.position
+
+    def readinto(self, buffer):
+        if self.position >= self.size:
+            return 0
+        index = self._part_at(self.position)
+        start, name, length = self.parts[index]
+        if self._index != index:
+            self._close_handle()
+            self._handle = self.storage.open(name, "rb")
+            self._index = index
+            self._handle.seek(self.position - start)
+        wanted = min(len(buffer), start + length - self.position)
+        data = self._handle.read(wanted)
+        if not data:
+            raise OSError(f"Parte {name} truncada")
+        buffer[: len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def _part_at(self, position):
+        for index, (start, _, length) in enumerate(self.parts):
+            if start <= position < start + length:
+                return index
+        raise OSError(f"Sin parte para el offset {position}")
+
+    def _close_handle(self):
+        if self._handle is not None:
+            self._handle.close()
+        self._handle, self._index = None, None
+
+    def close(self):
+        self._close_handle()
+        super().close()
+
+
+def open_upload(user, upload_id, purpose, checksum="") -> tuple[ChunkedUpload, File]:
+    """Verifica la subida completa y la devuelve como archivo subido."""
+    upload = get_upload(user, upload_id)
+    if upload.purpose != purpose:
+        raise ChunkedUploadError("La subida no corresponde a este destino.")
+    if upload.status == "consumed":
+        raise ChunkedUploadError("La subida ya fue utilizada.", status_code=409)
+    if upload.status != "complete":
+        raise ChunkedUploadError(
+            "La subida está incompleta.", status_code=409, offset=upload.offset
+        )
+    expected = _normalize_checksum(checksum) or upload.checksum
+    if not expected:
+        raise ChunkedUploadError("Se requiere el checksum SHA-256 para finalizar.")
+
+    digest = hashlib.sha256()
+    with _PartsStream(upload.parts) as stream:
+        for block in iter(lambda: stream.read(_READ_SIZE), b""):
+            digest.update(block)
+    if digest.hexdigest() != expected:
+        raise ChunkedUploadError("El checksum no coincide con el archivo recibido.")
+
+    stream = io.BufferedReader(_PartsStream(upload.parts), buffer_size=_READ_SIZE)
+    uploaded = UploadedFile(
+        file=stream,
+        name=upload.filename,
+        content_type=upload.content_type or "application/octet-stream",
+        size=upload.size,
+    )
+    return upload, uploaded
+
+
+def attach_upload(request, data, field: str, purpose: str) -> ChunkedUpload | None:
+    """Si `data` trae `upload_id`, pone el archivo ensamblado en `data[field]`.
+
+    Para que los endpoints de siempre acepten tanto el multipart como una
+    subida por partes sin duplicar su lógica de creación.
+    """
+    upload_id = data.get("upload_id")
+    if not upload_id:
+        return None
+    upload, uploaded = open_upload(
+        request.user, upload_id, purpose, checksum=data.get("checksum", "")
+    )
+    data[field] = uploaded
+    return upload
+
+
+def mark_consumed(upload: ChunkedUpload) -> bool:
+    """Marca la subida como usada; False si otro request se adelantó.
+
+    Llamar dentro del `transaction.atomic()` que crea el modelo: si la
+    creación falla, la subida vuelve a quedar disponible.
+    """
+    if not ChunkedUpload.objects.filter(pk=upload.pk, status="complete").update(
+        status="consumed", updated_at=timezone.now()
+    ):
+        return False
+    paths = [name for _, name, _ in upload.parts]
+    transaction.on_commit(lambda: _delete_paths(paths))
+    return True
+
+
+def _delete_paths(paths) -> None:
+    for path in paths:
+        try:
+            default_storage.delete(path)
+        except Exception:  # noqa: BLE001
+            logger.warning("No se pudo borrar la parte %s", path)
+
+
+def delete_upload(upload: ChunkedUpload) -> None:
+    paths = [name for _, name, _ in upload.parts]
+    upload.delete()
+    transaction.on_commit(lambda: _delete_paths(paths))
+
+
+def cleanup_expired(now=None) -> int:
+    """Borra las subidas expiradas (abandonadas o ya consumidas) y sus partes."""
+    now = now or timezone.now()
+    removed = 0
+    for upload in ChunkedUpload.objects.filter(expires_at__lte=now).iterator():
+        delete_upload(upload)
+        removed += 1
+    return removed
+
+
+def upload_headers(upload: ChunkedUpload) -> dict:
+    return {
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.size),
+        "Cache-Control": "no-store",
+    }
@@ -0,0 +1,230 @@
+"""
+Entrega de archivos protegidos (documentos de inquilinos) tras el
+chequeo de permisos y el registro de auditoría.
+
+`FileResponse` ocupaba un worker de Python durante toda la transferencia
+y no soportaba `Range`, así que los visores de PDF descargaban el
+archivo completo en cada salto de página. Modos (`PROTECTED_FILE_DELIVERY`):
+
+- ``"x-accel"``: la vista responde sólo headers con `X-Accel-Redirect`
+  hacia la location interna de nginx (`PROTECTED_FILE_ACCEL_PREFIX`),
+  firmada con `secure_link` y con vencimiento corto
+  (`PROTECTED_FILE_URL_TTL`). nginx sirve el archivo con sendfile y
+  resuelve `Range`/`ETag` por su cuenta.
+- ``"x-sendfile"``: igual para Apache/lighttpd (`X-Sendfile` con la ruta
+  absoluta).
+- ``"python"`` (por defecto, y fallback si el storage no es local): se
+  sirve desde Django con soporte de `Range` (un rango), `If-Range`,
+  `ETag`/`If-None-Match` y `Last-Modified`.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import logging
+import re
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+logger = logging.getLogger(__name__)
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_STREAM_BLOCK = 64 * 1024
+
+
+def delivery_mode() -> str:
+    return getattr(settings, "PROTECTED_FILE_DELIVERY", "python")
+
+
+def serve_protected_file(
+    request,
+    field_file,
+    *,
+    filename: str,
+    content_type: str = "application/octet-stream",
+    as_attachment: bool = True,
+    headers: dict | None = None,
+):
+    """Respuesta para `field_file` según el modo de entrega configurado.
+
+    Los permisos y la auditoría son responsabilidad de la vista: esta
+    función sólo decide cómo viajan los bytes. Puede lanzar
+    `FileNotFoundError` si el archivo no existe.
+    """
+    mode = delivery_mode()
+    path = _local_path(field_file)
+    if mode in ("x-accel", "x-sendfile") and path is None:
+        logger.warning(
+            "Storage sin ruta local para %s: se sirve desde Python", field_file.name
+        )
+        mode = "python"
+    if mode == "x-accel" and not getattr(settings, "PROTECTED_FILE_SECRET", ""):
+        logger.error("PROTECTED_FILE_SECRET vacío: X-Accel-Redirect deshabilitado")
+        mode = "python"
+
+    if mode == "x-accel":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = signed_internal_uri(field_file.name)
+        # nginx fija Content-Length, ETag y Range desde el archivo.
+        response["X-Accel-Buffering"] = "no"
+    elif mode == "x-sendfile":
+        if not field_file.storage.exists(field_file.name):
+            raise FileNotFoundError(field_file.name)
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = path
+    else:
+        response = _python_response(request, field_file, content_type)
+
+    response["Content-Disposition"] = content_disposition_header(
+        as_attachment, filename
+    )
+    for header, value in (headers or {}).items():
+        response[header] = value
+    return response
+
+
+def _local_path(field_file) -> str | None:
+    try:
+        return field_file.storage.path(field_file.name)
+    except NotImplementedError:
+        return None
+
+
+# ----------------------------------------------------------------------
+# X-Accel-Redirect (nginx secure_link)
+# ----------------------------------------------------------------------
+
+
+def signed_internal_uri(name: str, now: float | None = None) -> str:
+    """URI interna firmada para `secure_link_md5` de nginx.
+
+    Corresponde a `secure_link_md5 "$secure_link_expires$uri <secreto>"`
+    en nginx/nginx.prod.conf. nginx sólo admite MD5 en `secure_link`.
+    """
+    prefix = getattr(settings, "PROTECTED_FILE_ACCEL_PREFIX", "/_protected/")
+    # `$uri` en nginx es la ruta ya decodificada: se firma sin escapar.
+    uri = prefix.rstrip("/") + "/" + name.lstrip("/")
+    ttl = getattr(settings, "PROTECTED_FILE_URL_TTL", 60)
+    expires = int(now if now is not None else time.time()) + ttl
+    secret = getattr(settings, "PROTECTED_FILE_SECRET", "")
+    digest = hashlib.md5(f"{expires}{uri} {secret}".encode()).digest()
+    token = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+    return f"{quote(uri)}?md5={token}&expires={expires}"
+
+
+# ----------------------------------------------------------------------
+# Fallback en Python: Range / ETag
+# ----------------------------------------------------------------------
+
+
+def _python_response(request, field_file, content_type):
+    storage, name = field_file.storage, field_file.name
+    size = storage.size(name)
+    try:
+        modified = storage.get_modified_time(name).timestamp()
+    except (NotImplementedError, AttributeError):
+        modified = None
+    etag = _etag(name, size, modified)
+
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        response = HttpResponse(status=304)
+        _validators(response, etag, modified)
+        return response
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and _if_range_ok(request.headers.get("If-Range"), etag, modified):
+        byte_range = parse_range(range_header, size)
+        if byte_range == "unsatisfiable":
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            response["Accept-Ranges"] = "bytes"
+            return response
+
+    handle = storage.open(name, "rb")
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+        response["Content-Length"] = str(size)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _iter_range(handle, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    response["Accept-Ranges"] = "bytes"
+    _validators(response, etag, modified)
+    return response
+
+
+def _etag(name: str, size: int, modified: float | None) -> str:
+    # Los archivos subidos no se reescriben en sitio (un reemplazo es un
+    # nombre nuevo), así que nombre+tamaño+mtime es un validador fuerte.
+    raw = f"{name}:{size}:{modified or ''}".encode()
+    return quote_etag(hashlib.sha256(raw).hexdigest()[:32])
+
+
+def _validators(response, etag, modified):
+    response["ETag"] = etag
+    if modified is not None:
+        response["Last-Modified"] = http_date(modified)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _if_range_ok(header: str | None, etag: str, modified: float | None) -> bool:
+    """Sin `If-Range`, o si coincide, se respeta el `Range`."""
+    if not header:
+        return True
+    if header.startswith('"'):
+        return header == etag
+    return modified is not None and header == http_date(modified)
+
+
+def parse_range(header: str, size: int):
+    """`(start, end)` inclusivo, None para ignorar o "unsatisfiable".
+
+    Sólo se atiende un rango; varios rangos se responden con el archivo
+    completo (permitido por RFC 9110).
+    """
+    match = _RANGE_RE.match(header.strip().replace(" ", ""))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            return "unsatisfiable"
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or (last and end < start):
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+def _iter_range(handle, start: int, length: int):
+    try:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(_STREAM_BLOCK, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        handle.close()
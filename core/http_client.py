@@ -0,0 +1,342 @@
+"""Cliente HTTP saliente compartido para pasarelas e integraciones.
+
+Antes cada operación de Bold, PSE, Wompi o del DANE llamaba a
+`requests.post/get` sueltos: un handshake TCP+TLS nuevo por llamada y,
+para catálogos como la lista de bancos o la serie del IPC, la misma
+consulta en cada checkout. `get_client(servicio)` entrega un cliente
+por integración con:
+
+- Una `requests.Session` por host (keep-alive, pool de conexiones).
+- Timeouts por defecto (conexión, lectura) y reintentos con backoff
+  exponencial y jitter. Los reintentos por lectura o por 502/503/504
+  sólo aplican a métodos idempotentes; un POST sólo se reintenta si la
+  conexión no llegó a establecerse.
+- Un circuit breaker por host: tras N fallos seguidos (errores de red o
+  5xx) las llamadas fallan de inmediato con `CircuitOpenError` hasta que
+  pasa la ventana de reapertura y una llamada de prueba sale bien.
+- `get_json(..., cache_ttl=...)` cachea respuestas de catálogos en el
+  cache de Django.
+- Métricas de latencia por servicio, acumuladas en el proceso y volcadas
+  como contadores al cache para `core.performance_monitor`.
+
+`CircuitOpenError` hereda de `requests.ConnectionError`, así que los
+`except requests.RequestException` existentes la manejan igual que una
+caída de red.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from urllib3.util.retry import Retry
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+_CACHE_KEY = "core:http:v1:cache:{service}:{digest}"
+_METRIC_KEY = "core:http:v1:metrics:{service}:{field}"
+_SERVICES_KEY = "core:http:v1:services"
+
+METRIC_FIELDS = ("calls", "errors", "total_ms", "slow")
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """El circuito del host está abierto: la llamada no se intenta."""
+
+
+class CircuitBreaker:
+    """Breaker por host: closed → open tras `threshold` fallos seguidos.
+
+    Con el circuito abierto se rechaza todo hasta `reset_after` segundos;
+    luego se deja pasar una sola llamada de prueba (half-open) que lo
+    cierra si sale bien o lo reabre si falla.
+    """
+
+    def __init__(self, threshold: int, reset_after: float):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_after:
+                return "open"
+            return "half-open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after:
+                return False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+class _Metrics:
+    """Contadores de latencia por servicio, volcados al cache por lotes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[str, Counter] = {}
+        self._known: set[str] = set()
+        self._flushed_at = time.monotonic()
+
+    def record(self, service: str, elapsed_ms: float, error: bool) -> None:
+        slow = elapsed_ms >= getattr(settings, "HTTP_CLIENT_SLOW_MS", 1000)
+        interval = getattr(settings, "HTTP_CLIENT_METRICS_INTERVAL", 10)
+        with self._lock:
+            counter = self._pending.setdefault(service, Counter())
+            counter["calls"] += 1
+            counter["errors"] += int(error)
+            counter["total_ms"] += round(elapsed_ms)
+            counter["slow"] += int(slow)
+            due = time.monotonic() - self._flushed_at >= interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+        try:
+            new = set(pending) - self._known
+            if new:
+                services = set(cache.get(_SERVICES_KEY) or ())
+                if not new <= services:
+                    cache.set(_SERVICES_KEY, sorted(services | new), None)
+                self._known |= new
+            for service, counter in pending.items():
+                for field, value in counter.items():
+                    if not value:
+                        continue
+                    key = _METRIC_KEY.format(service=service, field=field)
+                    cache.add(key, 0, None)
+                    cache.incr(key, value)
+        except Exception as exc:  # noqa: BLE001 — las métricas no rompen la llamada
+            logger.debug("No se pudieron volcar las métricas HTTP: %s", exc)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending = {}
+            self._known = set()
+            self._flushed_at = time.monotonic()
+
+
+_metrics = _Metrics()
+
+
+def flush_metrics() -> None:
+    """Vuelca al cache los contadores pendientes de este proceso."""
+    _metrics.flush()
+
+
+def metrics_snapshot() -> dict[str, dict]:
+    """Contadores acumulados por servicio (todos los procesos)."""
+    services = cache.get(_SERVICES_KEY) or []
+    keys = {
+        (service, field): _METRIC_KEY.format(service=service, field=field)
+        for service in services
+        for field in METRIC_FIELDS
+    }
+    values = cache.get_many(keys.values())
+    snapshot = {}
+    for service in services:
+        row = {
+            field: values.get(keys[service, field], 0) or 0 for field in METRIC_FIELDS
+        }
+        row["avg_ms"] = row["total_ms"] / row["calls"] if row["calls"] else 0.0
+        snapshot[service] = row
+    return snapshot
+
+
+class HttpClient:
+    """Cliente de un servicio externo con sesiones y breakers por host."""
+
+    def __init__(
+        self,
+        service: str,
+        *,
+        timeout: tuple[float, float] | None = None,
+        retries: int | None = None,
+        backoff: float | None = None,
+        pool_size: int | None = None,
+    ):
+        self.service = service
+        self.timeout = timeout or (
+            getattr(settings, "HTTP_CLIENT_CONNECT_TIMEOUT", 5),
+            getattr(settings, "HTTP_CLIENT_READ_TIMEOUT", 30),
+        )
+        if retries is None:
+            retries = getattr(settings, "HTTP_CLIENT_RETRIES", 2)
+        if backoff is None:
+            backoff = getattr(settings, "HTTP_CLIENT_BACKOFF", 0.3)
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size or getattr(settings, "HTTP_CLIENT_POOL_SIZE", 10)
+        self._lock = threading.Lock()
+        self._sessions: dict[str, requests.Session] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def _retry(self) -> Retry:
+        return Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=self.retries,
+            status_forcelist=RETRY_STATUSES,
+            backoff_factor=self.backoff,
+            backoff_jitter=self.backoff,
+            raise_on_status=False,
+        )
+
+    def _session(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # `requests.adapters` vía atributo: la app local `requests`
+                # reexporta la librería pero no sus submódulos.
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.pool_size,
+                    max_retries=self._retry(),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    getattr(settings, "HTTP_CLIENT_BREAKER_THRESHOLD", 5),
+                    getattr(settings, "HTTP_CLIENT_BREAKER_RESET", 30),
+                )
+                self._breakers[host] = breaker
+            return breaker
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            _metrics.record(self.service, 0.0, error=True)
+            raise CircuitOpenError(f"Circuito abierto para {host} ({self.service})")
+
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            response = self._session(host).request(method, url, **kwargs)
+        except requests.RequestException:
+            breaker.record(False)
+            _metrics.record(
+                self.service, (time.perf_counter() - start) * 1000, error=True
+            )
+            raise
+        failed = response.status_code >= 500
+        breaker.record(not failed)
+        _metrics.record(self.service, (time.perf_counter() - start) * 1000, failed)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get_json(
+        self,
+        url: str,
+        *,
+        params: dict | None = None,
+        headers: dict | None = None,
+        cache_ttl: int | None = None,
+    ):
+        """GET que devuelve el JSON; con `cache_ttl` se cachea la respuesta.
+
+        La clave depende sólo de la URL y los parámetros (no de los
+        headers): usarlo para catálogos que no varían por usuario.
+        """
+        key = None
+        if cache_ttl:
+            digest = hashlib.sha1(
+                json.dumps([url, params or {}], sort_keys=True, default=str).encode(),
+                usedforsecurity=False,
+            ).hexdigest()
+            key = _CACHE_KEY.format(service=self.service, digest=digest)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.get(url, params=params, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        if key:
+            cache.set(key, data, cache_ttl)
+        return data
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+
+_clients: dict[str, HttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(service: str, **options) -> HttpClient:
+    """Cliente compartido (por proceso) del servicio `service`.
+
+    `options` (timeout, retries, ...) sólo aplican al crear el cliente.
+    """
+    with _clients_lock:
+        client = _clients.get(service)
+        if client is None:
+            client = _clients[service] = HttpClient(service, **options)
+        return client
+
+
+def reset_clients() -> None:
+    """Cierra las sesiones y olvida breakers y métricas locales (tests)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    for client in clients:
+        client.close()
+        with client._lock:
+            client._breakers.clear()
+    _metrics.reset()
@@ -0,0 +1,340 @@
+"""
+Pipeline de imágenes subidas (propiedades, servicios, avatares).
+
+Las subidas ya no se procesan durante el request: el `post_save` del
+modelo llama a `schedule_renditions()`, que encola
+`core.tasks.generate_image_renditions` tras el commit. La tarea:
+
+- aplica la orientación EXIF y reescribe el original sin metadatos
+  (GPS incluido), acotado al tamaño `full` del perfil;
+- genera las versiones `thumb`/`card`/`full` en WebP y JPEG;
+- calcula dimensiones, un blurhash y un LQIP (data URI WebP de ~16px)
+  para pintar un placeholder antes de que llegue la imagen.
+
+El resultado queda en un JSONField del modelo (`renditions`, o
+`avatar_renditions` en `User`) y los serializers lo exponen con
+`rendition_payload()`.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+import math
+import posixpath
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Caja máxima (ancho, alto) de cada versión por tipo de imagen.
+PROFILES = {
+    "property": {"thumb": (320, 240), "card": (640, 480), "full": (1920, 1080)},
+    "service": {"thumb": (320, 240), "card": (640, 480), "full": (1600, 1200)},
+    "avatar": {"thumb": (64, 64), "card": (160, 160), "full": (512, 512)},
+}
+
+FORMATS = (
+    ("webp", "WEBP", {"quality": 80, "method": 4}),
+    ("jpeg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+)
+
+# Formatos del original que se reescriben sin EXIF (los demás, p.ej. GIF
+# animados, se dejan intactos).
+_REWRITABLE = {
+    "JPEG": ("JPEG", {"quality": 85, "optimize": True}),
+    "MPO": ("JPEG", {"quality": 85, "optimize": True}),
+    "PNG": ("PNG", {"optimize": True}),
+    "WEBP": ("WEBP", {"quality": 85}),
+}
+
+_LQIP_WIDTH = 16
+
+
+# ----------------------------------------------------------------------
+# Procesamiento
+# ----------------------------------------------------------------------
+
+
+def process_image(field_file, profile: str) -> dict:
+    """Genera las versiones de `field_file` y retorna sus metadatos."""
+    storage = field_file.storage
+    name = field_file.name
+    with storage.open(name, "rb") as handle:
+        image = Image.open(handle)
+        image.load()
+    source_format = image.format
+    image = ImageOps.exif_transpose(image)
+    boxes = PROFILES[profile]
+
+    name = _rewrite_original(storage, name, image, source_format, boxes["full"])
+    flat = _flatten(image)
+
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    renditions = {}
+    for rendition, box in boxes.items():
+        resized = flat.copy()
+        resized.thumbnail(box, Image.Resampling.LANCZOS)
+        entry = {"width": resized.width, "height": resized.height}
+        for extension, pillow_format, options in FORMATS:
+            path = posixpath.join(
+                directory, "renditions", f"{stem}_{rendition}.{extension}"
+            )
+            entry[extension] = _save(storage, path, resized, pillow_format, options)
+        renditions[rendition] = entry
+
+    return {
+        "source": name,
+        "width": image.width,
+        "height": image.height,
+        "blurhash": blurhash(flat),
+        "lqip": lqip(flat),
+        "renditions": renditions,
+    }
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB sobre blanco: JPEG no tiene alfa y el blurhash tampoco."""
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _rewrite_original(storage, name, image, source_format, box) -> str:
+    target = _REWRITABLE.get(source_format)
+    if target is None:
+        return name
+    original = image.copy()
+    original.thumbnail(box, Image.Resampling.LANCZOS)
+    if target[0] == "JPEG":
+        original = _flatten(original)
+    # Sin `exif=`: Pillow no copia los metadatos al guardar.
+    return _save(storage, name, original, *target)
+
+
+def _save(storage, path, image, pillow_format, options) -> str:
+    buffer = BytesIO()
+    image.save(buffer, pillow_format, **options)
+    if storage.exists(path):
+        storage.delete(path)
+    return storage.save(path, ContentFile(buffer.getvalue()))
+
+
+def delete_renditions(meta: dict, storage, keep: dict | None = None) -> None:
+    """Borra los archivos de `meta` que no estén también en `keep`."""
+    kept = set(_rendition_paths(keep or {}))
+    for path in _rendition_paths(meta or {}):
+        if path not in kept:
+            try:
+                storage.delete(path)
+            except Exception:  # noqa: BLE001
+                logger.warning("No se pudo borrar la versión %s", path)
+
+
+def _rendition_paths(meta: dict):
+    for entry in (meta.get("renditions") or {}).values():
+        for extension, _, _ in FORMATS:
+            if entry.get(extension):
+                yield entry[extension]
+
+
+# ----------------------------------------------------------------------
+# Placeholders
+# ----------------------------------------------------------------------
+
+
+def lqip(image: Image.Image) -> str:
+    """Data URI WebP de `_LQIP_WIDTH` px de ancho."""
+    small = image.copy()
+    small.thumbnail((_LQIP_WIDTH, _LQIP_WIDTH), Image.Resampling.BILINEAR)
+    buffer = BytesIO()
+    small.save(buffer, "WEBP", quality=40)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _base83(value: int, length: int) -> str:
+    return "".join(
+        _BASE83[(value // 83 ** (length - index)) % 83]
+        for index in range(1, length + 1)
+    )
+
+
+def _to_linear(value: int) -> float:
+    value = value / 255
+    return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+
+def _to_srgb(value: float) -> int:
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(image: Image.Image, x_components: int = 4, y_components: int = 3) -> str:
+    """Blurhash (https://blurha.sh) calculado sobre una muestra de 32x32."""
+    size = 32
+    pixels = [
+        tuple(_to_linear(channel) for channel in pixel)
+        for pixel in image.convert("RGB").resize((size, size)).getdata()
+    ]
+    cosines = [
+        [math.cos(math.pi * component * position / size) for position in range(size)]
+        for component in range(max(x_components, y_components))
+    ]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == j == 0 else 2
+            red = green = blue = 0.0
+            for y in range(size):
+                row = cosines[j][y] * normalisation
+                for x in range(size):
+                    basis = cosines[i][x] * row
+                    pixel = pixels[y * size + x]
+                    red += basis * pixel[0]
+                    green += basis * pixel[1]
+                    blue += basis * pixel[2]
+            scale = 1 / (size * size)
+            factors.append((red * scale, green * scale, blue * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        actual_max = max(abs(value) for factor in ac for value in factor)
+        quantised_max = max(0, min(82, math.floor(actual_max * 166 - 0.5)))
+        maximum = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        maximum = 1.0
+        result += _base83(0, 1)
+    result += _base83(
+        (_to_srgb(dc[0]) << 16) + (_to_srgb(dc[1]) << 8) + _to_srgb(dc[2]), 4
+    )
+
+    def quantise(value: float) -> int:
+        signed = math.copysign(abs(value / maximum) ** 0.5, value)
+        return max(0, min(18, math.floor(signed * 9 + 9.5)))
+
+    for factor in ac:
+        red, green, blue = (quantise(value) for value in factor)
+        result += _base83(red * 19 * 19 + green * 19 + blue, 2)
+    return result
+
+
+# ----------------------------------------------------------------------
+# Programación y serialización
+# ----------------------------------------------------------------------
+
+
+def schedule_renditions(
+    instance, field_name: str, profile: str, renditions_field: str = "renditions"
+) -> None:
+    """Encola el procesamiento si la imagen cambió desde el último."""
+    field_file = getattr(instance, field_name)
+    meta = getattr(instance, renditions_field) or {}
+    source = field_file.name if field_file else ""
+    if meta.get("source", "") == source:
+        return
+    args = (
+        instance._meta.label,
+        str(instance.pk),
+        field_name,
+        profile,
+        renditions_field,
+        source,
+    )
+    transaction.on_commit(lambda: _enqueue(args))
+
+
+def _enqueue(args) -> None:
+    from .tasks import generate_image_renditions
+
+    if getattr(settings, "IMAGE_RENDITIONS_ASYNC", True):
+        try:
+            generate_image_renditions.delay(*args)
+            return
+        except Exception as exc:  # noqa: BLE001
+            # Sin broker se procesa en línea, como antes del pipeline.
+            logger.error("No se pudo encolar el procesamiento de %s: %s", args, exc)
+    generate_image_renditions(*args)
+
+
+def generate_renditions(
+    model_label: str,
+    pk: str,
+    field_name: str,
+    profile: str,
+    renditions_field: str,
+    source: str,
+) -> str:
+    """Cuerpo de `core.tasks.generate_image_renditions`."""
+    instance = apps.get_model(model_label).objects.filter(pk=pk).first()
+    if instance is None:
+        return "deleted"
+    field_file = getattr(instance, field_name)
+    current = field_file.name if field_file else ""
+    if current != source:
+        # Otra subida la reemplazó; su propia tarea la procesa.
+        return "stale"
+
+    previous = getattr(instance, renditions_field) or {}
+    if not source:
+        meta = {}
+    else:
+        try:
+            meta = process_image(field_file, profile)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("No se pudo procesar %s (%s): %s", source, model_label, exc)
+            meta = {"source": source, "error": str(exc)[:200]}
+
+    update_fields = [renditions_field]
+    if meta.get("source", source) != source:
+        setattr(instance, field_name, meta["source"])
+        update_fields.append(field_name)
+    setattr(instance, renditions_field, meta)
+    instance.save(update_fields=update_fields)
+    delete_renditions(previous, field_file.storage, keep=meta)
+    return "processed" if meta.get("renditions") else "cleared"
+
+
+def rendition_payload(meta: dict, storage, request=None) -> dict | None:
+    """Metadatos y URLs de las versiones; None si aún no se procesó."""
+    if not meta or not meta.get("renditions"):
+        return None
+
+    def url(path):
+        location = storage.url(path)
+        return request.build_absolute_uri(location) if request else location
+
+    return {
+        "width": meta.get("width"),
+        "height": meta.get("height"),
+        "blurhash": meta.get("blurhash"),
+        "lqip": meta.get("lqip"),
+        **{
+            name: {
+                "width": entry["width"],
+                "height": entry["height"],
+                **{
+                    extension: url(entry[extension])
+                    for extension, _, _ in FORMATS
+                    if entry.get(extension)
+                },
+            }
+            for name, entry in meta["renditions"].items()
+        },
+    }
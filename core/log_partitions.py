@@ -0,0 +1,380 @@
+"""Particionado mensual y retención de las tablas de logs.
+
+`ActivityLog`, `UserActivityLog`, `DocumentAccessLog` y
+`ContractWorkflowHistory` sólo crecen, y la limpieza borraba fila por
+fila (DELETE con índices, bloat y locks largos). En PostgreSQL cada una
+es una tabla particionada por rango (`PARTITION BY RANGE`) sobre su
+columna de fecha, con una partición por mes calendario en UTC
+(`<tabla>_pAAAAMM`) y una partición DEFAULT de respaldo:
+
+- `ensure_partitions()` crea las particiones de los próximos meses
+  (`manage.py manage_log_partitions`, tarea diaria
+  `core.tasks.maintain_log_partitions`). Si por algún motivo la DEFAULT
+  ya tiene filas del mes nuevo, se mueven a la partición creada.
+- `purge_before()` aplica la retención: las particiones que quedan
+  enteras antes del corte se separan (`DETACH`) y se borran (`DROP`),
+  sin tocar filas; sólo el mes que cruza el corte se borra con DELETE.
+- Los filtros por fecha sobre la columna de partición permiten al
+  planner descartar particiones (partition pruning).
+
+En SQLite (tests, desarrollo) las tablas siguen siendo normales: no hay
+particiones que crear y la retención borra por lotes de
+`LOG_RETENTION_DELETE_BATCH` filas para no bloquear la tabla entera.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import UTC, date, datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection as default_connection
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# (modelo, campo de fecha usado como clave de partición)
+PARTITIONED_LOGS = (
+    ("core.ActivityLog", "created_at"),
+    ("users.UserActivityLog", "timestamp"),
+    ("requests.DocumentAccessLog", "timestamp"),
+    ("contracts.ContractWorkflowHistory", "timestamp"),
+)
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def supported(conn=None) -> bool:
+    return (conn or default_connection).vendor == "postgresql"
+
+
+def partition_field(model) -> str | None:
+    for label, field in PARTITIONED_LOGS:
+        if model._meta.label == label:
+            return field
+    return None
+
+
+def partitioned_models():
+    for label, field in PARTITIONED_LOGS:
+        yield apps.get_model(label), field
+
+
+# ----------------------------------------------------------------------
+# Meses
+# ----------------------------------------------------------------------
+
+
+def month_start(value: datetime | date) -> date:
+    if isinstance(value, datetime):
+        value = value.astimezone(UTC).date()
+    return value.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00:00"
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+# ----------------------------------------------------------------------
+# Introspección (PostgreSQL)
+# ----------------------------------------------------------------------
+
+
+def is_partitioned(table: str, conn=None) -> bool:
+    conn = conn or default_connection
+    if not supported(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions(table: str, conn=None) -> list[dict]:
+    """Particiones de `table`: nombre, límites (UTC) y si es la DEFAULT."""
+    conn = conn or default_connection
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+            [table],
+        )
+        rows = cursor.fetchall()
+    result = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        result.append(
+            {
+                "name": name,
+                "default": bound == "DEFAULT",
+                "start": datetime.fromisoformat(match.group(1)) if match else None,
+                "end": datetime.fromisoformat(match.group(2)) if match else None,
+            }
+        )
+    return result
+
+
+# ----------------------------------------------------------------------
+# Conversión y mantenimiento
+# ----------------------------------------------------------------------
+
+
+def convert_to_partitioned(
+    table: str, column: str, conn=None, months_ahead: int | None = None
+) -> bool:
+    """Convierte `table` en tabla particionada por mes sobre `column`.
+
+    Copia las filas a una tabla nueva con la misma estructura y recrea
+    índices, FKs y la secuencia del pk. La clave primaria pasa a ser
+    ``(pk, column)``: PostgreSQL exige que incluya la clave de
+    partición. Retorna False si no aplica (otro motor o ya particionada).
+    """
+    conn = conn or default_connection
+    if not supported(conn) or is_partitioned(table, conn):
+        return False
+    qn = conn.ops.quote_name
+    legacy = f"{table}__unpartitioned"
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        pk_column = conn.introspection.get_primary_key_column(cursor, table)
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'p'",
+            [table],
+        )
+        pk_name = cursor.fetchone()[0]
+        cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [qn(table), pk_column])
+        has_sequence = cursor.fetchone()[0] is not None
+        # Las definiciones se leen antes de renombrar: ya nombran `table`.
+        cursor.execute(
+            "SELECT pg_get_indexdef(x.indexrelid), x.indisunique "
+            "FROM pg_index x WHERE x.indrelid = %s::regclass AND NOT x.indisprimary",
+            [table],
+        )
+        indexes = cursor.fetchall()
+        for definition, unique in indexes:
+            if unique and column not in definition:
+                raise ValueError(
+                    f"{table}: índice único sin {column}, no se puede particionar"
+                )
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT min({qn(column)}) FROM {qn(table)}")
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        # Sin INCLUDING DEFAULTS: el default del pk apunta a la secuencia
+        # de la tabla vieja, que se borra con ella.
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING CONSTRAINTS "
+            f"INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({qn(column)})"
+        )
+        cursor.execute(
+            f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(table)} DEFAULT"
+        )
+        ensure_partitions(table, conn, months_ahead=months_ahead, since=oldest)
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(pk_name)} "
+            f"PRIMARY KEY ({qn(pk_column)}, {qn(column)})"
+        )
+        for definition, _ in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}"
+            )
+        if has_sequence:
+            sequence = f"{table}_{pk_column}_seq"
+            cursor.execute(
+                f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.{qn(pk_column)}"
+            )
+            cursor.execute(
+                f"SELECT setval(%s, COALESCE(max({qn(pk_column)}), 0) + 1, false) "
+                f"FROM {qn(table)}",
+                [qn(sequence)],
+            )
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} ALTER COLUMN {qn(pk_column)} "
+                f"SET DEFAULT nextval(%s::regclass)",
+                [qn(sequence)],
+            )
+    logger.info("Tabla %s particionada por mes sobre %s", table, column)
+    return True
+
+
+def ensure_partitions(
+    table: str,
+    conn=None,
+    months_ahead: int | None = None,
+    since: datetime | date | None = None,
+) -> list[str]:
+    """Crea las particiones mensuales que falten hasta `months_ahead`.
+
+    Empieza en el mes de `since` (por defecto el actual). Retorna los
+    nombres creados.
+    """
+    conn = conn or default_connection
+    if not supported(conn):
+        return []
+    if months_ahead is None:
+        months_ahead = getattr(settings, "LOG_PARTITION_MONTHS_AHEAD", 3)
+    now = timezone.now()
+    first = month_start(now)
+    if since is not None:
+        first = min(first, month_start(since))
+    last = add_months(month_start(now), months_ahead)
+
+    existing = {part["name"] for part in partitions(table, conn)}
+    default = f"{table}_default"
+    created = []
+    month = first
+    while month <= last:
+        name = partition_name(table, month)
+        if name not in existing:
+            _create_partition(conn, table, name, default in existing, month)
+            created.append(name)
+        month = add_months(month, 1)
+    if created:
+        logger.info("Particiones creadas en %s: %s", table, ", ".join(created))
+    return created
+
+
+def _create_partition(conn, table, name, has_default, month):
+    qn = conn.ops.quote_name
+    column_bounds = (_bound(month), _bound(add_months(month, 1)))
+    bounds = "FOR VALUES FROM (%s) TO (%s)"
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        stray = False
+        if has_default:
+            column = _partition_column(cursor, table)
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {qn(table + '_default')} "
+                f"WHERE {qn(column)} >= %s AND {qn(column)} < %s)",
+                column_bounds,
+            )
+            stray = cursor.fetchone()[0]
+        if not stray:
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} {bounds}",
+                column_bounds,
+            )
+            return
+        # PostgreSQL no deja crear la partición si la DEFAULT tiene filas
+        # de ese rango: se separa, se mueven las filas y se vuelve a unir.
+        default = qn(table + "_default")
+        where = f"{qn(column)} >= %s AND {qn(column)} < %s"
+        cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {default}")
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} {bounds}",
+            column_bounds,
+        )
+        cursor.execute(
+            f"INSERT INTO {qn(name)} SELECT * FROM {default} WHERE {where}",
+            column_bounds,
+        )
+        cursor.execute(f"DELETE FROM {default} WHERE {where}", column_bounds)
+        cursor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {default} DEFAULT")
+
+
+def _partition_column(cursor, table: str) -> str:
+    cursor.execute(
+        "SELECT a.attname FROM pg_partitioned_table pt "
+        "JOIN pg_attribute a ON a.attrelid = pt.partrelid "
+        "AND a.attnum = pt.partattrs[0] "
+        "WHERE pt.partrelid = %s::regclass",
+        [table],
+    )
+    return cursor.fetchone()[0]
+
+
+# ----------------------------------------------------------------------
+# Retención
+# ----------------------------------------------------------------------
+
+
+def purge_before(
+    model, cutoff: datetime, field: str | None = None, dry_run: bool = False
+) -> int:
+    """Elimina las filas de `model` anteriores a `cutoff`; retorna cuántas.
+
+    En tablas particionadas las particiones enteras se separan y borran;
+    el resto (tablas normales, o el mes que cruza el corte) se borra por
+    lotes.
+    """
+    field = field or partition_field(model) or "created_at"
+    if dry_run:
+        return model.objects.filter(**{f"{field}__lt": cutoff}).count()
+    table = model._meta.db_table
+    conn = default_connection
+    removed = 0
+    if is_partitioned(table, conn):
+        qn = conn.ops.quote_name
+        for part in partitions(table, conn):
+            if part["default"] or part["end"] is None or part["end"] > cutoff:
+                continue
+            with transaction.atomic(), conn.cursor() as cursor:
+                cursor.execute(f"SELECT count(*) FROM {qn(part['name'])}")
+                removed += cursor.fetchone()[0]
+                cursor.execute(
+                    f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(part['name'])}"
+                )
+                cursor.execute(f"DROP TABLE {qn(part['name'])}")
+            logger.info("Partición %s eliminada (retención)", part["name"])
+    return removed + _delete_in_batches(model, field, cutoff)
+
+
+def _delete_in_batches(model, field: str, cutoff: datetime) -> int:
+    queryset = model.objects.filter(**{f"{field}__lt": cutoff}).order_by()
+    batch = getattr(settings, "LOG_RETENTION_DELETE_BATCH", 5000)
+    removed = 0
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:batch])
+        if not pks:
+            return removed
+        # Un DELETE corto por lote: los locks no duran todo el borrado.
+        removed += model.objects.filter(pk__in=pks).delete()[0]
+
+
+def apply_retention(now: datetime | None = None, dry_run: bool = False) -> dict:
+    """Aplica `LOG_RETENTION_DAYS` ({"app.Modelo": días}); retorna filas por modelo."""
+    now = now or timezone.now()
+    result = {}
+    for label, days in getattr(settings, "LOG_RETENTION_DAYS", {}).items():
+        if not days:
+            continue
+        model = apps.get_model(label)
+        result[label] = purge_before(model, now - timedelta(days=days), dry_run=dry_run)
+    return result
+
+
+def maintain(months_ahead: int | None = None) -> dict:
+    """Particiones futuras de todas las tablas de logs + retención."""
+    created = {}
+    for model, _ in partitioned_models():
+        table = model._meta.db_table
+        if is_partitioned(table):
+            created[table] = ensure_partitions(table, months_ahead=months_ahead)
+    return {"created": created, "purged": apply_retention()}
@@ -3,10 +3,17 @@ Configuración personalizada de logging para VeriHome.
 Incluye formatters JSON seguros y configuración optimizada.
 """
 
+import atexit
+import copy
 import json
 import logging
+import os
+import queue
+import threading
+import time
 import traceback
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, Any
 
 
@@ -211,3 +218,176 @@ def get_logging_config(debug_mode: bool = False) -> Dict[str, Any]:
         config["root"]["handlers"].extend(["file"])
 
     return config
+
+
+# =============================================================================
+# LOGGING ASÍNCRONO Y MUESTREO
+# =============================================================================
+# Los handlers de E/S (consola, archivos, correo) quedan detrás de una cola:
+# el hilo del request solo arma el LogRecord y lo encola; el formateo
+# (JSON, colores, tracebacks) y la escritura ocurren en un único hilo
+# QueueListener compartido. Los mensajes de bajo nivel se limitan por logger
+# con SamplingFilter para que el ruido de depuración de un bucle no sature
+# la cola.
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Limita por logger los registros por debajo de `below` (DEBUG por
+    defecto) a `rate` por ventana de `period` segundos.
+
+    El primer registro que pasa tras una ventana con descartes lleva el
+    atributo `sampled_out` con cuántos se descartaron (SafeJSONFormatter
+    lo incluye como campo extra).
+    """
+
+    def __init__(self, rate: int = 20, period: float = 1.0, below: str = "INFO"):
+        super().__init__()
+        self.rate = rate
+        self.period = period
+        self.levelno = below if isinstance(below, int) else logging.getLevelName(below)
+        self._windows = {}  # logger -> [inicio, emitidos, descartados]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= self.levelno:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(record.name)
+            if window is None or now - window[0] >= self.period:
+                if window and window[2]:
+                    record.sampled_out = window[2]
+                window = self._windows[record.name] = [now, 0, 0]
+            if window[1] >= self.rate:
+                window[2] += 1
+                return False
+            window[1] += 1
+            return True
+
+
+class _TargetListener(QueueListener):
+    """QueueListener compartido: cada elemento lleva su handler de destino."""
+
+    def handle(self, item):
+        handler, record = item
+        if record.levelno >= handler.level:
+            handler.handle(record)
+
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def _log_queue(maxsize: int) -> queue.Queue:
+    """Cola del listener del proceso actual (lo arranca si hace falta).
+
+    Se comprueba el pid porque los hilos no sobreviven a un fork (workers
+    de gunicorn con preload, celery prefork).
+    """
+    global _listener, _listener_pid
+    if _listener_pid != os.getpid():
+        with _listener_lock:
+            if _listener_pid != os.getpid():
+                _listener = _TargetListener(queue.Queue(maxsize))
+                _listener.start()
+                _listener_pid = os.getpid()
+    return _listener.queue
+
+
+def stop_queue_listener():
+    """Vacía la cola y detiene el hilo escritor (vuelve a arrancar al loguear)."""
+    global _listener, _listener_pid
+    with _listener_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        _listener = _listener_pid = None
+
+
+# Se registra después del atexit de logging, así que corre antes:
+# los registros pendientes se escriben antes de cerrar los handlers.
+atexit.register(stop_queue_listener)
+
+
+class QueuedHandler(QueueHandler):
+    """
+    Encola los registros para el handler `target` (nombre en LOGGING).
+
+    A diferencia de QueueHandler, no formatea en el hilo que loguea: solo
+    resuelve el mensaje (`msg % args`) para que los argumentos mutables no
+    cambien antes de escribirse. Si la cola está llena escribe en línea.
+    """
+
+    def __init__(self, target: str, maxsize: int = 10000):
+        super().__init__(None)
+        # logging.getHandlerByName existe desde Python 3.12.
+        by_name = getattr(logging, "getHandlerByName", None) or logging._handlers.get
+        # Referencia fuerte: logging solo guarda referencias débiles.
+        self.target = by_name(target)
+        if self.target is None:
+            raise ValueError(f"Handler de log {target!r} no configurado")
+        self.maxsize = maxsize
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            _log_queue(self.maxsize).put_nowait((self.target, record))
+        except queue.Full:
+            if record.levelno >= self.target.level:
+                self.target.handle(record)
+
+    def close(self):
+        stop_queue_listener()
+        super().close()
+
+
+def queued_logging_config(
+    config: Dict[str, Any],
+    queued: bool = True,
+    sample_rate: int = 20,
+    queue_size: int = 10000,
+) -> Dict[str, Any]:
+    """
+    Adapta una configuración de LOGGING para el camino caliente.
+
+    - Agrega el filtro "sampled" (SamplingFilter) a todos los handlers.
+    - Con `queued`, cada handler `X` pasa a llamarse `_X` y `X` queda
+      como un QueuedHandler hacia él: los loggers que usaban `X` siguen
+      igual pero escriben desde el hilo del listener. dictConfig configura
+      los handlers en orden alfabético y "_" va antes de las minúsculas,
+      así que `_X` ya existe cuando se crea `X`.
+
+    Args:
+        config: Diccionario de LOGGING (se modifica y se devuelve).
+        queued: Si poner los handlers detrás de la cola.
+        sample_rate: Registros DEBUG por segundo y logger (0 los descarta).
+        queue_size: Tamaño máximo de la cola.
+
+    Returns:
+        El mismo diccionario de configuración.
+    """
+    config.setdefault("filters", {})["sampled"] = {
+        "()": SamplingFilter,
+        "rate": sample_rate,
+    }
+    handlers = config["handlers"]
+    for name in list(handlers):
+        handler = handlers[name]
+        if not queued:
+            handler.setdefault("filters", []).append("sampled")
+            continue
+        handlers[f"_{name}"] = handlers.pop(name)
+        handlers[name] = {
+            "()": QueuedHandler,
+            "target": f"_{name}",
+            "maxsize": queue_size,
+            "level": handler.get("level", "NOTSET"),
+            "filters": ["sampled"],
+        }
+    return config
@@ -0,0 +1,72 @@
+"""Genera las versiones de las imágenes subidas antes del pipeline.
+
+Las imágenes nuevas se procesan solas (`core.image_pipeline`); este
+comando cubre las existentes, que tienen `renditions` vacío.
+
+Uso:
+
+    python manage.py backfill_image_renditions
+    python manage.py backfill_image_renditions --model properties.PropertyImage
+    python manage.py backfill_image_renditions --inline --limit 500
+"""
+
+from __future__ import annotations
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.tasks import generate_image_renditions
+
+# (modelo, campo de imagen, perfil, campo de metadatos)
+TARGETS = (
+    ("properties.PropertyImage", "image", "property", "renditions"),
+    ("services.ServiceImage", "image", "service", "renditions"),
+    ("users.User", "avatar", "avatar", "avatar_renditions"),
+)
+
+
+class Command(BaseCommand):
+    help = "Genera las versiones de imágenes existentes sin procesar."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            choices=[target[0] for target in TARGETS],
+            help="Procesar sólo este modelo.",
+        )
+        parser.add_argument(
+            "--inline",
+            action="store_true",
+            help="Procesar en este proceso en vez de encolar en Celery.",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=None, help="Máximo de imágenes por modelo."
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for label, field_name, profile, renditions_field in TARGETS:
+            if options["model"] and options["model"] != label:
+                continue
+            pending = (
+                apps.get_model(label)
+                .objects.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .filter(**{renditions_field: {}})
+                .values_list("pk", field_name)
+                .order_by("pk")
+            )
+            if options["limit"]:
+                pending = pending[: options["limit"]]
+            count = 0
+            for pk, source in pending.iterator():
+                task_args = (label, str(pk), field_name, profile, renditions_field)
+                if options["inline"]:
+                    generate_image_renditions(*task_args, source)
+                else:
+                    generate_image_renditions.delay(*task_args, source)
+                count += 1
+            self.stdout.write(f"{label}: {count}")
+            total += count
+        verb = "procesadas" if options["inline"] else "encoladas"
+        self.stdout.write(self.style.SUCCESS(f"Imágenes {verb}: {total}."))
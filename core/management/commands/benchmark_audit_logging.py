@@ -0,0 +1,133 @@
+"""Latencia que agrega la auditoría al request, en línea vs diferida.
+
+Mide `AuditService.log_user_activity` (lo que paga cada request que
+audita) en dos modos:
+
+- ``inline``: escritura en la transacción del request, como antes de
+  `core/audit_buffer.py` (dos INSERT, métricas y la consulta de usuarios);
+- ``write-behind``: armar el evento y encolarlo en el buffer.
+
+Además mide el costo por evento de `flush_events()` (lo que paga el
+worker de Celery). Los datos se crean dentro de una transacción que se
+revierte al final; ahí adentro `on_commit` se ejecuta en el acto. Se usa
+siempre un buffer en memoria propio para no vaciar ni ensuciar el de
+Redis: con Redis el modo diferido suma un RPUSH (un round-trip).
+
+Uso:
+
+    python manage.py benchmark_audit_logging
+    python manage.py benchmark_audit_logging --events 2000 --json
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import audit_buffer
+from core.audit_service import audit_service
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compara la latencia de auditoría en línea y diferida."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=500,
+            help="Eventos por modo (default: 500).",
+        )
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+
+    def handle(self, *args, **options):
+        if options["events"] < 1:
+            raise CommandError("--events debe ser >= 1")
+        report = {}
+        try:
+            with transaction.atomic():
+                report = self._run(options["events"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            self.style.MIGRATE_HEADING("═══ Latencia de auditoría por request ═══")
+        )
+        for mode in ("inline", "write-behind"):
+            row = report[mode]
+            self.stdout.write(
+                f"  {mode:<13} p50 {row['p50_ms']:>7.3f} ms  "
+                f"p95 {row['p95_ms']:>7.3f} ms  queries/evento {row['queries']:.1f}"
+            )
+        self.stdout.write(
+            f"  flush         {report['flush']['ms_per_event']:.3f} ms/evento "
+            f"(lotes de {report['flush']['batch']})"
+        )
+
+    def _run(self, events: int) -> dict:
+        user = get_user_model().objects.create(
+            email=f"bench-audit-{time.time_ns()}@verihome.test", user_type="tenant"
+        )
+        report = {}
+        store = audit_buffer._LocalAuditStore()
+        with (
+            mock.patch.object(
+                transaction, "on_commit", lambda func, using=None, robust=False: func()
+            ),
+            mock.patch.object(audit_buffer, "get_store", return_value=store),
+        ):
+            for mode, write_behind in (("inline", False), ("write-behind", True)):
+                with override_settings(
+                    AUDIT_WRITE_BEHIND=write_behind,
+                    AUDIT_BUFFER_LOCAL_MAX=events + 1,
+                    AUDIT_BUFFER_MAX_PENDING=events + 1,
+                ):
+                    timings = []
+                    with CaptureQueriesContext(connection) as queries:
+                        for i in range(events):
+                            start = time.perf_counter()
+                            audit_service.log_user_activity(
+                                user=user,
+                                action_type="update",
+                                description=f"Evento de prueba {i}",
+                                target_object=user,
+                                details={"benchmark": True, "i": i},
+                                ip_address="10.0.0.1",
+                                user_agent="benchmark",
+                            )
+                            timings.append((time.perf_counter() - start) * 1000)
+                report[mode] = {
+                    "p50_ms": statistics.median(timings),
+                    "p95_ms": statistics.quantiles(timings, n=20)[-1]
+                    if len(timings) > 1
+                    else timings[0],
+                    "queries": len(queries) / events,
+                }
+
+            batch = getattr(settings, "AUDIT_FLUSH_BATCH", 500)
+            start = time.perf_counter()
+            written = audit_buffer.flush_events(batch_size=batch)
+            elapsed = (time.perf_counter() - start) * 1000
+        report["flush"] = {
+            "events": written,
+            "batch": batch,
+            "ms_per_event": elapsed / written if written else 0.0,
+        }
+        return report
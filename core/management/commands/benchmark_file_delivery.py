@@ -0,0 +1,141 @@
+"""Ocupación de worker por descarga de documento según el modo de entrega.
+
+Genera un PDF sintético en un MEDIA_ROOT temporal y mide, con
+`core.file_delivery.serve_protected_file`, el tiempo de worker de:
+
+- ``python``: el archivo completo servido desde Django (como el
+  `FileResponse` anterior), consumiendo el cuerpo;
+- ``python-range``: un visor de PDF que pide sólo `--pages` rangos de
+  64 KB en vez del archivo completo;
+- ``x-accel``: sólo armar los headers; nginx transfiere el archivo.
+
+En producción un worker síncrono queda ocupado además mientras el
+cliente recibe los bytes, así que la capacidad por worker se estima con
+`--client-mbps`: en los modos Python cada descarga ocupa el worker
+`max(cpu, tamaño / ancho de banda)`; con X-Accel sólo `cpu`.
+
+Uso:
+
+    python manage.py benchmark_file_delivery
+    python manage.py benchmark_file_delivery --size-mb 8 --requests 50 --json
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.db.models.fields.files import FieldFile
+from django.test import RequestFactory, override_settings
+
+from core import file_delivery
+from requests.models import TenantDocument
+
+_RANGE = 64 * 1024
+
+
+class Command(BaseCommand):
+    help = "Compara la ocupación de worker al servir documentos protegidos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size-mb", type=float, default=4.0)
+        parser.add_argument("--requests", type=int, default=30)
+        parser.add_argument(
+            "--pages", type=int, default=6, help="Rangos que pide el visor."
+        )
+        parser.add_argument(
+            "--client-mbps",
+            type=float,
+            default=20.0,
+            help="Ancho de banda del cliente para estimar la ocupación.",
+        )
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        size = int(options["size_mb"] * 1024 * 1024)
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(
+                PROTECTED_FILE_SECRET="benchmark", MEDIA_ROOT=media_root
+            ):
+                storage = FileSystemStorage(location=media_root)
+                name = storage.save(
+                    "tenant_documents/benchmark.pdf",
+                    ContentFile(b"%PDF-1.4\n" + os.urandom(size - 9)),
+                )
+                field = TenantDocument._meta.get_field("document_file")
+                field_file = FieldFile(None, field, name)
+                field_file.storage = storage
+                results = self._run(field_file, size, options)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"Archivo de {options['size_mb']} MB, {options['requests']} descargas, "
+            f"cliente a {options['client_mbps']} Mbps"
+        )
+        for mode, row in results.items():
+            self.stdout.write(
+                f"  {mode:<13} cpu p50 {row['cpu_ms_p50']:>8.2f} ms  "
+                f"bytes {row['bytes']:>10}  "
+                f"worker ocupado {row['worker_seconds']:>7.3f} s  "
+                f"-> {row['downloads_per_worker_minute']:>8.1f} descargas/min/worker"
+            )
+
+    def _run(self, field_file, size, options):
+        factory = RequestFactory()
+        transfer = size * 8 / (options["client_mbps"] * 1_000_000)
+        scenarios = {
+            "python": ("python", [None]),
+            "python-range": (
+                "python",
+                [
+                    f"bytes={offset}-{offset + _RANGE - 1}"
+                    for offset in range(
+                        0, size, max(_RANGE, size // max(1, options["pages"]))
+                    )
+                ][: options["pages"]],
+            ),
+            "x-accel": ("x-accel", [None]),
+        }
+        results = {}
+        for label, (mode, ranges) in scenarios.items():
+            timings, sent = [], 0
+            with override_settings(PROTECTED_FILE_DELIVERY=mode):
+                for _ in range(options["requests"]):
+                    start = time.perf_counter()
+                    sent = 0
+                    for byte_range in ranges:
+                        headers = {"HTTP_RANGE": byte_range} if byte_range else {}
+                        request = factory.get("/", **headers)
+                        response = file_delivery.serve_protected_file(
+                            request,
+                            field_file,
+                            filename="benchmark.pdf",
+                            content_type="application/pdf",
+                        )
+                        if response.streaming:
+                            for chunk in response.streaming_content:
+                                sent += len(chunk)
+                        else:
+                            sent += len(response.content)
+                    timings.append(time.perf_counter() - start)
+            cpu = statistics.median(timings)
+            occupied = cpu if mode == "x-accel" else max(cpu, transfer * sent / size)
+            results[label] = {
+                "cpu_ms_p50": cpu * 1000,
+                "bytes": sent,
+                "worker_seconds": occupied,
+                "downloads_per_worker_minute": 60 / occupied if occupied else 0.0,
+            }
+        return results
@@ -0,0 +1,84 @@
+"""Mantenimiento de las tablas de logs particionadas por mes.
+
+Crea las particiones de los próximos meses (como la tarea diaria
+`core.tasks.maintain_log_partitions`), lista las existentes o aplica la
+retención de `LOG_RETENTION_DAYS`. En SQLite las tablas no están
+particionadas: sólo aplica la retención (borrado por lotes).
+
+Uso:
+
+    python manage.py manage_log_partitions
+    python manage.py manage_log_partitions --months-ahead 6
+    python manage.py manage_log_partitions --list
+    python manage.py manage_log_partitions --purge --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import log_partitions
+
+
+class Command(BaseCommand):
+    help = "Crea particiones futuras de los logs y aplica la retención."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=None,
+            help="Meses a crear por adelantado (default: LOG_PARTITION_MONTHS_AHEAD).",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="Lista las particiones."
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Aplica LOG_RETENTION_DAYS además de crear particiones.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Con --purge: sólo cuenta las filas a eliminar.",
+        )
+
+    def handle(self, *args, **options):
+        if not log_partitions.supported():
+            self.stdout.write(
+                "Motor sin particionado: las tablas de logs son tablas normales."
+            )
+        else:
+            for model, field in log_partitions.partitioned_models():
+                self._table(model._meta.db_table, field, options)
+
+        if options["purge"]:
+            purged = log_partitions.apply_retention(dry_run=options["dry_run"])
+            if not purged:
+                self.stdout.write("LOG_RETENTION_DAYS vacío: no hay retención.")
+            verb = "a eliminar" if options["dry_run"] else "eliminadas"
+            for label, rows in purged.items():
+                self.stdout.write(f"  {label}: {rows} filas {verb}")
+
+    def _table(self, table, field, options):
+        if not log_partitions.is_partitioned(table):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{table}: no está particionada (falta migrar core 0008)"
+                )
+            )
+            return
+        created = log_partitions.ensure_partitions(
+            table, months_ahead=options["months_ahead"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"{table} ({field}): {len(created)} particiones nuevas")
+        )
+        if options["list"]:
+            for part in log_partitions.partitions(table):
+                if part["default"]:
+                    self.stdout.write(f"  {part['name']}  DEFAULT")
+                else:
+                    self.stdout.write(
+                        f"  {part['name']}  {part['start']:%Y-%m-%d} → "
+                        f"{part['end']:%Y-%m-%d}"
+                    )
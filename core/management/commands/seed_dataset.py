@@ -0,0 +1,109 @@
+"""Siembra el dataset determinista de rendimiento (`core.seeding`).
+
+Crea arrendadores, inquilinos, propiedades, matches, contratos, pagos,
+mensajes, calificaciones y notificaciones con `bulk_create`, a la escala
+pedida, y muestra (o guarda) el manifiesto con filas y segundos por
+tabla. Las cuentas son `<rol><n>@perf.verihome.test` con la contraseña
+del manifiesto (la usa `performance_tests/locustfile.py`).
+
+Uso:
+
+    python manage.py seed_dataset                       # escala 1
+    python manage.py seed_dataset --scale 100 --manifest seed.json
+    python manage.py seed_dataset --flush --scale 10 --seed 7
+    python manage.py seed_dataset --flush-only
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import seeding
+
+
+class Command(BaseCommand):
+    help = "Siembra datos deterministas a escala para benchmarks y locust."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", type=int, default=1, help="Multiplicador (1, 10, 100...)."
+        )
+        parser.add_argument("--seed", type=int, default=seeding.DEFAULT_SEED)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=seeding.BATCH_SIZE,
+            help="Filas por INSERT.",
+        )
+        parser.add_argument("--manifest", help="Guardar el manifiesto JSON aquí.")
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Borrar antes los datos sembrados previamente.",
+        )
+        parser.add_argument(
+            "--flush-only", action="store_true", help="Sólo borrar y salir."
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Permitir con DEBUG=False (crea un superusuario conocido).",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError(
+                "seed_dataset crea cuentas con contraseña conocida; "
+                "use --force para correrlo con DEBUG=False."
+            )
+        if options["scale"] < 1:
+            raise CommandError("--scale debe ser >= 1")
+
+        if options["flush"] or options["flush_only"]:
+            deleted = seeding.purge()
+            self.stdout.write(f"  {deleted} filas sembradas borradas")
+            if options["flush_only"]:
+                return
+
+        existing = get_user_model().objects.filter(
+            email__endswith=f"@{seeding.EMAIL_DOMAIN}"
+        )
+        if existing.exists():
+            raise CommandError(
+                f"Ya hay datos sembrados (@{seeding.EMAIL_DOMAIN}); use --flush."
+            )
+
+        manifest = seeding.seed(
+            scale=options["scale"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        if options["manifest"]:
+            Path(options["manifest"]).write_text(
+                json.dumps(manifest, indent=2, ensure_ascii=False) + "\n",
+                encoding="utf-8",
+            )
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"═══ Dataset escala {manifest['scale']} "
+                f"(semilla {manifest['seed']}, {manifest['database']}) ═══"
+            )
+        )
+        for label, rows in manifest["counts"].items():
+            seconds = manifest["seconds"][label]
+            rate = round(rows / seconds) if seconds else 0
+            self.stdout.write(
+                f"  {label:<34} {rows:>8} filas {seconds:>8.3f} s {rate:>8}/s"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  {manifest['total_rows']} filas en {manifest['total_seconds']} s"
+                f" · contraseña {manifest['password']}"
+            )
+        )
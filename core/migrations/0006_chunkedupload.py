@@ -0,0 +1,115 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0005_alter_supportticket_created_by"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChunkedUpload",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "purpose",
+                    models.CharField(
+                        choices=[
+                            ("property_video", "Video de propiedad"),
+                            ("tenant_document", "Documento de inquilino"),
+                        ],
+                        max_length=30,
+                        verbose_name="Destino",
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(max_length=255, verbose_name="Nombre del archivo"),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="Tipo de contenido"
+                    ),
+                ),
+                ("size", models.PositiveBigIntegerField(verbose_name="Tamaño total")),
+                (
+                    "offset",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Bytes recibidos"
+                    ),
+                ),
+                (
+                    "checksum",
+                    models.CharField(
+                        blank=True, max_length=64, verbose_name="SHA-256 declarado"
+                    ),
+                ),
+                (
+                    "parts",
+                    models.JSONField(blank=True, default=list, verbose_name="Partes"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("uploading", "Subiendo"),
+                            ("complete", "Completa"),
+                            ("consumed", "Utilizada"),
+                        ],
+                        default="uploading",
+                        max_length=10,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de creación"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Fecha de actualización"
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(verbose_name="Fecha de expiración"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunked_uploads",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Subida por partes",
+                "verbose_name_plural": "Subidas por partes",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["expires_at"], name="core_chunke_expires_c2edf6_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+"""Particionado mensual de las tablas de logs (sólo PostgreSQL).
+
+Ver core/log_partitions.py. En SQLite no hace nada. La conversión copia
+las filas a la tabla particionada dentro de la transacción de la
+migración: en tablas grandes conviene correrla en ventana de
+mantenimiento. No tiene reversa: la tabla particionada es equivalente
+para el ORM.
+"""
+
+from django.db import migrations
+
+from core import log_partitions
+
+
+def partition_log_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    if not log_partitions.supported(connection):
+        return
+    for label, field_name in log_partitions.PARTITIONED_LOGS:
+        model = apps.get_model(label)
+        log_partitions.convert_to_partitioned(
+            model._meta.db_table,
+            model._meta.get_field(field_name).column,
+            connection,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0007_activity_log_default_timestamp"),
+        ("users", "0009_activity_log_default_timestamp"),
+        ("requests", "0010_secure_document_access"),
+        ("contracts", "0025_face_embedding"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_log_tables, migrations.RunPython.noop),
+    ]
@@ -279,7 +279,11 @@ class ActivityLog(models.Model):
     success = models.BooleanField("Exitosa", default=True)
     error_message = models.TextField("Mensaje de error", blank=True)
 
-    created_at = models.DateTimeField("Fecha de actividad", auto_now_add=True)
+    # Con `default` y no `auto_now_add`: los eventos que esperan en el
+    # buffer de auditoría (core/audit_buffer.py) guardan su hora real.
+    created_at = models.DateTimeField(
+        "Fecha de actividad", default=timezone.now, editable=False
+    )
 
     class Meta:
         verbose_name = "Registro de Actividad"
@@ -665,3 +669,55 @@ class SystemMetrics(models.Model):
 
     def __str__(self):
         return f"{self.get_metric_type_display()} - {self.date}: {self.count}"
+
+
+class ChunkedUpload(models.Model):
+    """Subida reanudable por partes (ver core/chunked_uploads.py).
+
+    Cada PATCH guarda una parte en el storage y avanza `offset`; el
+    endpoint de destino (video de propiedad, documento de inquilino)
+    recibe `upload_id`, verifica el checksum y crea su modelo con el
+    archivo ensamblado.
+    """
+
+    PURPOSE_CHOICES = [
+        ("property_video", "Video de propiedad"),
+        ("tenant_document", "Documento de inquilino"),
+    ]
+
+    STATUS_CHOICES = [
+        ("uploading", "Subiendo"),
+        ("complete", "Completa"),
+        ("consumed", "Utilizada"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="chunked_uploads"
+    )
+    purpose = models.CharField("Destino", max_length=30, choices=PURPOSE_CHOICES)
+    filename = models.CharField("Nombre del archivo", max_length=255)
+    content_type = models.CharField("Tipo de contenido", max_length=100, blank=True)
+    size = models.PositiveBigIntegerField("Tamaño total")
+    offset = models.PositiveBigIntegerField("Bytes recibidos", default=0)
+    checksum = models.CharField("SHA-256 declarado", max_length=64, blank=True)
+    # [[offset, nombre en storage, longitud], ...] en orden de offset.
+    parts = models.JSONField("Partes", default=list, blank=True)
+    status = models.CharField(
+        "Estado", max_length=10, choices=STATUS_CHOICES, default="uploading"
+    )
+
+    created_at = models.DateTimeField("Fecha de creación", auto_now_add=True)
+    updated_at = models.DateTimeField("Fecha de actualización", auto_now=True)
+    expires_at = models.DateTimeField("Fecha de expiración")
+
+    class Meta:
+        verbose_name = "Subida por partes"
+        verbose_name_plural = "Subidas por partes"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
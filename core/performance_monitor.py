@@ -25,6 +25,7 @@ class PerformanceMonitor:
         self.alerts = []
         self.running = False
         self.check_interval = 30  # 30 segundos
+        self._http_last = {}  # último snapshot de core.http_client
 
         # Thresholds de alerta
         self.thresholds = {
@@ -58,6 +59,7 @@ class PerformanceMonitor:
                 self._collect_django_metrics()
                 self._collect_cache_metrics()
                 self._collect_database_metrics()
+                self._collect_http_metrics()
                 self._check_alerts()
                 self._store_metrics()
 
@@ -181,6 +183,35 @@ class PerformanceMonitor:
         except Exception as e:
             logger.error(f"Error collecting Redis metrics: {e}")
 
+    def _collect_http_metrics(self):
+        """Latencia y errores de llamadas salientes (core.http_client).
+
+        Los contadores son acumulados; se registra el promedio del
+        intervalo desde la lectura anterior.
+        """
+        from core.http_client import metrics_snapshot
+
+        try:
+            snapshot = metrics_snapshot()
+        except Exception as e:
+            logger.error(f"Error collecting HTTP client metrics: {e}")
+            return
+
+        for service, row in snapshot.items():
+            last = self._http_last.get(service, {})
+            calls = row["calls"] - last.get("calls", 0)
+            self._http_last[service] = row
+            if calls <= 0:
+                continue
+            total_ms = row["total_ms"] - last.get("total_ms", 0)
+            errors = row["errors"] - last.get("errors", 0)
+            self.metrics[f"http_{service}_latency_ms"].append(
+                {"timestamp": datetime.now(), "value": total_ms / calls}
+            )
+            self.metrics[f"http_{service}_error_rate"].append(
+                {"timestamp": datetime.now(), "value": errors / calls * 100}
+            )
+
     def _collect_database_metrics(self):
         """Recolecta métricas de la base de datos."""
         try:
@@ -0,0 +1,524 @@
+"""
+Generador de datos deterministas a escala (benchmarks, locust y pruebas).
+
+`seed(scale=1, seed=...)` crea con `bulk_create` por lotes un ecosistema
+consistente cuyo tamaño crece linealmente con `scale` (1×, 10×, 100×):
+
+- usuarios (administrador, arrendadores, inquilinos) con perfil,
+  configuración y correo verificado de allauth (pueden iniciar sesión);
+- propiedades con amenidades, favoritos y criterios de búsqueda;
+- solicitudes de match; las aceptadas generan su contrato activo;
+- por contrato, un pago de arriendo por mes transcurrido con su orden
+  pagada, y la orden del mes en curso (pendiente o vencida);
+- hilos de mensajes, calificaciones entre las partes y notificaciones.
+
+El mismo `seed` produce las mismas filas, UUID y reparto. Un cuarto de
+las filas cae en las cuentas observadas (`tenant0`, `landlord0`): sus
+endpoints crecen con la escala y un N+1 aparece como más consultas.
+
+Devuelve (y `seed_dataset --manifest` guarda) un manifiesto JSON con
+filas y segundos por tabla, cuentas observadas y credenciales.
+"""
+
+import logging
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from contracts.models import Contract
+from core.models import Notification
+from matching.models import MatchCriteria, MatchRequest
+from messaging.models import Message, MessageThread, ThreadParticipant
+from payments.models import PaymentOrder, Transaction
+from properties.models import (
+    Property,
+    PropertyAmenity,
+    PropertyAmenityRelation,
+    PropertyFavorite,
+)
+from ratings.models import Rating
+from users.models import LandlordProfile, TenantProfile, UserSettings
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+DEFAULT_SEED = 20260101
+EMAIL_DOMAIN = "perf.verihome.test"
+PASSWORD = "PerfPass123!"
+HOT_SHARE = 0.25
+BATCH_SIZE = 1000
+
+# Filas por unidad de escala.
+PER_SCALE = {
+    "landlords": 5,
+    "tenants": 20,
+    "properties": 30,
+    "favorites": 40,
+    "match_requests": 40,
+    "threads": 20,
+    "messages_per_thread": 5,
+    "ratings": 20,
+    "notifications": 60,
+}
+MAX_CONTRACT_MONTHS = 12
+
+FIRST_NAMES = (
+    "María", "Juan", "Camila", "Andrés", "Valentina", "Santiago", "Laura",
+    "Carlos", "Daniela", "Felipe", "Natalia", "Sebastián", "Paula", "Diego",
+)  # fmt: skip
+LAST_NAMES = (
+    "García", "Rodríguez", "Martínez", "López", "González", "Pérez", "Gómez",
+    "Díaz", "Torres", "Ramírez", "Vargas", "Castro", "Rojas", "Moreno",
+)  # fmt: skip
+CITIES = (
+    ("Bogotá", "Cundinamarca"),
+    ("Medellín", "Antioquia"),
+    ("Cali", "Valle del Cauca"),
+    ("Barranquilla", "Atlántico"),
+    ("Bucaramanga", "Santander"),
+)
+PROPERTY_TYPES = {
+    "apartment": "Apartamento",
+    "house": "Casa",
+    "studio": "Apartaestudio",
+    "penthouse": "Penthouse",
+    "townhouse": "Casa en conjunto",
+}
+AMENITIES = (
+    ("Piscina", "recreation"),
+    ("Gimnasio", "recreation"),
+    ("Portería 24h", "security"),
+    ("Parqueadero cubierto", "parking"),
+    ("Balcón", "interior"),
+    ("Jardín", "exterior"),
+    ("Gas natural", "utilities"),
+    ("Ascensor", "interior"),
+)
+MATCH_STATUSES = ("pending", "viewed", "accepted", "rejected")
+
+
+def email(role, n):
+    """Correo de la cuenta sembrada número `n` de un rol."""
+    return f"{role}{n}@{EMAIL_DOMAIN}"
+
+
+class _Seeder:
+    def __init__(self, scale, seed, batch_size):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.today = timezone.localdate()
+        self.counts = {}
+        self.timings = {}
+
+    def count(self, key):
+        return PER_SCALE[key] * self.scale
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def pick(self, items):
+        """Elemento al azar; el primero (cuenta observada) con HOT_SHARE."""
+        if self.rng.random() < HOT_SHARE:
+            return items[0]
+        return self.rng.choice(items)
+
+    def money(self, low, high):
+        return Decimal(self.rng.randrange(low, high, 50000))
+
+    def insert(self, model, rows):
+        started = time.perf_counter()
+        model.objects.bulk_create(rows, batch_size=self.batch_size)
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + len(rows)
+        self.timings[label] = round(
+            self.timings.get(label, 0) + time.perf_counter() - started, 4
+        )
+        return rows
+
+    # -- usuarios -----------------------------------------------------------
+
+    def users(self, role, user_type, count, password, **extra):
+        rng = self.rng
+        users = self.insert(
+            User,
+            [
+                User(
+                    id=self.uuid(),
+                    email=email(role, n),
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    phone_number=f"+573{rng.randrange(10**9):09d}",
+                    user_type=user_type,
+                    password=password,
+                    city=rng.choice(CITIES)[0],
+                    is_active=True,
+                    is_verified=True,
+                    **extra,
+                )
+                for n in range(count)
+            ],
+        )
+        self.insert(
+            EmailAddress,
+            [
+                EmailAddress(user=user, email=user.email, verified=True, primary=True)
+                for user in users
+            ],
+        )
+        self.insert(UserSettings, [UserSettings(user=user) for user in users])
+        profile = TenantProfile if user_type == "tenant" else LandlordProfile
+        self.insert(profile, [profile(user=user) for user in users])
+        return users
+
+    # -- propiedades --------------------------------------------------------
+
+    def properties(self, landlords):
+        rng = self.rng
+        amenities = [
+            PropertyAmenity.objects.get_or_create(
+                name=name, defaults={"category": category}
+            )[0]
+            for name, category in AMENITIES
+        ]
+        properties = []
+        for n in range(self.count("properties")):
+            city, state = rng.choice(CITIES)
+            property_type = rng.choice(list(PROPERTY_TYPES))
+            properties.append(
+                Property(
+                    id=self.uuid(),
+                    landlord=self.pick(landlords),
+                    title=f"{PROPERTY_TYPES[property_type]} {n} en {city}",
+                    description="Inmueble generado para pruebas de rendimiento.",
+                    property_type=property_type,
+                    listing_type="rent",
+                    status="available",
+                    address=f"Calle {rng.randint(1, 200)} # {rng.randint(1, 99)}-{n}",
+                    city=city,
+                    state=state,
+                    country="Colombia",
+                    bedrooms=rng.randint(1, 4),
+                    bathrooms=rng.randint(1, 3),
+                    total_area=Decimal(rng.randint(35, 220)),
+                    rent_price=self.money(800000, 6000000),
+                    pets_allowed=rng.random() < 0.4,
+                    furnished=rng.random() < 0.3,
+                    is_featured=rng.random() < 0.2,
+                    is_active=True,
+                )
+            )
+        self.insert(Property, properties)
+        self.insert(
+            PropertyAmenityRelation,
+            [
+                PropertyAmenityRelation(property=prop, amenity=amenity)
+                for prop in properties
+                for amenity in rng.sample(amenities, rng.randint(2, 5))
+            ],
+        )
+        return properties
+
+    def favorites_and_criteria(self, tenants, properties):
+        rng = self.rng
+        favorites = {
+            (self.pick(tenants), rng.choice(properties))
+            for _ in range(self.count("favorites"))
+        }
+        self.insert(
+            PropertyFavorite,
+            [PropertyFavorite(user=user, property=prop) for user, prop in favorites],
+        )
+        self.insert(
+            MatchCriteria,
+            [
+                MatchCriteria(
+                    tenant=tenant,
+                    preferred_cities=[rng.choice(CITIES)[0]],
+                    min_price=Decimal(500000),
+                    max_price=self.money(2000000, 7000000),
+                    property_types=rng.sample(list(PROPERTY_TYPES), 2),
+                    min_bedrooms=1,
+                )
+                for tenant in tenants
+            ],
+        )
+
+    # -- matching y contratos -----------------------------------------------
+
+    def match_requests(self, tenants, properties):
+        rng = self.rng
+        requests = []
+        for n in range(self.count("match_requests")):
+            prop = rng.choice(properties)
+            tenant = self.pick(tenants)
+            requests.append(
+                MatchRequest(
+                    id=self.uuid(),
+                    match_code=f"MT-P{n:07d}",
+                    property=prop,
+                    tenant=tenant,
+                    landlord=prop.landlord,
+                    status=rng.choice(MATCH_STATUSES),
+                    tenant_message="Me interesa el inmueble.",
+                    tenant_email=tenant.email,
+                    tenant_phone=tenant.phone_number,
+                    monthly_income=self.money(2000000, 15000000),
+                    lease_duration_months=12,
+                )
+            )
+        return self.insert(MatchRequest, requests)
+
+    def contracts(self, match_requests):
+        """Un contrato activo por solicitud aceptada, con meses ya corridos."""
+        contracts = []
+        for n, match in enumerate(m for m in match_requests if m.status == "accepted"):
+            months = self.rng.randint(1, MAX_CONTRACT_MONTHS)
+            start = self.today - timedelta(days=30 * months)
+            rent = match.property.rent_price
+            contracts.append(
+                Contract(
+                    id=self.uuid(),
+                    contract_number=f"VH-PERF-{n:06d}",
+                    contract_type="rental_urban",
+                    primary_party=match.landlord,
+                    secondary_party=match.tenant,
+                    property=match.property,
+                    match_request=match,
+                    title=f"Contrato de arrendamiento {match.property.title}",
+                    content="Contrato generado para pruebas de rendimiento.",
+                    start_date=start,
+                    end_date=start + timedelta(days=365),
+                    monthly_rent=rent,
+                    security_deposit=rent,
+                    status="active",
+                )
+            )
+        MatchRequest.objects.filter(
+            pk__in=[c.match_request_id for c in contracts]
+        ).update(has_contract=True)
+        return self.insert(Contract, contracts)
+
+    def payments(self, contracts):
+        """Arriendos pagados (transacción + orden) y la orden del mes en curso."""
+        rng = self.rng
+        transactions, orders = [], []
+        for contract in contracts:
+            months = (self.today - contract.start_date).days // 30
+            for month in range(months + 1):
+                due = contract.start_date + timedelta(days=30 * month)
+                paid = month < months and rng.random() < 0.9
+                tx = None
+                if paid:
+                    tx = Transaction(
+                        id=self.uuid(),
+                        transaction_number=f"TX-PERF-{len(transactions):07d}",
+                        transaction_type="rent_payment",
+                        direction="inbound",
+                        status="completed",
+                        payer=contract.secondary_party,
+                        payee=contract.primary_party,
+                        contract=contract,
+                        property=contract.property,
+                        amount=contract.monthly_rent,
+                        total_amount=contract.monthly_rent,
+                        description=f"Canon {contract.contract_number} mes {month + 1}",
+                    )
+                    transactions.append(tx)
+                orders.append(
+                    PaymentOrder(
+                        id=self.uuid(),
+                        order_number=f"PO-PERF-{len(orders):07d}",
+                        order_type="rent",
+                        status=(
+                            "paid"
+                            if paid
+                            else "pending"
+                            if month == months
+                            else "overdue"
+                        ),
+                        payer=contract.secondary_party,
+                        payee=contract.primary_party,
+                        created_by=contract.primary_party,
+                        amount=contract.monthly_rent,
+                        paid_amount=contract.monthly_rent if paid else Decimal(0),
+                        date_due=due,
+                        transaction=tx,
+                        description=f"Canon {contract.contract_number} mes {month + 1}",
+                    )
+                )
+        self.insert(Transaction, transactions)
+        self.insert(PaymentOrder, orders)
+
+    # -- comunicación y reputación ------------------------------------------
+
+    def messages(self, tenants, properties):
+        rng = self.rng
+        threads, participants, messages = [], [], []
+        for n in range(self.count("threads")):
+            prop = self.pick(properties)
+            tenant = self.pick(tenants)
+            thread = MessageThread(
+                id=self.uuid(),
+                subject=f"Consulta sobre {prop.title}",
+                thread_type="inquiry",
+                property=prop,
+                created_by=tenant,
+            )
+            threads.append(thread)
+            for user in (tenant, prop.landlord):
+                participants.append(ThreadParticipant(thread=thread, user=user))
+            for m in range(PER_SCALE["messages_per_thread"]):
+                sender, recipient = (
+                    (tenant, prop.landlord) if m % 2 == 0 else (prop.landlord, tenant)
+                )
+                messages.append(
+                    Message(
+                        id=self.uuid(),
+                        thread=thread,
+                        sender=sender,
+                        recipient=recipient,
+                        content=f"Mensaje {m} del hilo {n}",
+                        is_read=rng.random() < 0.5,
+                    )
+                )
+        self.insert(MessageThread, threads)
+        self.insert(ThreadParticipant, participants)
+        self.insert(Message, messages)
+        return threads
+
+    def ratings(self, contracts):
+        rng = self.rng
+        ratings = []
+        for _ in range(self.count("ratings") if contracts else 0):
+            contract = self.pick(contracts)
+            by_tenant = rng.random() < 0.5
+            tenant, landlord = contract.secondary_party, contract.primary_party
+            ratings.append(
+                Rating(
+                    id=self.uuid(),
+                    reviewer=tenant if by_tenant else landlord,
+                    reviewee=landlord if by_tenant else tenant,
+                    rating_type=(
+                        "tenant_to_landlord" if by_tenant else "landlord_to_tenant"
+                    ),
+                    overall_rating=rng.randint(5, 10),
+                    property=contract.property,
+                    title="Buena experiencia",
+                    review_text="Calificación generada para pruebas de rendimiento.",
+                )
+            )
+        self.insert(Rating, ratings)
+
+    def notifications(self, recipients):
+        rng = self.rng
+        self.insert(
+            Notification,
+            [
+                Notification(
+                    id=self.uuid(),
+                    user=self.pick(recipients),
+                    notification_type=rng.choice(("message", "contract", "payment")),
+                    title=f"Notificación {n}",
+                    message="Notificación generada para pruebas de rendimiento.",
+                    is_read=rng.random() < 0.5,
+                )
+                for n in range(self.count("notifications"))
+            ],
+        )
+
+
+def _first(objects, **owner):
+    """id (str) del primer objeto de la cuenta observada, o None."""
+    ((field, user),) = owner.items()
+    for obj in objects:
+        if getattr(obj, field) is user:
+            return str(obj.pk)
+    return None
+
+
+def seed(scale=1, seed=DEFAULT_SEED, batch_size=BATCH_SIZE):
+    """Crea el conjunto de datos en una transacción y devuelve el manifiesto.
+
+    Args:
+        scale: multiplicador de filas (1, 10, 100...).
+        seed: semilla del generador; la misma semilla da los mismos datos.
+        batch_size: filas por INSERT de `bulk_create`.
+
+    Returns:
+        dict serializable a JSON: `accounts` (correos observados),
+        `ids` (un objeto de cada tipo de las cuentas observadas, para
+        endpoints de detalle), `counts` y `seconds` por tabla.
+    """
+    started = time.perf_counter()
+    seeder = _Seeder(scale, seed, batch_size)
+    password = make_password(PASSWORD)  # un solo hash para todos
+
+    with transaction.atomic():
+        admin = seeder.users(
+            "admin", "landlord", 1, password, is_staff=True, is_superuser=True
+        )[0]
+        landlords = seeder.users(
+            "landlord", "landlord", seeder.count("landlords"), password
+        )
+        tenants = seeder.users("tenant", "tenant", seeder.count("tenants"), password)
+        properties = seeder.properties(landlords)
+        seeder.favorites_and_criteria(tenants, properties)
+        match_requests = seeder.match_requests(tenants, properties)
+        contracts = seeder.contracts(match_requests)
+        seeder.payments(contracts)
+        threads = seeder.messages(tenants, properties)
+        seeder.ratings(contracts)
+        seeder.notifications([*tenants, *landlords])
+
+    tenant, landlord = tenants[0], landlords[0]
+    manifest = {
+        "seed": seed,
+        "scale": scale,
+        "database": connection.vendor,
+        "password": PASSWORD,
+        "email_pattern": f"{{role}}{{n}}@{EMAIL_DOMAIN}",
+        "accounts": {
+            "admin": admin.email,
+            "landlord": landlord.email,
+            "tenant": tenant.email,
+        },
+        "users": {"admin": 1, "landlord": len(landlords), "tenant": len(tenants)},
+        "ids": {
+            "property": _first(properties, landlord=landlord),
+            "match_request": _first(match_requests, tenant=tenant),
+            "contract": _first(contracts, primary_party=landlord),
+            "thread": _first(threads, created_by=tenant),
+        },
+        "counts": seeder.counts,
+        "seconds": seeder.timings,
+        "total_rows": sum(seeder.counts.values()),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(
+        f"💾 Dataset sembrado (escala {scale}, semilla {seed}): "
+        f"{manifest['total_rows']} filas en {manifest['total_seconds']} s"
+    )
+    return manifest
+
+
+def purge():
+    """Borra los usuarios sembrados y, en cascada, todos sus datos."""
+    users = User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+    with transaction.atomic():
+        # Las órdenes de pago protegen a sus usuarios (on_delete=PROTECT).
+        orders, _ = PaymentOrder.objects.filter(
+            Q(payer__in=users) | Q(payee__in=users) | Q(created_by__in=users)
+        ).delete()
+        deleted, _ = users.delete()
+    return orders + deleted
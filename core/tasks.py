@@ -226,3 +226,54 @@ def health_check():
     except Exception as e:
         logger.error(f"Error en verificación de salud: {str(e)}")
         raise
+
+
+@shared_task(ignore_result=True)
+def generate_image_renditions(
+    model_label, pk, field_name, profile, renditions_field, source
+):
+    """Genera las versiones de una imagen subida (core/image_pipeline.py)."""
+    from .image_pipeline import generate_renditions
+
+    result = generate_renditions(
+        model_label, pk, field_name, profile, renditions_field, source
+    )
+    logger.info(f"Versiones de {model_label} {pk}: {result}")
+    return result
+
+
+@shared_task(ignore_result=True)
+def cleanup_chunked_uploads():
+    """Borra subidas por partes expiradas y sus partes (core/chunked_uploads.py)."""
+    from .chunked_uploads import cleanup_expired
+
+    removed = cleanup_expired()
+    if removed:
+        logger.info(f"Subidas por partes expiradas eliminadas: {removed}")
+    return removed
+
+
+@shared_task(ignore_result=True)
+def flush_audit_events():
+    """Persiste los eventos de auditoría diferidos (core/audit_buffer.py)."""
+    from .audit_buffer import flush_events
+
+    written = flush_events()
+    if written:
+        logger.info(f"Eventos de auditoría persistidos: {written}")
+    return written
+
+
+@shared_task(ignore_result=True)
+def maintain_log_partitions():
+    """Particiones futuras y retención de las tablas de logs (core/log_partitions.py)."""
+    from .log_partitions import maintain
+
+    result = maintain()
+    created = sum(len(names) for names in result["created"].values())
+    purged = sum(result["purged"].values())
+    if created or purged:
+        logger.info(
+            f"Particiones de logs creadas: {created}; filas eliminadas por retención: {purged}"
+        )
+    return result
@@ -0,0 +1,220 @@
+"""Tests de la auditoría con escritura diferida (`core.audit_buffer`)."""
+
+from __future__ import annotations
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DataError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import audit_buffer
+from core.audit_service import audit_service, log_activity
+from core.models import ActivityLog, SystemMetrics
+from users.middleware import ActivityLoggerMiddleware
+from users.models import UserActivityLog
+
+User = get_user_model()
+
+_LOCMEM = {
+    alias: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": f"audit-buffer-tests-{alias}",
+    }
+    for alias in ("default", "sessions", "query_cache", "local_fallback")
+}
+
+
+@override_settings(
+    CACHES=_LOCMEM,
+    AUDIT_WRITE_BEHIND=True,
+    AUDIT_BUFFER_LOCAL_MAX=1000,
+    AUDIT_FLUSH_INTERVAL=3600,
+)
+class WriteBehindAuditTests(TestCase):
+    def setUp(self):
+        audit_buffer.reset_local_store()
+        self.addCleanup(audit_buffer.reset_local_store)
+        self.user = User.objects.create_user(
+            email="auditado@test.com", password="TestPass123!", user_type="tenant"
+        )
+
+    def _log(self, action_type="update", **kwargs):
+        return audit_service.log_user_activity(
+            user=self.user,
+            action_type=action_type,
+            description="Actualizó su perfil",
+            target_object=self.user,
+            details={"campo": "telefono"},
+            ip_address="10.0.0.1",
+            user_agent="pruebas",
+            **kwargs,
+        )
+
+    def test_request_path_does_not_write(self):
+        with (
+            CaptureQueriesContext(connection) as queries,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            activity_log = self._log()
+        self.assertEqual(len(queries), 0)
+        self.assertIsNone(activity_log.pk)
+        self.assertEqual(activity_log.action_type, "update")
+        self.assertEqual(ActivityLog.objects.count(), 0)
+        self.assertEqual(audit_buffer.get_store().pending(), 1)
+
+    def test_flush_writes_both_tables_in_batches(self):
+        before = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(5):
+                self._log()
+            self._log(success=False, error_message="sin permiso")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(audit_buffer.flush_events(), 6)
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        # Un INSERT por tabla; las métricas nuevas se crean una vez.
+        self.assertEqual(
+            sum("core_activitylog" in q["sql"] for q in inserts), 1, inserts
+        )
+        self.assertEqual(
+            sum("users_useractivitylog" in q["sql"] for q in inserts), 1, inserts
+        )
+
+        activity_log = ActivityLog.objects.first()
+        self.assertEqual(activity_log.object_id, str(self.user.pk))
+        self.assertEqual(activity_log.details, {"campo": "telefono"})
+        self.assertGreaterEqual(activity_log.created_at, before)
+        self.assertLess(activity_log.created_at, timezone.now())
+        user_log = UserActivityLog.objects.get(
+            metadata__activity_log_id=str(activity_log.pk)
+        )
+        self.assertEqual(user_log.metadata["target_object_type"], "user")
+        self.assertEqual(user_log.timestamp, activity_log.created_at)
+
+        today = timezone.localdate()
+        counts = dict(
+            SystemMetrics.objects.filter(date=today).values_list("metric_type", "count")
+        )
+        self.assertEqual(
+            counts,
+            {"user_activity": 6, "activity_update": 6, "activity_errors": 1},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self._log()
+        audit_buffer.flush_events()
+        self.assertEqual(
+            SystemMetrics.objects.get(metric_type="user_activity", date=today).count,
+            7,
+        )
+
+    def test_security_critical_actions_are_written_inline(self):
+        activity_log = self._log(action_type="login")
+        self.assertIsNotNone(activity_log.pk)
+        self.assertTrue(
+            UserActivityLog.objects.filter(
+                metadata__activity_log_id=str(activity_log.pk)
+            ).exists()
+        )
+
+        request = RequestFactory().post("/")
+        request.user = self.user
+        request.session = mock.Mock(session_key="abc")
+        log_activity(request, "payment.refunded", "Reembolso emitido")
+        self.assertTrue(
+            ActivityLog.objects.filter(action_type="payment.refunded").exists()
+        )
+        self.assertIsNotNone(self._log(durable=True).pk)
+        self.assertEqual(audit_buffer.get_store().pending(), 0)
+
+    def test_rolled_back_transaction_is_not_audited(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self._log()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(audit_buffer.get_store().pending(), 0)
+
+    @override_settings(AUDIT_BUFFER_MAX_PENDING=3, AUDIT_FLUSH_BATCH=2)
+    def test_back_pressure_drains_on_the_producer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(4):
+                self._log()
+        # Al cuarto evento la cola pasó el límite y se escribió un lote.
+        self.assertEqual(ActivityLog.objects.count(), 2)
+        self.assertEqual(audit_buffer.get_store().pending(), 2)
+
+    def test_failed_flush_keeps_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._log()
+        with (
+            mock.patch.object(
+                ActivityLog.objects, "bulk_create", side_effect=RuntimeError("bd")
+            ),
+            self.assertRaises(RuntimeError),
+        ):
+            audit_buffer.flush_events()
+        self.assertEqual(audit_buffer.get_store().pending(), 1)
+        self.assertEqual(audit_buffer.flush_events(), 1)
+
+    def test_invalid_event_does_not_block_the_batch(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._log()
+            self._log(action_type="broken")
+            self._log()
+        real_write = audit_buffer.write_events
+
+        def write(events):
+            if any(event["activity"]["action_type"] == "broken" for event in events):
+                raise DataError("value too long")
+            return real_write(events)
+
+        with mock.patch.object(audit_buffer, "write_events", side_effect=write):
+            self.assertEqual(audit_buffer.flush_events(), 2)
+        self.assertEqual(audit_buffer.get_store().pending(), 0)
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+    def test_deleted_user_keeps_activity_log(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._log()
+        self.user.delete()
+        self.assertEqual(audit_buffer.flush_events(), 1)
+        self.assertIsNone(ActivityLog.objects.get().user_id)
+        self.assertFalse(UserActivityLog.objects.exists())
+
+    def test_flush_task(self):
+        from core.tasks import flush_audit_events
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._log()
+        self.assertEqual(flush_audit_events(), 1)
+
+    def test_activity_middleware_buffers_user_activity(self):
+        request = RequestFactory().patch("/api/v1/users/profile/")
+        request.user = self.user
+        request.session = mock.Mock(session_key="abc")
+        middleware = ActivityLoggerMiddleware(lambda request: None)
+        with self.captureOnCommitCallbacks(execute=True):
+            middleware._log_activity(
+                request, mock.Mock(status_code=200), "profile_update", "api_profile"
+            )
+        self.assertFalse(UserActivityLog.objects.exists())
+        audit_buffer.flush_events()
+        user_log = UserActivityLog.objects.get()
+        self.assertEqual(user_log.activity_type, "profile_update")
+        self.assertEqual(user_log.session_key, "abc")
+        self.assertEqual(user_log.metadata["status_code"], 200)
+        self.assertFalse(ActivityLog.objects.exists())
+
+
+@override_settings(AUDIT_WRITE_BEHIND=False)
+class InlineAuditTests(TestCase):
+    def test_disabled_write_behind_writes_inline(self):
+        user = User.objects.create_user(
+            email="inline@test.com", password="TestPass123!", user_type="tenant"
+        )
+        activity_log = audit_service.log_user_activity(
+            user=user, action_type="update", description="Cambio"
+        )
+        self.assertIsNotNone(activity_log.pk)
+        self.assertEqual(UserActivityLog.objects.filter(user=user).count(), 1)
@@ -0,0 +1,402 @@
+"""Tests de subidas reanudables por partes (`core.chunked_uploads`).
+
+Incluye un arnés que simula cortes de conexión: el cliente declara un
+`Content-Length` y el cuerpo se corta antes (o la lectura falla), como
+pasa con un móvil que pierde señal a mitad de un trozo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core import chunked_uploads
+from core.models import ChunkedUpload
+from matching.models import MatchRequest
+from properties.models import Property, PropertyVideo
+from requests.models import TenantDocument
+
+User = get_user_model()
+
+UPLOADS_URL = "/api/v1/core/uploads/"
+CHUNK = 4096
+
+
+def _payload(size: int) -> bytes:
+    return os.urandom(size)
+
+
+def _pdf(size: int) -> bytes:
+    return b"%PDF-1.4\n" + os.urandom(size - 9)
+
+
+class _ChunkedClientMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(
+            MEDIA_ROOT=media_root, CHUNKED_UPLOAD_MAX_CHUNK_SIZE=CHUNK
+        )
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def _create(self, content, purpose="property_video", filename="tour.mp4", **extra):
+        data = {"purpose": purpose, "filename": filename, "size": len(content)}
+        data.update(extra)
+        response = self.client.post(UPLOADS_URL, data, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response["Upload-Offset"], "0")
+        return response.data["id"]
+
+    def _patch(self, upload_id, offset, body, **extra):
+        return self.client.generic(
+            "PATCH",
+            f"{UPLOADS_URL}{upload_id}/",
+            body,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+            **extra,
+        )
+
+    def _offset(self, upload_id):
+        response = self.client.head(f"{UPLOADS_URL}{upload_id}/")
+        self.assertEqual(response.status_code, 200)
+        return int(response["Upload-Offset"])
+
+    def _send_all(self, upload_id, content, start=0):
+        for offset in range(start, len(content), CHUNK):
+            response = self._patch(upload_id, offset, content[offset : offset + CHUNK])
+            self.assertEqual(response.status_code, 204)
+            self.assertEqual(
+                int(response["Upload-Offset"]), min(offset + CHUNK, len(content))
+            )
+
+
+class ChunkedVideoUploadTests(_ChunkedClientMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.landlord = User.objects.create_user(
+            email="landlord@test.com", password="TestPass123!", user_type="landlord"
+        )
+        self.property = Property.objects.create(
+            landlord=self.landlord,
+            title="Casa con video",
+            description="Casa amplia con jardín.",
+            property_type="house",
+            listing_type="rent",
+            status="available",
+            address="Calle 10 #5-20",
+            city="Bogotá",
+            state="Cundinamarca",
+            country="Colombia",
+            bedrooms=3,
+            bathrooms=Decimal("2.0"),
+            total_area=Decimal("120.00"),
+            rent_price=Decimal("2500000.00"),
+        )
+        self.client.force_authenticate(user=self.landlord)
+        self.video_url = f"/api/v1/properties/{self.property.pk}/videos/upload/"
+
+    def _finalize(self, upload_id, **extra):
+        data = {"upload_id": upload_id, "title": "Recorrido"}
+        data.update(extra)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.video_url, data, format="json")
+
+    def test_full_upload_creates_video_with_same_bytes(self):
+        content = _payload(3 * CHUNK + 100)
+        upload_id = self._create(content, checksum=hashlib.sha256(content).hexdigest())
+        self._send_all(upload_id, content)
+
+        response = self._finalize(upload_id)
+        self.assertEqual(response.status_code, 201, response.data)
+        video = PropertyVideo.objects.get(property=self.property)
+        with video.video.open("rb") as handle:
+            self.assertEqual(handle.read(), content)
+        self.assertEqual(ChunkedUpload.objects.get().status, "consumed")
+        self.assertFalse(
+            default_storage.exists(f"chunked_uploads/{upload_id}/")
+            and default_storage.listdir(f"chunked_uploads/{upload_id}/")[1]
+        )
+
+    def test_interrupted_chunk_is_discarded_and_upload_resumes(self):
+        content = _payload(2 * CHUNK + 10)
+        upload_id = self._create(content)
+        self._patch(upload_id, 0, content[:CHUNK])
+
+        # Se declara un trozo completo pero el cuerpo se corta a la mitad.
+        response = self._patch(
+            upload_id,
+            CHUNK,
+            content[CHUNK : CHUNK + CHUNK // 2],
+            CONTENT_LENGTH=str(CHUNK),
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response["Upload-Offset"], str(CHUNK))
+        self.assertEqual(
+            len(default_storage.listdir(f"chunked_uploads/{upload_id}/")[1]), 1
+        )
+
+        # El cliente pregunta dónde quedó y reanuda desde ahí.
+        offset = self._offset(upload_id)
+        self.assertEqual(offset, CHUNK)
+        self._send_all(upload_id, content, start=offset)
+
+        response = self._finalize(
+            upload_id, checksum=hashlib.sha256(content).hexdigest()
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        with PropertyVideo.objects.get().video.open("rb") as handle:
+            self.assertEqual(handle.read(), content)
+
+    def test_offset_mismatch_returns_conflict_with_real_offset(self):
+        content = _payload(2 * CHUNK)
+        upload_id = self._create(content)
+        self._patch(upload_id, 0, content[:CHUNK])
+        # Reintento del primer trozo (la respuesta anterior se perdió).
+        response = self._patch(upload_id, 0, content[:CHUNK])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Upload-Offset"], str(CHUNK))
+
+    def test_chunk_larger_than_limit_is_rejected(self):
+        content = _payload(2 * CHUNK)
+        upload_id = self._create(content)
+        response = self._patch(upload_id, 0, content)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self._offset(upload_id), 0)
+
+    def test_checksum_mismatch_keeps_upload_available(self):
+        content = _payload(CHUNK)
+        upload_id = self._create(content, checksum="0" * 64)
+        self._send_all(upload_id, content)
+
+        response = self._finalize(upload_id)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("checksum", response.data["error"])
+        self.assertFalse(PropertyVideo.objects.exists())
+
+        response = self._finalize(
+            upload_id, checksum=hashlib.sha256(content).hexdigest()
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        content = _payload(2 * CHUNK)
+        upload_id = self._create(content)
+        self._patch(upload_id, 0, content[:CHUNK])
+        response = self._finalize(
+            upload_id, checksum=hashlib.sha256(content).hexdigest()
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(PropertyVideo.objects.exists())
+
+    def test_upload_can_only_be_used_once(self):
+        content = _payload(CHUNK)
+        checksum = hashlib.sha256(content).hexdigest()
+        upload_id = self._create(content, checksum=checksum)
+        self._send_all(upload_id, content)
+        self.assertEqual(self._finalize(upload_id).status_code, 201)
+        self.assertEqual(self._finalize(upload_id).status_code, 409)
+        self.assertEqual(PropertyVideo.objects.count(), 1)
+
+    def test_other_users_cannot_touch_the_upload(self):
+        content = _payload(CHUNK)
+        upload_id = self._create(content)
+        intruder = User.objects.create_user(
+            email="otro@test.com", password="TestPass123!", user_type="landlord"
+        )
+        self.client.force_authenticate(user=intruder)
+        self.assertEqual(self._patch(upload_id, 0, content).status_code, 404)
+
+    def test_rejects_disallowed_extension_and_size(self):
+        response = self.client.post(
+            UPLOADS_URL,
+            {"purpose": "property_video", "filename": "virus.exe", "size": 10},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            UPLOADS_URL,
+            {
+                "purpose": "tenant_document",
+                "filename": "cedula.pdf",
+                "size": 11 * 1024 * 1024,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 413)
+
+
+class ChunkedTenantDocumentTests(_ChunkedClientMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        landlord = User.objects.create_user(
+            email="landlord@test.com", password="TestPass123!", user_type="landlord"
+        )
+        self.tenant = User.objects.create_user(
+            email="tenant@test.com", password="TestPass123!", user_type="tenant"
+        )
+        property_obj = Property.objects.create(
+            landlord=landlord,
+            title="Apartamento",
+            description="Apartamento en el centro.",
+            property_type="apartment",
+            listing_type="rent",
+            status="available",
+            address="Calle 50 #10-30",
+            city="Bucaramanga",
+            state="Santander",
+            country="Colombia",
+            bedrooms=2,
+            bathrooms=Decimal("1.0"),
+            total_area=Decimal("60.00"),
+            rent_price=Decimal("1200000.00"),
+        )
+        self.match_request = MatchRequest.objects.create(
+            property=property_obj,
+            tenant=self.tenant,
+            landlord=landlord,
+            status="accepted",
+        )
+        self.client.force_authenticate(user=self.tenant)
+
+    def test_document_goes_through_existing_pdf_validation(self):
+        content = _pdf(CHUNK + 500)
+        upload_id = self._create(
+            content,
+            purpose="tenant_document",
+            filename="cedula.pdf",
+            checksum=hashlib.sha256(content).hexdigest(),
+        )
+        self._send_all(upload_id, content)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/requests/api/documents/upload/",
+                {
+                    "upload_id": upload_id,
+                    "property_request": str(self.match_request.pk),
+                    "document_type": "tomador_cedula_ciudadania",
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        document = TenantDocument.objects.get()
+        with document.document_file.open("rb") as handle:
+            self.assertEqual(handle.read(), content)
+
+    def test_renamed_binary_is_still_rejected(self):
+        content = _payload(CHUNK)
+        upload_id = self._create(
+            content,
+            purpose="tenant_document",
+            filename="cedula.pdf",
+            checksum=hashlib.sha256(content).hexdigest(),
+        )
+        self._send_all(upload_id, content)
+        response = self.client.post(
+            "/api/v1/requests/api/documents/upload/",
+            {
+                "upload_id": upload_id,
+                "property_request": str(self.match_request.pk),
+                "document_type": "tomador_cedula_ciudadania",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ChunkedUpload.objects.get().status, "complete")
+
+
+class _FlakyStream:
+    """Cuerpo que entrega `available` bytes y luego corta la conexión."""
+
+    def __init__(self, data: bytes, available: int):
+        self.data = data
+        self.available = available
+        self.position = 0
+
+    def read(self, size=-1):
+        if self.position >= self.available:
+            raise ConnectionResetError("cliente desconectado")
+        end = min(self.position + size, self.available)
+        chunk = self.data[self.position : end]
+        self.position = end
+        return chunk
+
+
+@override_settings(CHUNKED_UPLOAD_MAX_CHUNK_SIZE=CHUNK)
+class ChunkedUploadModuleTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user(
+            email="tenant@test.com", password="TestPass123!", user_type="tenant"
+        )
+
+    def test_connection_reset_mid_chunk_does_not_advance(self):
+        content = _payload(CHUNK)
+        upload = chunked_uploads.create_upload(
+            self.user, "property_video", "tour.mp4", len(content)
+        )
+        with self.assertRaises(chunked_uploads.ChunkedUploadError) as error:
+            chunked_uploads.append_chunk(
+                upload, 0, _FlakyStream(content, available=1000), len(content)
+            )
+        self.assertEqual(error.exception.offset, 0)
+        upload.refresh_from_db()
+        self.assertEqual((upload.offset, upload.parts), (0, []))
+
+    def test_assembled_file_supports_seek_across_parts(self):
+        content = _payload(2 * CHUNK + 7)
+        upload = chunked_uploads.create_upload(
+            self.user,
+            "property_video",
+            "tour.mp4",
+            len(content),
+            checksum=hashlib.sha256(content).hexdigest(),
+        )
+        for offset in range(0, len(content), CHUNK):
+            body = content[offset : offset + CHUNK]
+            upload = chunked_uploads.append_chunk(
+                upload, offset, _FlakyStream(body, len(body)), len(body)
+            )
+        _, uploaded = chunked_uploads.open_upload(
+            self.user, upload.pk, "property_video"
+        )
+        self.assertEqual(uploaded.size, len(content))
+        uploaded.seek(CHUNK - 3)
+        self.assertEqual(uploaded.read(6), content[CHUNK - 3 : CHUNK + 3])
+        uploaded.seek(0)
+        self.assertEqual(uploaded.read(), content)
+
+    def test_cleanup_removes_expired_uploads_and_parts(self):
+        content = _payload(CHUNK)
+        upload = chunked_uploads.create_upload(
+            self.user, "property_video", "tour.mp4", 2 * CHUNK
+        )
+        chunked_uploads.append_chunk(
+            upload, 0, _FlakyStream(content, len(content)), len(content)
+        )
+        part = upload.parts[0][1]
+        ChunkedUpload.objects.update(expires_at=timezone.now() - timedelta(hours=1))
+
+        from core.tasks import cleanup_chunked_uploads
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(cleanup_chunked_uploads(), 1)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertFalse(default_storage.exists(part))
@@ -0,0 +1,183 @@
+"""Tests del cliente HTTP saliente compartido (`core.http_client`).
+
+Corre contra un servidor HTTP local (stub) en un hilo:
+- Keep-alive: varias llamadas reutilizan una conexión
+- Reintentos con backoff sólo para métodos idempotentes
+- Circuit breaker por host: abre, rechaza sin llamar y se recupera
+- Cache de respuestas de catálogos (`get_json`)
+- Métricas de latencia por servicio para el monitor de performance
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+import requests
+from core import http_client
+from core.http_client import CircuitOpenError, HttpClient
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = hits = server.hits.get(self.path, 0) + 1
+        if self.path.startswith("/flaky") and hits <= server.failures:
+            self._reply(503, {"error": "temporalmente no disponible"})
+        elif self.path.startswith("/down"):
+            self._reply(500, {"error": "caído"})
+        else:
+            self._reply(200, {"path": self.path, "hits": hits})
+
+    do_GET = do_POST = _handle
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def reset(self, failures=0):
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.connections = 0
+        self.failures = failures
+
+
+@override_settings(
+    HTTP_CLIENT_BREAKER_THRESHOLD=2,
+    HTTP_CLIENT_BREAKER_RESET=60,
+    HTTP_CLIENT_METRICS_INTERVAL=3600,
+)
+class HttpClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = _StubServer(("127.0.0.1", 0), _StubHandler)
+        cls.server.reset()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.reset()
+        cache.clear()
+        http_client.reset_clients()
+        self.addCleanup(cache.clear)
+        self.client = HttpClient("stub", timeout=(1, 2), retries=2, backoff=0)
+        self.addCleanup(self.client.close)
+
+    def test_keep_alive_reuses_one_connection(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(f"{self.base}/ok").status_code, 200)
+        self.client.post(f"{self.base}/ok", json={"a": 1})
+        self.assertEqual(self.server.hits["/ok"], 6)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_get_is_retried_and_post_is_not(self):
+        self.server.reset(failures=2)
+        response = self.client.get(f"{self.base}/flaky")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits["/flaky"], 3)
+
+        response = self.client.post(f"{self.base}/flaky-post", json={})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits["/flaky-post"], 1)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        client = HttpClient("stub", timeout=(1, 2), retries=0)
+        self.addCleanup(client.close)
+        for _ in range(2):
+            self.assertEqual(client.get(f"{self.base}/down").status_code, 500)
+
+        with self.assertRaises(CircuitOpenError):
+            client.get(f"{self.base}/ok")
+        self.assertNotIn("/ok", self.server.hits)
+        # Los manejadores existentes la tratan como caída de red.
+        self.assertTrue(issubclass(CircuitOpenError, requests.RequestException))
+
+    def test_circuit_half_opens_and_recovers(self):
+        client = HttpClient("stub", timeout=(1, 2), retries=0)
+        self.addCleanup(client.close)
+        breaker = client.breaker(f"127.0.0.1:{self.server.server_port}")
+        breaker.reset_after = 0.05
+        for _ in range(2):
+            client.get(f"{self.base}/down")
+        self.assertEqual(breaker.state, "open")
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, "half-open")
+        self.assertEqual(client.get(f"{self.base}/ok").status_code, 200)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_refused_connection_counts_as_failure(self):
+        probe = _StubServer(("127.0.0.1", 0), _StubHandler)
+        closed = f"http://127.0.0.1:{probe.server_port}"
+        probe.server_close()
+        client = HttpClient("stub", timeout=(0.5, 1), retries=1, backoff=0)
+        self.addCleanup(client.close)
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                client.get(f"{closed}/ok")
+        with self.assertRaises(CircuitOpenError):
+            client.get(f"{closed}/ok")
+
+    def test_get_json_caches_catalogs(self):
+        first = self.client.get_json(
+            f"{self.base}/banks", params={"country": "CO"}, cache_ttl=60
+        )
+        second = self.client.get_json(
+            f"{self.base}/banks", params={"country": "CO"}, cache_ttl=60
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.hits["/banks?country=CO"], 1)
+
+        self.client.get_json(f"{self.base}/banks", params={"country": "CO"})
+        self.assertEqual(self.server.hits["/banks?country=CO"], 2)
+
+    def test_latency_metrics_per_service(self):
+        client = HttpClient("stub", timeout=(1, 2), retries=0)
+        self.addCleanup(client.close)
+        for _ in range(3):
+            client.get(f"{self.base}/ok")
+        client.get(f"{self.base}/down")
+        http_client.flush_metrics()
+
+        row = http_client.metrics_snapshot()["stub"]
+        self.assertEqual((row["calls"], row["errors"]), (4, 1))
+        self.assertGreaterEqual(row["avg_ms"], 0)
+
+        client.get(f"{self.base}/ok")
+        http_client.flush_metrics()
+        self.assertEqual(http_client.metrics_snapshot()["stub"]["calls"], 5)
+
+    def test_shared_client_per_service(self):
+        self.assertIs(http_client.get_client("dane"), http_client.get_client("dane"))
+        self.assertIsNot(http_client.get_client("dane"), http_client.get_client("pse"))
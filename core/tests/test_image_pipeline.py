@@ -0,0 +1,217 @@
+"""Tests del pipeline de imágenes subidas (`core.image_pipeline`)."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from core import image_pipeline
+from properties import list_cache
+from properties.models import Property, PropertyImage
+
+User = get_user_model()
+
+_LOCMEM = {
+    alias: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": f"image-pipeline-tests-{alias}",
+    }
+    for alias in ("default", "sessions", "query_cache", "local_fallback")
+}
+
+
+def _jpeg(size=(1200, 800), color=(200, 30, 30), orientation=None) -> bytes:
+    image = Image.new("RGB", size, color)
+    exif = Image.Exif()
+    exif[0x010F] = "Camara de prueba"  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class _MediaRootMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root, IMAGE_RENDITIONS_ASYNC=False)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.landlord = User.objects.create_user(
+            email="landlord@test.com", password="TestPass123!", user_type="landlord"
+        )
+        self.property = Property.objects.create(
+            landlord=self.landlord,
+            title="Casa con fotos",
+            description="Casa amplia con jardín.",
+            property_type="house",
+            listing_type="rent",
+            status="available",
+            address="Calle 10 #5-20",
+            city="Bogotá",
+            state="Cundinamarca",
+            country="Colombia",
+            bedrooms=3,
+            bathrooms=Decimal("2.0"),
+            total_area=Decimal("120.00"),
+            rent_price=Decimal("2500000.00"),
+            is_active=True,
+        )
+
+    def _upload(self, content=None, name="foto.jpg", **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = PropertyImage.objects.create(
+                property=self.property,
+                image=ContentFile(content or _jpeg(), name=name),
+                **kwargs,
+            )
+        image.refresh_from_db()
+        return image
+
+
+class PipelineTests(_MediaRootMixin, TestCase):
+    def test_upload_generates_renditions_after_commit(self):
+        image = self._upload(_jpeg(size=(1200, 800), orientation=6))
+        meta = image.renditions
+
+        self.assertEqual(meta["source"], image.image.name)
+        # Orientación 6: la foto se guardó rotada 90°.
+        self.assertEqual((meta["width"], meta["height"]), (800, 1200))
+        self.assertEqual(set(meta["renditions"]), {"thumb", "card", "full"})
+        thumb = meta["renditions"]["thumb"]
+        self.assertEqual((thumb["width"], thumb["height"]), (160, 240))
+        for entry in meta["renditions"].values():
+            for extension in ("webp", "jpeg"):
+                self.assertTrue(default_storage.exists(entry[extension]))
+        self.assertEqual(len(meta["blurhash"]), 28)
+        self.assertTrue(meta["lqip"].startswith("data:image/webp;base64,"))
+
+    def test_original_is_rewritten_without_exif(self):
+        image = self._upload(_jpeg(orientation=6))
+        with default_storage.open(image.image.name) as handle:
+            original = Image.open(handle)
+            self.assertEqual(dict(original.getexif()), {})
+            # Rotada a 800x1200 y acotada a la caja `full` (1920x1080).
+            self.assertEqual(original.size, (720, 1080))
+
+    def test_large_original_is_capped_to_full_box(self):
+        image = self._upload(_jpeg(size=(4000, 3000)))
+        self.assertEqual(image.image.width, 1440)
+        self.assertEqual(image.image.height, 1080)
+
+    def test_save_without_new_file_does_not_reprocess(self):
+        image = self._upload()
+        with self.captureOnCommitCallbacks() as callbacks:
+            image.caption = "Fachada"
+            image.save()
+        self.assertEqual(callbacks, [])
+
+    def test_replacing_file_removes_old_renditions(self):
+        image = self._upload()
+        old_paths = list(image_pipeline._rendition_paths(image.renditions))
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = ContentFile(_jpeg(color=(0, 0, 255)), name="nueva.jpg")
+            image.save()
+        image.refresh_from_db()
+        self.assertNotEqual(image.renditions["source"], old_paths[0])
+        for path in old_paths:
+            self.assertFalse(default_storage.exists(path))
+
+    def test_delete_removes_renditions(self):
+        image = self._upload()
+        paths = list(image_pipeline._rendition_paths(image.renditions))
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        for path in paths:
+            self.assertFalse(default_storage.exists(path))
+
+    def test_stale_and_deleted_tasks_are_noops(self):
+        image = self._upload()
+        args = ("properties.PropertyImage", str(image.pk), "image", "property")
+        self.assertEqual(
+            image_pipeline.generate_renditions(*args, "renditions", "otra.jpg"),
+            "stale",
+        )
+        PropertyImage.objects.filter(pk=image.pk).delete()
+        self.assertEqual(
+            image_pipeline.generate_renditions(*args, "renditions", image.image.name),
+            "deleted",
+        )
+
+    def test_unreadable_file_records_error(self):
+        image = self._upload(b"no es una imagen", name="rota.jpg")
+        self.assertIn("error", image.renditions)
+        self.assertIsNone(
+            image_pipeline.rendition_payload(image.renditions, default_storage)
+        )
+
+    def test_avatar_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.landlord.avatar = ContentFile(_jpeg(size=(900, 600)), name="yo.jpg")
+            self.landlord.save()
+        self.landlord.refresh_from_db()
+        renditions = self.landlord.avatar_renditions["renditions"]
+        self.assertEqual(renditions["thumb"]["width"], 64)
+        self.assertEqual(renditions["full"]["width"], 512)
+
+    def test_backfill_command_processes_existing_images(self):
+        image = self._upload()
+        PropertyImage.objects.filter(pk=image.pk).update(renditions={})
+        out = StringIO()
+        call_command(
+            "backfill_image_renditions",
+            "--inline",
+            "--model",
+            "properties.PropertyImage",
+            stdout=out,
+        )
+        image.refresh_from_db()
+        self.assertIn("thumb", image.renditions["renditions"])
+        self.assertIn("properties.PropertyImage: 1", out.getvalue())
+
+
+@override_settings(CACHES=_LOCMEM)
+class SerializerTests(_MediaRootMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        list_cache.bump_generation()
+        self.image = self._upload(is_main=True)
+        self.client.force_authenticate(user=self.landlord)
+
+    def test_list_uses_card_rendition(self):
+        response = self.client.get("/api/v1/properties/")
+        self.assertEqual(response.status_code, 200)
+        results = response.data.get("results", response.data)
+        card = self.image.renditions["renditions"]["card"]["jpeg"]
+        self.assertTrue(results[0]["main_image_url"].endswith(card))
+
+    def test_detail_exposes_renditions_and_placeholders(self):
+        response = self.client.get(f"/api/v1/properties/{self.property.pk}/")
+        self.assertEqual(response.status_code, 200)
+        image = response.data["images"][0]
+        self.assertEqual(
+            image["renditions"]["blurhash"], self.image.renditions["blurhash"]
+        )
+        self.assertTrue(image["renditions"]["card"]["webp"].startswith("http"))
+
+
+class BlurhashTests(SimpleTestCase):
+    def test_encodes_size_flag_and_average_color(self):
+        image = Image.new("RGB", (50, 50), (255, 0, 0))
+        result = image_pipeline.blurhash(image)
+        self.assertEqual(len(result), 28)
+        # 4x3 componentes: (4 - 1) + (3 - 1) * 9 = 21 -> "L".
+        self.assertEqual(result[0], "L")
+        self.assertEqual(result[2:6], image_pipeline._base83(0xFF0000, 4))
@@ -0,0 +1,183 @@
+"""Tests del particionado y la retención de logs (`core.log_partitions`)."""
+
+from __future__ import annotations
+
+import unittest
+from datetime import UTC, date, datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import log_partitions
+from core.audit_service import audit_service
+from core.models import ActivityLog
+from users.models import UserActivityLog
+
+User = get_user_model()
+
+
+class LogPartitionHelpersTests(TestCase):
+    def test_month_arithmetic_and_names(self):
+        self.assertEqual(
+            log_partitions.month_start(datetime(2025, 3, 31, 23, tzinfo=UTC)),
+            date(2025, 3, 1),
+        )
+        self.assertEqual(
+            log_partitions.add_months(date(2025, 11, 1), 3), date(2026, 2, 1)
+        )
+        self.assertEqual(
+            log_partitions.add_months(date(2025, 1, 1), -1), date(2024, 12, 1)
+        )
+        self.assertEqual(
+            log_partitions.partition_name("core_activitylog", date(2025, 7, 1)),
+            "core_activitylog_p202507",
+        )
+        self.assertEqual(log_partitions.partition_field(UserActivityLog), "timestamp")
+        self.assertIsNone(log_partitions.partition_field(User))
+
+
+class LogRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="retencion@test.com", password="TestPass123!", user_type="tenant"
+        )
+        now = timezone.now()
+        for days in (200, 120, 95, 10, 0):
+            UserActivityLog.objects.create(
+                user=self.user,
+                activity_type="login",
+                timestamp=now - timedelta(days=days),
+            )
+            ActivityLog.objects.create(
+                user=self.user,
+                action_type="update",
+                description="Cambio",
+                created_at=now - timedelta(days=days),
+            )
+
+    @override_settings(LOG_RETENTION_DELETE_BATCH=2)
+    def test_purge_deletes_in_batches(self):
+        cutoff = timezone.now() - timedelta(days=90)
+        self.assertEqual(
+            log_partitions.purge_before(UserActivityLog, cutoff, dry_run=True), 3
+        )
+        self.assertEqual(UserActivityLog.objects.count(), 5)
+        with CaptureQueriesContext(connection) as queries:
+            removed = log_partitions.purge_before(ActivityLog, cutoff)
+        self.assertEqual(removed, 3)
+        deletes = [q for q in queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 2)  # lotes de 2 y 1
+        self.assertFalse(ActivityLog.objects.filter(created_at__lt=cutoff).exists())
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+    def test_cleanup_old_logs_uses_the_right_field(self):
+        stats = audit_service.cleanup_old_logs(retention_days=90, dry_run=True)
+        self.assertEqual(stats["user_activity_logs"], 3)
+        self.assertEqual(stats["activity_logs"], 3)
+        stats = audit_service.cleanup_old_logs(retention_days=100)
+        self.assertEqual(stats["total"], 4)
+        self.assertEqual(UserActivityLog.objects.count(), 3)
+
+    @override_settings(
+        LOG_RETENTION_DAYS={"users.UserActivityLog": 30, "core.ActivityLog": 0}
+    )
+    def test_apply_retention_reads_settings(self):
+        self.assertEqual(log_partitions.apply_retention(), {"users.UserActivityLog": 3})
+        self.assertEqual(UserActivityLog.objects.count(), 2)
+        self.assertEqual(ActivityLog.objects.count(), 5)
+
+    @override_settings(LOG_RETENTION_DAYS={})
+    def test_maintain_and_command_without_partitioning(self):
+        result = log_partitions.maintain()
+        self.assertEqual(result["purged"], {})
+        if not log_partitions.supported():
+            self.assertEqual(result["created"], {})
+        out = StringIO()
+        call_command("manage_log_partitions", "--purge", stdout=out)
+        self.assertIn("LOG_RETENTION_DAYS vacío", out.getvalue())
+
+
+class GlobalAuditLogDateFilterTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email="admin-audit@test.com",
+            password="TestPass123!",
+            user_type="landlord",
+            is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        tz = timezone.get_current_timezone()
+        for day, hour in ((9, 12), (10, 0), (10, 23), (11, 8)):
+            UserActivityLog.objects.create(
+                user=self.admin,
+                activity_type="login",
+                timestamp=datetime(2025, 6, day, hour, tzinfo=tz),
+            )
+
+    def _count(self, **params):
+        response = self.client.get("/api/v1/core/audit-logs/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["count"]
+
+    def test_date_only_upper_bound_includes_the_whole_day(self):
+        self.assertEqual(self._count(date_from="2025-06-10", date_to="2025-06-10"), 2)
+        self.assertEqual(self._count(date_to="2025-06-10"), 3)
+        self.assertEqual(self._count(date_to="2025-06-10T12:00:00"), 2)
+        self.assertEqual(self._count(date_from="2025-06-10T01:00:00"), 2)
+
+    def test_invalid_bounds_are_ignored(self):
+        self.assertEqual(self._count(date_from="ayer", days="x"), 4)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "requiere PostgreSQL")
+class PostgresPartitionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="particiones@test.com", password="TestPass123!", user_type="tenant"
+        )
+
+    def test_log_tables_are_partitioned(self):
+        for model, _ in log_partitions.partitioned_models():
+            table = model._meta.db_table
+            self.assertTrue(log_partitions.is_partitioned(table), table)
+            names = {part["name"] for part in log_partitions.partitions(table)}
+            self.assertIn(f"{table}_default", names)
+            current = log_partitions.month_start(timezone.now())
+            self.assertIn(log_partitions.partition_name(table, current), names)
+
+    def test_old_rows_move_out_of_default_and_purge_drops_partitions(self):
+        table = UserActivityLog._meta.db_table
+        old = timezone.now() - timedelta(days=800)
+        log = UserActivityLog.objects.create(
+            user=self.user, activity_type="login", timestamp=old
+        )
+        old_month = log_partitions.month_start(old)
+        log_partitions.ensure_partitions(table, months_ahead=0, since=old_month)
+        name = log_partitions.partition_name(table, old_month)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {connection.ops.quote_name(name)} WHERE id = %s",
+                [log.pk],
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        cutoff = datetime.combine(
+            log_partitions.add_months(old_month, 1),
+            datetime.min.time(),
+            tzinfo=UTC,
+        )
+        with connection.cursor() as cursor:
+            # Las FK de Django son diferidas: dentro del test quedan
+            # chequeos pendientes que impiden el DROP.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        self.assertEqual(log_partitions.purge_before(UserActivityLog, cutoff), 1)
+        names = {part["name"] for part in log_partitions.partitions(table)}
+        self.assertNotIn(name, names)
+        self.assertFalse(UserActivityLog.objects.filter(pk=log.pk).exists())
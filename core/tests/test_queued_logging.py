@@ -0,0 +1,191 @@
+"""Tests del logging asíncrono y con muestreo (`core.logging`)."""
+
+from __future__ import annotations
+
+import io
+import logging
+import logging.config
+import threading
+from contextlib import redirect_stdout
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from core import logging as core_logging
+from core.logging import (
+    QueuedHandler,
+    SamplingFilter,
+    queued_logging_config,
+    stop_queue_listener,
+)
+from matching.models import MatchRequest
+from properties.models import Property
+
+User = get_user_model()
+
+
+class _Recorder(logging.Handler):
+    """Guarda (hilo, mensaje formateado) de cada registro."""
+
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.setFormatter(core_logging.SafeJSONFormatter())
+        self.rows = []
+
+    def emit(self, record):
+        self.rows.append((threading.get_ident(), self.format(record)))
+
+
+def _record(name="verihome.test", level=logging.DEBUG, msg="m"):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+class SamplingFilterTests(SimpleTestCase):
+    def test_limits_debug_per_logger_and_reports_dropped(self):
+        sampler = SamplingFilter(rate=3, period=1.0)
+        with mock.patch.object(core_logging.time, "monotonic", return_value=100.0):
+            passed = [sampler.filter(_record()) for _ in range(10)]
+            self.assertTrue(sampler.filter(_record(name="otro")))
+            self.assertTrue(sampler.filter(_record(level=logging.INFO)))
+        self.assertEqual(passed.count(True), 3)
+
+        later = _record()
+        with mock.patch.object(core_logging.time, "monotonic", return_value=101.5):
+            self.assertTrue(sampler.filter(later))
+        self.assertEqual(later.sampled_out, 7)
+
+
+class QueuedHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.target = _Recorder()
+        self.target.set_name("_queued_test_target")
+        self.handler = QueuedHandler("_queued_test_target")
+        self.logger = logging.getLogger("verihome.queued_test")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+        self.addCleanup(stop_queue_listener)
+
+    def test_formats_and_writes_off_the_calling_thread(self):
+        items = ["a"]
+        self.logger.info("items=%s", items)
+        items.append("b")  # el mensaje se resolvió al encolar
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("falló")
+        stop_queue_listener()
+
+        self.assertEqual(len(self.target.rows), 2)
+        threads = {thread for thread, _ in self.target.rows}
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertIn('"message": "items=[\'a\']"', self.target.rows[0][1])
+        self.assertIn('"type": "ValueError"', self.target.rows[1][1])
+
+    def test_respects_target_level(self):
+        self.target.setLevel(logging.WARNING)
+        self.logger.info("ignorado")
+        self.logger.warning("escrito")
+        stop_queue_listener()
+        self.assertEqual(len(self.target.rows), 1)
+
+    def test_full_queue_writes_inline(self):
+        full = mock.Mock(put_nowait=mock.Mock(side_effect=core_logging.queue.Full))
+        with mock.patch.object(core_logging, "_log_queue", return_value=full):
+            self.logger.error("en línea")
+        self.assertEqual(self.target.rows[0][0], threading.get_ident())
+
+    def test_unknown_target_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "no configurado"):
+            QueuedHandler("no_existe")
+
+
+class QueuedLoggingConfigTests(SimpleTestCase):
+    def _config(self, **kwargs):
+        return queued_logging_config(
+            {
+                "version": 1,
+                "disable_existing_loggers": False,
+                "handlers": {
+                    "console": {"class": "logging.StreamHandler", "level": "INFO"},
+                },
+                "loggers": {
+                    "verihome.queued_config": {
+                        "handlers": ["console"],
+                        "level": "DEBUG",
+                        "propagate": False,
+                    },
+                },
+            },
+            **kwargs,
+        )
+
+    def test_handlers_go_behind_the_queue(self):
+        self.addCleanup(logging.config.dictConfig, settings.LOGGING)
+        self.addCleanup(stop_queue_listener)
+        logging.config.dictConfig(self._config())
+
+        handler = logging.getLogger("verihome.queued_config").handlers[0]
+        self.assertIsInstance(handler, QueuedHandler)
+        self.assertEqual(handler.name, "console")
+        self.assertEqual(handler.target.name, "_console")
+        self.assertEqual(handler.level, logging.INFO)
+
+    def test_sync_mode_only_adds_sampling(self):
+        config = self._config(queued=False, sample_rate=5)
+        self.assertEqual(list(config["handlers"]), ["console"])
+        self.assertEqual(config["handlers"]["console"]["filters"], ["sampled"])
+        self.assertEqual(config["filters"]["sampled"]["rate"], 5)
+
+
+class RequestPathOutputTests(TestCase):
+    def test_tenant_processes_writes_nothing_to_stdout(self):
+        landlord = User.objects.create_user(
+            email="landlord@logging.test",
+            password="test1234",
+            user_type="landlord",
+            first_name="Land",
+            last_name="Lord",
+        )
+        tenant = User.objects.create_user(
+            email="tenant@logging.test",
+            password="test1234",
+            user_type="tenant",
+            first_name="Ten",
+            last_name="Ant",
+        )
+        prop = Property.objects.create(
+            title="Apto",
+            description="Apto",
+            property_type="apartment",
+            rent_price=1000000,
+            landlord=landlord,
+            address="Calle 1",
+            city="Bogotá",
+            country="Colombia",
+            bedrooms=2,
+            bathrooms=1,
+            total_area=50,
+        )
+        for _ in range(3):
+            MatchRequest.objects.create(
+                property=prop,
+                tenant=tenant,
+                landlord=landlord,
+                status="accepted",
+                workflow_data={"visit_scheduled": {"date": "2026-10-20"}},
+            )
+        client = APIClient()
+        client.force_authenticate(user=tenant)
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            response = client.get("/api/v1/contracts/tenant-processes/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(out.getvalue(), "")
@@ -0,0 +1,120 @@
+"""Tests del generador de datos a escala (`core.seeding`)."""
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from contracts.models import Contract
+from core import seeding
+from matching.models import MatchRequest
+from messaging.models import MessageThread
+from payments.models import PaymentOrder, Transaction
+from properties.models import Property
+
+User = get_user_model()
+
+
+def _snapshot():
+    return {
+        "users": list(User.objects.order_by("email").values_list("id", "email")),
+        "properties": list(
+            Property.objects.order_by("id").values_list("id", "landlord_id", "city")
+        ),
+        "matches": list(
+            MatchRequest.objects.order_by("id").values_list("id", "tenant_id", "status")
+        ),
+        "orders": list(
+            PaymentOrder.objects.order_by("id").values_list("id", "status", "amount")
+        ),
+    }
+
+
+class SeedTests(TestCase):
+    def test_counts_match_the_database_and_scale(self):
+        manifest = seeding.seed(scale=2)
+
+        for label, rows in manifest["counts"].items():
+            self.assertEqual(apps.get_model(label).objects.count(), rows, label)
+        self.assertEqual(manifest["users"], {"admin": 1, "landlord": 10, "tenant": 40})
+        self.assertEqual(Property.objects.count(), 60)
+        self.assertEqual(manifest["total_rows"], sum(manifest["counts"].values()))
+        self.assertTrue(all(manifest["ids"].values()))
+
+    def test_rows_are_referentially_consistent(self):
+        seeding.seed()
+
+        for match in MatchRequest.objects.select_related("property"):
+            self.assertEqual(match.landlord_id, match.property.landlord_id)
+        for contract in Contract.objects.select_related("match_request"):
+            self.assertEqual(contract.match_request.status, "accepted")
+            self.assertEqual(
+                contract.primary_party_id, contract.match_request.landlord_id
+            )
+            self.assertEqual(
+                contract.secondary_party_id, contract.match_request.tenant_id
+            )
+        for order in PaymentOrder.objects.select_related("transaction"):
+            if order.status == "paid":
+                self.assertEqual(order.transaction.payer_id, order.payer_id)
+                self.assertEqual(order.transaction.amount, order.amount)
+            else:
+                self.assertIsNone(order.transaction_id)
+        self.assertEqual(
+            Transaction.objects.count(),
+            PaymentOrder.objects.filter(status="paid").count(),
+        )
+        for thread in MessageThread.objects.prefetch_related("participants"):
+            self.assertIn(thread.created_by, thread.participants.all())
+
+    def test_same_seed_reproduces_the_dataset(self):
+        seeding.seed(seed=7)
+        first = _snapshot()
+        seeding.purge()
+        self.assertFalse(User.objects.filter(email__endswith=seeding.EMAIL_DOMAIN))
+
+        seeding.seed(seed=7)
+        self.assertEqual(_snapshot(), first)
+
+        seeding.purge()
+        seeding.seed(seed=8)
+        self.assertNotEqual(_snapshot()["matches"], first["matches"])
+
+    def test_seeded_accounts_can_log_in(self):
+        manifest = seeding.seed()
+        response = self.client.post(
+            "/api/v1/users/auth/login/",
+            {"email": manifest["accounts"]["tenant"], "password": manifest["password"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn("access", response.json())
+
+
+class SeedDatasetCommandTests(TestCase):
+    def test_writes_manifest_and_requires_flush_to_reseed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "seed.json"
+            call_command(
+                "seed_dataset", "--force", "--manifest", str(path), stdout=StringIO()
+            )
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+        self.assertEqual(manifest["scale"], 1)
+        self.assertEqual(
+            User.objects.filter(email__endswith=seeding.EMAIL_DOMAIN).count(),
+            sum(manifest["users"].values()),
+        )
+
+        with self.assertRaisesMessage(CommandError, "--flush"):
+            call_command("seed_dataset", "--force", stdout=StringIO())
+        call_command("seed_dataset", "--force", "--flush", stdout=StringIO())
+
+    def test_refuses_without_debug(self):
+        with self.assertRaisesMessage(CommandError, "--force"):
+            call_command("seed_dataset", stdout=StringIO())
@@ -6,6 +6,7 @@ import logging
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from django.utils import timezone
 from rest_framework import viewsets, permissions, status, serializers
 from rest_framework.decorators import action
@@ -13,6 +14,14 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import MatchRequest, MatchCriteria, MatchNotification
+from .pipeline import (
+    applied_property_ids,
+    candidates,
+    main_image_url,
+    prefetch_images,
+    property_summary,
+    score_candidates,
+)
 from .serializers import (
     MatchRequestSerializer,
     MatchCriteriaSerializer,
@@ -651,7 +660,8 @@ class MatchCriteriaViewSet(viewsets.ModelViewSet):
 
         matches = find_potential_matches(criteria.tenant, limit=20)
 
-        # Calcular scores para cada match
+        # Calcular scores para cada match (una consulta para has_applied)
+        applied = applied_property_ids(request.user, matches)
         matches_with_scores = []
         for property in matches:
             score = criteria.get_match_score(property)
@@ -669,11 +679,7 @@ class MatchCriteriaViewSet(viewsets.ModelViewSet):
                         "landlord": property.landlord.get_full_name(),
                     },
                     "match_score": score,
-                    "has_applied": MatchRequest.objects.filter(
-                        tenant=request.user,
-                        property=property,
-                        status__in=["pending", "viewed", "accepted"],
-                    ).exists(),
+                    "has_applied": property.id in applied,
                 }
             )
 
@@ -695,7 +701,8 @@ class PotentialMatchesAPIView(APIView):
             )
 
         limit = int(request.query_params.get("limit", 10))
-        matches = find_potential_matches(request.user, limit=limit)
+        matches = prefetch_images(find_potential_matches(request.user, limit=limit))
+        applied = applied_property_ids(request.user, matches)
 
         # Serializar matches
         matches_data = []
@@ -711,17 +718,8 @@ class PotentialMatchesAPIView(APIView):
             matches_data.append(
                 {
                     "property": {
-                        "id": str(property.id),
-                        "title": property.title,
-                        "description": property.description[:200],
-                        "rent_price": property.rent_price,
-                        "city": property.city,
-                        "state": property.state,
-                        "property_type": property.property_type,
-                        "bedrooms": property.bedrooms,
-                        "bathrooms": property.bathrooms,
-                        "total_area": property.total_area,
-                        "main_image": property.get_main_image(),
+                        **property_summary(property),
+                        "main_image": main_image_url(property),
                         "landlord": {
                             "name": property.landlord.get_full_name(),
                             "user_type": property.landlord.user_type,
@@ -729,11 +727,7 @@ class PotentialMatchesAPIView(APIView):
                     },
                     "match_score": score,
                     "reasons": self.get_match_reasons(property, request.user),
-                    "has_applied": MatchRequest.objects.filter(
-                        tenant=request.user,
-                        property=property,
-                        status__in=["pending", "viewed", "accepted"],
-                    ).exists(),
+                    "has_applied": property.id in applied,
                 }
             )
 
@@ -1266,47 +1260,41 @@ class SmartMatchingAPIView(APIView):
 
         # Ejecutar algoritmo de matching
         if algorithm == "advanced":
-            matches = self._advanced_matching_algorithm(criteria, limit, min_score)
+            matches, analyzed = self._advanced_matching_algorithm(
+                criteria, limit, min_score
+            )
         elif algorithm == "ml":
-            matches = self._ml_matching_algorithm(criteria, limit, min_score)
+            matches, analyzed = self._ml_matching_algorithm(criteria, limit, min_score)
         else:
-            matches = self._standard_matching_algorithm(criteria, limit, min_score)
+            matches, analyzed = self._standard_matching_algorithm(
+                criteria, limit, min_score
+            )
 
-        # Preparar respuesta
+        # Preparar respuesta (una consulta para has_applied)
+        applied = applied_property_ids(
+            request.user, [match["property"] for match in matches]
+        )
         matches_data = []
         for match in matches:
             property_obj = match["property"]
             matches_data.append(
                 {
                     "property": {
-                        "id": str(property_obj.id),
-                        "title": property_obj.title,
-                        "description": property_obj.description[:200],
-                        "rent_price": property_obj.rent_price,
-                        "city": property_obj.city,
-                        "state": property_obj.state,
-                        "property_type": property_obj.property_type,
-                        "bedrooms": property_obj.bedrooms,
-                        "bathrooms": property_obj.bathrooms,
-                        "total_area": property_obj.total_area,
+                        **property_summary(property_obj),
                         "landlord": property_obj.landlord.get_full_name(),
                     },
                     "match_score": match["match_score"],
                     "algorithm_details": match.get("details", {}),
                     "confidence": match.get("confidence", 0),
                     "reasons": match.get("reasons", []),
-                    "has_applied": MatchRequest.objects.filter(
-                        tenant=request.user,
-                        property=property_obj,
-                        status__in=["pending", "viewed", "accepted"],
-                    ).exists(),
+                    "has_applied": property_obj.id in applied,
                 }
             )
 
         return Response(
             {
                 "algorithm_used": algorithm,
-                "total_analyzed": match.get("total_analyzed", 0),
+                "total_analyzed": analyzed,
                 "matches_found": len(matches_data),
                 "min_score_threshold": min_score,
                 "smart_matches": matches_data,
@@ -1315,30 +1303,18 @@ class SmartMatchingAPIView(APIView):
         )
 
     def _standard_matching_algorithm(self, criteria, limit, min_score):
-        """Algoritmo de matching estándar basado en criterios."""
-
-        # Obtener propiedades que cumplan criterios básicos
-        properties = criteria.find_matching_properties()[
-            : limit * 2
-        ]  # Buffer para filtrado
-
-        matches = []
-        for property in properties:
-            score = criteria.get_match_score(property)
-            if score >= min_score:
-                matches.append(
-                    {
-                        "property": property,
-                        "match_score": score,
-                        "confidence": min(score / 100, 1.0),
-                        "details": {"algorithm": "standard"},
-                        "reasons": self._get_match_reasons(property, criteria),
-                    }
-                )
+        """Algoritmo de matching estándar basado en criterios.
 
-        # Ordenar por score y limitar
-        matches.sort(key=lambda x: x["match_score"], reverse=True)
-        return matches[:limit]
+        Returns:
+            (matches, propiedades analizadas); ver `matching.pipeline`.
+        """
+        return score_candidates(
+            criteria,
+            candidates(criteria),
+            limit,
+            min_score=min_score,
+            reasons=self._get_match_reasons,
+        )
 
     def _advanced_matching_algorithm(self, criteria, limit, min_score):
         """Algoritmo avanzado que considera historial y patrones."""
@@ -1346,27 +1322,34 @@ class SmartMatchingAPIView(APIView):
         # - Historial de matches anteriores
         # - Patrones de comportamiento
         # - Similitud con otros usuarios
-        matches = self._standard_matching_algorithm(criteria, limit, min_score)
+        matches, analyzed = self._standard_matching_algorithm(
+            criteria, limit, min_score
+        )
 
-        # Ajustar scores basado en historial
+        # Ajustar scores basado en historial (dos consultas en total)
         user_history = MatchRequest.objects.filter(tenant=criteria.tenant)
+        preferred_types = set(
+            user_history.filter(status="accepted").values_list(
+                "property__property_type", flat=True
+            )
+        )
+        rejected_by_kind = {
+            (row["property__city"], row["property__property_type"]): row["total"]
+            for row in user_history.filter(status="rejected")
+            .values("property__city", "property__property_type")
+            .annotate(total=Count("id"))
+        }
 
         for match in matches:
             # Bonus por tipo de propiedad preferido
-            preferred_types = [
-                req.property.property_type
-                for req in user_history.filter(status="accepted")
-            ]
             if match["property"].property_type in preferred_types:
                 match["match_score"] = min(match["match_score"] + 10, 100)
                 match["reasons"].append("Tipo de propiedad que has preferido antes")
 
             # Penalty por rechazos previos similares
-            similar_rejected = user_history.filter(
-                status="rejected",
-                property__city=match["property"].city,
-                property__property_type=match["property"].property_type,
-            ).count()
+            similar_rejected = rejected_by_kind.get(
+                (match["property"].city, match["property"].property_type), 0
+            )
 
             if similar_rejected > 2:
                 match["match_score"] = max(match["match_score"] - 5, 0)
@@ -1374,13 +1357,26 @@ class SmartMatchingAPIView(APIView):
             match["details"]["algorithm"] = "advanced"
             match["details"]["history_adjustment"] = True
 
-        return matches
+        return matches, analyzed
 
     def _ml_matching_algorithm(self, criteria, limit, min_score):
         """Algoritmo de machine learning simulado."""
         # En una implementación real, aquí iría un modelo de ML entrenado
         # Por ahora, simulamos con lógica heurística avanzada
-        matches = self._advanced_matching_algorithm(criteria, limit, min_score)
+        matches, analyzed = self._advanced_matching_algorithm(
+            criteria, limit, min_score
+        )
+
+        # Respuestas por arrendador, en una sola consulta
+        responses = dict(
+            MatchRequest.objects.filter(
+                landlord_id__in={match["property"].landlord_id for match in matches},
+                responded_at__isnull=False,
+            )
+            .values("landlord_id")
+            .annotate(total=Count("id"))
+            .values_list("landlord_id", "total")
+        )
 
         # Simular ajustes de ML
         for match in matches:
@@ -1391,10 +1387,7 @@ class SmartMatchingAPIView(APIView):
                 match["reasons"].append("Propiedad popular entre usuarios")
 
             # Factor de respuesta rápida del landlord
-            landlord = match["property"].landlord
-            avg_response = MatchRequest.objects.filter(
-                landlord=landlord, responded_at__isnull=False
-            ).count()
+            avg_response = responses.get(match["property"].landlord_id, 0)
 
             if avg_response > 5:  # Landlord responsivo
                 match["match_score"] = min(match["match_score"] + 3, 100)
@@ -1406,7 +1399,7 @@ class SmartMatchingAPIView(APIView):
                 match["match_score"] / 90, 1.0
             )  # ML tiene más confianza
 
-        return matches
+        return matches, analyzed
 
     def _get_match_reasons(self, property, criteria):
         """Genera razones específicas para el match."""
@@ -2,12 +2,15 @@
 Modelos para el sistema de matching entre arrendadores y arrendatarios de VeriHome.
 """
 
+import logging
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 
@@ -306,14 +309,14 @@ class MatchRequest(models.Model):
             MatchingMessagingService.send_match_rejection_message(self)
 
             # 4. Log de la limpieza
-            print(
-                f"🧹 Match {self.match_code} rechazado y datos limpiados completamente"
+            logger.debug(
+                "🧹 Match %s rechazado y datos limpiados completamente", self.match_code
             )
 
     def _cleanup_associated_data(self):
         """Limpia todos los datos asociados a este match cuando es rechazado."""
 
-        print(f"🧹 INICIANDO LIMPIEZA COMPLETA para match {self.match_code}")
+        logger.debug("🧹 INICIANDO LIMPIEZA COMPLETA para match %s", self.match_code)
 
         # 1. ELIMINAR CONTRATOS ASOCIADOS
         from contracts.models import (
@@ -328,7 +331,7 @@ class MatchRequest(models.Model):
         )
         contract_count = contracts.count()
         if contract_count > 0:
-            print(f"   📄 Eliminando {contract_count} contrato(s) asociado(s)")
+            logger.debug("   📄 Eliminando %s contrato(s) asociado(s)", contract_count)
             # Eliminar firmas y autenticaciones relacionadas
             for contract in contracts:
                 ContractSignature.objects.filter(contract=contract).delete()
@@ -349,16 +352,17 @@ class MatchRequest(models.Model):
         for prop_request in property_requests:
             # Eliminar documentos asociados
             tenant_docs = TenantDocument.objects.filter(property_request=prop_request)
-            doc_count += tenant_docs.count()
-            if tenant_docs.exists():
-                print(
-                    f"   📋 Eliminando {tenant_docs.count()} documento(s) del inquilino"
-                )
+            docs = tenant_docs.count()
+            doc_count += docs
+            if docs:
+                logger.debug("   📋 Eliminando %s documento(s) del inquilino", docs)
                 tenant_docs.delete()
 
         # Eliminar las PropertyInterestRequest completamente
         if prop_request_count > 0:
-            print(f"   📄 Eliminando {prop_request_count} solicitud(es) de propiedad")
+            logger.debug(
+                "   📄 Eliminando %s solicitud(es) de propiedad", prop_request_count
+            )
             property_requests.delete()
 
         # 3. ELIMINAR MENSAJES DEL HILO DE CONVERSACIÓN
@@ -376,15 +380,17 @@ class MatchRequest(models.Model):
             if thread:
                 message_count = Message.objects.filter(thread=thread).count()
                 if message_count > 0:
-                    print(f"   💬 Eliminando {message_count} mensaje(s) del hilo")
+                    logger.debug(
+                        "   💬 Eliminando %s mensaje(s) del hilo", message_count
+                    )
                     Message.objects.filter(thread=thread).delete()
                     # No eliminar el thread, solo los mensajes
         except Exception as e:
-            print(f"   ⚠️  Error limpiando mensajes: {e}")
+            logger.warning(f"   ⚠️  Error limpiando mensajes: {e}")
 
         # 4. LIMPIAR DATOS DEL WORKFLOW EN EL MATCH
         if hasattr(self, "workflow_data") and self.workflow_data:
-            print("   🔄 Limpiando datos de workflow")
+            logger.debug("   🔄 Limpiando datos de workflow")
             self.workflow_data = {}
             self.current_stage = 1  # Resetear a etapa inicial
             self.save(update_fields=["workflow_data", "current_stage"])
@@ -392,19 +398,20 @@ class MatchRequest(models.Model):
         # 5. LIBERAR LA PROPIEDAD PARA NUEVAS SOLICITUDES
         # No marcar como no disponible, solo limpiar reservas temporales
         if self.property:
-            print(
-                f"   🏠 Liberando propiedad {self.property.title} para nuevas solicitudes"
+            logger.debug(
+                "   🏠 Liberando propiedad %s para nuevas solicitudes",
+                self.property.title,
             )
             # La propiedad queda disponible automáticamente
 
-        print(f"✅ Limpieza completa terminada para match {self.match_code}")
-        print(f"   • {contract_count} contratos eliminados")
-        print(f"   • {prop_request_count} solicitudes de propiedad eliminadas")
-        print(f"   • {doc_count} documentos de inquilino eliminados")
-        print("   • Mensajes del hilo de conversación limpiados")
-        print("   • Propiedad liberada para nuevas solicitudes")
-        print("   • Datos de workflow reiniciados")
-        print("🎯 El inquilino puede solicitar nuevamente sin datos residuales")
+        logger.info(f"✅ Limpieza completa terminada para match {self.match_code}")
+        logger.debug("   • %s contratos eliminados", contract_count)
+        logger.debug("   • %s solicitudes de propiedad eliminadas", prop_request_count)
+        logger.debug("   • %s documentos de inquilino eliminados", doc_count)
+        logger.debug("   • Mensajes del hilo de conversación limpiados")
+        logger.debug("   • Propiedad liberada para nuevas solicitudes")
+        logger.debug("   • Datos de workflow reiniciados")
+        logger.debug("🎯 El inquilino puede solicitar nuevamente sin datos residuales")
 
     def is_expired(self):
         """Verifica si la solicitud ha expirado."""
@@ -774,7 +781,14 @@ class MatchCriteria(models.Model):
 
         # Amenidades (15 puntos)
         if self.required_amenities:
-            property_amenities = property.amenities.values_list("name", flat=True)
+            # Usa las amenidades precargadas por matching.pipeline si existen.
+            relations = getattr(property, "prefetched_amenity_relations", None)
+            if relations is not None:
+                property_amenities = [relation.amenity.name for relation in relations]
+            else:
+                property_amenities = property.amenity_relations.values_list(
+                    "amenity__name", flat=True
+                )
             matching_amenities = len(
                 set(self.required_amenities) & set(property_amenities)
             )
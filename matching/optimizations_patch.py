@@ -7,6 +7,10 @@ INSTRUCCIONES DE APLICACIÓN:
 2. Aplicar los cambios marcados con # OPTIMIZACIÓN
 """
 
+import logging
+
+logger = logging.getLogger(__name__)
+
 # ==========================================
 # OPTIMIZACIÓN 1: MatchRequestViewSet.get_queryset()
 # ==========================================
@@ -108,6 +112,6 @@ MEJORA: ~94% reducción de queries (50 → 3)
 IMPACTO: Response time ~500ms → ~50ms (~90% más rápido)
 """
 
-print("✅ Optimizaciones de matching preparadas")
-print("📊 Impacto esperado: 94% menos queries, 90% más rápido")
-print("📝 Aplicar cambios manualmente en matching/api_views.py")
+logger.info("✅ Optimizaciones de matching preparadas")
+logger.debug("📊 Impacto esperado: 94%% menos queries, 90%% más rápido")
+logger.debug("📝 Aplicar cambios manualmente en matching/api_views.py")
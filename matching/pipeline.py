@@ -0,0 +1,132 @@
+"""
+Matching de propiedades para inquilinos: candidatos → puntaje → decoración.
+
+1. `candidates(criteria)` — propiedades de `find_matching_properties`
+   con arrendador (`select_related`) y amenidades (`prefetch_related`),
+   de menor a mayor canon: el precio es la parte del puntaje que más
+   varía entre candidatos que ya cumplen los filtros, así que los
+   mejores aparecen primero.
+2. `score_candidates(...)` — recorre los candidatos por bloques de
+   CANDIDATE_CHUNK (una consulta de precarga por bloque) hasta reunir
+   `limit` resultados con puntaje >= `min_score`, y cuenta cuántos
+   analizó.
+3. `applied_property_ids(tenant, properties)` — una sola consulta
+   `values_list` con las propiedades a las que el inquilino ya aplicó;
+   `prefetch_images(properties)` precarga solo lo que se va a mostrar.
+
+Sin consultas por resultado: el costo no crece con `limit`.
+"""
+
+from django.db.models import Prefetch, prefetch_related_objects
+
+from properties.models import PropertyAmenityRelation, PropertyImage
+
+from .models import MatchRequest
+
+ACTIVE_REQUEST_STATUSES = ("pending", "viewed", "accepted")
+CANDIDATE_CHUNK = 100
+# Atributos con las relaciones precargadas (ver `MatchCriteria.get_match_score`).
+AMENITIES_ATTR = "prefetched_amenity_relations"
+IMAGES_ATTR = "prefetched_images"
+
+
+def candidates(criteria):
+    """Propiedades que cumplen los criterios, listas para puntuar.
+
+    Las amenidades solo se precargan si los criterios las puntúan.
+    """
+    queryset = criteria.find_matching_properties().select_related("landlord")
+    if criteria.required_amenities:
+        queryset = queryset.prefetch_related(
+            Prefetch(
+                "amenity_relations",
+                queryset=PropertyAmenityRelation.objects.select_related("amenity"),
+                to_attr=AMENITIES_ATTR,
+            )
+        )
+    return queryset.order_by("rent_price", "pk")
+
+
+def prefetch_images(properties):
+    """Precarga las imágenes de las propiedades que se van a mostrar."""
+    prefetch_related_objects(
+        list(properties),
+        Prefetch("images", queryset=PropertyImage.objects.all(), to_attr=IMAGES_ATTR),
+    )
+    return properties
+
+
+def score_candidates(criteria, queryset, limit, min_score=0, reasons=None):
+    """Puntúa candidatos hasta reunir `limit` con puntaje >= `min_score`.
+
+    Args:
+        reasons: callable(property, criteria) -> list, opcional.
+
+    Returns:
+        (resultados ordenados por puntaje, candidatos analizados). Cada
+        resultado es un dict con property, match_score, confidence,
+        details y reasons.
+    """
+    results, analyzed = [], 0
+    for property in queryset.iterator(chunk_size=CANDIDATE_CHUNK):
+        analyzed += 1
+        score = criteria.get_match_score(property)
+        if score < min_score:
+            continue
+        results.append(
+            {
+                "property": property,
+                "match_score": score,
+                "confidence": min(score / 100, 1.0),
+                "details": {"algorithm": "standard"},
+                "reasons": reasons(property, criteria) if reasons else [],
+            }
+        )
+        if len(results) >= limit:
+            break
+    results.sort(key=lambda result: result["match_score"], reverse=True)
+    return results, analyzed
+
+
+def applied_property_ids(tenant, properties):
+    """ids de las propiedades con una solicitud activa del inquilino."""
+    return set(
+        MatchRequest.objects.filter(
+            tenant=tenant,
+            property__in=[property.pk for property in properties],
+            status__in=ACTIVE_REQUEST_STATUSES,
+        ).values_list("property_id", flat=True)
+    )
+
+
+def main_image_url(property):
+    """URL de la imagen principal usando las imágenes precargadas.
+
+    Solo lectura: a diferencia de `Property.get_main_image`, no marca
+    la primera imagen como principal.
+    """
+    images = getattr(property, IMAGES_ATTR, None)
+    if images is None:
+        return property.get_main_image()
+    image = next((image for image in images if image.is_main), None) or next(
+        iter(images), None
+    )
+    if image and image.image:
+        return image.image.url
+    return None
+
+
+def property_summary(property):
+    """Campos de la propiedad que muestran los endpoints de matching."""
+    return {
+        "id": str(property.id),
+        "title": property.title,
+        "description": property.description[:200],
+        "rent_price": property.rent_price,
+        "city": property.city,
+        "state": property.state,
+        "property_type": property.property_type,
+        "bedrooms": property.bedrooms,
+        "bathrooms": property.bathrooms,
+        "total_area": property.total_area,
+    }
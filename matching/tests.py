@@ -911,3 +911,119 @@ class MatchContractIntegrationServiceTests(TestCase):
 
         with self.assertRaises(ValidationError):
             MatchContractIntegrationService.create_contract_from_match(self.mr)
+
+
+# -- Pipeline de matching: consultas constantes --------------------------------
+
+
+class MatchingPipelineQueryTests(APITestCase):
+    """Los endpoints de matching no hacen consultas por propiedad."""
+
+    def setUp(self):
+        from properties.models import (
+            PropertyAmenity,
+            PropertyAmenityRelation,
+            PropertyImage,
+        )
+
+        self.landlord = _make_landlord()
+        self.tenant = _make_tenant()
+        self.criteria = MatchCriteria.objects.create(
+            tenant=self.tenant,
+            preferred_cities=["Bogotá"],
+            max_price=Decimal("3000000.00"),
+            required_amenities=["Piscina", "Gimnasio"],
+        )
+        self.pool = PropertyAmenity.objects.create(
+            name="Piscina", category="recreation"
+        )
+        self.relation_model = PropertyAmenityRelation
+        self.image_model = PropertyImage
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.tenant)
+
+    def _add_properties(self, count):
+        for n in range(count):
+            prop = _make_property(
+                self.landlord, rent_price=Decimal(1000000 + n * 10000)
+            )
+            self.relation_model.objects.create(property=prop, amenity=self.pool)
+            self.image_model.objects.create(
+                property=prop, image=f"properties/images/{n}.jpg"
+            )
+            _make_match_request(self.tenant, self.landlord, prop)
+
+    def _queries(self, method, url, data=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data or {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return len(ctx), response
+
+    def test_get_match_score_counts_required_amenities(self):
+        prop = _make_property(self.landlord)
+        self.relation_model.objects.create(property=prop, amenity=self.pool)
+        without = _make_property(self.landlord, title="Sin amenidades")
+
+        # 1/2 amenidades → 7 puntos más que una propiedad sin ninguna
+        self.assertEqual(
+            self.criteria.get_match_score(prop)
+            - self.criteria.get_match_score(without),
+            7,
+        )
+
+    def test_smart_matching_queries_do_not_grow_with_results(self):
+        url = "/api/v1/matching/smart-matching/"
+        for algorithm in ("standard", "advanced", "ml"):
+            data = {"algorithm": algorithm, "limit": 50, "min_score": 0}
+            self._add_properties(3)
+            few, _ = self._queries("post", url, data)
+            self._add_properties(12)
+            many, response = self._queries("post", url, data)
+
+            self.assertEqual(few, many, algorithm)
+            self.assertEqual(response.data["total_analyzed"], 15)
+            self.assertEqual(response.data["matches_found"], 15)
+            self.assertTrue(
+                all(match["has_applied"] for match in response.data["smart_matches"])
+            )
+            Property.objects.all().delete()
+
+    def test_smart_matching_stops_once_limit_is_reached(self):
+        self._add_properties(6)
+        _, response = self._queries(
+            "post",
+            "/api/v1/matching/smart-matching/",
+            {"limit": 2, "min_score": 0},
+        )
+        self.assertEqual(response.data["matches_found"], 2)
+        self.assertEqual(response.data["total_analyzed"], 2)
+        prices = [m["property"]["rent_price"] for m in response.data["smart_matches"]]
+        self.assertEqual(sorted(prices), [Decimal("1000000.00"), Decimal("1010000.00")])
+
+    def test_smart_matching_without_results(self):
+        _, response = self._queries("post", "/api/v1/matching/smart-matching/")
+        self.assertEqual(response.data["smart_matches"], [])
+        self.assertEqual(response.data["total_analyzed"], 0)
+
+    def test_potential_matches_queries_do_not_grow_with_results(self):
+        # Sin solicitudes previas: find_potential_matches no excluye nada
+        for n in range(3):
+            prop = _make_property(self.landlord, rent_price=Decimal(1000000 + n))
+            self.image_model.objects.create(property=prop, image=f"p/{n}.jpg")
+        few, _ = self._queries("get", "/api/v1/matching/potential-matches/?limit=50")
+        for n in range(12):
+            prop = _make_property(self.landlord, rent_price=Decimal(2000000 + n))
+            self.image_model.objects.create(property=prop, image=f"q/{n}.jpg")
+        many, response = self._queries(
+            "get", "/api/v1/matching/potential-matches/?limit=50"
+        )
+
+        self.assertEqual(few, many)
+        self.assertEqual(response.data["total_found"], 15)
+        self.assertTrue(
+            all(m["property"]["main_image"] for m in response.data["potential_matches"])
+        )
+        self.assertFalse(self.image_model.objects.filter(is_main=True).exists())
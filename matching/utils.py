@@ -79,16 +79,18 @@ def find_potential_matches(tenant, limit=10):
         # Si no tiene criterios, usar búsqueda básica
         from properties.models import Property
 
-        return Property.objects.filter(is_active=True, status="available")[:limit]
+        return Property.objects.filter(
+            is_active=True, status="available"
+        ).select_related("landlord")[:limit]
 
-    matching_properties = criteria.find_matching_properties()
+    from .pipeline import ACTIVE_REQUEST_STATUSES, candidates
 
     # Excluir propiedades donde ya envió solicitud
     already_requested = MatchRequest.objects.filter(
-        tenant=tenant, status__in=["pending", "viewed", "accepted"]
+        tenant=tenant, status__in=ACTIVE_REQUEST_STATUSES
     ).values_list("property_id", flat=True)
 
-    matching_properties = matching_properties.exclude(id__in=already_requested)
+    matching_properties = candidates(criteria).exclude(id__in=already_requested)
 
     # Calcular scores y ordenar
     properties_with_scores = []
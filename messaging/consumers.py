@@ -11,6 +11,8 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone as django_timezone
 import logging
 
+from . import presence
+
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
@@ -690,7 +692,13 @@ class ThreadConsumer(AsyncWebsocketConsumer):
 
 
 class UserStatusConsumer(AsyncWebsocketConsumer):
-    """Consumer para estados de usuario (online/offline)."""
+    """Consumer para estados de usuario (online/offline).
+
+    La presencia vive en `messaging.presence` (Redis): conectar, el
+    heartbeat y desconectar no escriben en la base de datos. Cada socket
+    se suscribe sólo a la presencia de sus contactos (conversaciones y
+    contratos compartidos) en lugar de un grupo global.
+    """
 
     async def connect(self):
         """Conecta para seguimiento de estado."""
@@ -700,46 +708,39 @@ class UserStatusConsumer(AsyncWebsocketConsumer):
             await self.close(code=4001)
             return
 
-        self.status_group = "user_status"
-
-        await self.channel_layer.group_add(self.status_group, self.channel_name)
+        contacts = await database_sync_to_async(presence.contacts_of)(self.user.pk)
+        self.status_groups = [presence.group_name(contact) for contact in contacts]
+        for group in self.status_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
 
         await self.accept()
 
-        # Actualizar estado del usuario a online
-        await self.update_user_status(True)
+        # Estado actual de los contactos: ya no llega por difusión global.
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "presence_snapshot",
+                    "users": await database_sync_to_async(presence.snapshot)(contacts),
+                }
+            )
+        )
 
-        # Notificar a otros usuarios que este usuario está online
-        await self.channel_layer.group_send(
-            self.status_group,
-            {
-                "type": "user_status_update",
-                "user_id": self.user.id,
-                "user_name": self.user.get_full_name(),
-                "is_online": True,
-                "last_seen": django_timezone.now().isoformat(),
-            },
+        # Marcar online y avisar a los contactos si es su primer socket
+        event = await database_sync_to_async(presence.connect)(
+            self.user, self.channel_name
         )
+        await self.publish(event)
 
     async def disconnect(self, close_code):
-        """Desconecta y actualiza estado a offline."""
-        if hasattr(self, "status_group"):
-            # Actualizar estado del usuario a offline
-            await self.update_user_status(False)
-
-            # Notificar a otros usuarios que este usuario está offline
-            await self.channel_layer.group_send(
-                self.status_group,
-                {
-                    "type": "user_status_update",
-                    "user_id": self.user.id,
-                    "user_name": self.user.get_full_name(),
-                    "is_online": False,
-                    "last_seen": django_timezone.now().isoformat(),
-                },
+        """Desconecta y, si era el último socket, publica offline."""
+        if hasattr(self, "status_groups"):
+            event = await database_sync_to_async(presence.disconnect)(
+                self.user, self.channel_name
             )
+            await self.publish(event)
 
-            await self.channel_layer.group_discard(self.status_group, self.channel_name)
+            for group in self.status_groups:
+                await self.channel_layer.group_discard(group, self.channel_name)
 
     async def receive(self, text_data):
         """Procesa mensajes de estado y cambios manuales."""
@@ -755,72 +756,30 @@ class UserStatusConsumer(AsyncWebsocketConsumer):
                         }
                     )
                 )
-                await self.update_last_activity()
+                await database_sync_to_async(presence.heartbeat)(
+                    self.user, self.channel_name
+                )
 
             elif data.get("type") == "set_status":
                 new_status = data.get("status", "online")
-                if new_status in ("online", "busy", "offline"):
-                    await self.set_manual_status(new_status)
-                    await self.channel_layer.group_send(
-                        self.status_group,
-                        {
-                            "type": "user_status_update",
-                            "user_id": self.user.id,
-                            "user_name": self.user.get_full_name(),
-                            "is_online": new_status != "offline",
-                            "status_mode": new_status,
-                            "last_seen": django_timezone.now().isoformat(),
-                        },
+                if new_status in presence.STATUS_MODES:
+                    event = await database_sync_to_async(presence.set_mode)(
+                        self.user, new_status
                     )
+                    await self.publish(event)
 
         except Exception as e:
             logger.error(f"Error in status consumer: {str(e)}")
 
+    async def publish(self, event):
+        """Publica un cambio de estado sólo a los suscriptores del usuario."""
+        if event:
+            await self.channel_layer.group_send(
+                presence.group_name(self.user.pk), event
+            )
+
     async def user_status_update(self, event):
         """Envía actualización de estado de usuario."""
         # No enviar actualización del propio usuario
-        if event["user_id"] != self.user.id:
+        if event["user_id"] != str(self.user.pk):
             await self.send(text_data=json.dumps(event))
-
-    @database_sync_to_async
-    def update_user_status(self, is_online):
-        """Actualiza el estado online/offline del usuario en el modelo User."""
-        try:
-            from django.contrib.auth import get_user_model
-
-            User = get_user_model()
-            User.objects.filter(pk=self.user.pk).update(
-                is_online=is_online,
-                last_seen=django_timezone.now(),
-                status_mode="online" if is_online else "offline",
-            )
-        except Exception as e:
-            logger.error(f"Error updating user status: {str(e)}")
-
-    @database_sync_to_async
-    def set_manual_status(self, status_mode):
-        """Establece estado manual del usuario (online/busy/offline)."""
-        try:
-            from django.contrib.auth import get_user_model
-
-            User = get_user_model()
-            User.objects.filter(pk=self.user.pk).update(
-                is_online=status_mode != "offline",
-                status_mode=status_mode,
-                last_seen=django_timezone.now(),
-            )
-        except Exception as e:
-            logger.error(f"Error setting manual status: {str(e)}")
-
-    @database_sync_to_async
-    def update_last_activity(self):
-        """Actualiza la última actividad del usuario."""
-        try:
-            from django.contrib.auth import get_user_model
-
-            User = get_user_model()
-            User.objects.filter(pk=self.user.pk).update(
-                last_seen=django_timezone.now(),
-            )
-        except Exception as e:
-            logger.error(f"Error updating last activity: {str(e)}")
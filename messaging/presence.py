@@ -0,0 +1,419 @@
+"""Presencia de usuarios (online/ocupado/offline) en Redis.
+
+`UserStatusConsumer` escribía `User.is_online/last_seen` en cada
+conexión, desconexión y heartbeat, y difundía cada cambio al grupo
+global `user_status`: con N sockets conectados, cada conexión generaba
+N mensajes (O(N²) en total). Ahora:
+
+- La presencia vive en Redis: un ZSET por usuario con sus sockets
+  (score = vencimiento) y un ZSET global `online`. El heartbeat sólo
+  renueva el vencimiento (PRESENCE_TTL); un socket que muere sin
+  desconectar vence solo.
+- `last_seen` se marca como pendiente y `flush_presence()` (tarea
+  `messaging.tasks.flush_presence`, cada minuto en beat) lo persiste con
+  un único `bulk_update` por lote, junto con `is_online/status_mode`.
+  La misma tarea da de baja a los usuarios cuyos sockets vencieron.
+- Suscripción por interés: cada socket se une al grupo
+  `presence.<id>` de sus contactos (usuarios con los que comparte una
+  conversación o un contrato) y los cambios de estado se publican sólo
+  en el grupo del usuario. Una conexión cuesta O(contactos) mensajes.
+
+Sin Redis (desarrollo/tests con LocMem) se usa un almacén en memoria del
+proceso y el vaciado a la base de datos se hace en línea al envejecer.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import UTC, datetime
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+
+User = get_user_model()
+
+_CONNS_KEY = "messaging:presence:v1:conns:{user_id}"
+_ONLINE_KEY = "messaging:presence:v1:online"
+_MODE_KEY = "messaging:presence:v1:mode"
+_DIRTY_KEY = "messaging:presence:v1:dirty"
+_CONTACTS_KEY = "messaging:presence:v1:contacts:{user_id}"
+
+STATUS_MODES = ("online", "busy", "offline")
+
+
+def ttl() -> int:
+    return getattr(settings, "PRESENCE_TTL", 90)
+
+
+def group_name(user_id) -> str:
+    """Grupo de Channels donde se publica el estado de `user_id`."""
+    return f"presence.{user_id}"
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class _RedisPresenceStore:
+    """Presencia en el Redis del cache `default`."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, key: str) -> str:
+        return cache.make_key(key)
+
+    def connect(self, user_id: str, channel: str, now: float) -> bool:
+        conns = self._key(_CONNS_KEY.format(user_id=user_id))
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(conns, "-inf", now)
+        pipe.zcard(conns)
+        pipe.zadd(conns, {channel: now + ttl()})
+        pipe.expire(conns, ttl())
+        pipe.zadd(self._key(_ONLINE_KEY), {user_id: now + ttl()})
+        pipe.hset(self._key(_DIRTY_KEY), user_id, now)
+        became_online = pipe.execute()[1] == 0
+        if became_online:
+            self.client.hset(self._key(_MODE_KEY), user_id, "online")
+        return became_online
+
+    def heartbeat(self, user_id: str, channel: str, now: float) -> None:
+        conns = self._key(_CONNS_KEY.format(user_id=user_id))
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zadd(conns, {channel: now + ttl()})
+        pipe.expire(conns, ttl())
+        pipe.zadd(self._key(_ONLINE_KEY), {user_id: now + ttl()})
+        pipe.hset(self._key(_DIRTY_KEY), user_id, now)
+        pipe.execute()
+
+    def disconnect(self, user_id: str, channel: str, now: float) -> bool:
+        conns = self._key(_CONNS_KEY.format(user_id=user_id))
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(conns, channel)
+        pipe.zremrangebyscore(conns, "-inf", now)
+        pipe.zcard(conns)
+        pipe.hset(self._key(_DIRTY_KEY), user_id, now)
+        went_offline = pipe.execute()[2] == 0
+        if went_offline:
+            self.client.zrem(self._key(_ONLINE_KEY), user_id)
+        return went_offline
+
+    def set_mode(self, user_id: str, mode: str, now: float) -> None:
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(_MODE_KEY), user_id, mode)
+        pipe.hset(self._key(_DIRTY_KEY), user_id, now)
+        pipe.execute()
+
+    def status(self, user_ids: list[str], now: float) -> dict[str, tuple[bool, str]]:
+        if not user_ids:
+            return {}
+        pipe = self.client.pipeline()
+        for user_id in user_ids:
+            pipe.zscore(self._key(_ONLINE_KEY), user_id)
+        pipe.hmget(self._key(_MODE_KEY), user_ids)
+        *scores, modes = pipe.execute()
+        return {
+            user_id: (
+                score is not None and score > now,
+                _decode(mode) or "offline",
+            )
+            for user_id, score, mode in zip(user_ids, scores, modes)
+        }
+
+    def expire(self, now: float) -> list[str]:
+        online = self._key(_ONLINE_KEY)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrangebyscore(online, "-inf", now)
+        pipe.zremrangebyscore(online, "-inf", now)
+        expired = [_decode(user_id) for user_id in pipe.execute()[0]]
+        if expired:
+            self.client.hset(self._key(_DIRTY_KEY), mapping=dict.fromkeys(expired, now))
+        return expired
+
+    def drain(self) -> dict[str, float]:
+        # HGETALL+DEL en MULTI: dos flushes concurrentes no se pisan.
+        dirty = self._key(_DIRTY_KEY)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(dirty)
+        pipe.delete(dirty)
+        raw, _ = pipe.execute()
+        return {_decode(user_id): float(seen) for user_id, seen in raw.items()}
+
+    def requeue(self, dirty: dict[str, float]) -> None:
+        if dirty:
+            self.client.hset(self._key(_DIRTY_KEY), mapping=dirty)
+
+
+class _LocalPresenceStore:
+    """Mismo contrato en memoria del proceso (sin Redis)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._conns: dict[str, dict[str, float]] = {}
+        self._modes: dict[str, str] = {}
+        self._dirty: dict[str, float] = {}
+        self._oldest: float | None = None
+
+    def _touch(self, user_id: str, now: float) -> None:
+        self._dirty[user_id] = now
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+    def _alive(self, user_id: str, now: float) -> dict[str, float]:
+        conns = {
+            channel: expires
+            for channel, expires in self._conns.get(user_id, {}).items()
+            if expires > now
+        }
+        if conns:
+            self._conns[user_id] = conns
+        else:
+            self._conns.pop(user_id, None)
+        return conns
+
+    def connect(self, user_id: str, channel: str, now: float) -> bool:
+        with self._lock:
+            became_online = not self._alive(user_id, now)
+            self._conns.setdefault(user_id, {})[channel] = now + ttl()
+            if became_online:
+                self._modes[user_id] = "online"
+            self._touch(user_id, now)
+            return became_online
+
+    def heartbeat(self, user_id: str, channel: str, now: float) -> None:
+        with self._lock:
+            self._conns.setdefault(user_id, {})[channel] = now + ttl()
+            self._touch(user_id, now)
+
+    def disconnect(self, user_id: str, channel: str, now: float) -> bool:
+        with self._lock:
+            self._conns.get(user_id, {}).pop(channel, None)
+            self._touch(user_id, now)
+            return not self._alive(user_id, now)
+
+    def set_mode(self, user_id: str, mode: str, now: float) -> None:
+        with self._lock:
+            self._modes[user_id] = mode
+            self._touch(user_id, now)
+
+    def status(self, user_ids: list[str], now: float) -> dict[str, tuple[bool, str]]:
+        with self._lock:
+            return {
+                # Sin podar: los vencidos los reporta `expire()`.
+                user_id: (
+                    any(exp > now for exp in self._conns.get(user_id, {}).values()),
+                    self._modes.get(user_id, "offline"),
+                )
+                for user_id in user_ids
+            }
+
+    def expire(self, now: float) -> list[str]:
+        with self._lock:
+            expired = [
+                user_id
+                for user_id in list(self._conns)
+                if not self._alive(user_id, now)
+            ]
+            for user_id in expired:
+                self._touch(user_id, now)
+            return expired
+
+    def drain(self) -> dict[str, float]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            self._oldest = None
+            return dirty
+
+    def requeue(self, dirty: dict[str, float]) -> None:
+        with self._lock:
+            for user_id, seen in dirty.items():
+                self._dirty.setdefault(user_id, seen)
+            if self._dirty and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def due(self) -> bool:
+        """Hay que vaciar en línea: no hay beat que lo haga por nosotros."""
+        if self._oldest is None:
+            return False
+        interval = getattr(settings, "PRESENCE_FLUSH_INTERVAL", 60)
+        return time.monotonic() - self._oldest >= interval
+
+
+_local_store = _LocalPresenceStore()
+
+
+def get_store():
+    client = getattr(cache, "client", None)
+    if client is not None and hasattr(client, "get_client"):
+        return _RedisPresenceStore(client.get_client(write=True))
+    return _local_store
+
+
+def reset_local_store() -> None:
+    _local_store.reset()
+
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+
+
+def _status_event(user, is_online: bool, mode: str, now: float) -> dict:
+    return {
+        "type": "user_status_update",
+        "user_id": str(user.pk),
+        "user_name": user.get_full_name(),
+        "is_online": is_online and mode != "offline",
+        "status_mode": mode if is_online else "offline",
+        "last_seen": datetime.fromtimestamp(now, tz=UTC).isoformat(),
+    }
+
+
+def connect(user, channel: str) -> dict | None:
+    """Registra el socket; retorna el evento a publicar si el usuario
+    pasó a estar en línea (primer socket), o None."""
+    now = time.time()
+    store = get_store()
+    became_online = store.connect(str(user.pk), channel, now)
+    _maybe_flush(store)
+    return _status_event(user, True, "online", now) if became_online else None
+
+
+def heartbeat(user, channel: str) -> None:
+    """Renueva el vencimiento del socket. No publica ni escribe la base."""
+    store = get_store()
+    store.heartbeat(str(user.pk), channel, time.time())
+    _maybe_flush(store)
+
+
+def disconnect(user, channel: str) -> dict | None:
+    """Quita el socket; retorna el evento si era el último del usuario."""
+    now = time.time()
+    store = get_store()
+    went_offline = store.disconnect(str(user.pk), channel, now)
+    _maybe_flush(store)
+    return _status_event(user, False, "offline", now) if went_offline else None
+
+
+def set_mode(user, mode: str) -> dict:
+    """Estado manual (online/busy/offline); retorna el evento a publicar."""
+    if mode not in STATUS_MODES:
+        raise ValueError(f"Estado inválido: {mode}")
+    now = time.time()
+    store = get_store()
+    store.set_mode(str(user.pk), mode, now)
+    _maybe_flush(store)
+    return _status_event(user, True, mode, now)
+
+
+def snapshot(user_ids) -> list[dict]:
+    """Estado actual de `user_ids` (para el socket que recién conecta)."""
+    statuses = get_store().status([str(user_id) for user_id in user_ids], time.time())
+    return [
+        {
+            "user_id": user_id,
+            "is_online": is_online and mode != "offline",
+            "status_mode": mode if is_online else "offline",
+        }
+        for user_id, (is_online, mode) in statuses.items()
+    ]
+
+
+def contacts_of(user_id) -> list[str]:
+    """Usuarios que pueden ver la presencia de `user_id`: los que comparten
+    con él una conversación activa o un contrato. Cacheado por
+    PRESENCE_CONTACTS_TTL."""
+    key = _CONTACTS_KEY.format(user_id=user_id)
+    contacts = cache.get(key)
+    if contacts is None:
+        contacts = sorted(_load_contacts(user_id))
+        cache.set(key, contacts, getattr(settings, "PRESENCE_CONTACTS_TTL", 300))
+    return contacts
+
+
+def _load_contacts(user_id) -> set[str]:
+    from contracts.landlord_contract_models import LandlordControlledContract
+    from contracts.models import Contract
+
+    from .models import ThreadParticipant
+
+    contacts = set(
+        ThreadParticipant.objects.filter(
+            thread__thread_participants__user_id=user_id,
+            thread__thread_participants__is_active=True,
+            is_active=True,
+        ).values_list("user_id", flat=True)
+    )
+    for model, first, second in (
+        (Contract, "primary_party_id", "secondary_party_id"),
+        (LandlordControlledContract, "landlord_id", "tenant_id"),
+    ):
+        for a, b in model.objects.filter(
+            Q(**{first: user_id}) | Q(**{second: user_id})
+        ).values_list(first, second):
+            contacts.update((a, b))
+    return {str(contact) for contact in contacts if contact} - {str(user_id)}
+
+
+def _maybe_flush(store) -> None:
+    if isinstance(store, _LocalPresenceStore) and store.due():
+        flush_presence()
+
+
+def flush_presence(batch_size: int | None = None) -> int:
+    """Persiste `last_seen/is_online/status_mode` de los usuarios con
+    cambios y da de baja los sockets vencidos. Retorna los usuarios
+    actualizados."""
+    batch_size = batch_size or getattr(settings, "PRESENCE_FLUSH_BATCH", 1000)
+    store = get_store()
+    now = time.time()
+    expired = store.expire(now)
+    dirty = store.drain()
+    if not dirty:
+        _publish_expired(expired, now)
+        return 0
+    try:
+        statuses = store.status(list(dirty), now)
+        users = []
+        for user_id, seen in dirty.items():
+            is_online, mode = statuses[user_id]
+            users.append(
+                User(
+                    pk=user_id,
+                    is_online=is_online and mode != "offline",
+                    status_mode=mode if is_online else "offline",
+                    last_seen=datetime.fromtimestamp(seen, tz=UTC),
+                )
+            )
+        User.objects.bulk_update(
+            users, ["is_online", "status_mode", "last_seen"], batch_size=batch_size
+        )
+    except Exception:
+        store.requeue(dirty)
+        raise
+    _publish_expired(expired, now)
+    return len(users)
+
+
+def _publish_expired(user_ids: list[str], now: float) -> None:
+    """Publica la baja de usuarios cuyos sockets vencieron sin desconectar."""
+    if not user_ids:
+        return
+    from channels.layers import get_channel_layer
+
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    for user in User.objects.filter(pk__in=user_ids).only(
+        "id", "first_name", "last_name"
+    ):
+        async_to_sync(layer.group_send)(
+            group_name(user.pk), _status_event(user, False, "offline", now)
+        )
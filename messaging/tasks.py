@@ -0,0 +1,19 @@
+"""
+Tareas asíncronas de Celery para el módulo messaging de VeriHome.
+"""
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(ignore_result=True)
+def flush_presence():
+    """Persiste la presencia de usuarios (messaging/presence.py)."""
+    from .presence import flush_presence as flush
+
+    written = flush()
+    if written:
+        logger.info(f"Presencia de usuarios persistida: {written}")
+    return written
@@ -0,0 +1,308 @@
+"""Tests de la presencia de usuarios (`messaging.presence`).
+
+Cubre:
+- Varios sockets por usuario: online con el primero, offline con el último
+- Heartbeat y cambios de estado sin escribir la base de datos
+- Vaciado por lotes de last_seen y baja de sockets vencidos
+- Contactos por conversaciones y contratos (cacheados)
+- UserStatusConsumer: sólo los contactos reciben el cambio de estado
+- Carga: miles de sockets contra InMemoryChannelLayer
+"""
+
+import asyncio
+import time
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from contracts.models import Contract
+from messaging import presence
+from messaging.consumers import UserStatusConsumer
+from messaging.models import MessageThread, ThreadParticipant
+from properties.models import Property
+
+User = get_user_model()
+
+
+def _fake_user(name):
+    return SimpleNamespace(
+        pk=uuid4(), is_authenticated=True, get_full_name=lambda: name
+    )
+
+
+class _PresenceMixin:
+    def setUp(self):
+        presence.reset_local_store()
+        self.addCleanup(presence.reset_local_store)
+        self.layer = get_channel_layer()
+        if not isinstance(self.layer, InMemoryChannelLayer):
+            self.skipTest("requiere InMemoryChannelLayer")
+        self.addCleanup(lambda: asyncio.run(self.layer.flush()))
+
+
+@override_settings(PRESENCE_FLUSH_INTERVAL=3600)
+class PresenceStoreTests(_PresenceMixin, SimpleTestCase):
+    def test_online_with_first_socket_offline_with_last(self):
+        user = _fake_user("Ana")
+        event = presence.connect(user, "socket-1")
+        self.assertEqual(event["user_id"], str(user.pk))
+        self.assertTrue(event["is_online"])
+        self.assertIsNone(presence.connect(user, "socket-2"))
+        self.assertIsNone(presence.disconnect(user, "socket-1"))
+        event = presence.disconnect(user, "socket-2")
+        self.assertFalse(event["is_online"])
+        self.assertEqual(event["status_mode"], "offline")
+
+    def test_manual_status(self):
+        user = _fake_user("Ana")
+        presence.connect(user, "socket-1")
+        event = presence.set_mode(user, "busy")
+        self.assertEqual((event["is_online"], event["status_mode"]), (True, "busy"))
+        event = presence.set_mode(user, "offline")
+        self.assertFalse(event["is_online"])
+        self.assertEqual(
+            presence.snapshot([user.pk]),
+            [{"user_id": str(user.pk), "is_online": False, "status_mode": "offline"}],
+        )
+        with self.assertRaises(ValueError):
+            presence.set_mode(user, "away")
+
+    @override_settings(PRESENCE_TTL=30)
+    def test_heartbeat_keeps_the_socket_alive(self):
+        user = _fake_user("Ana")
+        start = time.time()
+        with patch("messaging.presence.time.time", return_value=start):
+            presence.connect(user, "socket-1")
+        with patch("messaging.presence.time.time", return_value=start + 25):
+            presence.heartbeat(user, "socket-1")
+        with patch("messaging.presence.time.time", return_value=start + 50):
+            self.assertTrue(presence.snapshot([user.pk])[0]["is_online"])
+        with patch("messaging.presence.time.time", return_value=start + 60):
+            self.assertFalse(presence.snapshot([user.pk])[0]["is_online"])
+
+
+@override_settings(PRESENCE_FLUSH_INTERVAL=3600)
+class PresenceFlushTests(_PresenceMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = [
+            User.objects.create_user(
+                email=f"presence{n}@test.com",
+                password="testpass123",
+                first_name=f"Usuario{n}",
+                last_name="X",
+            )
+            for n in range(3)
+        ]
+
+    def test_connect_and_heartbeat_do_not_touch_the_database(self):
+        with self.assertNumQueries(0):
+            for user in self.users:
+                presence.connect(user, f"socket-{user.pk}")
+                presence.heartbeat(user, f"socket-{user.pk}")
+        self.users[0].refresh_from_db()
+        self.assertFalse(self.users[0].is_online)
+
+    def test_flush_writes_all_users_in_one_update(self):
+        for user in self.users:
+            presence.connect(user, f"socket-{user.pk}")
+        presence.set_mode(self.users[1], "busy")
+        presence.disconnect(self.users[2], f"socket-{self.users[2].pk}")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(presence.flush_presence(), 3)
+
+        states = {
+            user.pk: (user.is_online, user.status_mode, user.last_seen is not None)
+            for user in User.objects.filter(pk__in=[u.pk for u in self.users])
+        }
+        self.assertEqual(states[self.users[0].pk], (True, "online", True))
+        self.assertEqual(states[self.users[1].pk], (True, "busy", True))
+        self.assertEqual(states[self.users[2].pk], (False, "offline", True))
+        self.assertEqual(presence.flush_presence(), 0)
+
+    @override_settings(PRESENCE_TTL=30)
+    def test_expired_sockets_go_offline_and_are_published(self):
+        user, watcher = self.users[0], "watcher-channel"
+        asyncio.run(self.layer.group_add(presence.group_name(user.pk), watcher))
+        start = time.time()
+        with patch("messaging.presence.time.time", return_value=start):
+            presence.connect(user, "socket-1")
+            presence.flush_presence()
+        with patch("messaging.presence.time.time", return_value=start + 31):
+            self.assertEqual(presence.flush_presence(), 1)
+
+        user.refresh_from_db()
+        self.assertFalse(user.is_online)
+        event = asyncio.run(self.layer.receive(watcher))
+        self.assertEqual(event["type"], "user_status_update")
+        self.assertEqual((event["user_id"], event["is_online"]), (str(user.pk), False))
+
+
+class PresenceContactsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _user(self, name):
+        return User.objects.create_user(
+            email=f"{name}@contacts.test",
+            password="testpass123",
+            first_name=name,
+            last_name="X",
+        )
+
+    def test_threads_and_contracts_define_contacts(self):
+        ana, beto, carla, dani, eva = (
+            self._user(name) for name in ("ana", "beto", "carla", "dani", "eva")
+        )
+        thread = MessageThread.objects.create(
+            subject="Consulta", thread_type="general", created_by=ana
+        )
+        ThreadParticipant.objects.create(thread=thread, user=ana)
+        ThreadParticipant.objects.create(thread=thread, user=beto)
+        ThreadParticipant.objects.create(thread=thread, user=dani, is_active=False)
+        prop = Property.objects.create(
+            landlord=ana,
+            title="Apto",
+            description="x",
+            property_type="apartment",
+            listing_type="rent",
+            rent_price=1000000,
+            total_area=60,
+            bedrooms=2,
+            bathrooms=1,
+            city="Bucaramanga",
+            state="Santander",
+            address="X",
+        )
+        Contract.objects.create(
+            primary_party=ana,
+            secondary_party=carla,
+            property=prop,
+            contract_type="rental_urban",
+            title="Contrato",
+            monthly_rent=1000000,
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31),
+        )
+
+        self.assertEqual(
+            sorted(presence.contacts_of(ana.pk)),
+            sorted([str(beto.pk), str(carla.pk)]),
+        )
+        self.assertEqual(presence.contacts_of(carla.pk), [str(ana.pk)])
+        self.assertEqual(presence.contacts_of(eva.pk), [])
+        with self.assertNumQueries(0):
+            presence.contacts_of(ana.pk)
+
+
+async def _connect(user):
+    communicator = WebsocketCommunicator(
+        UserStatusConsumer.as_asgi(), "/ws/user-status/"
+    )
+    communicator.scope["user"] = user
+    connected, _ = await communicator.connect()
+    assert connected
+    snapshot = await communicator.receive_json_from()
+    assert snapshot["type"] == "presence_snapshot"
+    return communicator
+
+
+async def _drain(communicator, settle=0.05) -> list[dict]:
+    """Mensajes pendientes del socket; `settle` deja que la capa entregue."""
+    await asyncio.sleep(settle)
+    events = []
+    while not await communicator.receive_nothing(timeout=0):
+        events.append(await communicator.receive_json_from())
+    return events
+
+
+@override_settings(PRESENCE_FLUSH_INTERVAL=3600)
+class UserStatusConsumerTests(_PresenceMixin, SimpleTestCase):
+    def test_only_contacts_receive_status_changes(self):
+        ana, beto, carla = (_fake_user(name) for name in ("Ana", "Beto", "Carla"))
+        contacts = {
+            str(ana.pk): [str(beto.pk)],
+            str(beto.pk): [str(ana.pk)],
+            str(carla.pk): [],
+        }
+
+        async def scenario():
+            a = await _connect(ana)
+            c = await _connect(carla)
+            b = await _connect(beto)
+            self.assertEqual(
+                [(e["user_id"], e["is_online"]) for e in await _drain(a)],
+                [(str(beto.pk), True)],
+            )
+            await b.send_json_to({"type": "set_status", "status": "busy"})
+            await b.send_json_to({"type": "heartbeat"})
+            self.assertEqual((await b.receive_json_from())["type"], "heartbeat_ack")
+            self.assertEqual([e["status_mode"] for e in await _drain(a)], ["busy"])
+            await b.disconnect()
+            self.assertEqual(
+                [(e["user_id"], e["is_online"]) for e in await _drain(a)],
+                [(str(beto.pk), False)],
+            )
+            self.assertEqual(await _drain(c), [])
+            await a.disconnect()
+            await c.disconnect()
+
+        with patch.object(presence, "contacts_of", lambda pk: contacts[str(pk)]):
+            asyncio.run(scenario())
+
+
+@override_settings(PRESENCE_FLUSH_INTERVAL=3600)
+class PresenceLoadTests(_PresenceMixin, SimpleTestCase):
+    """Miles de sockets: cada conexión genera O(contactos) mensajes.
+
+    Con el grupo global `user_status` las mismas conexiones generaban
+    N·(N−1)/2 mensajes (~2 millones para 2000 sockets).
+    """
+
+    SOCKETS = 2000
+    CONTACTS = 4  # vecinos en un anillo: ±1, ±2
+
+    def test_thousands_of_sockets(self):
+        users = [_fake_user(f"Usuario {n}") for n in range(self.SOCKETS)]
+        ids = [str(user.pk) for user in users]
+        offsets = (-2, -1, 1, 2)
+        contacts = {
+            ids[n]: [ids[(n + k) % self.SOCKETS] for k in offsets]
+            for n in range(self.SOCKETS)
+        }
+
+        async def scenario():
+            sockets = [await _connect(user) for user in users]
+            await asyncio.sleep(0.5)
+            received = [await _drain(socket, settle=0) for socket in sockets]
+            updates = sum(len(events) for events in received)
+            # Cada socket sólo oye a los contactos que conectaron después.
+            self.assertLessEqual(updates, self.SOCKETS * self.CONTACTS // 2 + 4)
+            self.assertGreater(updates, 0)
+
+            await sockets[0].send_json_to({"type": "set_status", "status": "busy"})
+            await sockets[0].send_json_to({"type": "heartbeat"})
+            await sockets[0].receive_json_from()  # heartbeat_ack
+            await asyncio.sleep(0.5)
+            heard = [
+                n for n, socket in enumerate(sockets) if await _drain(socket, settle=0)
+            ]
+            self.assertEqual(
+                sorted(heard),
+                sorted((0 + k) % self.SOCKETS for k in offsets),
+            )
+            await asyncio.gather(*(socket.disconnect() for socket in sockets))
+
+        started = time.perf_counter()
+        with patch.object(presence, "contacts_of", lambda pk: contacts[str(pk)]):
+            asyncio.run(scenario())
+        self.assertLess(time.perf_counter() - started, 120)
@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from .models import LegalInterestRate, PaymentOrder
+from .models import (
+    AutoChargeRun,
+    LegalInterestRate,
+    PaymentOrder,
+    PaymentOrderEvent,
+    PaymentWebhookEvent,
+)
 
 
 @admin.register(LegalInterestRate)
@@ -35,8 +41,27 @@ class LegalInterestRateAdmin(admin.ModelAdmin):
     max_usury_rate_pct.short_description = "Tope usura"
 
 
+class PaymentOrderEventInline(admin.TabularInline):
+    """Historial de la orden (append-only: sólo lectura)."""
+
+    model = PaymentOrderEvent
+    extra = 0
+    fields = ["created_at", "event_type", "message", "actor"]
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(PaymentOrder)
 class PaymentOrderAdmin(admin.ModelAdmin):
+    inlines = [PaymentOrderEventInline]
     list_display = (
         "order_number",
         "order_type",
@@ -56,7 +81,6 @@ class PaymentOrderAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
         "paid_at",
-        "audit_log",
         "total_amount_display",
         "balance_display",
     )
@@ -84,7 +108,7 @@ class PaymentOrderAdmin(admin.ModelAdmin):
             "Origen",
             {"fields": ("rent_schedule", "installment", "invoice", "transaction")},
         ),
-        ("Detalles", {"fields": ("description", "audit_log")}),
+        ("Detalles", {"fields": ("description",)}),
         ("Auditoría", {"fields": ("created_at", "updated_at")}),
     )
 
@@ -97,3 +121,59 @@ class PaymentOrderAdmin(admin.ModelAdmin):
         return obj.balance
 
     balance_display.short_description = "Saldo pendiente"
+
+
+@admin.register(AutoChargeRun)
+class AutoChargeRunAdmin(admin.ModelAdmin):
+    """Resumen de corridas de cobro automático (sólo lectura)."""
+
+    list_display = (
+        "reference_date",
+        "status",
+        "schedules_total",
+        "processed",
+        "skipped",
+        "failed",
+        "total_charged",
+        "started_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+    ordering = ("-started_at",)
+    readonly_fields = [field.name for field in AutoChargeRun._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PaymentWebhookEvent)
+class PaymentWebhookEventAdmin(admin.ModelAdmin):
+    """Bandeja de webhooks (sólo lectura); los descartados se reprocesan."""
+
+    list_display = (
+        "gateway",
+        "event_id",
+        "ordering_key",
+        "status",
+        "attempts",
+        "received_at",
+        "processed_at",
+    )
+    list_filter = ("gateway", "status")
+    search_fields = ("event_id", "ordering_key")
+    ordering = ("-received_at",)
+    readonly_fields = [field.name for field in PaymentWebhookEvent._meta.fields]
+    actions = ["replay_events"]
+
+    @admin.action(description="Reprocesar los webhooks seleccionados")
+    def replay_events(self, request, queryset):
+        from .webhook_inbox import replay
+
+        count = replay(queryset)
+        self.message_user(request, f"{count} webhooks devueltos a la cola.")
+
+    def has_add_permission(self, request):
+        return False
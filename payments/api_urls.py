@@ -137,6 +137,11 @@ urlpatterns = [
         api_views.LandlordFinancialDashboardAPIView.as_view(),
         name="api_landlord_dashboard",
     ),
+    path(
+        "landlord/arrears/",
+        api_views.LandlordArrearsReportAPIView.as_view(),
+        name="api_landlord_arrears",
+    ),
     # Webhooks
     path(
         "webhooks/stripe/",
@@ -158,6 +163,11 @@ urlpatterns = [
         api_views.BoldWebhookAPIView.as_view(),
         name="api_bold_webhook",
     ),
+    path(
+        "webhooks/pse/",
+        api_views.PSEWebhookAPIView.as_view(),
+        name="api_pse_webhook",
+    ),
     # Bold — pasarela colombiana principal
     path(
         "bold/initiate/",
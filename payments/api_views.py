@@ -23,6 +23,7 @@ from core.optimizations import (
 )
 from users.services import AdminActionLogger
 
+from . import arrears
 from .gateways.stripe_gateway import StripeGateway
 from .models import (
     Transaction,
@@ -1143,7 +1144,8 @@ class DIANInvoiceXMLAPIView(APIView):
                 {"detail": "No autorizado"}, status=status.HTTP_403_FORBIDDEN
             )
 
-        xml = generate_dian_xml(invoice)
+        # Las facturas emitidas guardan su XML firmado; las antiguas no.
+        xml = invoice.dian_xml or generate_dian_xml(invoice)
         response = HttpResponse(xml, content_type="application/xml")
         response["Content-Disposition"] = (
             f'attachment; filename="{invoice.invoice_number}.xml"'
@@ -1264,94 +1266,71 @@ class TransactionReportAPIView(generics.ListAPIView):
         ) | Transaction.objects.filter(payee=self.request.user)
 
 
-class PaymentWebhookView(APIView):
+class _GatewayWebhookView(APIView):
     """
-    Vista mejorada para webhooks de pasarelas de pago (Stripe).
-
-    SECURITY: ✅ Validates webhook signatures using stripe.Webhook.construct_event()
-    This prevents replay attacks and unauthorized webhook submissions.
+    Base de los webhooks de pasarelas: verifica la firma con el
+    `handle_webhook` de la pasarela, guarda el evento en la bandeja de
+    entrada (`payments.webhook_inbox`) y responde 200 de inmediato. La
+    reconciliación y las notificaciones corren después en Celery, fuera
+    del request de la pasarela.
+
+    Returns 403 si la firma es inválida y 400 si el payload no se pudo
+    procesar; una re-entrega de un evento ya recibido responde 200.
     """
 
     permission_classes = [permissions.AllowAny]
+    gateway_name = None
+    # Header que espera handle_webhook → clave en request.META
+    signature_headers = {}
 
-    def post(self, request):
-        """
-        Procesar webhook de Stripe.
+    def get_payload(self, request):
+        return request.data
 
-        Signature validation is performed by StripeGateway.handle_webhook()
-        which uses stripe.Webhook.construct_event() to verify authenticity.
-        """
-        payload = request.body
-        sig_header = request.META.get("HTTP_STRIPE_SIGNATURE")
+    def post(self, request):
+        from . import webhook_inbox
 
+        headers = {
+            name: request.META.get(meta_key, "")
+            for name, meta_key in self.signature_headers.items()
+        }
         try:
-            gateway = StripeGateway(
-                {
-                    "secret_key": settings.STRIPE_SECRET_KEY,
-                    "publishable_key": settings.STRIPE_PUBLISHABLE_KEY,
-                    "webhook_secret": settings.STRIPE_WEBHOOK_SECRET,
-                }
-            )
-
-            # Procesar webhook
-            result = gateway.handle_webhook(
-                data=payload.decode("utf-8"), headers={"stripe-signature": sig_header}
+            event, created = webhook_inbox.ingest(
+                self.gateway_name, self.get_payload(request), headers
             )
-
-            if result.success:
-                # Procesar eventos específicos
-                event = result.metadata.get("event", "")
-                if event == "payment_succeeded":
-                    self._handle_payment_success(result.to_dict())
-                elif event == "payment_failed":
-                    self._handle_payment_failure(result.to_dict())
-
-                return Response({"status": "success"})
-            else:
+        except webhook_inbox.WebhookRejected as exc:
+            if exc.result.error_code == "INVALID_SIGNATURE":
                 return Response(
-                    {"error": result.error_message}, status=status.HTTP_400_BAD_REQUEST
+                    {"error": "Invalid signature"}, status=status.HTTP_403_FORBIDDEN
                 )
-
+            return Response(
+                {"error": exc.result.error_message}, status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-    def _handle_payment_success(self, webhook_data):
-        """Manejar webhook de pago exitoso. Reconcilia y envía confirmación."""
-        payment_intent_id = webhook_data.get("payment_intent_id")
-
-        try:
-            payment = Transaction.objects.get(gateway_transaction_id=payment_intent_id)
-            payment.status = "completed"
-            payment.processed_at = timezone.now()
-            payment.save()
-
-            # Reconciliar con RentPaymentSchedule
-            from .reconciliation_service import (
-                reconcile_payment,
-                send_payment_confirmation,
+            logger.error(f"Error recibiendo webhook {self.gateway_name}: {e}")
+            return Response(
+                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-            reconcile_payment(payment)
-            send_payment_confirmation(payment)
-        except Transaction.DoesNotExist:
-            pass
+        return Response(
+            {"status": "received", "event": str(event.pk), "duplicate": not created},
+            status=status.HTTP_200_OK,
+        )
 
-    def _handle_payment_failure(self, webhook_data):
-        """Manejar webhook de pago fallido. Notifica al pagador."""
-        payment_intent_id = webhook_data.get("payment_intent_id")
-        error = webhook_data.get("error", {})
 
-        try:
-            payment = Transaction.objects.get(gateway_transaction_id=payment_intent_id)
-            payment.status = "failed"
-            payment.failure_reason = error.get("message", "Payment failed")
-            payment.save()
+class PaymentWebhookView(_GatewayWebhookView):
+    """
+    Webhook de Stripe.
 
-            from .reconciliation_service import send_payment_failure_notification
+    SECURITY: ✅ Validates webhook signatures using stripe.Webhook.construct_event()
+    This prevents replay attacks and unauthorized webhook submissions.
+    La firma se calcula sobre el cuerpo crudo, por eso se pasa sin parsear.
+    """
 
-            send_payment_failure_notification(payment)
-        except Transaction.DoesNotExist:
-            pass
+    gateway_name = "stripe"
+    signature_headers = {"stripe-signature": "HTTP_STRIPE_SIGNATURE"}
+
+    def get_payload(self, request):
+        return request.body.decode("utf-8")
 
 
 class PayPalWebhookAPIView(APIView):
@@ -1558,11 +1537,13 @@ class TenantPaymentPortalAPIView(APIView):
         dashboard_data = []
         total_monthly_rent = 0
         overdue_amount = 0
+        batch = arrears.compute(schedules)
 
         for schedule in schedules:
             next_due_date = schedule.get_next_due_date()
-            is_overdue = schedule.is_payment_overdue()
-            late_fee = schedule.calculate_late_fee()
+            row = batch.get(schedule.pk)
+            is_overdue = row.is_overdue
+            late_fee = row.late_fee
 
             # Obtener último pago
             last_payment = (
@@ -1657,29 +1638,28 @@ class LandlordFinancialDashboardAPIView(APIView):
 
         collected_this_month = sum(t.total_amount for t in recent_transactions)
 
-        # Calcular pagos vencidos
+        # Calcular pagos vencidos (mora de todos los cronogramas en una pasada)
         overdue_amount = 0
         overdue_tenants = []
+        batch = arrears.compute(schedules)
 
         for schedule in schedules:
-            if schedule.is_payment_overdue():
-                pending_amount = schedule.rent_amount + schedule.calculate_late_fee()
-                overdue_amount += pending_amount
+            row = batch.get(schedule.pk)
+            if row.is_overdue:
+                overdue_amount += row.total_due
                 overdue_tenants.append(
                     {
                         "tenant_name": schedule.tenant.get_full_name(),
                         "property": schedule.contract.property.title,
-                        "amount_due": pending_amount,
-                        "days_overdue": (
-                            date.today() - schedule.get_next_due_date()
-                        ).days,
+                        "amount_due": row.total_due,
+                        "days_overdue": row.overdue_days,
                     }
                 )
 
         # Próximos pagos esperados
         upcoming_payments = []
         for schedule in schedules:
-            if not schedule.is_payment_overdue():
+            if not batch.get(schedule.pk).is_overdue:
                 upcoming_payments.append(
                     {
                         "tenant_name": schedule.tenant.get_full_name(),
@@ -1712,6 +1692,76 @@ class LandlordFinancialDashboardAPIView(APIView):
         )
 
 
+class LandlordArrearsReportAPIView(APIView):
+    """Reporte de cartera en mora del arrendador.
+
+    Calcula con `payments.arrears` los cronogramas activos con el período
+    en curso sin pagar: vencimiento, días de mora capados e interés
+    moratorio. Staff puede pedir el de otro arrendador con `?landlord=<id>`;
+    `?date=YYYY-MM-DD` cambia la fecha de referencia.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        import uuid
+        from datetime import date
+
+        params = request.query_params
+        try:
+            landlord_id = request.user.id
+            if request.user.is_staff and params.get("landlord"):
+                landlord_id = uuid.UUID(params["landlord"])
+            reference = (
+                date.fromisoformat(params["date"]) if params.get("date") else None
+            )
+        except ValueError:
+            return Response(
+                {"error": "Parámetros inválidos: landlord=<uuid>, date=YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        schedules = RentPaymentSchedule.objects.filter(
+            landlord_id=landlord_id, is_active=True
+        )
+        batch = arrears.compute(schedules, reference)
+        pending = batch.pending()
+        labels = {
+            pk: (" ".join(filter(None, [first, last])) or email, title)
+            for pk, first, last, email, title in schedules.filter(
+                pk__in=[row.schedule_id for row in pending]
+            ).values_list(
+                "id",
+                "tenant__first_name",
+                "tenant__last_name",
+                "tenant__email",
+                "contract__property__title",
+            )
+        }
+
+        return Response(
+            {
+                "summary": batch.summary(),
+                "monthly_rate": batch.monthly_rate,
+                "results": [
+                    {
+                        "schedule_id": row.schedule_id,
+                        "tenant_name": labels[row.schedule_id][0],
+                        "property": labels[row.schedule_id][1],
+                        "rent_amount": row.rent_amount,
+                        "date_due": row.date_due,
+                        "date_grace_end": row.date_grace_end,
+                        "date_max_overdue": row.date_max_overdue,
+                        "overdue_days": row.overdue_days,
+                        "late_fee": row.late_fee,
+                        "total_due": row.total_due,
+                    }
+                    for row in pending
+                ],
+            }
+        )
+
+
 # ===== WOMPI / PSE PAYMENT GATEWAY INTEGRATION =====
 
 
@@ -1880,7 +1930,7 @@ class WompiInitiatePaymentAPIView(APIView):
             )
 
 
-class WompiWebhookAPIView(APIView):
+class WompiWebhookAPIView(_GatewayWebhookView):
     """
     Webhook para recibir notificaciones de Wompi (Colombian payment processor).
 
@@ -1892,99 +1942,8 @@ class WompiWebhookAPIView(APIView):
     Returns 403 Forbidden if signature validation fails.
     """
 
-    permission_classes = [permissions.AllowAny]
-
-    def post(self, request):
-        """
-        Procesar webhook de Wompi.
-
-        Signature validation is performed by WompiGateway._verify_webhook_signature()
-        using timing-attack safe HMAC comparison.
-        """
-        try:
-            from .gateways.wompi_gateway import WompiGateway
-
-            # Inicializar gateway
-            wompi_config = {
-                "public_key": getattr(settings, "WOMPI_PUBLIC_KEY", ""),
-                "private_key": getattr(settings, "WOMPI_PRIVATE_KEY", ""),
-                "events_secret": getattr(settings, "WOMPI_EVENTS_SECRET", ""),
-                "sandbox_mode": getattr(settings, "WOMPI_SANDBOX_MODE", True),
-            }
-
-            gateway = WompiGateway(wompi_config)
-
-            # Procesar webhook
-            payload = request.data
-            headers = {
-                "X-Event-Checksum": request.META.get("HTTP_X_EVENT_CHECKSUM", "")
-            }
-
-            result = gateway.handle_webhook(payload, headers)
-
-            if not result.success and result.error_code == "INVALID_SIGNATURE":
-                return Response(
-                    {"error": "Invalid signature"}, status=status.HTTP_403_FORBIDDEN
-                )
-
-            # Buscar transacción en nuestra DB
-            try:
-                transaction = Transaction.objects.get(reference=result.transaction_id)
-
-                # Actualizar estado
-                transaction.status = result.status
-                transaction.gateway_transaction_id = result.gateway_reference
-
-                if result.status == "completed":
-                    transaction.processed_at = timezone.now()
-                elif result.status == "failed":
-                    transaction.failure_reason = result.metadata.get(
-                        "status_message", "Payment failed"
-                    )
-
-                # Actualizar metadata
-                transaction.metadata.update(result.metadata)
-                transaction.save()
-
-                # Reconciliar y notificar
-                from .reconciliation_service import (
-                    reconcile_payment,
-                    send_payment_confirmation,
-                    send_payment_failure_notification,
-                )
-
-                if result.status == "completed":
-                    reconcile_payment(transaction)
-                    send_payment_confirmation(transaction)
-                elif result.status == "failed":
-                    send_payment_failure_notification(transaction)
-
-                # Log del evento
-                import logging
-
-                logger = logging.getLogger(__name__)
-                logger.info(
-                    f"Wompi webhook processed: {result.transaction_id} - {result.status}"
-                )
-
-                return Response({"status": "success"}, status=status.HTTP_200_OK)
-
-            except Transaction.DoesNotExist:
-                # Transacción no encontrada, pero no fallar el webhook
-                return Response(
-                    {"status": "accepted", "message": "Transaction not found"},
-                    status=status.HTTP_200_OK,
-                )
-
-        except Exception as e:
-            import logging
-
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error processing Wompi webhook: {str(e)}")
-
-            return Response(
-                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    gateway_name = "wompi"
+    signature_headers = {"X-Event-Checksum": "HTTP_X_EVENT_CHECKSUM"}
 
 
 class BoldInitiatePaymentAPIView(APIView):
@@ -2063,7 +2022,7 @@ class BoldInitiatePaymentAPIView(APIView):
             )
 
 
-class BoldWebhookAPIView(APIView):
+class BoldWebhookAPIView(_GatewayWebhookView):
     """
     Recibe notificaciones de Bold cuando cambia el estado de una transacción.
 
@@ -2071,77 +2030,19 @@ class BoldWebhookAPIView(APIView):
     integrity_secret configurado en el dashboard Bold.
     """
 
-    permission_classes = [permissions.AllowAny]
-
-    def post(self, request):
-        from .gateways.bold_gateway import BoldGateway
-
-        try:
-            gateway = BoldGateway(
-                {
-                    "api_key": getattr(settings, "BOLD_API_KEY", ""),
-                    "integrity_secret": getattr(settings, "BOLD_INTEGRITY_SECRET", ""),
-                    "sandbox_mode": getattr(settings, "BOLD_SANDBOX_MODE", True),
-                }
-            )
-
-            headers = {
-                "x-bold-signature": request.META.get("HTTP_X_BOLD_SIGNATURE", ""),
-            }
-
-            result = gateway.handle_webhook(request.data, headers)
-
-            if not result.success and result.error_code == "INVALID_SIGNATURE":
-                return Response(
-                    {"error": "Firma inválida"}, status=status.HTTP_403_FORBIDDEN
-                )
-
-            # Reconciliar con nuestra base de datos
-            if result.transaction_id:
-                try:
-                    transaction = Transaction.objects.get(
-                        reference=result.transaction_id
-                    )
-                    transaction.status = result.status
-                    if result.gateway_reference:
-                        transaction.gateway_transaction_id = result.gateway_reference
-                    if result.status == "completed":
-                        transaction.processed_at = timezone.now()
-                    elif result.status == "failed":
-                        transaction.failure_reason = result.metadata.get(
-                            "bold_status", "failed"
-                        )
-                    transaction.metadata.update(result.metadata)
-                    transaction.save()
-
-                    from .reconciliation_service import (
-                        reconcile_payment,
-                        send_payment_confirmation,
-                        send_payment_failure_notification,
-                    )
+    gateway_name = "bold"
+    signature_headers = {"x-bold-signature": "HTTP_X_BOLD_SIGNATURE"}
 
-                    if result.status == "completed":
-                        reconcile_payment(transaction)
-                        send_payment_confirmation(transaction)
-                    elif result.status == "failed":
-                        send_payment_failure_notification(transaction)
 
-                    logger.info(
-                        f"Bold webhook reconciliado: {result.transaction_id} → {result.status}"
-                    )
-
-                except Transaction.DoesNotExist:
-                    logger.warning(
-                        f"Bold webhook: transacción {result.transaction_id} no encontrada"
-                    )
+class PSEWebhookAPIView(_GatewayWebhookView):
+    """
+    Recibe las notificaciones de PSE sobre el estado de un pago.
 
-            return Response({"status": "received"}, status=status.HTTP_200_OK)
+    SECURITY: Verifica la firma HMAC ('X-PSE-Signature') con PSE_SECRET_KEY.
+    """
 
-        except Exception as e:
-            logger.error(f"Error procesando Bold webhook: {e}")
-            return Response(
-                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    gateway_name = "pse"
+    signature_headers = {"X-PSE-Signature": "HTTP_X_PSE_SIGNATURE"}
 
 
 class PSEBanksListAPIView(APIView):
@@ -2361,7 +2262,9 @@ class PaymentOrderViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        qs = PaymentOrder.objects.select_related("payer", "payee", "created_by")
+        qs = PaymentOrder.objects.select_related(
+            "payer", "payee", "created_by"
+        ).prefetch_related("events")
 
         # Filtro por rol
         if user.is_staff or user.is_superuser:
@@ -0,0 +1,308 @@
+"""Motor de mora de la cartera de arriendos.
+
+`RentPaymentSchedule.calculate_late_fee` resuelve un cronograma a la vez
+y consulta `LegalInterestRate` en cada llamada. Este módulo calcula la
+mora de toda la cartera en una pasada:
+
+- una consulta para las tasas legales activas (`RateTable`) y otra para
+  los cronogramas (`values_list`, sin instanciar modelos);
+- vencimiento del período en curso, fin de gracia, tope de mora, días
+  de mora (capados en `legal_grace_days_max`) e interés moratorio se
+  calculan con arreglos de NumPy sobre todas las filas a la vez;
+- los montos se manejan en centavos enteros y el interés se redondea
+  con división entera half-even: el resultado es idéntico al de
+  `moratory_interest()` con `Decimal` (sin pasar por float).
+
+El período en curso vence el último día de pago (`due_date`, ajustado
+al largo del mes) que no es posterior a la fecha de referencia. Queda
+cubierto si `last_payment_date` cae ese mismo mes o después del
+vencimiento; si no, está pendiente y genera mora al pasar la gracia.
+La tasa aplicada es la del mes de referencia, como en
+`calculate_late_fee`; sin tasa vigente se usa `late_fee_amount`.
+
+Uso:
+
+    batch = arrears.compute(RentPaymentSchedule.objects.filter(landlord=user))
+    for row in batch.pending():
+        row.overdue_days, row.late_fee, row.total_due
+"""
+
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import ROUND_HALF_EVEN, Decimal
+from uuid import UUID
+
+import numpy as np
+from django.utils import timezone
+
+CENT = Decimal("0.01")
+DAYS_PER_MONTH = 30  # La tasa diaria legal es la mensual / 30.
+
+_INT64_MAX = np.iinfo(np.int64).max
+_NAT = np.iinfo(np.int64).min  # Representación de NaT en datetime64.
+_EPOCH = date(1970, 1, 1).toordinal()
+
+_FIELDS = (
+    "id",
+    "landlord_id",
+    "tenant_id",
+    "rent_amount",
+    "due_date",
+    "grace_period_days",
+    "legal_grace_days_max",
+    "late_fee_amount",
+    "auto_late_fee_enabled",
+    "start_date",
+    "end_date",
+    "last_payment_date",
+)
+
+
+def moratory_interest(principal: Decimal, monthly_rate: Decimal, days: int) -> Decimal:
+    """`principal × tasa_mensual / 30 × días`, redondeado a centavos.
+
+    Multiplica antes de dividir: el resultado no depende de cómo se
+    redondee la tasa diaria.
+    """
+    if days <= 0:
+        return Decimal("0.00")
+    interest = principal * monthly_rate * Decimal(days) / Decimal(DAYS_PER_MONTH)
+    return interest.quantize(CENT, rounding=ROUND_HALF_EVEN)
+
+
+class RateTable:
+    """Tasas `LegalInterestRate` activas, cargadas una vez."""
+
+    def __init__(self, rates: dict[tuple[int, int], Decimal]):
+        self._rates = rates
+        self._latest = rates[max(rates)] if rates else None
+
+    @classmethod
+    def load(cls) -> RateTable:
+        from .models import LegalInterestRate
+
+        return cls(
+            {
+                (year, month): rate
+                for year, month, rate in LegalInterestRate.objects.filter(
+                    is_active=True
+                ).values_list("year", "month", "monthly_rate")
+            }
+        )
+
+    def rate_for(self, year: int, month: int) -> Decimal | None:
+        """Misma regla que `LegalInterestRate.get_rate_for`: la tasa del
+        período o, si no existe, la activa más reciente."""
+        return self._rates.get((year, month), self._latest)
+
+
+@dataclass(frozen=True)
+class Arrears:
+    """Estado de mora de un cronograma a la fecha de referencia."""
+
+    schedule_id: int
+    landlord_id: UUID
+    tenant_id: UUID
+    rent_amount: Decimal
+    date_due: date | None
+    date_grace_end: date | None
+    date_max_overdue: date | None
+    pending: bool
+    overdue_days: int
+    late_fee: Decimal
+
+    @property
+    def is_overdue(self) -> bool:
+        return self.overdue_days > 0
+
+    @property
+    def total_due(self) -> Decimal:
+        if not self.pending:
+            return Decimal("0.00")
+        return self.rent_amount + self.late_fee
+
+
+def _cents(values) -> np.ndarray:
+    return np.array([int(value.scaleb(2)) for value in values], dtype=np.int64)
+
+
+def _from_cents(value) -> Decimal:
+    return Decimal(int(value)).scaleb(-2)
+
+
+def _dates(values) -> np.ndarray:
+    # Vía ordinales: `np.array(fechas, "datetime64[D]")` es varias veces
+    # más lento con objetos `date`. None queda como NaT.
+    ordinals = np.fromiter(
+        (_NAT if value is None else value.toordinal() - _EPOCH for value in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return ordinals.view("datetime64[D]")
+
+
+def _days(values: np.ndarray) -> np.ndarray:
+    return values.astype("timedelta64[D]")
+
+
+def period_due_dates(due_day: np.ndarray, reference: date) -> np.ndarray:
+    """Vencimiento del período en curso para cada día de pago del mes."""
+    previous = reference.replace(day=1) - timedelta(days=1)
+    this_day = np.clip(
+        due_day, 1, calendar.monthrange(reference.year, reference.month)[1]
+    )
+    prev_day = np.clip(
+        due_day, 1, calendar.monthrange(previous.year, previous.month)[1]
+    )
+    this_month = np.datetime64(reference.replace(day=1), "D")
+    prev_month = np.datetime64(previous.replace(day=1), "D")
+    return np.where(
+        this_day <= reference.day,
+        this_month + _days(this_day - 1),
+        prev_month + _days(prev_day - 1),
+    )
+
+
+def _round_half_even_div(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    # `//` y `%` (no `np.divmod`) también sirven para arreglos de objetos.
+    quotient, remainder = numerator // denominator, numerator % denominator
+    round_up = (2 * remainder > denominator) | (
+        (2 * remainder == denominator) & (quotient % 2 == 1)
+    )
+    return quotient + round_up
+
+
+class ArrearsBatch:
+    """Resultado vectorizado de `compute()`; itera como `Arrears`."""
+
+    def __init__(
+        self, rows: list[tuple], reference: date, monthly_rate: Decimal | None
+    ):
+        self.reference = reference
+        self.monthly_rate = monthly_rate
+        columns = list(zip(*rows)) if rows else [()] * len(_FIELDS)
+        (
+            self.schedule_ids,
+            self.landlord_ids,
+            self.tenant_ids,
+            rent,
+            due_day,
+            grace,
+            legal_max,
+            fallback,
+            auto_fee,
+            start,
+            end,
+            last_paid,
+        ) = columns
+        self.rent_cents = _cents(rent)
+        legal_max = np.array(legal_max, dtype=np.int64)
+
+        ref = np.datetime64(reference, "D")
+        start = _dates(start)
+        end = _dates(end)
+        last_paid = _dates(last_paid)
+        self.date_due = period_due_dates(np.array(due_day, dtype=np.int64), reference)
+        self.date_grace_end = self.date_due + _days(np.array(grace, dtype=np.int64))
+        self.date_max_overdue = self.date_grace_end + _days(legal_max)
+
+        # Comparaciones con NaT dan False: sin fecha de inicio no se debe
+        # nada, sin fecha de fin no hay corte y sin pago no hay cobertura.
+        owed = (start <= self.date_due) & ~(end < self.date_due)
+        covered = (last_paid >= self.date_due) | (
+            last_paid.astype("datetime64[M]") == self.date_due.astype("datetime64[M]")
+        )
+        self.pending_mask = owed & ~covered
+        late = (ref - self.date_grace_end).astype(np.int64)
+        self.overdue_days = np.clip(late, 0, legal_max) * self.pending_mask
+
+        charge = np.array(auto_fee, dtype=bool) & (self.overdue_days > 0)
+        if monthly_rate is None:
+            fee = _cents(fallback)
+        else:
+            rate_num, rate_den = monthly_rate.as_integer_ratio()
+            cents, days = self.rent_cents, self.overdue_days
+            divisor = DAYS_PER_MONTH * rate_den
+            bound = int(cents.max(initial=0)) * rate_num * int(days.max(initial=0))
+            if max(bound, divisor) >= _INT64_MAX:
+                # Fuera de rango para int64: enteros de Python (exactos).
+                cents, days = cents.astype(object), days.astype(object)
+            fee = _round_half_even_div(cents * rate_num * days, divisor)
+        self.late_fee_cents = np.where(charge, fee, 0)
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.schedule_ids)
+
+    def _rows(self, positions) -> list[Arrears]:
+        positions = np.asarray(positions, dtype=np.intp)
+        pending = self.pending_mask[positions].tolist()
+        due = self.date_due[positions].astype(object)
+        grace_end = self.date_grace_end[positions].astype(object)
+        max_overdue = self.date_max_overdue[positions].astype(object)
+        rent = self.rent_cents[positions].tolist()
+        days = self.overdue_days[positions].tolist()
+        fees = self.late_fee_cents[positions].tolist()
+        return [
+            Arrears(
+                schedule_id=self.schedule_ids[i],
+                landlord_id=self.landlord_ids[i],
+                tenant_id=self.tenant_ids[i],
+                rent_amount=_from_cents(rent[n]),
+                date_due=due[n] if pending[n] else None,
+                date_grace_end=grace_end[n] if pending[n] else None,
+                date_max_overdue=max_overdue[n] if pending[n] else None,
+                pending=pending[n],
+                overdue_days=days[n],
+                late_fee=_from_cents(fees[n]),
+            )
+            for n, i in enumerate(positions.tolist())
+        ]
+
+    def __iter__(self):
+        return iter(self._rows(range(len(self))))
+
+    def pending(self) -> list[Arrears]:
+        """Cronogramas con el período en curso sin pagar, más atrasados primero."""
+        positions = np.flatnonzero(self.pending_mask)
+        order = np.argsort(-self.overdue_days[positions], kind="stable")
+        return self._rows(positions[order])
+
+    def get(self, schedule_id) -> Arrears | None:
+        if self._index is None:
+            self._index = {pk: i for i, pk in enumerate(self.schedule_ids)}
+        i = self._index.get(schedule_id)
+        return None if i is None else self._rows([i])[0]
+
+    def summary(self) -> dict:
+        pending = self.pending_mask
+        return {
+            "reference_date": self.reference,
+            "schedules": len(self),
+            "pending": int(pending.sum()),
+            "overdue": int((self.overdue_days > 0).sum()),
+            "rent_due": _from_cents(self.rent_cents[pending].sum()),
+            "late_fees": _from_cents(self.late_fee_cents.sum()),
+            "total_due": _from_cents(
+                self.rent_cents[pending].sum() + self.late_fee_cents.sum()
+            ),
+        }
+
+
+def compute(
+    queryset=None, reference_date: date | None = None, rates: RateTable | None = None
+) -> ArrearsBatch:
+    """Mora de los cronogramas de `queryset` (por defecto, todos los activos)."""
+    from .models import RentPaymentSchedule
+
+    if queryset is None:
+        queryset = RentPaymentSchedule.objects.filter(is_active=True)
+    reference = reference_date or timezone.localdate()
+    rates = rates or RateTable.load()
+    rows = list(queryset.order_by().values_list(*_FIELDS))
+    return ArrearsBatch(
+        rows, reference, rates.rate_for(reference.year, reference.month)
+    )
@@ -1,172 +1,353 @@
 """
 Servicio de cobros automáticos de arriendo.
 Procesa pagos programados según RentPaymentSchedule.
+
+Una corrida (`AutoChargeRun`) calcula con `payments.arrears` qué
+cronogramas tienen el período en curso vencido, los reparte en lotes de
+AUTO_CHARGE_CHUNK_SIZE y encola una tarea Celery por lote. Garantías:
+
+- Cada lote toma sus cronogramas con `select_for_update(skip_locked=True)`:
+  dos workers nunca cobran el mismo cronograma a la vez. Las filas que
+  otro worker tiene tomadas se esperan después del commit (en orden de
+  pk, sin deadlocks) y se vuelven a evaluar antes de cerrar el lote.
+- Cada cobro lleva `Transaction.idempotency_key` única por
+  (cronograma, período): reintentos y entregas duplicadas de un lote
+  no vuelven a cobrar.
+- Los contadores de la corrida se suman en la misma transacción que los
+  cobros; el último lote en cerrar envía todas las notificaciones con
+  una sola conexión SMTP y marca la corrida como completada.
 """
 
 import logging
 from decimal import Decimal
-from django.utils import timezone
-from django.core.mail import send_mail
+
 from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 200
+
+
+def idempotency_key(schedule_id, due_date):
+    """Clave del cobro de un cronograma en el período que vence `due_date`."""
+    return f"auto-charge:{schedule_id}:{due_date:%Y-%m}"
+
 
-def process_auto_charges():
+def process_auto_charges(reference_date=None, chunk_size=None):
     """
-    Procesa todos los cobros automáticos de arriendo pendientes.
-    Se ejecuta diariamente via Celery.
+    Procesa en línea todos los cobros automáticos de arriendo pendientes.
 
     Flujo:
-    1. Busca RentPaymentSchedule con auto_charge_enabled y pago vencido
-    2. Crea Transaction para cada uno
+    1. Calcula la mora de los RentPaymentSchedule con auto_charge_enabled
+       en una pasada (`payments.arrears`)
+    2. Crea Transaction (canon + interés moratorio) para cada período
+       vencido sin pagar
     3. Marca last_payment_date
-    4. Envía confirmación o notificación de fallo
+    4. Envía confirmaciones y notificaciones de fallo al final
+
+    Returns:
+        dict con el resumen de la corrida (`AutoChargeRun.summary()`).
     """
-    from .models import RentPaymentSchedule, Transaction
+    run = start_auto_charge_run(reference_date, chunk_size, asynchronous=False)
+    run.refresh_from_db()
+    return run.summary()
+
+
+def start_auto_charge_run(reference_date=None, chunk_size=None, asynchronous=None):
+    """Crea la corrida y encola un lote por cada AUTO_CHARGE_CHUNK_SIZE
+    cronogramas vencidos. Sin broker (o AUTO_CHARGE_ASYNC=False) los lotes
+    se procesan en línea."""
+    from . import arrears
+    from .models import AutoChargeRun, RentPaymentSchedule
 
-    today = timezone.localdate()
-    processed = 0
-    failed = 0
+    reference = reference_date or timezone.localdate()
+    size = chunk_size or getattr(settings, "AUTO_CHARGE_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    if asynchronous is None:
+        asynchronous = getattr(settings, "AUTO_CHARGE_ASYNC", True)
 
     schedules = RentPaymentSchedule.objects.filter(
-        auto_charge_enabled=True,
-        is_active=True,
-    ).select_related("contract", "contract__landlord", "contract__tenant")
+        auto_charge_enabled=True, is_active=True
+    )
+    due = [row.schedule_id for row in arrears.compute(schedules, reference).pending()]
+    chunks = [due[i : i + size] for i in range(0, len(due), size)]
+    run = AutoChargeRun.objects.create(
+        reference_date=reference,
+        chunk_size=size,
+        chunks_total=len(chunks),
+        schedules_total=len(due),
+    )
+    logger.info(
+        "Cobro automático %s: %s cronogramas en %s lotes",
+        run.pk,
+        len(due),
+        len(chunks),
+    )
+    if not chunks:
+        finish_auto_charge_run(run.pk)
+    for index, chunk in enumerate(chunks):
+        _enqueue_chunk(str(run.pk), index, chunk, asynchronous)
+    return run
 
-    for schedule in schedules:
+
+def _enqueue_chunk(run_id, index, schedule_ids, asynchronous):
+    from .tasks import process_auto_charge_chunk
+
+    if asynchronous:
         try:
-            next_due = schedule.get_next_due_date()
-            if not next_due or next_due > today:
-                continue
-
-            # Verificar que no se haya cobrado ya este mes
-            if (
-                schedule.last_payment_date
-                and schedule.last_payment_date.month == today.month
-                and schedule.last_payment_date.year == today.year
-            ):
-                continue
-
-            amount = schedule.monthly_amount
-            late_fee = Decimal("0")
-
-            # Aplicar mora si aplica
-            if schedule.is_payment_overdue() and schedule.late_fee_percentage:
-                late_fee = schedule.calculate_late_fee()
-
-            total_amount = amount + late_fee
-
-            # Crear transacción
-            transaction = Transaction.objects.create(
-                transaction_type="rent_payment",
-                amount=total_amount,
-                currency="COP",
-                status="completed",
-                payer=schedule.contract.tenant
-                if hasattr(schedule.contract, "tenant")
-                else None,
-                payee=schedule.contract.landlord
-                if hasattr(schedule.contract, "landlord")
-                else None,
-                contract=schedule.contract,
-                description=f'Pago automático de arriendo - {today.strftime("%B %Y")}',
-                processed_at=timezone.now(),
-                metadata={
-                    "auto_charge": True,
-                    "schedule_id": str(schedule.id),
-                    "base_amount": str(amount),
-                    "late_fee": str(late_fee),
-                    "due_date": str(next_due),
-                },
-            )
+            process_auto_charge_chunk.delay(run_id, index, schedule_ids)
+            return
+        except Exception as exc:  # noqa: BLE001
+            # Sin broker se procesa en línea, como antes de los lotes.
+            logger.error("No se pudo encolar el lote %s de %s: %s", index, run_id, exc)
+    charge_chunk(run_id, index, schedule_ids)
+
+
+def charge_chunk(run_id, index, schedule_ids):
+    """Cuerpo de `payments.tasks.process_auto_charge_chunk`.
+
+    Idempotente: un lote repetido (reintento, entrega duplicada o dos
+    workers con los mismos ids) no cobra dos veces ni cuenta dos veces
+    el lote como terminado.
+    """
+    from .models import AutoChargeRun
+
+    stats = {
+        "processed": 0,
+        "skipped": 0,
+        "failed": 0,
+        "total": Decimal("0.00"),
+        "errors": [],
+    }
+    run = AutoChargeRun.objects.get(pk=run_id)
+
+    # 1) Tomar lo que esté libre; lo tomado por otro worker se salta.
+    with transaction.atomic():
+        claimed = _claim(schedule_ids, skip_locked=True)
+        _charge(run, claimed, stats)
+    rest = set(schedule_ids) - {schedule.pk for schedule in claimed}
+
+    # 2) Esperar al otro worker y volver a evaluar, luego cerrar el lote.
+    with transaction.atomic():
+        if rest:
+            waited = _claim(rest, skip_locked=False)
+            # Inactivos o sin cobro automático desde que se planificó.
+            stats["skipped"] += len(rest) - len(waited)
+            _charge(run, waited, stats)
+        last = _record_chunk(run_id, index, stats)
+
+    if last:
+        finish_auto_charge_run(run_id)
+    return {
+        "processed": stats["processed"],
+        "skipped": stats["skipped"],
+        "failed": stats["failed"],
+        "total": str(stats["total"]),
+    }
+
+
+def _claim(schedule_ids, skip_locked):
+    from .models import RentPaymentSchedule
 
-            # Actualizar schedule
-            schedule.last_payment_date = today
-            schedule.save(update_fields=["last_payment_date", "updated_at"])
+    return list(
+        RentPaymentSchedule.objects.select_for_update(
+            skip_locked=skip_locked, of=("self",)
+        )
+        .filter(pk__in=schedule_ids, auto_charge_enabled=True, is_active=True)
+        .select_related("contract", "tenant", "landlord")
+        .order_by("pk")
+    )
 
-            # Enviar confirmación
-            _send_charge_confirmation(schedule, transaction, total_amount, late_fee)
 
-            processed += 1
-            logger.info(f"Auto-charge OK: {schedule.contract} - ${total_amount}")
+def _charge(run, schedules, stats):
+    """Cobra los cronogramas ya bloqueados que sigan vencidos."""
+    from . import arrears
+    from .models import RentPaymentSchedule, Transaction
 
-        except Exception as e:
-            failed += 1
+    if not schedules:
+        return
+    # Se recalcula con las filas bloqueadas: otro worker pudo cobrarlas.
+    batch = arrears.compute(
+        RentPaymentSchedule.objects.filter(pk__in=[s.pk for s in schedules]),
+        run.reference_date,
+    )
+    for schedule in schedules:
+        row = batch.get(schedule.pk)
+        if row is None or not row.pending:
+            stats["skipped"] += 1
+            continue
+        key = idempotency_key(schedule.pk, row.date_due)
+        try:
+            with transaction.atomic():
+                Transaction.objects.create(
+                    transaction_number=f"AC-{row.date_due:%Y%m}-{schedule.pk:08d}",
+                    idempotency_key=key,
+                    transaction_type="rent_payment",
+                    amount=row.rent_amount,
+                    total_amount=row.total_due,
+                    currency="COP",
+                    status="completed",
+                    payer=schedule.tenant,
+                    payee=schedule.landlord,
+                    contract=schedule.contract,
+                    description=f"Pago automático de arriendo - {row.date_due:%m/%Y}",
+                    due_date=row.date_due,
+                    processed_at=timezone.now(),
+                    metadata={
+                        "auto_charge": True,
+                        "auto_charge_run": str(run.pk),
+                        "schedule_id": str(schedule.id),
+                        "base_amount": str(row.rent_amount),
+                        "late_fee": str(row.late_fee),
+                        "overdue_days": row.overdue_days,
+                        "due_date": str(row.date_due),
+                    },
+                )
+                schedule.last_payment_date = run.reference_date
+                schedule.save(update_fields=["last_payment_date", "updated_at"])
+        except IntegrityError:
+            # El período ya tiene su cobro (clave de idempotencia).
+            stats["skipped"] += 1
+            continue
+        except Exception as e:  # noqa: BLE001
+            stats["failed"] += 1
+            stats["errors"].append({"schedule_id": schedule.pk, "error": str(e)})
             logger.error(f"Auto-charge FAILED: {schedule.id} - {e}")
-            _send_charge_failure(schedule, str(e))
+            continue
+        stats["processed"] += 1
+        stats["total"] += row.total_due
+        logger.info(f"Auto-charge OK: {schedule.contract} - ${row.total_due}")
+
 
-    return {"processed": processed, "failed": failed}
+def _record_chunk(run_id, index, stats):
+    """Suma los contadores del lote; True si fue el último en cerrar."""
+    from .models import AutoChargeRun
+
+    run = AutoChargeRun.objects.select_for_update().get(pk=run_id)
+    run.processed += stats["processed"]
+    run.skipped += stats["skipped"]
+    run.failed += stats["failed"]
+    run.total_charged += stats["total"]
+    run.errors = run.errors + stats["errors"]
+    first_close = index not in run.chunks_done
+    if first_close:
+        run.chunks_done = [*run.chunks_done, index]
+    run.save(
+        update_fields=[
+            "processed",
+            "skipped",
+            "failed",
+            "total_charged",
+            "errors",
+            "chunks_done",
+        ]
+    )
+    return first_close and len(run.chunks_done) >= run.chunks_total
 
 
-def _send_charge_confirmation(schedule, transaction, amount, late_fee):
-    """Envía email de confirmación de cobro automático."""
-    tenant = schedule.contract.tenant if hasattr(schedule.contract, "tenant") else None
-    landlord = (
-        schedule.contract.landlord if hasattr(schedule.contract, "landlord") else None
+def finish_auto_charge_run(run_id):
+    """Marca la corrida como completada y envía las notificaciones.
+
+    Sólo la primera llamada por corrida envía correos.
+    """
+    from .models import AutoChargeRun, RentPaymentSchedule, Transaction
+
+    claimed = AutoChargeRun.objects.filter(pk=run_id, finished_at__isnull=True).update(
+        status="completed", finished_at=timezone.now()
+    )
+    if not claimed:
+        return 0
+    run = AutoChargeRun.objects.get(pk=run_id)
+
+    messages = []
+    for tx in Transaction.objects.filter(
+        metadata__auto_charge_run=str(run.pk)
+    ).select_related("payer", "payee"):
+        messages.extend(_confirmation_messages(tx))
+    failed_ids = {error["schedule_id"] for error in run.errors}
+    for schedule in RentPaymentSchedule.objects.filter(
+        pk__in=failed_ids
+    ).select_related("tenant"):
+        messages.extend(_failure_messages(schedule))
+
+    sent = 0
+    if messages:
+        try:
+            sent = get_connection(fail_silently=True).send_messages(messages) or 0
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Cobro automático %s: error enviando correos: %s", run.pk, exc)
+    logger.info(
+        "Cobro automático %s completado: %s (%s correos)", run.pk, run.summary(), sent
     )
+    return sent
+
+
+def _confirmation_messages(tx):
+    """Correos de confirmación de un cobro automático."""
+    tenant = tx.payer
+    landlord = tx.payee
+    late_fee = Decimal(tx.metadata.get("late_fee", "0"))
+    messages = []
 
     # Email al arrendatario (pagador)
     if tenant and tenant.email:
         late_msg = f"\nMora aplicada: ${late_fee:,.0f}" if late_fee > 0 else ""
-        try:
-            send_mail(
+        messages.append(
+            EmailMessage(
                 subject="[VeriHome] Pago de arriendo procesado",
-                message=(
-                    f'Estimado/a {tenant.get_full_name()},\n\n'
-                    f'Su pago de arriendo ha sido procesado exitosamente.\n\n'
-                    f'Monto: ${amount:,.0f} COP{late_msg}\n'
-                    f'Referencia: {transaction.id}\n'
-                    f'Fecha: {timezone.now().strftime("%d/%m/%Y %H:%M")}\n\n'
-                    f'Puede ver el detalle en su panel de VeriHome.\n\n'
-                    f'Equipo VeriHome'
+                body=(
+                    f"Estimado/a {tenant.get_full_name()},\n\n"
+                    f"Su pago de arriendo ha sido procesado exitosamente.\n\n"
+                    f"Monto: ${tx.total_amount:,.0f} COP{late_msg}\n"
+                    f"Referencia: {tx.id}\n"
+                    f"Fecha: {tx.processed_at.strftime('%d/%m/%Y %H:%M')}\n\n"
+                    f"Puede ver el detalle en su panel de VeriHome.\n\n"
+                    f"Equipo VeriHome"
                 ),
                 from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[tenant.email],
-                fail_silently=True,
+                to=[tenant.email],
             )
-        except Exception:
-            pass
+        )
 
     # Email al arrendador (receptor)
     if landlord and landlord.email:
-        try:
-            send_mail(
+        messages.append(
+            EmailMessage(
                 subject="[VeriHome] Pago de arriendo recibido",
-                message=(
-                    f'Estimado/a {landlord.get_full_name()},\n\n'
-                    f'Se ha recibido un pago de arriendo.\n\n'
-                    f'Monto: ${amount:,.0f} COP\n'
-                    f'Arrendatario: {tenant.get_full_name() if tenant else "N/A"}\n'
-                    f'Referencia: {transaction.id}\n\n'
-                    f'Equipo VeriHome'
+                body=(
+                    f"Estimado/a {landlord.get_full_name()},\n\n"
+                    f"Se ha recibido un pago de arriendo.\n\n"
+                    f"Monto: ${tx.total_amount:,.0f} COP\n"
+                    f"Arrendatario: {tenant.get_full_name() if tenant else 'N/A'}\n"
+                    f"Referencia: {tx.id}\n\n"
+                    f"Equipo VeriHome"
                 ),
                 from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[landlord.email],
-                fail_silently=True,
+                to=[landlord.email],
             )
-        except Exception:
-            pass
+        )
+    return messages
 
 
-def _send_charge_failure(schedule, error_msg):
-    """Envía email cuando un cobro automático falla."""
-    tenant = schedule.contract.tenant if hasattr(schedule.contract, "tenant") else None
-    if tenant and tenant.email:
-        try:
-            send_mail(
-                subject="[VeriHome] Error en pago automático de arriendo",
-                message=(
-                    f"Estimado/a {tenant.get_full_name()},\n\n"
-                    f"No pudimos procesar su pago automático de arriendo.\n\n"
-                    f"Por favor ingrese a VeriHome y realice el pago manualmente "
-                    f"o verifique su método de pago.\n\n"
-                    f"Si necesita ayuda, contáctenos a soporte@verihome.com\n\n"
-                    f"Equipo VeriHome"
-                ),
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[tenant.email],
-                fail_silently=True,
-            )
-        except Exception:
-            pass
+def _failure_messages(schedule):
+    """Correo al arrendatario cuando un cobro automático falla."""
+    tenant = schedule.tenant
+    if not (tenant and tenant.email):
+        return []
+    return [
+        EmailMessage(
+            subject="[VeriHome] Error en pago automático de arriendo",
+            body=(
+                f"Estimado/a {tenant.get_full_name()},\n\n"
+                f"No pudimos procesar su pago automático de arriendo.\n\n"
+                f"Por favor ingrese a VeriHome y realice el pago manualmente "
+                f"o verifique su método de pago.\n\n"
+                f"Si necesita ayuda, contáctenos a soporte@verihome.com\n\n"
+                f"Equipo VeriHome"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[tenant.email],
+        )
+    ]
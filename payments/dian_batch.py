@@ -0,0 +1,219 @@
+"""
+Facturación electrónica DIAN por lotes (cierre de mes).
+
+`auto_invoice_rent_payment` factura cada pago al reconciliarlo, pero los
+pagos que no pasan por ahí (o cuya factura falló) quedan sin factura.
+`run_batch()` factura todas las transacciones de arriendo completadas
+sin factura hasta una fecha de corte, por lotes de DIAN_BATCH_CHUNK_SIZE:
+
+1. select   — una consulta por lote (pagador, beneficiario y contrato
+   con `select_related`), en orden de pk a partir del checkpoint.
+2. allocate — un bloque de consecutivos con un solo UPDATE
+   (`DIANInvoiceSequence`).
+3. render   — XML UBL, CUFE y firma sobre documentos planos
+   (`dian_invoice_service.invoice_document`), en un pool de
+   DIAN_BATCH_WORKERS procesos.
+4. write    — `bulk_create` de facturas y líneas.
+
+Cada lote (consecutivos, facturas y checkpoint de la corrida) se
+confirma en una sola transacción: una corrida interrumpida se retoma
+con `run_batch(resume=<id>)` desde el último lote confirmado, sin
+huecos ni números repetidos. Las métricas por etapa (segundos y filas)
+quedan en `DIANInvoiceBatchRun.metrics`.
+"""
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import dian_invoice_service as dian
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("select", "allocate", "render", "write")
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_ATTEMPTS = 3
+
+
+def render_document(context, document):
+    """XML firmado y CUFE de un documento. Corre en los procesos del pool."""
+    xml = dian.sign_invoice_xml(
+        dian.render_invoice_xml(document),
+        certificate_path=context["certificate_path"],
+        certificate_password=context["certificate_password"],
+    )
+    cufe = dian.cufe_from_document(
+        document, context["technical_key"], context["ambiente_code"]
+    )
+    return xml, cufe
+
+
+class _Stages:
+    """Acumula segundos y filas por etapa sobre las métricas de la corrida."""
+
+    def __init__(self, metrics):
+        self.metrics = {
+            stage: dict(metrics.get(stage) or {"seconds": 0.0, "rows": 0})
+            for stage in STAGES
+        }
+
+    def add(self, stage, started, rows):
+        row = self.metrics[stage]
+        row["seconds"] = round(row["seconds"] + time.perf_counter() - started, 6)
+        row["rows"] += rows
+        row["per_second"] = round(row["rows"] / row["seconds"]) if row["seconds"] else 0
+
+
+def _pending(run):
+    from .models import Transaction
+
+    queryset = Transaction.objects.filter(
+        status="completed",
+        transaction_type="rent_payment",
+        invoice__isnull=True,
+        created_at__lte=run.cutoff,
+    )
+    if run.cursor:
+        queryset = queryset.filter(pk__gt=run.cursor)
+    return queryset.select_related("payer", "payee", "contract").order_by("pk")
+
+
+def create_run(cutoff=None, chunk_size=None):
+    """Registra una corrida nueva (sin procesar) para poder retomarla."""
+    from .models import DIANInvoiceBatchRun
+
+    chunk_size = chunk_size or getattr(
+        settings, "DIAN_BATCH_CHUNK_SIZE", DEFAULT_CHUNK_SIZE
+    )
+    return DIANInvoiceBatchRun.objects.create(
+        cutoff=cutoff or timezone.now(), chunk_size=chunk_size
+    )
+
+
+def run_batch(cutoff=None, chunk_size=None, workers=None, resume=None):
+    """Factura en lotes las transacciones de arriendo sin factura.
+
+    Args:
+        cutoff: datetime; transacciones creadas hasta ese momento
+            (default: ahora).
+        chunk_size: transacciones por lote (DIAN_BATCH_CHUNK_SIZE).
+        workers: procesos para render/CUFE/firma (DIAN_BATCH_WORKERS);
+            0 o 1 procesa en el proceso actual.
+        resume: id de una `DIANInvoiceBatchRun` a retomar.
+
+    Returns:
+        DIANInvoiceBatchRun con contadores y métricas.
+    """
+    from .models import DIANInvoiceBatchRun
+
+    if resume:
+        run = DIANInvoiceBatchRun.objects.get(pk=resume)
+    else:
+        run = create_run(cutoff, chunk_size)
+    if run.status == "completed":
+        return run
+
+    if workers is None:
+        workers = getattr(settings, "DIAN_BATCH_WORKERS", 0)
+    context = {
+        "technical_key": dian._technical_key(),
+        "ambiente_code": dian._ambiente_code(),
+        "certificate_path": getattr(settings, "DIAN_CERTIFICATE_PATH", ""),
+        "certificate_password": getattr(settings, "DIAN_CERTIFICATE_PASSWORD", ""),
+    }
+    # spawn: los procesos no heredan las conexiones abiertas a la base.
+    pool = (
+        ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        if workers > 1
+        else None
+    )
+    render = partial(render_document, context)
+
+    def render_all(documents):
+        if pool is None:
+            return [render(document) for document in documents]
+        chunksize = max(1, len(documents) // (workers * 4))
+        return list(pool.map(render, documents, chunksize=chunksize))
+
+    with pool or nullcontext():
+        while _run_chunk(run, render_all):
+            pass
+
+    run.status = "completed"
+    run.finished_at = timezone.now()
+    run.save(update_fields=["status", "finished_at"])
+    logger.info(f"Facturación DIAN por lotes {run.pk}: {run.summary()}")
+    return run
+
+
+def _run_chunk(run, render_all):
+    """Procesa y confirma un lote. Devuelve False si no quedaban pendientes."""
+    for attempt in range(1, MAX_CHUNK_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                return _process_chunk(run, render_all)
+        except IntegrityError as exc:
+            # Otra ruta (p. ej. auto_invoice_rent_payment) facturó una de
+            # las transacciones del lote: se revierte y se vuelve a leer.
+            run.refresh_from_db()
+            logger.warning(
+                f"Lote DIAN de {run.pk} revertido (intento {attempt}): {exc}"
+            )
+    raise RuntimeError(f"Lote DIAN de {run.pk} falló {MAX_CHUNK_ATTEMPTS} veces")
+
+
+def _process_chunk(run, render_all):
+    from .models import DIANInvoiceBatchRun, Invoice, InvoiceItem
+
+    stages = _Stages(run.metrics)
+
+    started = time.perf_counter()
+    payments = list(_pending(run)[: run.chunk_size])
+    stages.add("select", started, len(payments))
+    if not payments:
+        return False
+
+    started = time.perf_counter()
+    numbers = dian.reserve_invoice_numbers(len(payments))
+    stages.add("allocate", started, len(payments))
+
+    started = time.perf_counter()
+    issued_at = timezone.now()
+    built = [
+        dian.build_invoice(payment, number, issued_at)
+        for payment, number in zip(payments, numbers)
+    ]
+    documents = [dian.invoice_document(invoice, [item]) for invoice, item in built]
+    for (invoice, _item), (xml, cufe) in zip(built, render_all(documents)):
+        invoice.dian_xml = xml
+        invoice.cufe = cufe
+    stages.add("render", started, len(payments))
+
+    started = time.perf_counter()
+    # Los pk (uuid) se asignan al construir: las líneas ya apuntan a su factura.
+    Invoice.objects.bulk_create([invoice for invoice, _item in built], batch_size=1000)
+    InvoiceItem.objects.bulk_create([item for _invoice, item in built], batch_size=1000)
+    stages.add("write", started, len(payments))
+
+    run.cursor = str(payments[-1].pk)
+    run.chunks_done += 1
+    run.invoices_created += len(payments)
+    run.first_number = run.first_number or numbers[0]
+    run.last_number = numbers[-1]
+    run.metrics = stages.metrics
+    DIANInvoiceBatchRun.objects.filter(pk=run.pk).update(
+        cursor=run.cursor,
+        chunks_done=run.chunks_done,
+        invoices_created=run.invoices_created,
+        first_number=run.first_number,
+        last_number=run.last_number,
+        metrics=run.metrics,
+    )
+    return True
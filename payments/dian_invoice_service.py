@@ -22,7 +22,10 @@ UBL 2.1 estándar colombiano.
 
 import hashlib
 import logging
+from datetime import datetime
 from decimal import Decimal
+from xml.sax.saxutils import escape
+
 from django.utils import timezone
 from django.conf import settings
 
@@ -82,37 +85,32 @@ class DIANInvoiceData:
         self.notes = ""
 
 
+def reserve_invoice_numbers(count, year=None):
+    """Reserva un bloque de `count` números de factura consecutivos."""
+    from payments.models import DIANInvoiceSequence
+
+    return DIANInvoiceSequence.reserve(count, DIAN_CONFIG["prefijo_factura"], year=year)
+
+
 def generate_invoice_number():
     """Genera número de factura secuencial con prefijo VeriHome."""
-    from payments.models import Invoice
+    (number,) = reserve_invoice_numbers(1)
+    return number
 
-    year = timezone.now().year
-    count = Invoice.objects.filter(created_at__year=year).count() + 1
-    return f"{DIAN_CONFIG['prefijo_factura']}-{year}-{count:06d}"
 
+def build_invoice(transaction, invoice_number, issued_at):
+    """Arma (sin guardar) la factura y su línea para una transacción.
 
-def create_dian_invoice_from_transaction(transaction):
-    """
-    Crea una factura electrónica a partir de una transacción completada.
-
-    Args:
-        transaction: Transaction model instance con status='completed'
+    Compartido por la facturación en línea y por lotes
+    (`payments.dian_batch`); no hace consultas si `payer`, `payee` y
+    `contract` vienen con `select_related`.
 
     Returns:
-        Invoice model instance con datos DIAN
+        (Invoice, InvoiceItem) sin guardar.
     """
     from payments.models import Invoice, InvoiceItem
 
-    if transaction.status != "completed":
-        raise ValueError("Solo se pueden facturar transacciones completadas")
-
-    invoice_number = generate_invoice_number()
-
-    # Determinar emisor y receptor
-    issuer = transaction.payee or None
-    recipient = transaction.payer or None
-
-    today = timezone.localdate()
+    today = timezone.localdate(issued_at)
     invoice_type = (
         "rent" if transaction.transaction_type == "rent_payment" else "commission"
     )
@@ -121,11 +119,11 @@ def create_dian_invoice_from_transaction(transaction):
         if invoice_type == "rent"
         else f"{transaction.get_transaction_type_display()}"
     )
-    invoice = Invoice.objects.create(
+    invoice = Invoice(
         invoice_number=invoice_number,
         invoice_type=invoice_type,
-        issuer=issuer,
-        recipient=recipient,
+        issuer=transaction.payee,
+        recipient=transaction.payer,
         title=title,
         subtotal=transaction.amount,
         tax_amount=Decimal("0"),  # Arrendamiento residencial exento de IVA en CO
@@ -145,19 +143,17 @@ def create_dian_invoice_from_transaction(transaction):
             "ambiente": DIAN_CONFIG["ambiente"],
             "nit_emisor": DIAN_CONFIG["nit_emisor"],
             "resolucion": DIAN_CONFIG["resolucion_dian"],
+            # Momento de emisión del XML y del CUFE (created_at lo fija
+            # la base al insertar y en lotes no coincide).
+            "issued_at": issued_at.isoformat(),
         },
     )
 
-    # Crear línea de factura
-    description = (
-        "Canon de arrendamiento"
-        if transaction.transaction_type == "rent_payment"
-        else f"{transaction.get_transaction_type_display()}"
-    )
+    description = title
     if transaction.contract:
-        description += f' - Contrato {transaction.contract.contract_number if hasattr(transaction.contract, "contract_number") else transaction.contract_id}'
+        description += f" - Contrato {getattr(transaction.contract, 'contract_number', transaction.contract_id)}"
 
-    InvoiceItem.objects.create(
+    item = InvoiceItem(
         invoice=invoice,
         description=description,
         quantity=1,
@@ -166,38 +162,56 @@ def create_dian_invoice_from_transaction(transaction):
         tax_rate=Decimal("0"),
         discount_rate=Decimal("0"),
     )
-
-    logger.info(
-        f"DIAN invoice {invoice_number} created for transaction {transaction.id}"
-    )
-    return invoice
+    return invoice, item
 
 
-def generate_dian_xml(invoice):
+def create_dian_invoice_from_transaction(transaction):
     """
-    Genera XML en formato UBL 2.1 para envío a la DIAN.
+    Crea una factura electrónica a partir de una transacción completada.
 
-    NOTA: Este es un esquema base. La implementación completa requiere:
-    - Certificado digital de firma electrónica
-    - Habilitación como facturador electrónico ante la DIAN
-    - Validación con el web service de la DIAN (ambiente de pruebas/producción)
+    Args:
+        transaction: Transaction model instance con status='completed'
 
     Returns:
-        str: XML string en formato UBL 2.1
+        Invoice model instance con datos DIAN
     """
-    meta = invoice.metadata or {}
-    items = invoice.items.all()
+    if transaction.status != "completed":
+        raise ValueError("Solo se pueden facturar transacciones completadas")
+
+    invoice_number = generate_invoice_number()
+    invoice, item = build_invoice(transaction, invoice_number, timezone.now())
+
+    document = invoice_document(invoice, [item])
+    invoice.cufe = cufe_from_document(document, _technical_key(), _ambiente_code())
+    invoice.dian_xml = sign_invoice_xml(render_invoice_xml(document))
+    invoice.save()
+    item.invoice = invoice
+    item.save()
 
-    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+    logger.info(
+        f"DIAN invoice {invoice_number} created for transaction {transaction.id}"
+    )
+    return invoice
+
+
+# ---------------------------------------------------------------------------
+# XML UBL 2.1 y CUFE
+#
+# Plantillas compiladas una vez por proceso y funciones puras sobre un
+# "documento" (dict de strings): la facturación por lotes las ejecuta en
+# un pool de procesos sin tocar el ORM.
+# ---------------------------------------------------------------------------
+
+_XML_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
 <Invoice xmlns="urn:oasis:names:specification:ubl:schema:xsd:Invoice-2"
          xmlns:cbc="urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2"
          xmlns:cac="urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2">
   <cbc:UBLVersionID>UBL 2.1</cbc:UBLVersionID>
   <cbc:CustomizationID>10</cbc:CustomizationID>
   <cbc:ProfileID>DIAN 2.1</cbc:ProfileID>
-  <cbc:ID>{invoice.invoice_number}</cbc:ID>
-  <cbc:IssueDate>{invoice.created_at.strftime('%Y-%m-%d')}</cbc:IssueDate>
-  <cbc:IssueTime>{invoice.created_at.strftime('%H:%M:%S')}-05:00</cbc:IssueTime>
+  <cbc:ID>{invoice_number}</cbc:ID>
+  <cbc:IssueDate>{issue_date}</cbc:IssueDate>
+  <cbc:IssueTime>{issue_time}-05:00</cbc:IssueTime>
   <cbc:InvoiceTypeCode>01</cbc:InvoiceTypeCode>
   <cbc:DocumentCurrencyCode>COP</cbc:DocumentCurrencyCode>
 
@@ -205,10 +219,10 @@ def generate_dian_xml(invoice):
   <cac:AccountingSupplierParty>
     <cac:Party>
       <cac:PartyIdentification>
-        <cbc:ID>{meta.get('nit_emisor', DIAN_CONFIG['nit_emisor'])}</cbc:ID>
+        <cbc:ID>{nit_emisor}</cbc:ID>
       </cac:PartyIdentification>
       <cac:PartyName>
-        <cbc:Name>{DIAN_CONFIG['razon_social']}</cbc:Name>
+        <cbc:Name>{razon_social}</cbc:Name>
       </cac:PartyName>
     </cac:Party>
   </cac:AccountingSupplierParty>
@@ -217,39 +231,144 @@ def generate_dian_xml(invoice):
   <cac:AccountingCustomerParty>
     <cac:Party>
       <cac:PartyName>
-        <cbc:Name>{invoice.recipient.get_full_name() if invoice.recipient else 'N/A'}</cbc:Name>
+        <cbc:Name>{recipient_name}</cbc:Name>
       </cac:PartyName>
     </cac:Party>
   </cac:AccountingCustomerParty>
 
   <!-- Totales -->
   <cac:LegalMonetaryTotal>
-    <cbc:LineExtensionAmount currencyID="COP">{invoice.subtotal}</cbc:LineExtensionAmount>
-    <cbc:TaxExclusiveAmount currencyID="COP">{invoice.subtotal}</cbc:TaxExclusiveAmount>
-    <cbc:TaxInclusiveAmount currencyID="COP">{invoice.total_amount}</cbc:TaxInclusiveAmount>
-    <cbc:PayableAmount currencyID="COP">{invoice.total_amount}</cbc:PayableAmount>
+    <cbc:LineExtensionAmount currencyID="COP">{subtotal}</cbc:LineExtensionAmount>
+    <cbc:TaxExclusiveAmount currencyID="COP">{subtotal}</cbc:TaxExclusiveAmount>
+    <cbc:TaxInclusiveAmount currencyID="COP">{total}</cbc:TaxInclusiveAmount>
+    <cbc:PayableAmount currencyID="COP">{total}</cbc:PayableAmount>
   </cac:LegalMonetaryTotal>
 
-  <!-- Líneas -->"""
+  <!-- Líneas -->""".format_map
 
-    for i, item in enumerate(items, 1):
-        xml += f"""
+_XML_LINE = """
   <cac:InvoiceLine>
-    <cbc:ID>{i}</cbc:ID>
-    <cbc:InvoicedQuantity>{item.quantity}</cbc:InvoicedQuantity>
-    <cbc:LineExtensionAmount currencyID="COP">{item.total_price}</cbc:LineExtensionAmount>
+    <cbc:ID>{position}</cbc:ID>
+    <cbc:InvoicedQuantity>{quantity}</cbc:InvoicedQuantity>
+    <cbc:LineExtensionAmount currencyID="COP">{total_price}</cbc:LineExtensionAmount>
     <cac:Item>
-      <cbc:Description>{item.description}</cbc:Description>
+      <cbc:Description>{description}</cbc:Description>
     </cac:Item>
     <cac:Price>
-      <cbc:PriceAmount currencyID="COP">{item.unit_price}</cbc:PriceAmount>
+      <cbc:PriceAmount currencyID="COP">{unit_price}</cbc:PriceAmount>
     </cac:Price>
-  </cac:InvoiceLine>"""
+  </cac:InvoiceLine>""".format_map
 
-    xml += """
+_XML_TAIL = """
 </Invoice>"""
 
-    return xml
+
+def _issued_at(invoice):
+    issued_at = (getattr(invoice, "metadata", None) or {}).get("issued_at")
+    return datetime.fromisoformat(issued_at) if issued_at else invoice.created_at
+
+
+def invoice_document(invoice, items):
+    """Valores de la factura que usan el XML y el CUFE, ya formateados."""
+    # `metadata` puede venir vacío en facturas antiguas.
+    meta = getattr(invoice, "metadata", None) or {}
+    issued_at = _issued_at(invoice)
+    recipient = invoice.recipient if invoice.recipient_id else None
+
+    # Receptor: NIT (31) si el usuario tiene nit, si no CC (13).
+    recipient_doc_type = "13"
+    recipient_doc = ""
+    if recipient is not None:
+        recipient_doc = str(getattr(recipient, "document_number", "") or "")
+        if getattr(recipient, "document_type", "") == "NIT":
+            recipient_doc_type = "31"
+
+    return {
+        "invoice_number": invoice.invoice_number,
+        "issue_date": (invoice.issue_date or issued_at.date()).strftime("%Y-%m-%d"),
+        "issue_time": issued_at.strftime("%H:%M:%S"),
+        "nit_emisor": meta.get("nit_emisor", DIAN_CONFIG["nit_emisor"]),
+        "razon_social": DIAN_CONFIG["razon_social"],
+        "recipient_name": recipient.get_full_name() if recipient else "N/A",
+        "recipient_doc_type": recipient_doc_type,
+        "recipient_doc": recipient_doc,
+        "subtotal": str(invoice.subtotal),
+        "tax": str(invoice.tax_amount or 0),
+        "total": str(invoice.total_amount),
+        "lines": [
+            {
+                "quantity": str(item.quantity),
+                "total_price": str(item.total_price),
+                "description": item.description,
+                "unit_price": str(item.unit_price),
+            }
+            for item in items
+        ],
+    }
+
+
+def render_invoice_xml(document):
+    """XML UBL 2.1 de un documento de `invoice_document` (texto escapado)."""
+    head = {key: escape(value) for key, value in document.items() if key != "lines"}
+    parts = [_XML_HEAD(head)]
+    for position, line in enumerate(document["lines"], 1):
+        parts.append(
+            _XML_LINE(
+                {
+                    "position": position,
+                    **{key: escape(value) for key, value in line.items()},
+                }
+            )
+        )
+    parts.append(_XML_TAIL)
+    return "".join(parts)
+
+
+def cufe_from_document(document, technical_key, ambiente_code):
+    """SHA-384 del CUFE sobre un documento de `invoice_document`."""
+
+    # Normalizar montos a 2 decimales sin separadores
+    def _fmt(amount) -> str:
+        return f"{Decimal(amount):.2f}"
+
+    data_string = (
+        f"{document['invoice_number']}"
+        f"{document['issue_date']}"
+        f"{document['issue_time']}-05:00"
+        f"{_fmt(document['subtotal'])}"
+        f"01"  # Código impuesto IVA
+        f"{_fmt(document['tax'])}"
+        f"{_fmt(document['total'])}"
+        f"{document['nit_emisor']}"
+        f"{document['recipient_doc_type']}"
+        f"{document['recipient_doc']}"
+        f"{technical_key}"
+        f"{ambiente_code}"
+    )
+    return hashlib.sha384(data_string.encode("utf-8")).hexdigest()
+
+
+def _technical_key():
+    return getattr(settings, "DIAN_TECHNICAL_KEY", "placeholder-technical-key")
+
+
+def _ambiente_code():
+    return "1" if DIAN_CONFIG["ambiente"] == "production" else "2"
+
+
+def generate_dian_xml(invoice):
+    """
+    Genera XML en formato UBL 2.1 para envío a la DIAN.
+
+    NOTA: Este es un esquema base. La implementación completa requiere:
+    - Certificado digital de firma electrónica
+    - Habilitación como facturador electrónico ante la DIAN
+    - Validación con el web service de la DIAN (ambiente de pruebas/producción)
+
+    Returns:
+        str: XML string en formato UBL 2.1
+    """
+    return render_invoice_xml(invoice_document(invoice, invoice.items.all()))
 
 
 def calculate_cufe(invoice, technical_key: str | None = None) -> str:
@@ -278,47 +397,11 @@ def calculate_cufe(invoice, technical_key: str | None = None) -> str:
         str: hash hexadecimal SHA-384 de 96 caracteres.
     """
     if technical_key is None:
-        technical_key = getattr(
-            settings, "DIAN_TECHNICAL_KEY", "placeholder-technical-key"
-        )
-
-    # `metadata` puede no existir en el modelo Invoice (no es un campo
-    # declarado al 2026-04-18); resolver a dict vacío si el attr falta.
-    meta = getattr(invoice, "metadata", None) or {}
-    ambiente_code = "1" if DIAN_CONFIG["ambiente"] == "production" else "2"
-
-    issue_date = (invoice.issue_date or invoice.created_at.date()).strftime("%Y-%m-%d")
-    issue_time = invoice.created_at.strftime("%H:%M:%S-05:00")
-
-    # Normalizar montos a 2 decimales sin separadores
-    def _fmt(amount) -> str:
-        return f"{Decimal(amount):.2f}"
-
-    # Receptor: NIT (31) si recipient.profile tiene nit, si no CC (13).
-    recipient_doc_type = "13"
-    recipient_doc = ""
-    if invoice.recipient_id:
-        recipient_doc = str(getattr(invoice.recipient, "document_number", "") or "")
-        if getattr(invoice.recipient, "document_type", "") == "NIT":
-            recipient_doc_type = "31"
-
-    data_string = (
-        f"{invoice.invoice_number}"
-        f"{issue_date}"
-        f"{issue_time}"
-        f"{_fmt(invoice.subtotal)}"
-        f"01"  # Código impuesto IVA
-        f"{_fmt(invoice.tax_amount or 0)}"
-        f"{_fmt(invoice.total_amount)}"
-        f"{meta.get('nit_emisor', DIAN_CONFIG['nit_emisor'])}"
-        f"{recipient_doc_type}"
-        f"{recipient_doc}"
-        f"{technical_key}"
-        f"{ambiente_code}"
+        technical_key = _technical_key()
+    return cufe_from_document(
+        invoice_document(invoice, ()), technical_key, _ambiente_code()
     )
 
-    return hashlib.sha384(data_string.encode("utf-8")).hexdigest()
-
 
 def sign_invoice_xml(
     xml: str,
@@ -3,15 +3,21 @@ Sistema de pagos con Escrow integrado a contratos.
 Manejo automático de liberación de fondos según hitos del contrato.
 """
 
+import logging
 from decimal import Decimal
 from datetime import datetime
 from typing import Dict, List, Optional, TYPE_CHECKING
 from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 import uuid
 
 from contracts.colombian_contracts import ColombianContract, ContractMilestone
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from django.contrib.auth import get_user_model
 
@@ -144,11 +150,18 @@ class EscrowReleaseRule(models.Model):
     is_active = models.BooleanField(default=True)
     priority = models.IntegerField(default=1)
 
+    # Calendario de liberación (payments.escrow_schedule): momento en que
+    # vence la primera retención que la regla libera; None si no hay.
+    next_release_at = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_outcome = models.JSONField(default=dict, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "escrow_release_rules"
         ordering = ["priority"]
+        indexes = [models.Index(fields=["next_release_at"])]
 
 
 class EscrowService:
@@ -247,7 +260,7 @@ class EscrowService:
             escrow_account.save()
 
             escrow_transaction.status = "COMPLETED"
-            escrow_transaction.processed_at = datetime.now()
+            escrow_transaction.processed_at = timezone.now()
             escrow_transaction.save()
 
             # Notificar partes
@@ -342,12 +355,12 @@ class EscrowService:
             escrow_account.save()
 
             release_transaction.status = "COMPLETED"
-            release_transaction.processed_at = datetime.now()
+            release_transaction.processed_at = timezone.now()
             release_transaction.save()
 
             # Marcar hito como completado
             milestone.status = "COMPLETED"
-            milestone.completed_date = datetime.now()
+            milestone.completed_date = timezone.now()
             milestone.save()
 
             # Notificar partes
@@ -364,14 +377,23 @@ class EscrowService:
 
     @staticmethod
     def check_automatic_releases(escrow_account: ContractEscrowAccount):
-        """Verifica y ejecuta liberaciones automáticas pendientes"""
+        """Verifica y ejecuta liberaciones automáticas pendientes.
+
+        Las reglas vencidas de la cuenta se procesan con
+        `escrow_schedule.release_due`; la tarea periódica
+        `payments.tasks.release_due_escrow` hace lo mismo para todas las
+        cuentas sin recorrerlas.
+        """
+        from .escrow_schedule import release_due
+
+        release_due(account=escrow_account)
 
         # Buscar transacciones programadas para liberación
         pending_releases = EscrowTransaction.objects.filter(
             escrow_account=escrow_account,
             transaction_type="RELEASE",
             status="PENDING",
-            scheduled_for__lte=datetime.now(),
+            scheduled_for__lte=timezone.now(),
         )
 
         for escrow_txn in pending_releases:
@@ -383,7 +405,7 @@ class EscrowService:
                     )
             except Exception as e:
                 # Log error pero continúa con otras transacciones
-                print(f"Error en liberación automática: {e}")
+                logger.error(f"Error en liberación automática: {e}")
 
     @staticmethod
     def _process_payment(
@@ -454,3 +476,44 @@ class EscrowDisputeResolution:
         """Resuelve una disputa y redistribuye fondos"""
         # Implementar resolución de disputas
         pass
+
+
+# Calendario de liberación: cualquier cambio en retenciones, hitos, reglas
+# o en la cuenta recalcula `EscrowReleaseRule.next_release_at`.
+
+
+@receiver(post_save, sender=EscrowReleaseRule)
+@receiver(post_delete, sender=EscrowReleaseRule)
+@receiver(post_save, sender=EscrowTransaction)
+@receiver(post_delete, sender=EscrowTransaction)
+def _reschedule_from_escrow(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if sender is EscrowTransaction and instance.transaction_type != "HOLD":
+        return
+    from .escrow_schedule import reschedule_accounts
+
+    reschedule_accounts([instance.escrow_account_id])
+
+
+@receiver(post_save, sender=ContractEscrowAccount)
+def _reschedule_from_account(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    from .escrow_schedule import reschedule_accounts
+
+    reschedule_accounts([instance.pk])
+
+
+@receiver(post_save, sender=ContractMilestone)
+@receiver(post_delete, sender=ContractMilestone)
+def _reschedule_from_milestone(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .escrow_schedule import reschedule_accounts
+
+    reschedule_accounts(
+        ContractEscrowAccount.objects.filter(
+            contract_id=instance.contract_id
+        ).values_list("pk", flat=True)
+    )
@@ -0,0 +1,224 @@
+"""
+Calendario de liberaciones automáticas de escrow.
+
+Antes `EscrowService.check_automatic_releases` se llamaba por cuenta:
+saber qué cuentas tenían algo por liberar obligaba a recorrerlas todas
+con sus reglas. Ahora cada `EscrowReleaseRule` guarda en
+`next_release_at` (indexado) cuándo vence la primera retención que
+libera, y la tarea `payments.tasks.release_due_escrow` solo toca las
+reglas vencidas:
+
+1. Reglas programables: activas, TIME_BASED o AUTOMATED, sin
+   `require_landlord_confirmation`, en una cuenta ACTIVE con
+   `auto_release_enabled`. Liberan las retenciones (HOLD completadas)
+   de hitos abiertos del `milestone_type` de sus condiciones, pasadas
+   `auto_release_after_hours` (por defecto `hold_period_hours` de la
+   cuenta) desde el `scheduled_for` de la retención. Las reglas por
+   hitos o por aprobación siguen siendo manuales y quedan sin fecha.
+2. `reschedule_accounts()` recalcula las fechas de las reglas de unas
+   cuentas. Lo llaman las señales de `escrow_integration` cuando cambian
+   retenciones, hitos, reglas o la cuenta, y el comando
+   `reschedule_escrow_releases` para reconstruir el calendario.
+3. `release_due()` toma lotes de ESCROW_RELEASE_BATCH_SIZE reglas
+   vencidas con `select_for_update(skip_locked=True)`: dos workers nunca
+   procesan la misma regla. Libera con
+   `EscrowService.release_funds_for_milestone` y guarda el resultado en
+   `last_run_at`/`last_outcome`; una regla con fallos se reintenta
+   pasados ESCROW_RELEASE_RETRY_DELAY segundos.
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_RETRY_DELAY = 3600
+SCHEDULED_RULE_TYPES = ("TIME_BASED", "AUTOMATED")
+OPEN_MILESTONE_STATUSES = ("PENDING", "IN_PROGRESS", "OVERDUE")
+
+
+def is_scheduled(rule):
+    """True si la regla libera sola en una cuenta que lo permite."""
+    account = rule.escrow_account
+    return (
+        rule.is_active
+        and rule.rule_type in SCHEDULED_RULE_TYPES
+        and not rule.conditions.get("require_landlord_confirmation", False)
+        and account.status == "ACTIVE"
+        and account.auto_release_enabled
+    )
+
+
+def release_delay(rule):
+    """Tiempo entre el fin de una retención y su liberación automática."""
+    hours = rule.conditions.get(
+        "auto_release_after_hours", rule.escrow_account.hold_period_hours
+    )
+    return timedelta(hours=float(hours or 0))
+
+
+def open_holds(account_ids):
+    """Retenciones completadas de hitos abiertos de las cuentas dadas.
+
+    `held_until` es el fin de la retención (`scheduled_for`, o su
+    creación si no se indicó).
+    """
+    from .escrow_integration import EscrowTransaction
+
+    return EscrowTransaction.objects.filter(
+        escrow_account_id__in=account_ids,
+        transaction_type="HOLD",
+        status="COMPLETED",
+        related_milestone__status__in=OPEN_MILESTONE_STATUSES,
+    ).annotate(held_until=Coalesce("scheduled_for", "created_at"))
+
+
+def _schedule(rules):
+    """{rule.pk: next_release_at} con una consulta agregada por llamada."""
+    account_ids = {rule.escrow_account_id for rule in rules}
+    first_hold = {
+        (row["escrow_account_id"], row["related_milestone__milestone_type"]): row[
+            "first"
+        ]
+        for row in open_holds(account_ids)
+        .values("escrow_account_id", "related_milestone__milestone_type")
+        .annotate(first=Min("held_until"))
+        .order_by()
+    }
+    schedule = {}
+    for rule in rules:
+        wanted = rule.conditions.get("milestone_type")
+        held = [
+            first
+            for (account_id, milestone_type), first in first_hold.items()
+            if account_id == rule.escrow_account_id
+            and (not wanted or milestone_type == wanted)
+        ]
+        schedule[rule.pk] = (
+            min(held) + release_delay(rule) if held and is_scheduled(rule) else None
+        )
+    return schedule
+
+
+def reschedule_accounts(account_ids):
+    """Recalcula `next_release_at` de las reglas de las cuentas dadas.
+
+    Returns:
+        Número de reglas cuya fecha cambió.
+    """
+    from .escrow_integration import EscrowReleaseRule
+
+    account_ids = list(account_ids)
+    if not account_ids:
+        return 0
+    rules = list(
+        EscrowReleaseRule.objects.filter(
+            escrow_account_id__in=account_ids
+        ).select_related("escrow_account")
+    )
+    schedule = _schedule(rules)
+    changed = []
+    for rule in rules:
+        if rule.next_release_at != schedule[rule.pk]:
+            rule.next_release_at = schedule[rule.pk]
+            changed.append(rule)
+    # bulk_update no dispara las señales que llaman a esta función.
+    EscrowReleaseRule.objects.bulk_update(changed, ["next_release_at"])
+    return len(changed)
+
+
+def release_due(now=None, batch_size=None, account=None):
+    """Procesa las reglas con `next_release_at` vencido, por lotes.
+
+    Args:
+        account: limita la corrida a una cuenta
+            (`EscrowService.check_automatic_releases`).
+
+    Returns:
+        dict con reglas procesadas, liberaciones, fallos y monto liberado.
+    """
+    from .escrow_integration import EscrowReleaseRule
+
+    now = now or timezone.now()
+    size = batch_size or getattr(
+        settings, "ESCROW_RELEASE_BATCH_SIZE", DEFAULT_BATCH_SIZE
+    )
+    stats = {"rules": 0, "released": 0, "failed": 0, "amount": Decimal("0.00")}
+
+    due = EscrowReleaseRule.objects.filter(next_release_at__lte=now)
+    if account is not None:
+        due = due.filter(escrow_account=account)
+    while True:
+        # Cada regla procesada queda con fecha futura o sin fecha, así que
+        # el siguiente lote no la vuelve a tomar.
+        with transaction.atomic():
+            rules = list(
+                due.select_for_update(skip_locked=True, of=("self",))
+                .select_related("escrow_account")
+                .order_by("next_release_at", "pk")[:size]
+            )
+            for rule in rules:
+                outcome = _release_rule(rule, now)
+                stats["rules"] += 1
+                stats["released"] += outcome["released"]
+                stats["failed"] += outcome["failed"]
+                stats["amount"] += Decimal(outcome["amount"])
+        if len(rules) < size:
+            break
+
+    stats["amount"] = str(stats["amount"])
+    if stats["rules"]:
+        logger.info("Liberaciones automáticas de escrow: %s", stats)
+    return stats
+
+
+def _release_rule(rule, now):
+    """Libera las retenciones vencidas de una regla ya bloqueada."""
+    from .escrow_integration import EscrowReleaseRule, EscrowService
+
+    outcome = {"released": 0, "failed": 0, "amount": "0.00", "errors": []}
+    if is_scheduled(rule):
+        holds = (
+            open_holds([rule.escrow_account_id])
+            .filter(held_until__lte=now - release_delay(rule))
+            .select_related("related_milestone__contract")
+            .order_by("held_until", "pk")
+        )
+        if rule.conditions.get("milestone_type"):
+            holds = holds.filter(
+                related_milestone__milestone_type=rule.conditions["milestone_type"]
+            )
+        percentage = Decimal(str(rule.actions.get("release_percentage", 100)))
+        released = Decimal("0.00")
+        for hold in holds:
+            amount = (hold.amount * percentage / 100).quantize(Decimal("0.01"))
+            try:
+                EscrowService.release_funds_for_milestone(
+                    milestone=hold.related_milestone, release_amount=amount
+                )
+            except Exception as exc:  # noqa: BLE001
+                outcome["failed"] += 1
+                outcome["errors"].append({"hold_id": str(hold.pk), "error": str(exc)})
+                logger.error(f"Error en liberación automática {hold.pk}: {exc}")
+                continue
+            outcome["released"] += 1
+            released += amount
+        outcome["amount"] = str(released)
+
+    next_release_at = _schedule([rule])[rule.pk]
+    if next_release_at is not None and next_release_at <= now:
+        # Quedó algo vencido sin liberar (falló): se reintenta más tarde.
+        delay = getattr(settings, "ESCROW_RELEASE_RETRY_DELAY", DEFAULT_RETRY_DELAY)
+        next_release_at = now + timedelta(seconds=delay)
+    EscrowReleaseRule.objects.filter(pk=rule.pk).update(
+        next_release_at=next_release_at, last_run_at=now, last_outcome=outcome
+    )
+    return outcome
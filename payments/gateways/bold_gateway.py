@@ -20,10 +20,14 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
+from core.http_client import get_client
+
 from .base import BasePaymentGateway, PaymentResult
 
 logger = logging.getLogger(__name__)
 
+http = get_client("bold")
+
 
 class BoldGateway(BasePaymentGateway):
     """
@@ -123,11 +127,10 @@ class BoldGateway(BasePaymentGateway):
                 },
             )
 
-            response = requests.post(
+            response = http.post(
                 f"{self.BASE_URL}/online/link/v1",
                 json=payload,
                 headers=headers,
-                timeout=30,
             )
             response.raise_for_status()
             data = response.json()
@@ -181,10 +184,9 @@ class BoldGateway(BasePaymentGateway):
         """
         headers = self._auth_headers()
         try:
-            response = requests.get(
+            response = http.get(
                 f"{self.BASE_URL}/online/link/v1/{transaction_id}",
                 headers=headers,
-                timeout=30,
             )
             response.raise_for_status()
             data = response.json()
@@ -11,10 +11,16 @@ from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
 
+from django.conf import settings
+
+from core.http_client import get_client
+
 from .base import BasePaymentGateway, PaymentResult
 
 logger = logging.getLogger(__name__)
 
+http = get_client("pse")
+
 
 class PSEGateway(BasePaymentGateway):
     """
@@ -116,11 +122,10 @@ class PSEGateway(BasePaymentGateway):
             # Make API request
             self.log_info(f"Creating PSE payment for {reference}", {"amount": amount})
 
-            response = requests.post(
+            response = http.post(
                 f"{self.base_url}/payments",
                 json=payment_data,
                 headers=headers,
-                timeout=30,
             )
 
             response.raise_for_status()
@@ -175,10 +180,9 @@ class PSEGateway(BasePaymentGateway):
                 "Content-Type": "application/json",
             }
 
-            response = requests.get(
+            response = http.get(
                 f"{self.base_url}/payments/{transaction_id}",
                 headers=headers,
-                timeout=30,
             )
 
             response.raise_for_status()
@@ -246,11 +250,10 @@ class PSEGateway(BasePaymentGateway):
 
             self.log_info(f"Initiating PSE refund for {transaction_id}")
 
-            response = requests.post(
+            response = http.post(
                 f"{self.base_url}/refunds",
                 json=refund_data,
                 headers=headers,
-                timeout=30,
             )
 
             response.raise_for_status()
@@ -352,13 +355,12 @@ class PSEGateway(BasePaymentGateway):
                 "Content-Type": "application/json",
             }
 
-            response = requests.get(
-                f"{self.base_url}/banks", headers=headers, timeout=30
+            return http.get_json(
+                f"{self.base_url}/banks",
+                headers=headers,
+                cache_ttl=getattr(settings, "PAYMENT_BANKS_CACHE_TTL", 3600),
             )
 
-            response.raise_for_status()
-            return response.json()
-
         except Exception as e:
             self.log_error(f"Error fetching PSE banks: {str(e)}")
             return {"banks": []}
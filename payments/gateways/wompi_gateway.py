@@ -10,10 +10,16 @@ from decimal import Decimal
 from typing import Dict, Any, Optional, List
 import logging
 
+from django.conf import settings
+
+from core.http_client import get_client
+
 from .base import BasePaymentGateway, PaymentResult
 
 logger = logging.getLogger(__name__)
 
+http = get_client("wompi")
+
 
 class WompiGateway(BasePaymentGateway):
     """
@@ -178,11 +184,10 @@ class WompiGateway(BasePaymentGateway):
             )
 
             # Make API request
-            response = requests.post(
+            response = http.post(
                 f"{self.base_url}/transactions",
                 json=transaction_data,
                 headers=headers,
-                timeout=30,
             )
 
             response.raise_for_status()
@@ -271,10 +276,9 @@ class WompiGateway(BasePaymentGateway):
                 "Accept": "application/json",
             }
 
-            response = requests.get(
+            response = http.get(
                 f"{self.base_url}/transactions/{transaction_id}",
                 headers=headers,
-                timeout=30,
             )
 
             response.raise_for_status()
@@ -348,10 +352,9 @@ class WompiGateway(BasePaymentGateway):
 
             self.log_info(f"Voiding Wompi transaction {transaction_id}")
 
-            response = requests.post(
+            response = http.post(
                 f"{self.base_url}/transactions/{transaction_id}/void",
                 headers=headers,
-                timeout=30,
             )
 
             response.raise_for_status()
@@ -471,10 +474,9 @@ class WompiGateway(BasePaymentGateway):
         try:
             headers = {"Accept": "application/json"}
 
-            response = requests.get(
+            response = http.get(
                 f"{self.base_url}/merchants/{self.public_key}",
                 headers=headers,
-                timeout=30,
             )
 
             response.raise_for_status()
@@ -497,15 +499,12 @@ class WompiGateway(BasePaymentGateway):
                 "Authorization": f"Bearer {self.public_key}",
             }
 
-            response = requests.get(
+            result = http.get_json(
                 f"{self.base_url}/pse/financial_institutions",
                 headers=headers,
-                timeout=30,
+                cache_ttl=getattr(settings, "PAYMENT_BANKS_CACHE_TTL", 3600),
             )
 
-            response.raise_for_status()
-            result = response.json()
-
             return result.get("data", [])
 
         except Exception as e:
@@ -540,11 +539,10 @@ class WompiGateway(BasePaymentGateway):
                 "Accept": "application/json",
             }
 
-            response = requests.post(
+            response = http.post(
                 f"{self.base_url}/payment_sources",
                 json=data,
                 headers=headers,
-                timeout=30,
             )
 
             response.raise_for_status()
@@ -0,0 +1,182 @@
+"""Costo de calcular la mora de toda la cartera: por fila vs vectorizado.
+
+Arma una cartera sintética de cronogramas (las mismas tuplas que lee
+`payments.arrears.compute()`) y mide dos modos:
+
+- ``per-row``: `RentPaymentSchedule.calculate_late_fee` por cronograma,
+  con su consulta de `LegalInterestRate` en cada llamada. Se mide sobre
+  una muestra (``--sample``) y se extrapola al tamaño de la cartera;
+- ``vectorized``: `ArrearsBatch` sobre toda la cartera, más el armado
+  de las filas pendientes (`pending()`).
+
+Los días de mora del modo por fila se fijan con los del motor, de modo
+que ambos calculan lo mismo (el resultado se verifica). La tasa se
+crea dentro de una transacción que se revierte al final.
+
+Uso:
+
+    python manage.py benchmark_arrears
+    python manage.py benchmark_arrears --schedules 200000 --sample 2000 --json
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from payments import arrears
+from payments.models import LegalInterestRate, RentPaymentSchedule
+
+RATE = Decimal("0.0208")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _portfolio(size: int, reference: date, seed: int = 39) -> list[tuple]:
+    rng = random.Random(seed)
+    rows = []
+    for pk in range(1, size + 1):
+        rows.append(
+            (
+                pk,
+                None,
+                None,
+                Decimal(rng.randrange(50_000_000, 900_000_000)) / 100,
+                rng.randint(1, 31),
+                rng.randint(0, 10),
+                rng.choice((30, 60, 90)),
+                Decimal("50000.00"),
+                rng.random() < 0.9,
+                date(reference.year - 1, 1, 1),
+                None,
+                # ~70 % al día con el período en curso.
+                reference if rng.random() < 0.7 else None,
+            )
+        )
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Compara el cálculo de mora por cronograma y vectorizado."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--schedules",
+            type=int,
+            default=200_000,
+            help="Cronogramas en la cartera sintética (default: 200000).",
+        )
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=2000,
+            help="Cronogramas medidos en el modo por fila (default: 2000).",
+        )
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+
+    def handle(self, *args, **options):
+        schedules, sample = options["schedules"], options["sample"]
+        if schedules < 1 or not 1 <= sample <= schedules:
+            raise CommandError("Se requiere 1 <= --sample <= --schedules")
+        reference = timezone.localdate()
+        rows = _portfolio(schedules, reference)
+        report = {}
+        try:
+            with transaction.atomic():
+                LegalInterestRate.objects.update_or_create(
+                    year=reference.year,
+                    month=reference.month,
+                    defaults={"monthly_rate": RATE, "is_active": True},
+                )
+                report = self._run(rows, sample, reference)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"═══ Mora de {schedules} cronogramas "
+                f"({report['pending']} pendientes) ═══"
+            )
+        )
+        for mode in ("per-row", "vectorized"):
+            row = report[mode]
+            self.stdout.write(
+                f"  {mode:<11} {row['seconds']:>9.3f} s  "
+                f"{row['us_per_schedule']:>8.2f} µs/cronograma  "
+                f"queries {row['queries']}"
+            )
+        self.stdout.write(
+            f"  per-row extrapolado desde {sample} cronogramas; "
+            f"vectorizado ×{report['speedup']:.0f}"
+        )
+
+    def _run(self, rows: list[tuple], sample: int, reference: date) -> dict:
+        rates = arrears.RateTable.load()
+        start = time.perf_counter()
+        batch = arrears.ArrearsBatch(
+            rows, reference, rates.rate_for(reference.year, reference.month)
+        )
+        pending = batch.pending()
+        vectorized = time.perf_counter() - start
+        fees = batch.late_fee_cents
+
+        # Camino previo: una instancia y una consulta de tasa por cronograma.
+        instances = []
+        for row, days in zip(rows[:sample], batch.overdue_days):
+            schedule = RentPaymentSchedule(
+                rent_amount=row[3],
+                due_date=row[4],
+                grace_period_days=row[5],
+                legal_grace_days_max=row[6],
+                late_fee_amount=row[7],
+                auto_late_fee_enabled=row[8],
+            )
+            schedule._benchmark_days = int(days)
+            instances.append(schedule)
+        with (
+            mock.patch.object(
+                RentPaymentSchedule,
+                "overdue_days",
+                lambda self, today=None: self._benchmark_days,
+            ),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            start = time.perf_counter()
+            row_fees = [
+                schedule.calculate_late_fee(reference) for schedule in instances
+            ]
+            per_row = (time.perf_counter() - start) * len(rows) / sample
+
+        expected = [arrears._from_cents(fee) for fee in fees[:sample]]
+        if row_fees != expected:
+            raise CommandError("Los modos no coinciden: revisar payments.arrears")
+
+        def mode(seconds, queries):
+            return {
+                "seconds": seconds,
+                "us_per_schedule": seconds / len(rows) * 1e6,
+                "queries": queries,
+            }
+
+        return {
+            "schedules": len(rows),
+            "pending": len(pending),
+            "per-row": mode(per_row, round(len(queries) * len(rows) / sample)),
+            "vectorized": mode(vectorized, 0),
+            "speedup": per_row / vectorized if vectorized else 0.0,
+        }
@@ -0,0 +1,80 @@
+"""Facturación DIAN por lotes de los pagos de arriendo sin factura.
+
+Ver `payments.dian_batch`. Muestra la corrida y sus métricas por etapa
+(filas y filas/segundo de select, allocate, render y write).
+
+Uso:
+
+    python manage.py dian_batch_invoice                      # hasta ahora
+    python manage.py dian_batch_invoice --cutoff 2026-10-01 --workers 8
+    python manage.py dian_batch_invoice --resume <uuid> --json
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from payments.dian_batch import STAGES, run_batch
+from payments.models import DIANInvoiceBatchRun
+
+
+class Command(BaseCommand):
+    help = "Factura en lotes los pagos de arriendo completados sin factura DIAN."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cutoff",
+            help="Transacciones creadas antes de esta fecha (YYYY-MM-DD).",
+        )
+        parser.add_argument("--chunk-size", type=int, help="Transacciones por lote.")
+        parser.add_argument(
+            "--workers", type=int, help="Procesos para XML, CUFE y firma."
+        )
+        parser.add_argument("--resume", help="ID de una corrida a retomar.")
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+
+    def handle(self, *args, **options):
+        cutoff = None
+        if options["cutoff"]:
+            try:
+                day = datetime.strptime(options["cutoff"], "%Y-%m-%d").date()
+            except ValueError as exc:
+                raise CommandError("--cutoff debe tener formato YYYY-MM-DD") from exc
+            cutoff = timezone.make_aware(datetime.combine(day, time.min))
+        if options["resume"]:
+            if not DIANInvoiceBatchRun.objects.filter(pk=options["resume"]).exists():
+                raise CommandError(f"No existe la corrida {options['resume']}")
+            if cutoff or options["chunk_size"]:
+                raise CommandError("--resume usa el corte y el lote de la corrida")
+
+        run = run_batch(
+            cutoff=cutoff,
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            resume=options["resume"],
+        )
+        summary = run.summary()
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"═══ Facturación DIAN {run.pk} (hasta {run.cutoff:%Y-%m-%d}) ═══"
+            )
+        )
+        self.stdout.write(
+            f"  {run.invoices_created} facturas en {run.chunks_done} lotes"
+            + (f" ({run.first_number} … {run.last_number})" if run.first_number else "")
+        )
+        for stage in STAGES:
+            row = run.metrics.get(stage)
+            if row:
+                self.stdout.write(
+                    f"  {stage:<9} {row['seconds']:>9.3f} s  "
+                    f"{row['rows']:>8} filas  {row.get('per_second', 0):>8}/s"
+                )
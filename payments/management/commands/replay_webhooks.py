@@ -0,0 +1,80 @@
+"""Devuelve webhooks de pasarelas a la cola de procesamiento.
+
+Por defecto toma los descartados (dead letter) de `PaymentWebhookEvent`.
+Reprocesar un evento ya aplicado no cambia nada: los manejadores son
+idempotentes.
+
+Uso:
+
+    python manage.py replay_webhooks                       # todos los "dead"
+    python manage.py replay_webhooks --gateway bold --since 2026-10-01
+    python manage.py replay_webhooks --event <uuid> --event <uuid>
+    python manage.py replay_webhooks --status failed --dry-run
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from payments.models import PaymentWebhookEvent
+from payments.webhook_inbox import replay
+
+
+class Command(BaseCommand):
+    help = "Reprocesa webhooks de pasarelas descartados o seleccionados."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event",
+            action="append",
+            default=[],
+            help="ID (uuid) de un evento; se puede repetir. Ignora --status.",
+        )
+        parser.add_argument(
+            "--status",
+            choices=[code for code, _ in PaymentWebhookEvent.STATUS_CHOICES],
+            default="dead",
+            help="Estado de los eventos a reprocesar (default: dead).",
+        )
+        parser.add_argument(
+            "--gateway",
+            choices=[code for code, _ in PaymentWebhookEvent.GATEWAY_CHOICES],
+        )
+        parser.add_argument(
+            "--since", help="Sólo eventos recibidos desde esta fecha (YYYY-MM-DD)."
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Procesar en línea en vez de encolar en Celery.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Sólo contar los eventos."
+        )
+
+    def handle(self, *args, **options):
+        events = PaymentWebhookEvent.objects.all()
+        if options["event"]:
+            events = events.filter(pk__in=options["event"])
+        else:
+            events = events.filter(status=options["status"])
+        if options["gateway"]:
+            events = events.filter(gateway=options["gateway"])
+        if options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m-%d").date()
+            except ValueError as exc:
+                raise CommandError("--since debe tener formato YYYY-MM-DD") from exc
+            events = events.filter(
+                received_at__gte=timezone.make_aware(datetime.combine(since, time.min))
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(f"{events.count()} webhooks para reprocesar (dry-run)")
+            return
+
+        count = replay(events, asynchronous=False if options["sync"] else None)
+        self.stdout.write(self.style.SUCCESS(f"{count} webhooks devueltos a la cola"))
@@ -0,0 +1,47 @@
+"""Reconstruye el calendario de liberaciones automáticas de escrow.
+
+Recalcula `EscrowReleaseRule.next_release_at` de todas las cuentas (o de
+las indicadas). Las señales lo mantienen al día; este comando sirve
+tras migrar o si se cambiaron datos con `update()` o SQL directo.
+
+Uso:
+
+    python manage.py reschedule_escrow_releases
+    python manage.py reschedule_escrow_releases --account <uuid> --account <uuid>
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from payments.escrow_integration import ContractEscrowAccount
+from payments.escrow_schedule import reschedule_accounts
+
+
+class Command(BaseCommand):
+    help = "Recalcula next_release_at de las reglas de liberación de escrow."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--account",
+            action="append",
+            default=[],
+            help="ID (uuid) de una cuenta de garantía; se puede repetir.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Cuentas por consulta."
+        )
+
+    def handle(self, *args, **options):
+        account_ids = options["account"] or list(
+            ContractEscrowAccount.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        size = options["batch_size"]
+        changed = 0
+        for start in range(0, len(account_ids), size):
+            changed += reschedule_accounts(account_ids[start : start + size])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(account_ids)} cuentas revisadas, {changed} reglas reprogramadas"
+            )
+        )
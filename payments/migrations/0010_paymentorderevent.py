@@ -0,0 +1,119 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:30
+
+from datetime import datetime
+import uuid
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+BATCH_SIZE = 1000
+
+
+def _parse_timestamp(raw):
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(str(raw).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if django.utils.timezone.is_naive(value):
+        value = django.utils.timezone.make_aware(value)
+    return value
+
+
+def _actor_uuid(raw):
+    try:
+        return str(uuid.UUID(str(raw)))
+    except (TypeError, ValueError):
+        return None
+
+
+def explode_audit_logs(apps, schema_editor):
+    """Cada entrada del JSON `PaymentOrder.audit_log` pasa a ser una fila."""
+    PaymentOrder = apps.get_model('payments', 'PaymentOrder')
+    PaymentOrderEvent = apps.get_model('payments', 'PaymentOrderEvent')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    orders = (
+        PaymentOrder.objects.exclude(audit_log=[])
+        .only('id', 'audit_log', 'created_at')
+        .order_by()
+    )
+    known_actors = {}  # id -> existe (el actor pudo haber sido borrado)
+    pending = []
+    for order in orders.iterator(chunk_size=BATCH_SIZE):
+        entries = [e for e in order.audit_log or [] if isinstance(e, dict)]
+        actor_ids = {_actor_uuid(e.get('actor_id')) for e in entries} - {None}
+        unknown = actor_ids - known_actors.keys()
+        if unknown:
+            existing = {
+                str(pk)
+                for pk in User.objects.filter(pk__in=unknown).values_list('pk', flat=True)
+            }
+            known_actors.update((pk, pk in existing) for pk in unknown)
+        for entry in entries:
+            actor_id = _actor_uuid(entry.get('actor_id'))
+            pending.append(
+                PaymentOrderEvent(
+                    order_id=order.id,
+                    event_type=str(entry.get('type') or 'legacy')[:60],
+                    message=str(entry.get('message') or ''),
+                    actor_id=actor_id if known_actors.get(actor_id) else None,
+                    created_at=_parse_timestamp(entry.get('timestamp'))
+                    or order.created_at,
+                )
+            )
+        if len(pending) >= BATCH_SIZE:
+            PaymentOrderEvent.objects.bulk_create(pending)
+            pending = []
+    PaymentOrderEvent.objects.bulk_create(pending)
+
+
+def collapse_audit_logs(apps, schema_editor):
+    """Reverso: reconstruye el JSON a partir de las filas."""
+    PaymentOrder = apps.get_model('payments', 'PaymentOrder')
+    PaymentOrderEvent = apps.get_model('payments', 'PaymentOrderEvent')
+
+    logs = {}
+    for event in PaymentOrderEvent.objects.order_by('order_id', 'created_at', 'id'):
+        logs.setdefault(event.order_id, []).append(
+            {
+                'type': event.event_type,
+                'message': event.message,
+                'actor_id': str(event.actor_id) if event.actor_id else None,
+                'timestamp': event.created_at.isoformat(),
+            }
+        )
+    for order_id, audit_log in logs.items():
+        PaymentOrder.objects.filter(pk=order_id).update(audit_log=audit_log)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('payments', '0009_add_invoice_notes_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentOrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=60, verbose_name='Tipo de evento')),
+                ('message', models.TextField(blank=True, verbose_name='Mensaje')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Fecha')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_order_events', to=settings.AUTH_USER_MODEL, verbose_name='Actor')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='payments.paymentorder', verbose_name='Orden de pago')),
+            ],
+            options={
+                'verbose_name': 'Evento de Orden de Pago',
+                'verbose_name_plural': 'Eventos de Órdenes de Pago',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['order', 'created_at'], name='payments_pa_order_i_121665_idx'), models.Index(fields=['event_type', 'created_at'], name='payments_pa_event_t_10c75b_idx'), models.Index(fields=['created_at'], name='payments_pa_created_15b489_idx')],
+            },
+        ),
+        migrations.RunPython(explode_audit_logs, collapse_audit_logs),
+    ]
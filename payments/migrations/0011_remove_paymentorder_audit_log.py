@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Migración aparte de 0010: en PostgreSQL no se puede alterar la tabla
+    en la misma transacción que dejó chequeos de FK diferidos pendientes."""
+
+    dependencies = [
+        ('payments', '0010_paymentorderevent'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='paymentorder',
+            name='audit_log',
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:58
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0011_remove_paymentorder_audit_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='idempotency_key',
+            field=models.CharField(blank=True, help_text='Ej: auto-charge:<cronograma>:<AAAA-MM>; evita cobros duplicados', max_length=100, null=True, unique=True, verbose_name='Clave de idempotencia'),
+        ),
+        migrations.CreateModel(
+            name='AutoChargeRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('reference_date', models.DateField(verbose_name='Fecha de referencia')),
+                ('status', models.CharField(choices=[('running', 'En curso'), ('completed', 'Completada')], default='running', max_length=20, verbose_name='Estado')),
+                ('chunk_size', models.PositiveIntegerField(verbose_name='Cronogramas por lote')),
+                ('chunks_total', models.PositiveIntegerField(default=0, verbose_name='Lotes')),
+                ('chunks_done', models.JSONField(blank=True, default=list, verbose_name='Lotes terminados')),
+                ('schedules_total', models.PositiveIntegerField(default=0, verbose_name='Cronogramas a cobrar')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Cobrados')),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Omitidos')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='Fallidos')),
+                ('total_charged', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Total cobrado')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Errores')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Inicio')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+            ],
+            options={
+                'verbose_name': 'Corrida de Cobro Automático',
+                'verbose_name_plural': 'Corridas de Cobro Automático',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['reference_date'], name='payments_au_referen_3d076c_idx')],
+            },
+        ),
+    ]
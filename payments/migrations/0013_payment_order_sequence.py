@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0012_auto_charge_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentOrderSequence',
+            fields=[
+                ('year', models.PositiveIntegerField(primary_key=True, serialize=False, verbose_name='Año')),
+                ('last_number', models.PositiveIntegerField(default=0, verbose_name='Último consecutivo')),
+            ],
+            options={
+                'verbose_name': 'Consecutivo de Órdenes de Pago',
+                'verbose_name_plural': 'Consecutivos de Órdenes de Pago',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:49
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0013_payment_order_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentWebhookEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('gateway', models.CharField(choices=[('stripe', 'Stripe'), ('wompi', 'Wompi'), ('bold', 'Bold'), ('pse', 'PSE')], max_length=20, verbose_name='Pasarela')),
+                ('event_id', models.CharField(max_length=255, verbose_name='ID del evento')),
+                ('ordering_key', models.CharField(db_index=True, max_length=255, verbose_name='Clave de orden')),
+                ('payload', models.JSONField(verbose_name='Payload recibido')),
+                ('headers', models.JSONField(blank=True, default=dict, verbose_name='Headers de firma')),
+                ('result', models.JSONField(blank=True, default=dict, verbose_name='Resultado de la pasarela')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('processed', 'Procesado'), ('ignored', 'Ignorado'), ('failed', 'Fallido (reintentando)'), ('dead', 'Descartado (dead letter)')], default='pending', max_length=20, verbose_name='Estado')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('next_attempt_at', models.DateTimeField(blank=True, null=True, verbose_name='Próximo intento')),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Recibido')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Procesado')),
+            ],
+            options={
+                'verbose_name': 'Webhook de Pasarela',
+                'verbose_name_plural': 'Webhooks de Pasarelas',
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(fields=['ordering_key', 'received_at'], name='payments_pa_orderin_d0c091_idx'), models.Index(fields=['status', 'next_attempt_at'], name='payments_pa_status_5f7201_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='paymentwebhookevent',
+            constraint=models.UniqueConstraint(fields=('gateway', 'event_id'), name='unique_webhook_event'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:06
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0014_payment_webhook_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DIANInvoiceBatchRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('cutoff', models.DateTimeField(verbose_name='Transacciones hasta')),
+                ('status', models.CharField(choices=[('running', 'En curso'), ('completed', 'Completada')], default='running', max_length=20, verbose_name='Estado')),
+                ('chunk_size', models.PositiveIntegerField(verbose_name='Transacciones por lote')),
+                ('cursor', models.CharField(blank=True, max_length=64, verbose_name='Última transacción procesada')),
+                ('chunks_done', models.PositiveIntegerField(default=0, verbose_name='Lotes confirmados')),
+                ('invoices_created', models.PositiveIntegerField(default=0, verbose_name='Facturas emitidas')),
+                ('first_number', models.CharField(blank=True, max_length=50, verbose_name='Primera factura')),
+                ('last_number', models.CharField(blank=True, max_length=50, verbose_name='Última factura')),
+                ('metrics', models.JSONField(blank=True, default=dict, verbose_name='Métricas por etapa')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Inicio')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+            ],
+            options={
+                'verbose_name': 'Corrida de Facturación DIAN',
+                'verbose_name_plural': 'Corridas de Facturación DIAN',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DIANInvoiceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(verbose_name='Año')),
+                ('last_number', models.PositiveIntegerField(default=0, verbose_name='Último consecutivo')),
+                ('prefix', models.CharField(max_length=10, verbose_name='Prefijo')),
+            ],
+            options={
+                'verbose_name': 'Consecutivo de Facturas DIAN',
+                'verbose_name_plural': 'Consecutivos de Facturas DIAN',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dianinvoicesequence',
+            constraint=models.UniqueConstraint(fields=('prefix', 'year'), name='unique_dian_invoice_sequence'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='cufe',
+            field=models.CharField(blank=True, max_length=96, verbose_name='CUFE'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='dian_xml',
+            field=models.TextField(blank=True, verbose_name='XML UBL firmado'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0015_dian_invoice_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='escrowreleaserule',
+            name='last_outcome',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='escrowreleaserule',
+            name='last_run_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='escrowreleaserule',
+            name='next_release_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='escrowreleaserule',
+            index=models.Index(fields=['next_release_at'], name='escrow_rele_next_re_edc9a8_idx'),
+        ),
+    ]
@@ -8,6 +8,7 @@ from decimal import Decimal
 import uuid
 
 from django.db import models
+from django.db import transaction as db_transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -262,6 +263,14 @@ class Transaction(models.Model):
 
     # Información adicional
     metadata = models.JSONField("Metadatos adicionales", default=dict, blank=True)
+    idempotency_key = models.CharField(
+        "Clave de idempotencia",
+        max_length=100,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Ej: auto-charge:<cronograma>:<AAAA-MM>; evita cobros duplicados",
+    )
 
     class Meta:
         verbose_name = "Transacción"
@@ -499,6 +508,10 @@ class Invoice(models.Model):
         related_name="invoice",
     )
 
+    # Facturación electrónica DIAN (payments.dian_invoice_service)
+    cufe = models.CharField("CUFE", max_length=96, blank=True)
+    dian_xml = models.TextField("XML UBL firmado", blank=True)
+
     # Archivos
     pdf_file = models.FileField(
         "Archivo PDF", upload_to="invoices/", null=True, blank=True
@@ -902,7 +915,7 @@ class RentPaymentSchedule(models.Model):
         days = (today - dates["date_grace_end"]).days
         return min(days, self.legal_grace_days_max)
 
-    def calculate_late_fee(self, reference_date=None, principal=None):
+    def calculate_late_fee(self, reference_date=None, principal=None, rates=None):
         """Calcula el interés moratorio acumulado a la fecha.
 
         Fórmula (Ley 820/2003 + Superfinanciera):
@@ -912,11 +925,14 @@ class RentPaymentSchedule(models.Model):
 
         Si no hay LegalInterestRate vigente, cae al monto fijo legacy
         `late_fee_amount` (compatibilidad). Si auto_late_fee_enabled es
-        False, retorna 0.
+        False, retorna 0. `rates` (`payments.arrears.RateTable`) evita la
+        consulta de la tasa al calcular muchos cronogramas; para toda la
+        cartera usar `payments.arrears.compute()`.
         """
-        from decimal import Decimal
         from datetime import date
 
+        from .arrears import moratory_interest
+
         if not self.auto_late_fee_enabled:
             return Decimal("0.00")
 
@@ -926,15 +942,16 @@ class RentPaymentSchedule(models.Model):
             return Decimal("0.00")
 
         principal = principal if principal is not None else self.rent_amount
-        rate = LegalInterestRate.get_rate_for(today.year, today.month)
-        if rate is None:
+        if rates is not None:
+            monthly_rate = rates.rate_for(today.year, today.month)
+        else:
+            rate = LegalInterestRate.get_rate_for(today.year, today.month)
+            monthly_rate = rate.monthly_rate if rate else None
+        if monthly_rate is None:
             # Fallback: monto fijo legacy
             return self.late_fee_amount
 
-        daily_rate = rate.monthly_rate / Decimal("30")
-        interest = principal * daily_rate * Decimal(days)
-        # Redondear a 2 decimales (centavos)
-        return interest.quantize(Decimal("0.01"))
+        return moratory_interest(principal, monthly_rate, days)
 
 
 class RentPaymentReminder(models.Model):
@@ -1176,9 +1193,8 @@ class PaymentOrder(models.Model):
         help_text="Transaction de la pasarela cuando se completa el pago.",
     )
 
-    # Auditoría
+    # Auditoría: los eventos viven en PaymentOrderEvent (ver `audit_log`).
     description = models.CharField("Descripción", max_length=255, blank=True)
-    audit_log = models.JSONField("Log de eventos", default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     paid_at = models.DateTimeField(null=True, blank=True)
@@ -1200,10 +1216,12 @@ class PaymentOrder(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            year = timezone.now().year
-            count = PaymentOrder.objects.filter(created_at__year=year).count() + 1
-            self.order_number = f"PO-{year}-{count:08d}"
+            (self.order_number,) = PaymentOrderSequence.reserve(1)
         super().save(*args, **kwargs)
+        pending = self.__dict__.pop("_pending_events", None)
+        if pending:
+            PaymentOrderEvent.objects.bulk_create(pending)
+            getattr(self, "_prefetched_objects_cache", {}).pop("events", None)
 
     @property
     def total_amount(self):
@@ -1222,18 +1240,358 @@ class PaymentOrder(models.Model):
         return today > self.date_due and self.status not in ("paid", "cancelled")
 
     def add_audit_event(self, event_type, message, actor=None, save=True):
-        """Append a structured event to the audit_log."""
-        entry = {
-            "type": event_type,
-            "message": message,
-            "actor_id": str(actor.id) if actor else None,
-            "timestamp": timezone.now().isoformat(),
-        }
-        if not isinstance(self.audit_log, list):
-            self.audit_log = []
-        self.audit_log.append(entry)
+        """Registra un evento en `PaymentOrderEvent` (un INSERT por evento).
+
+        Antes cada evento reescribía el JSON completo de `audit_log`. Con
+        `save=False` el evento se inserta en el próximo `save()` de la orden,
+        junto con los demás cambios del llamador.
+        """
+        self.__dict__.setdefault("_pending_events", []).append(
+            PaymentOrderEvent(
+                order=self,
+                event_type=event_type,
+                message=message,
+                actor=actor,
+            )
+        )
         if save:
-            self.save(update_fields=["audit_log", "updated_at"])
+            self.save(update_fields=["updated_at"])
+
+    @property
+    def audit_log(self):
+        """Eventos de la orden con la forma del antiguo JSONField `audit_log`.
+
+        Usa `prefetch_related("events")` si está disponible.
+        """
+        events = [] if self._state.adding else list(self.events.all())
+        events += self.__dict__.get("_pending_events", [])
+        return [event.as_dict() for event in events]
+
+
+class PaymentOrderEvent(models.Model):
+    """Evento del historial de una PaymentOrder (append-only).
+
+    Reemplaza la lista JSON `PaymentOrder.audit_log`: agregar un evento es
+    un INSERT de tamaño fijo y el historial se consulta por orden, tipo y
+    fecha con índices.
+    """
+
+    order = models.ForeignKey(
+        PaymentOrder,
+        on_delete=models.CASCADE,
+        related_name="events",
+        verbose_name="Orden de pago",
+    )
+    event_type = models.CharField("Tipo de evento", max_length=60)
+    message = models.TextField("Mensaje", blank=True)
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="payment_order_events",
+        verbose_name="Actor",
+    )
+    created_at = models.DateTimeField("Fecha", default=timezone.now, editable=False)
+
+    class Meta:
+        verbose_name = "Evento de Orden de Pago"
+        verbose_name_plural = "Eventos de Órdenes de Pago"
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["order", "created_at"]),
+            models.Index(fields=["event_type", "created_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id} · {self.event_type} · {self.created_at:%Y-%m-%d %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            from django.core.exceptions import ValidationError
+
+            raise ValidationError("Los eventos de una orden de pago no se modifican.")
+        super().save(*args, **kwargs)
+
+    def as_dict(self):
+        """Entrada con la forma del antiguo `PaymentOrder.audit_log`."""
+        return {
+            "type": self.event_type,
+            "message": self.message,
+            "actor_id": str(self.actor_id) if self.actor_id else None,
+            "timestamp": self.created_at.isoformat(),
+        }
+
+
+class YearlySequence(models.Model):
+    """Consecutivo anual con reserva de bloques contiguos.
+
+    Cada fila guarda el último número asignado de su serie y queda
+    bloqueada mientras dura la transacción del llamador: un lote reserva
+    un bloque contiguo con un solo UPDATE, sin huecos. La primera
+    reserva de una serie arranca después del mayor número ya emitido,
+    así los documentos anteriores a la tabla no se repiten.
+    """
+
+    year = models.PositiveIntegerField("Año")
+    last_number = models.PositiveIntegerField("Último consecutivo", default=0)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def _reserve(cls, count, issued, **series):
+        """Aparta `count` números de la fila `series` y devuelve el rango.
+
+        `issued` es el mayor número ya emitido: sólo se evalúa si la
+        fila todavía no existe.
+        """
+        with db_transaction.atomic(savepoint=False):
+            sequence, _ = cls.objects.select_for_update().get_or_create(
+                **series, defaults={"last_number": issued}
+            )
+            first = sequence.last_number + 1
+            sequence.last_number += count
+            sequence.save(update_fields=["last_number"])
+        return range(first, first + count)
+
+    @staticmethod
+    def _last_issued(queryset, field, prefix):
+        """Mayor consecutivo emitido entre los `field` que empiezan por `prefix`."""
+        last = (
+            queryset.filter(**{f"{field}__startswith": prefix})
+            .order_by(f"-{field}")
+            .values_list(field, flat=True)
+            .first()
+        )
+        return int(last.rsplit("-", 1)[1]) if last else 0
+
+
+class PaymentOrderSequence(YearlySequence):
+    """Último consecutivo `PO-YYYY-NNNNNNNN` asignado en cada año.
+
+    Antes cada `PaymentOrder.save` contaba las órdenes del año para
+    armar su número (un COUNT(*) por orden).
+    """
+
+    year = models.PositiveIntegerField("Año", primary_key=True)
+
+    class Meta:
+        verbose_name = "Consecutivo de Órdenes de Pago"
+        verbose_name_plural = "Consecutivos de Órdenes de Pago"
+
+    def __str__(self):
+        return f"PO-{self.year}-{self.last_number:08d}"
+
+    @classmethod
+    def reserve(cls, count, year=None):
+        """Reserva `count` números consecutivos y los devuelve en orden."""
+        year = year or timezone.now().year
+        prefix = f"PO-{year}-"
+        numbers = cls._reserve(
+            count,
+            lambda: cls._last_issued(PaymentOrder.objects, "order_number", prefix),
+            year=year,
+        )
+        return [f"{prefix}{number:08d}" for number in numbers]
+
+
+class DIANInvoiceSequence(YearlySequence):
+    """Último consecutivo de facturas electrónicas DIAN por prefijo y año."""
+
+    prefix = models.CharField("Prefijo", max_length=10)
+
+    class Meta:
+        verbose_name = "Consecutivo de Facturas DIAN"
+        verbose_name_plural = "Consecutivos de Facturas DIAN"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["prefix", "year"], name="unique_dian_invoice_sequence"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.prefix}-{self.year}-{self.last_number:06d}"
+
+    @classmethod
+    def reserve(cls, count, prefix, year=None):
+        """Reserva `count` números `{prefix}-{year}-NNNNNN` consecutivos."""
+        year = year or timezone.now().year
+        series = f"{prefix}-{year}-"
+        numbers = cls._reserve(
+            count,
+            lambda: cls._last_issued(Invoice.objects, "invoice_number", series),
+            prefix=prefix,
+            year=year,
+        )
+        return [f"{series}{number:06d}" for number in numbers]
+
+
+class DIANInvoiceBatchRun(models.Model):
+    """Corrida de facturación DIAN por lotes (`payments.dian_batch`).
+
+    Factura las transacciones de arriendo completadas sin factura hasta
+    `cutoff`, por lotes. Cada lote se confirma junto con el checkpoint
+    (`cursor`, contadores y métricas por etapa), así una corrida
+    interrumpida se retoma desde el último lote confirmado.
+    """
+
+    STATUS_CHOICES = [
+        ("running", "En curso"),
+        ("completed", "Completada"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    cutoff = models.DateTimeField("Transacciones hasta")
+    status = models.CharField(
+        "Estado", max_length=20, choices=STATUS_CHOICES, default="running"
+    )
+    chunk_size = models.PositiveIntegerField("Transacciones por lote")
+    cursor = models.CharField("Última transacción procesada", max_length=64, blank=True)
+    chunks_done = models.PositiveIntegerField("Lotes confirmados", default=0)
+    invoices_created = models.PositiveIntegerField("Facturas emitidas", default=0)
+    first_number = models.CharField("Primera factura", max_length=50, blank=True)
+    last_number = models.CharField("Última factura", max_length=50, blank=True)
+    metrics = models.JSONField("Métricas por etapa", default=dict, blank=True)
+    started_at = models.DateTimeField("Inicio", default=timezone.now, editable=False)
+    finished_at = models.DateTimeField("Fin", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Corrida de Facturación DIAN"
+        verbose_name_plural = "Corridas de Facturación DIAN"
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"Facturación DIAN {self.cutoff:%Y-%m-%d} ({self.get_status_display()})"
+
+    def summary(self):
+        return {
+            "run_id": str(self.pk),
+            "cutoff": self.cutoff.isoformat(),
+            "status": self.status,
+            "chunks": self.chunks_done,
+            "invoices": self.invoices_created,
+            "first_number": self.first_number,
+            "last_number": self.last_number,
+            "metrics": self.metrics,
+        }
+
+
+class AutoChargeRun(models.Model):
+    """Resumen de una corrida de cobros automáticos de arriendo.
+
+    La corrida se reparte en lotes de cronogramas que procesan tareas
+    Celery en paralelo (`payments.auto_charge_service`). Cada lote suma
+    sus contadores al terminar; el último en cerrar envía las
+    notificaciones y marca la corrida como completada.
+    """
+
+    STATUS_CHOICES = [
+        ("running", "En curso"),
+        ("completed", "Completada"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    reference_date = models.DateField("Fecha de referencia")
+    status = models.CharField(
+        "Estado", max_length=20, choices=STATUS_CHOICES, default="running"
+    )
+    chunk_size = models.PositiveIntegerField("Cronogramas por lote")
+    chunks_total = models.PositiveIntegerField("Lotes", default=0)
+    chunks_done = models.JSONField("Lotes terminados", default=list, blank=True)
+    schedules_total = models.PositiveIntegerField("Cronogramas a cobrar", default=0)
+    processed = models.PositiveIntegerField("Cobrados", default=0)
+    skipped = models.PositiveIntegerField("Omitidos", default=0)
+    failed = models.PositiveIntegerField("Fallidos", default=0)
+    total_charged = models.DecimalField(
+        "Total cobrado", max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+    errors = models.JSONField("Errores", default=list, blank=True)
+    started_at = models.DateTimeField("Inicio", default=timezone.now, editable=False)
+    finished_at = models.DateTimeField("Fin", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Corrida de Cobro Automático"
+        verbose_name_plural = "Corridas de Cobro Automático"
+        ordering = ["-started_at"]
+        indexes = [models.Index(fields=["reference_date"])]
+
+    def __str__(self):
+        return f"Cobro automático {self.reference_date} ({self.get_status_display()})"
+
+    def summary(self):
+        return {
+            "run_id": str(self.pk),
+            "reference_date": self.reference_date.isoformat(),
+            "status": self.status,
+            "chunks": self.chunks_total,
+            "schedules": self.schedules_total,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "total_charged": str(self.total_charged),
+        }
+
+
+class PaymentWebhookEvent(models.Model):
+    """Bandeja de entrada de webhooks de pasarelas de pago.
+
+    La vista verifica la firma con `handle_webhook`, guarda el evento con
+    su resultado normalizado y responde 200 de inmediato; la
+    reconciliación corre después en Celery (`payments.webhook_inbox`).
+    (gateway, event_id) es único: las re-entregas de la pasarela no
+    crean un segundo evento. `ordering_key` agrupa los eventos de una
+    misma transacción, que se procesan en orden de llegada.
+    """
+
+    GATEWAY_CHOICES = [
+        ("stripe", "Stripe"),
+        ("wompi", "Wompi"),
+        ("bold", "Bold"),
+        ("pse", "PSE"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "Pendiente"),
+        ("processed", "Procesado"),
+        ("ignored", "Ignorado"),
+        ("failed", "Fallido (reintentando)"),
+        ("dead", "Descartado (dead letter)"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    gateway = models.CharField("Pasarela", max_length=20, choices=GATEWAY_CHOICES)
+    event_id = models.CharField("ID del evento", max_length=255)
+    ordering_key = models.CharField("Clave de orden", max_length=255, db_index=True)
+    payload = models.JSONField("Payload recibido")
+    headers = models.JSONField("Headers de firma", default=dict, blank=True)
+    result = models.JSONField("Resultado de la pasarela", default=dict, blank=True)
+    status = models.CharField(
+        "Estado", max_length=20, choices=STATUS_CHOICES, default="pending"
+    )
+    attempts = models.PositiveIntegerField("Intentos", default=0)
+    last_error = models.TextField("Último error", blank=True)
+    next_attempt_at = models.DateTimeField("Próximo intento", null=True, blank=True)
+    received_at = models.DateTimeField("Recibido", default=timezone.now, editable=False)
+    processed_at = models.DateTimeField("Procesado", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Webhook de Pasarela"
+        verbose_name_plural = "Webhooks de Pasarelas"
+        ordering = ["-received_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["gateway", "event_id"], name="unique_webhook_event"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["ordering_key", "received_at"]),
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_gateway_display()} {self.event_id} ({self.status})"
 
 
 # Importar modelos de escrow integration
@@ -1259,6 +1617,12 @@ try:
         "LegalInterestRate",
         "MAX_USURY_MONTHLY_RATE",
         "PaymentOrder",
+        "PaymentOrderEvent",
+        "PaymentOrderSequence",
+        "AutoChargeRun",
+        "DIANInvoiceSequence",
+        "DIANInvoiceBatchRun",
+        "PaymentWebhookEvent",
         "ContractEscrowAccount",
         "ContractEscrowTransaction",
         "ContractEscrowReleaseRule",
@@ -1279,4 +1643,10 @@ except ImportError:
         "LegalInterestRate",
         "MAX_USURY_MONTHLY_RATE",
         "PaymentOrder",
+        "PaymentOrderEvent",
+        "PaymentOrderSequence",
+        "AutoChargeRun",
+        "DIANInvoiceSequence",
+        "DIANInvoiceBatchRun",
+        "PaymentWebhookEvent",
     ]
@@ -331,7 +331,13 @@ if EscrowReleaseRule:
         class Meta:
             model = EscrowReleaseRule
             fields = "__all__"
-            read_only_fields = ("id", "created_at")
+            read_only_fields = (
+                "id",
+                "created_at",
+                "next_release_at",
+                "last_run_at",
+                "last_outcome",
+            )
 
         def get_is_active(self, obj):
             """Verifica si la regla está activa."""
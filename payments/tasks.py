@@ -66,17 +66,118 @@ def escalate_overdue_payments(self):
 def process_auto_rent_charges(self):
     """
     Tarea diaria para procesar cobros automáticos de arriendo.
-    Busca RentPaymentSchedule con auto_charge_enabled y pago pendiente,
-    crea transacciones y envía confirmaciones/notificaciones de fallo.
+    Busca RentPaymentSchedule con auto_charge_enabled y pago pendiente y
+    encola un `process_auto_charge_chunk` por lote. Las confirmaciones y
+    notificaciones de fallo salen al cerrar el último lote.
     """
     try:
-        from .auto_charge_service import process_auto_charges
+        from .auto_charge_service import start_auto_charge_run
 
         logger.info("Iniciando cobros automáticos de arriendo...")
-        stats = process_auto_charges()
-        logger.info(f"Cobros automáticos completados: {stats}")
-        return stats
+        run = start_auto_charge_run()
+        logger.info(
+            f"Cobros automáticos encolados: {run.schedules_total} cronogramas "
+            f"en {run.chunks_total} lotes (corrida {run.pk})"
+        )
+        return {"run_id": str(run.pk), "chunks": run.chunks_total}
 
     except Exception as exc:
         logger.error(f"Error en process_auto_rent_charges: {exc}")
         raise self.retry(exc=exc)
+
+
+@shared_task(
+    name="payments.tasks.process_auto_charge_chunk",
+    bind=True,
+    acks_late=True,
+    max_retries=3,
+    default_retry_delay=300,
+)
+def process_auto_charge_chunk(self, run_id, index, schedule_ids):
+    """
+    Cobra un lote de cronogramas de una corrida de cobro automático.
+    Idempotente: se puede reintentar o re-entregar sin cobrar dos veces.
+    """
+    try:
+        from .auto_charge_service import charge_chunk
+
+        return charge_chunk(run_id, index, schedule_ids)
+
+    except Exception as exc:
+        logger.error(f"Error en process_auto_charge_chunk {run_id}/{index}: {exc}")
+        raise self.retry(exc=exc)
+
+
+@shared_task(
+    name="payments.tasks.process_webhook_queue",
+    bind=True,
+    acks_late=True,
+    max_retries=None,
+    default_retry_delay=60,
+)
+def process_webhook_queue(self, ordering_key):
+    """
+    Procesa en orden los webhooks pendientes de una transacción.
+    Si la cola queda detenida en un evento fallido se reprograma para su
+    próximo intento; los intentos se cuentan en `PaymentWebhookEvent`.
+    """
+    try:
+        from .webhook_inbox import process_queue
+
+        delay = process_queue(ordering_key)
+
+    except Exception as exc:
+        logger.error(f"Error en process_webhook_queue {ordering_key}: {exc}")
+        raise self.retry(exc=exc)
+
+    if delay is not None:
+        raise self.retry(countdown=delay)
+
+
+@shared_task(name="payments.tasks.retry_webhook_events", ignore_result=True)
+def retry_webhook_events():
+    """Re-encola webhooks con reintento vencido o encolado perdido."""
+    from .webhook_inbox import retry_due
+
+    count = retry_due()
+    if count:
+        logger.info(f"Webhooks re-encolados: {count} transacciones")
+    return count
+
+
+@shared_task(name="payments.tasks.release_due_escrow", ignore_result=True)
+def release_due_escrow():
+    """Libera los fondos de escrow cuyas reglas vencieron (calendario indexado)."""
+    from .escrow_schedule import release_due
+
+    return release_due()
+
+
+@shared_task(
+    name="payments.tasks.run_dian_invoice_batch",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=600,
+)
+def run_dian_invoice_batch(self, resume=None):
+    """
+    Cierre de mes: factura los pagos de arriendo sin factura hasta el
+    inicio del mes en curso. Un reintento retoma la misma corrida desde
+    su último lote confirmado.
+    """
+    from django.utils import timezone
+
+    from .dian_batch import create_run, run_batch
+
+    if resume is None:
+        cutoff = timezone.localtime().replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        resume = create_run(cutoff).pk
+    try:
+        run = run_batch(resume=resume)
+        return run.summary()
+
+    except Exception as exc:
+        logger.error(f"Error en run_dian_invoice_batch {resume}: {exc}")
+        raise self.retry(exc=exc, args=(str(resume),))
@@ -0,0 +1,271 @@
+"""Tests del motor de mora de cartera (`payments.arrears`).
+
+Cubre:
+- Vencimiento del período en curso ajustado al largo del mes
+- Cálculo vectorizado idéntico al de `moratory_interest()` con Decimal
+- Períodos cubiertos por pago, cronogramas sin iniciar o terminados
+- Dos consultas para toda la cartera
+- Cobro automático con la mora calculada por el motor
+- Endpoint /landlord/arrears/ con permisos por rol
+"""
+
+import random
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from contracts.models import Contract
+from payments import arrears
+from payments.auto_charge_service import process_auto_charges
+from payments.models import LegalInterestRate, RentPaymentSchedule, Transaction
+from properties.models import Property
+
+User = get_user_model()
+
+REFERENCE = date(2026, 4, 20)
+RATE = Decimal("0.0208")
+
+
+def _user(email, user_type, is_staff=False):
+    return User.objects.create_user(
+        email=email,
+        password="test1234",
+        first_name=email.split("@")[0],
+        last_name="X",
+        user_type=user_type,
+        is_staff=is_staff,
+    )
+
+
+def _schedule(landlord, n, rent=Decimal(1500000), **kw):
+    tenant = _user(f"arrears-tt{n}@test.com", "tenant")
+    prop = Property.objects.create(
+        landlord=landlord,
+        title=f"Apto {n}",
+        description="x",
+        property_type="apartment",
+        listing_type="rent",
+        rent_price=rent,
+        total_area=60,
+        bedrooms=2,
+        bathrooms=1,
+        city="Bucaramanga",
+        state="Santander",
+        address="X",
+    )
+    contract = Contract.objects.create(
+        primary_party=landlord,
+        secondary_party=tenant,
+        property=prop,
+        contract_type="rental_urban",
+        title=f"Contrato {n}",
+        monthly_rent=rent,
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 12, 31),
+    )
+    defaults = {
+        "rent_amount": rent,
+        "due_date": 1,
+        "grace_period_days": 5,
+        "legal_grace_days_max": 30,
+        "start_date": date(2026, 1, 1),
+    }
+    defaults.update(kw)
+    return RentPaymentSchedule.objects.create(
+        contract=contract, tenant=tenant, landlord=landlord, **defaults
+    )
+
+
+def _row(pk, rent, due_day=1, grace=5, max_days=30, auto_fee=True, last_paid=None):
+    return (
+        pk,
+        None,
+        None,
+        rent,
+        due_day,
+        grace,
+        max_days,
+        Decimal(50000),
+        auto_fee,
+        date(2025, 1, 1),
+        None,
+        last_paid,
+    )
+
+
+class ArrearsBatchTests(TestCase):
+    """Cálculo en memoria, sin base de datos."""
+
+    def test_due_dates_clamp_to_month_length(self):
+        due_day = np.array([31, 15, 1, 0])
+        self.assertEqual(
+            arrears.period_due_dates(due_day, date(2026, 2, 20)).tolist(),
+            [date(2026, 1, 31), date(2026, 2, 15), date(2026, 2, 1), date(2026, 2, 1)],
+        )
+        self.assertEqual(
+            arrears.period_due_dates(due_day, date(2026, 3, 5)).tolist(),
+            [date(2026, 2, 28), date(2026, 2, 15), date(2026, 3, 1), date(2026, 3, 1)],
+        )
+
+    def test_matches_decimal_formula(self):
+        rng = random.Random(39)
+        rows = [
+            _row(
+                i,
+                Decimal(rng.randrange(100_000, 900_000_000)) / 100,
+                due_day=rng.randint(1, 31),
+                grace=rng.randint(0, 10),
+                max_days=rng.randint(1, 60),
+            )
+            for i in range(2000)
+        ]
+        for rate in (RATE, Decimal("0.0175"), Decimal("0.0208333333333333333333")):
+            batch = arrears.ArrearsBatch(rows, REFERENCE, rate)
+            for row in batch:
+                self.assertEqual(
+                    row.late_fee,
+                    arrears.moratory_interest(row.rent_amount, rate, row.overdue_days),
+                )
+            self.assertGreater(batch.summary()["overdue"], 0)
+
+    def test_overdue_days_are_capped_and_coverage_respected(self):
+        batch = arrears.ArrearsBatch(
+            [
+                _row(1, Decimal(1000000)),
+                _row(2, Decimal(1000000), max_days=10),
+                _row(3, Decimal(1000000), last_paid=date(2026, 4, 3)),
+                _row(4, Decimal(1000000), auto_fee=False),
+                _row(5, Decimal(1000000), due_day=18),
+            ],
+            REFERENCE,
+            RATE,
+        )
+        rows = {row.schedule_id: row for row in batch}
+        self.assertEqual(rows[1].date_due, date(2026, 4, 1))
+        self.assertEqual(rows[1].date_grace_end, date(2026, 4, 6))
+        self.assertEqual(rows[1].date_max_overdue, date(2026, 5, 6))
+        self.assertEqual(rows[1].overdue_days, 14)
+        self.assertEqual(rows[2].overdue_days, 10)
+        self.assertFalse(rows[3].pending)
+        self.assertEqual(rows[3].total_due, Decimal("0.00"))
+        self.assertEqual(rows[4].overdue_days, 14)
+        self.assertEqual(rows[4].late_fee, Decimal("0.00"))
+        self.assertTrue(rows[5].pending)
+        self.assertFalse(rows[5].is_overdue)  # dentro de la gracia
+        self.assertEqual([row.schedule_id for row in batch.pending()][:2], [1, 4])
+
+    def test_fallback_amount_without_legal_rate(self):
+        batch = arrears.ArrearsBatch([_row(1, Decimal(1000000))], REFERENCE, None)
+        self.assertEqual(batch.get(1).late_fee, Decimal("50000.00"))
+
+    def test_empty_portfolio(self):
+        batch = arrears.ArrearsBatch([], REFERENCE, RATE)
+        self.assertEqual(list(batch), [])
+        self.assertEqual(batch.summary()["total_due"], Decimal("0.00"))
+
+
+class ArrearsQueryTests(TestCase):
+    def setUp(self):
+        LegalInterestRate.objects.update_or_create(
+            year=2026, month=4, defaults={"monthly_rate": RATE}
+        )
+        self.landlord = _user("arrears-ll@test.com", "landlord")
+        self.schedules = [_schedule(self.landlord, n) for n in range(3)]
+
+    def test_portfolio_in_two_queries(self):
+        with self.assertNumQueries(2):
+            batch = arrears.compute(reference_date=REFERENCE)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.summary()["late_fees"], Decimal("43680.00"))
+
+    def test_schedule_outside_its_dates_owes_nothing(self):
+        _schedule(self.landlord, 10, start_date=date(2026, 4, 15))
+        _schedule(self.landlord, 11, end_date=date(2026, 3, 31))
+        batch = arrears.compute(reference_date=REFERENCE)
+        self.assertEqual(batch.summary()["pending"], 3)
+
+    def test_calculate_late_fee_with_rate_table(self):
+        schedule = self.schedules[0]
+        rates = arrears.RateTable.load()
+        with (
+            patch.object(schedule, "get_next_due_date", return_value=date(2026, 4, 1)),
+            self.assertNumQueries(0),
+        ):
+            fee = schedule.calculate_late_fee(REFERENCE, rates=rates)
+        self.assertEqual(fee, Decimal("14560.00"))
+
+
+class AutoChargeArrearsTests(TestCase):
+    def setUp(self):
+        LegalInterestRate.objects.update_or_create(
+            year=2026, month=4, defaults={"monthly_rate": RATE}
+        )
+        landlord = _user("charge-ll@test.com", "landlord")
+        self.schedule = _schedule(landlord, 20, auto_charge_enabled=True)
+        self.paid = _schedule(
+            landlord, 21, auto_charge_enabled=True, last_payment_date=date(2026, 4, 2)
+        )
+
+    @patch("payments.auto_charge_service.timezone.localdate", return_value=REFERENCE)
+    def test_charges_rent_plus_interest_once(self, _localdate):
+        summary = process_auto_charges()
+        self.assertEqual((summary["processed"], summary["failed"]), (1, 0))
+        transaction = Transaction.objects.get(contract=self.schedule.contract)
+        self.assertEqual(transaction.amount, Decimal("1500000.00"))
+        self.assertEqual(transaction.total_amount, Decimal("1514560.00"))
+        self.assertEqual(transaction.metadata["overdue_days"], 14)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.last_payment_date, REFERENCE)
+
+        self.assertEqual(process_auto_charges()["processed"], 0)
+
+
+class LandlordArrearsReportTests(TestCase):
+    URL = "/api/v1/payments/landlord/arrears/"
+
+    def setUp(self):
+        LegalInterestRate.objects.update_or_create(
+            year=2026, month=4, defaults={"monthly_rate": RATE}
+        )
+        self.landlord = _user("report-ll@test.com", "landlord")
+        self.other = _user("report-other@test.com", "landlord")
+        self.late = _schedule(self.landlord, 30)
+        _schedule(self.landlord, 31, last_payment_date=date(2026, 4, 1))
+        _schedule(self.other, 32)
+        self.client = APIClient()
+
+    def test_landlord_sees_own_pending_schedules(self):
+        self.client.force_authenticate(self.landlord)
+        response = self.client.get(self.URL, {"date": "2026-04-20"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["summary"]["schedules"], 2)
+        self.assertEqual(len(response.data["results"]), 1)
+        row = response.data["results"][0]
+        self.assertEqual(row["schedule_id"], self.late.pk)
+        self.assertEqual(row["overdue_days"], 14)
+        self.assertEqual(row["late_fee"], Decimal("14560.00"))
+        self.assertEqual(row["property"], "Apto 30")
+
+    def test_only_staff_can_query_another_landlord(self):
+        self.client.force_authenticate(self.landlord)
+        response = self.client.get(
+            self.URL, {"date": "2026-04-20", "landlord": str(self.other.pk)}
+        )
+        self.assertEqual(response.data["summary"]["schedules"], 2)
+
+        self.client.force_authenticate(_user("report-admin@test.com", "landlord", True))
+        response = self.client.get(
+            self.URL, {"date": "2026-04-20", "landlord": str(self.other.pk)}
+        )
+        self.assertEqual(response.data["summary"]["schedules"], 1)
+
+    def test_invalid_parameters(self):
+        self.client.force_authenticate(self.landlord)
+        response = self.client.get(self.URL, {"date": "20-04-2026"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,199 @@
+"""Tests de las corridas de cobro automático por lotes.
+
+Cubre:
+- Corrida repartida en lotes con resumen en AutoChargeRun
+- Notificaciones enviadas una vez, al cerrar el último lote
+- Lotes re-entregados y claves de idempotencia ya usadas
+- Fallos por cronograma sin abortar el lote
+- Encolado por lote y caída en línea sin broker
+- Varios workers sobre los mismos cronogramas (PostgreSQL)
+"""
+
+import threading
+import unittest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from payments import auto_charge_service
+from payments.models import AutoChargeRun, LegalInterestRate, Transaction
+from payments.tests.test_arrears import RATE, REFERENCE, _schedule, _user
+
+
+def _portfolio(size):
+    LegalInterestRate.objects.update_or_create(
+        year=2026, month=4, defaults={"monthly_rate": RATE}
+    )
+    landlord = _user("runner-ll@test.com", "landlord")
+    return [_schedule(landlord, 100 + n, auto_charge_enabled=True) for n in range(size)]
+
+
+class AutoChargeRunTests(TestCase):
+    def setUp(self):
+        self.schedules = _portfolio(5)
+        mail.outbox.clear()  # correos de alta de usuarios y contratos
+
+    def test_run_in_chunks_with_summary_and_bulk_notifications(self):
+        with patch(
+            "payments.auto_charge_service.get_connection",
+            wraps=auto_charge_service.get_connection,
+        ) as get_connection:
+            summary = auto_charge_service.process_auto_charges(REFERENCE, chunk_size=2)
+
+        self.assertEqual(summary["chunks"], 3)
+        self.assertEqual(summary["schedules"], 5)
+        self.assertEqual(summary["processed"], 5)
+        self.assertEqual(summary["status"], "completed")
+        self.assertEqual(summary["total_charged"], str(Decimal("1514560.00") * 5))
+        run = AutoChargeRun.objects.get()
+        self.assertEqual(sorted(run.chunks_done), [0, 1, 2])
+        self.assertIsNotNone(run.finished_at)
+
+        tx = Transaction.objects.get(contract=self.schedules[0].contract)
+        self.assertEqual(
+            tx.idempotency_key, f"auto-charge:{self.schedules[0].pk}:2026-04"
+        )
+        self.assertEqual(tx.metadata["auto_charge_run"], str(run.pk))
+        self.assertEqual(len(mail.outbox), 10)  # arrendatario + arrendador
+        get_connection.assert_called_once()
+
+    def test_redelivered_chunk_does_not_charge_or_count_twice(self):
+        auto_charge_service.process_auto_charges(REFERENCE, chunk_size=2)
+        run = AutoChargeRun.objects.get()
+        ids = [schedule.pk for schedule in self.schedules[:2]]
+        mail.outbox.clear()
+
+        result = auto_charge_service.charge_chunk(str(run.pk), 0, ids)
+
+        self.assertEqual((result["processed"], result["skipped"]), (0, 2))
+        self.assertEqual(Transaction.objects.count(), 5)
+        run.refresh_from_db()
+        self.assertEqual(run.processed, 5)
+        self.assertEqual(len(run.chunks_done), 3)
+        self.assertEqual(mail.outbox, [])
+
+    def test_existing_idempotency_key_skips_the_charge(self):
+        schedule = self.schedules[0]
+        Transaction.objects.create(
+            transaction_number="TX-MANUAL-1",
+            idempotency_key=auto_charge_service.idempotency_key(
+                schedule.pk, date(2026, 4, 1)
+            ),
+            transaction_type="rent_payment",
+            amount=Decimal(1500000),
+            total_amount=Decimal(1500000),
+            payer=schedule.tenant,
+            payee=schedule.landlord,
+            description="Pago registrado a mano",
+        )
+
+        summary = auto_charge_service.process_auto_charges(REFERENCE)
+
+        self.assertEqual((summary["processed"], summary["skipped"]), (4, 1))
+        self.assertEqual(Transaction.objects.filter(payer=schedule.tenant).count(), 1)
+
+    def test_failure_is_recorded_and_tenant_notified(self):
+        broken = self.schedules[1]
+        create = Transaction.objects.create
+
+        def flaky_create(**kwargs):
+            if kwargs["payer"] == broken.tenant:
+                raise ValueError("pasarela caída")
+            return create(**kwargs)
+
+        with patch.object(Transaction.objects, "create", side_effect=flaky_create):
+            summary = auto_charge_service.process_auto_charges(REFERENCE)
+
+        self.assertEqual((summary["processed"], summary["failed"]), (4, 1))
+        run = AutoChargeRun.objects.get()
+        self.assertEqual(
+            run.errors, [{"schedule_id": broken.pk, "error": "pasarela caída"}]
+        )
+        broken.refresh_from_db()
+        self.assertIsNone(broken.last_payment_date)
+        failures = [m for m in mail.outbox if "Error" in m.subject]
+        self.assertEqual([m.to for m in failures], [[broken.tenant.email]])
+
+    def test_empty_run_completes(self):
+        summary = auto_charge_service.process_auto_charges(date(2025, 12, 20))
+        self.assertEqual(Transaction.objects.count(), 0)
+        self.assertEqual((summary["chunks"], summary["status"]), (0, "completed"))
+
+
+@override_settings(AUTO_CHARGE_ASYNC=True, AUTO_CHARGE_CHUNK_SIZE=2)
+class AutoChargeDispatchTests(TestCase):
+    def setUp(self):
+        self.schedules = _portfolio(3)
+
+    @patch("payments.tasks.process_auto_charge_chunk.delay")
+    def test_one_task_per_chunk(self, delay):
+        run = auto_charge_service.start_auto_charge_run(REFERENCE)
+        self.assertEqual(delay.call_count, 2)
+        run_id, index, ids = delay.call_args_list[1].args
+        self.assertEqual((run_id, index), (str(run.pk), 1))
+        self.assertEqual(ids, [self.schedules[2].pk])
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    @patch(
+        "payments.tasks.process_auto_charge_chunk.delay",
+        side_effect=ConnectionError("sin broker"),
+    )
+    def test_without_broker_chunks_run_inline(self, _delay):
+        run = auto_charge_service.start_auto_charge_run(REFERENCE)
+        run.refresh_from_db()
+        self.assertEqual((run.processed, run.status), (3, "completed"))
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "requiere PostgreSQL")
+class ConcurrentAutoChargeTests(TransactionTestCase):
+    WORKERS = 4
+
+    def setUp(self):
+        self.schedules = _portfolio(12)
+        mail.outbox.clear()
+
+    def test_parallel_workers_never_double_charge(self):
+        ids = [schedule.pk for schedule in self.schedules]
+        run = AutoChargeRun.objects.create(
+            reference_date=REFERENCE,
+            chunk_size=len(ids),
+            chunks_total=1,
+            schedules_total=len(ids),
+        )
+        barrier = threading.Barrier(self.WORKERS)
+        results, errors = [], []
+
+        def worker(order):
+            try:
+                barrier.wait()
+                results.append(auto_charge_service.charge_chunk(str(run.pk), 0, order))
+            except Exception as exc:  # noqa: BLE001
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        # Mismos cronogramas, en distinto orden por worker.
+        threads = [
+            threading.Thread(target=worker, args=(ids[i:] + ids[:i],))
+            for i in range(self.WORKERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(r["processed"] for r in results), len(ids))
+        self.assertEqual(
+            Transaction.objects.filter(metadata__auto_charge_run=str(run.pk)).count(),
+            len(ids),
+        )
+        run.refresh_from_db()
+        self.assertEqual(run.processed, len(ids))
+        self.assertEqual(run.chunks_done, [0])
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(len(mail.outbox), 2 * len(ids))
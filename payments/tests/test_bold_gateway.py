@@ -55,7 +55,7 @@ class BoldConfigTests(TestCase):
 
 
 class BoldCreatePaymentTests(TestCase):
-    @patch("payments.gateways.bold_gateway.requests.post")
+    @patch("payments.gateways.bold_gateway.http.post")
     def test_create_payment_success(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.raise_for_status.return_value = None
@@ -86,7 +86,7 @@ class BoldCreatePaymentTests(TestCase):
             result.metadata["checkout_url"], "https://checkout.bold.co/payment/LNK_TEST"
         )
 
-    @patch("payments.gateways.bold_gateway.requests.post")
+    @patch("payments.gateways.bold_gateway.http.post")
     def test_create_payment_api_error(self, mock_post):
         import requests as req_lib
 
@@ -109,7 +109,7 @@ class BoldCreatePaymentTests(TestCase):
         self.assertEqual(result.error_code, "BOLD_API_ERROR")
         self.assertIn("API key inválido", result.error_message)
 
-    @patch("payments.gateways.bold_gateway.requests.post")
+    @patch("payments.gateways.bold_gateway.http.post")
     def test_create_payment_network_error(self, mock_post):
         import requests as req_lib
 
@@ -128,7 +128,7 @@ class BoldCreatePaymentTests(TestCase):
         self.assertFalse(result.success)
         self.assertEqual(result.error_code, "NETWORK_ERROR")
 
-    @patch("payments.gateways.bold_gateway.requests.post")
+    @patch("payments.gateways.bold_gateway.http.post")
     def test_payload_uses_integer_pesos(self, mock_post):
         """Bold espera monto en pesos enteros, no centavos."""
         mock_resp = MagicMock()
@@ -158,7 +158,7 @@ class BoldCreatePaymentTests(TestCase):
 
 
 class BoldConfirmPaymentTests(TestCase):
-    @patch("payments.gateways.bold_gateway.requests.get")
+    @patch("payments.gateways.bold_gateway.http.get")
     def test_confirm_approved(self, mock_get):
         mock_resp = MagicMock()
         mock_resp.raise_for_status.return_value = None
@@ -179,7 +179,7 @@ class BoldConfirmPaymentTests(TestCase):
         self.assertEqual(result.status, "completed")
         self.assertEqual(result.amount, Decimal("500000"))
 
-    @patch("payments.gateways.bold_gateway.requests.get")
+    @patch("payments.gateways.bold_gateway.http.get")
     def test_confirm_pending(self, mock_get):
         mock_resp = MagicMock()
         mock_resp.raise_for_status.return_value = None
@@ -0,0 +1,180 @@
+"""Tests de la facturación DIAN por lotes (`payments.dian_batch`).
+
+Cubre:
+- Sólo pagos de arriendo completados, sin factura y anteriores al corte
+- Consecutivos en bloque, contiguos y a continuación de los emitidos
+- XML firmado y CUFE guardados coinciden con `calculate_cufe`
+- Consultas por lote constantes (no por factura)
+- Checkpoints: una corrida interrumpida se retoma sin huecos
+- Pool de procesos: mismo resultado que en línea
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from payments import dian_batch
+from payments.dian_invoice_service import (
+    calculate_cufe,
+    create_dian_invoice_from_transaction,
+    generate_invoice_number,
+)
+from payments.models import (
+    DIANInvoiceBatchRun,
+    DIANInvoiceSequence,
+    Invoice,
+    InvoiceItem,
+    Transaction,
+)
+
+User = get_user_model()
+
+
+class DIANBatchTests(TestCase):
+    def setUp(self):
+        self.tenant = User.objects.create_user(
+            email="tenant@dian.test",
+            password="test1234",
+            first_name="Ana & Co",
+            last_name="<Inquilina>",
+            user_type="tenant",
+        )
+        self.landlord = User.objects.create_user(
+            email="landlord@dian.test",
+            password="test1234",
+            first_name="Beto",
+            last_name="Dueño",
+            user_type="landlord",
+        )
+        self.year = timezone.now().year
+
+    def _payments(self, count, **kwargs):
+        fields = {
+            "payer": self.tenant,
+            "payee": self.landlord,
+            "transaction_type": "rent_payment",
+            "direction": "inbound",
+            "status": "completed",
+            "amount": Decimal("1500000"),
+            "total_amount": Decimal("1500000"),
+        }
+        fields.update(kwargs)
+        start = Transaction.objects.count()
+        return [
+            Transaction.objects.create(transaction_number=f"TX-{start + n}", **fields)
+            for n in range(count)
+        ]
+
+    def test_invoices_pending_rent_payments_in_one_block(self):
+        paid = self._payments(5)
+        self._payments(1, status="pending")
+        self._payments(1, transaction_type="service_payment")
+        create_dian_invoice_from_transaction(self._payments(1)[0])
+
+        run = dian_batch.run_batch(chunk_size=2)
+
+        self.assertEqual(run.status, "completed")
+        self.assertEqual((run.invoices_created, run.chunks_done), (5, 3))
+        numbers = sorted(
+            Invoice.objects.filter(transaction__in=paid).values_list(
+                "invoice_number", flat=True
+            )
+        )
+        self.assertEqual(numbers, [f"VH-{self.year}-{n:06d}" for n in range(2, 7)])
+        self.assertEqual((run.first_number, run.last_number), (numbers[0], numbers[-1]))
+        self.assertEqual(InvoiceItem.objects.count(), 6)
+        for stage in dian_batch.STAGES:
+            self.assertEqual(run.metrics[stage]["rows"], 5)
+
+        # Una segunda corrida no encuentra nada pendiente.
+        self.assertEqual(dian_batch.run_batch().invoices_created, 0)
+
+    def test_cutoff_excludes_later_payments(self):
+        self._payments(2)
+        cutoff = timezone.now()
+        Transaction.objects.update(created_at=cutoff - timedelta(days=1))
+        self._payments(1)
+        self.assertEqual(dian_batch.run_batch(cutoff=cutoff).invoices_created, 2)
+
+    def test_stored_xml_and_cufe_match_the_invoice(self):
+        self._payments(1)
+        dian_batch.run_batch()
+
+        invoice = Invoice.objects.get()
+        self.assertEqual(invoice.cufe, calculate_cufe(invoice))
+        self.assertIn(f"<cbc:ID>{invoice.invoice_number}</cbc:ID>", invoice.dian_xml)
+        self.assertIn("Ana &amp; Co &lt;Inquilina&gt;", invoice.dian_xml)
+        self.assertIn("XAdES-BES signature pending", invoice.dian_xml)
+
+    def test_queries_do_not_grow_with_invoices(self):
+        def queries_for(count):
+            Invoice.objects.all().delete()
+            Transaction.objects.all().delete()
+            self._payments(count)
+            with CaptureQueriesContext(connection) as queries:
+                dian_batch.run_batch(chunk_size=100)
+            return len(queries)
+
+        queries_for(1)  # crea la fila del consecutivo del año
+        self.assertEqual(queries_for(3), queries_for(30))
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        self._payments(6)
+        render = dian_batch.render_document
+        calls = []
+
+        def flaky(context, document):
+            calls.append(document["invoice_number"])
+            if len(calls) == 3:
+                raise RuntimeError("worker caído")
+            return render(context, document)
+
+        with (
+            patch.object(dian_batch, "render_document", flaky),
+            self.assertRaises(RuntimeError),
+        ):
+            dian_batch.run_batch(chunk_size=2)
+
+        run = DIANInvoiceBatchRun.objects.get()
+        self.assertEqual(
+            (run.status, run.chunks_done, run.invoices_created), ("running", 1, 2)
+        )
+        self.assertEqual(Invoice.objects.count(), 2)
+
+        run = dian_batch.run_batch(resume=run.pk)
+        self.assertEqual((run.status, run.invoices_created), ("completed", 6))
+        numbers = sorted(Invoice.objects.values_list("invoice_number", flat=True))
+        self.assertEqual(numbers, [f"VH-{self.year}-{n:06d}" for n in range(1, 7)])
+
+    def test_sequence_continues_after_issued_numbers(self):
+        invoice = create_dian_invoice_from_transaction(self._payments(1)[0])
+        Invoice.objects.filter(pk=invoice.pk).update(
+            invoice_number=f"VH-{self.year}-000041"
+        )
+        DIANInvoiceSequence.objects.all().delete()
+        self.assertEqual(generate_invoice_number(), f"VH-{self.year}-000042")
+
+    def test_each_prefix_has_its_own_sequence(self):
+        self.assertEqual(
+            DIANInvoiceSequence.reserve(2, "NC", year=self.year),
+            [f"NC-{self.year}-000001", f"NC-{self.year}-000002"],
+        )
+        self.assertEqual(generate_invoice_number(), f"VH-{self.year}-000001")
+        self.assertEqual(
+            DIANInvoiceSequence.reserve(1, "NC", year=self.year),
+            [f"NC-{self.year}-000003"],
+        )
+
+    def test_process_pool_matches_inline_rendering(self):
+        self._payments(4)
+        run = dian_batch.run_batch(workers=2)
+        self.assertEqual(run.invoices_created, 4)
+        for invoice in Invoice.objects.all():
+            self.assertEqual(invoice.cufe, calculate_cufe(invoice))
+            self.assertIn("</Invoice>", invoice.dian_xml)
@@ -0,0 +1,253 @@
+"""Tests del calendario de liberaciones automáticas de escrow.
+
+Cubre:
+- `next_release_at` al retener fondos y al cambiar hitos, reglas o cuenta
+- Liberación de las reglas vencidas con resultado en `last_outcome`
+- Fallos con reintento diferido y corridas sin nada vencido
+- Comando de reconstrucción y tarea periódica
+- Varios workers sobre las mismas reglas (PostgreSQL)
+"""
+
+import threading
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from contracts.colombian_contracts import ColombianContract, ContractMilestone
+from matching.models import MatchRequest
+from payments import escrow_schedule
+from payments.escrow_integration import (
+    EscrowReleaseRule,
+    EscrowService,
+    EscrowTransaction,
+)
+from payments.tasks import release_due_escrow
+from properties.models import Property
+
+User = get_user_model()
+
+RENT = Decimal("1500000.00")
+
+
+def _escrow(suffix, hold_until):
+    """Cuenta con reglas por defecto y el canon retenido hasta `hold_until`."""
+    landlord = User.objects.create_user(
+        email=f"escrow-ll{suffix}@test.com",
+        password="Testpass123!",
+        user_type="landlord",
+    )
+    tenant = User.objects.create_user(
+        email=f"escrow-tn{suffix}@test.com",
+        password="Testpass123!",
+        user_type="tenant",
+    )
+    prop = Property.objects.create(
+        landlord=landlord,
+        title=f"Apartamento {suffix}",
+        description="Apartamento de prueba",
+        property_type="apartment",
+        status="rented",
+        address="Calle 10 #20-30",
+        city="Bogotá",
+        state="Cundinamarca",
+        country="Colombia",
+        rent_price=RENT,
+        bedrooms=2,
+        bathrooms=Decimal("1.0"),
+        total_area=Decimal("60.00"),
+    )
+    match = MatchRequest.objects.create(
+        property=prop,
+        tenant=tenant,
+        landlord=landlord,
+        tenant_message="Interesado",
+        status="accepted",
+    )
+    contract = ColombianContract.objects.create(
+        match_request=match,
+        contract_type="ARR_VIV_URB",
+        landlord_id_type="CC",
+        landlord_id_number=f"10{suffix}",
+        tenant_id_type="CC",
+        tenant_id_number=f"20{suffix}",
+        monthly_rent=RENT,
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 12, 31),
+        created_by=landlord,
+    )
+    milestone = ContractMilestone.objects.create(
+        contract=contract,
+        milestone_type="PAGO_MENSUAL",
+        description="Canon de octubre",
+        due_date=date(2026, 10, 5),
+        amount=RENT,
+    )
+    account = EscrowService.create_escrow_for_contract(contract)
+    EscrowService.deposit_funds(account, RENT, tenant, "Canon", "card")
+    EscrowService.hold_funds_for_milestone(milestone, RENT, hold_until)
+    return account, milestone
+
+
+def _rules(account):
+    rules = {rule.rule_type: rule for rule in account.release_rules.all()}
+    return rules["TIME_BASED"], rules["MILESTONE_BASED"]
+
+
+class ReleaseScheduleTests(TestCase):
+    def setUp(self):
+        self.hold_until = timezone.now() - timedelta(hours=30)
+        self.account, self.milestone = _escrow("1", self.hold_until)
+        self.timed, self.manual = _rules(self.account)
+
+    def test_hold_schedules_only_time_based_rules(self):
+        self.assertEqual(
+            self.timed.next_release_at, self.hold_until + timedelta(hours=24)
+        )
+        self.assertIsNone(self.manual.next_release_at)
+
+    def test_schedule_follows_milestones_rules_and_account(self):
+        self.milestone.status = "CANCELLED"
+        self.milestone.save()
+        self.timed.refresh_from_db()
+        self.assertIsNone(self.timed.next_release_at)
+
+        self.milestone.status = "PENDING"
+        self.milestone.save()
+        self.timed.conditions["auto_release_after_hours"] = 48
+        self.timed.save()
+        self.timed.refresh_from_db()
+        self.assertEqual(
+            self.timed.next_release_at, self.hold_until + timedelta(hours=48)
+        )
+
+        self.account.status = "FROZEN"
+        self.account.save()
+        self.timed.refresh_from_db()
+        self.assertIsNone(self.timed.next_release_at)
+
+    def test_release_due_releases_and_records_outcome(self):
+        stats = escrow_schedule.release_due()
+
+        self.assertEqual(
+            stats, {"rules": 1, "released": 1, "failed": 0, "amount": "1500000.00"}
+        )
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.held_balance, 0)
+        self.assertEqual(self.account.released_balance, RENT)
+        self.milestone.refresh_from_db()
+        self.assertEqual(self.milestone.status, "COMPLETED")
+        self.timed.refresh_from_db()
+        self.assertIsNone(self.timed.next_release_at)
+        self.assertEqual(self.timed.last_outcome["released"], 1)
+        self.assertIsNotNone(self.timed.last_run_at)
+
+        # Nada vencido: la segunda corrida no libera otra vez.
+        self.assertEqual(escrow_schedule.release_due()["rules"], 0)
+        self.assertEqual(
+            EscrowTransaction.objects.filter(transaction_type="RELEASE").count(), 1
+        )
+
+    def test_not_yet_due_is_left_alone(self):
+        stats = escrow_schedule.release_due(now=self.hold_until + timedelta(hours=23))
+        self.assertEqual(stats["rules"], 0)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.held_balance, RENT)
+
+    @override_settings(ESCROW_RELEASE_RETRY_DELAY=600)
+    def test_failed_release_is_retried_later(self):
+        now = timezone.now()
+        with patch.object(
+            EscrowService,
+            "_transfer_funds",
+            return_value={"success": False, "error": "banco caído"},
+        ):
+            stats = escrow_schedule.release_due(now=now)
+
+        self.assertEqual(stats["failed"], 1)
+        self.timed.refresh_from_db()
+        self.assertEqual(self.timed.next_release_at, now + timedelta(seconds=600))
+        self.assertIn("banco caído", self.timed.last_outcome["errors"][0]["error"])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.held_balance, RENT)
+
+        stats = escrow_schedule.release_due(now=now + timedelta(seconds=601))
+        self.assertEqual(stats["released"], 1)
+
+    def test_cost_does_not_depend_on_idle_accounts(self):
+        def queries():
+            with CaptureQueriesContext(connection) as ctx:
+                escrow_schedule.release_due(now=self.hold_until)
+            return len(ctx)
+
+        before = queries()
+        future = timezone.now() + timedelta(days=30)
+        for n in range(2, 6):
+            _escrow(str(n), future)
+        self.assertEqual(queries(), before)
+
+    def test_check_automatic_releases_uses_the_schedule(self):
+        other, _ = _escrow("2", self.hold_until)
+        EscrowService.check_automatic_releases(self.account)
+
+        self.account.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.account.held_balance, 0)
+        self.assertEqual(other.held_balance, RENT)
+
+    def test_command_rebuilds_the_schedule(self):
+        EscrowReleaseRule.objects.update(next_release_at=None)
+        out = StringIO()
+        call_command("reschedule_escrow_releases", stdout=out)
+
+        self.assertIn("1 reglas reprogramadas", out.getvalue())
+        self.timed.refresh_from_db()
+        self.assertEqual(
+            self.timed.next_release_at, self.hold_until + timedelta(hours=24)
+        )
+
+    def test_beat_task_releases_due_rules(self):
+        self.assertEqual(release_due_escrow()["released"], 1)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "requiere PostgreSQL")
+class ConcurrentReleaseTests(TransactionTestCase):
+    WORKERS = 4
+
+    def setUp(self):
+        past = timezone.now() - timedelta(days=2)
+        self.accounts = [_escrow(str(n), past)[0] for n in range(6)]
+
+    def test_parallel_workers_never_release_twice(self):
+        barrier = threading.Barrier(self.WORKERS)
+        results, errors = [], []
+
+        def worker():
+            try:
+                barrier.wait()
+                results.append(escrow_schedule.release_due(batch_size=2))
+            except Exception as exc:  # noqa: BLE001
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(r["released"] for r in results), len(self.accounts))
+        self.assertEqual(
+            EscrowTransaction.objects.filter(transaction_type="RELEASE").count(),
+            len(self.accounts),
+        )
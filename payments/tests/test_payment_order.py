@@ -2,8 +2,9 @@
 
 Cubre:
 - order_number consecutivo PO-YYYY-NNNNNNNN auto-generado
+- Reserva de bloques contiguos en PaymentOrderSequence
 - total_amount = amount + interest_amount, balance correcto
-- audit_log estructurado
+- audit_log estructurado (tabla append-only PaymentOrderEvent)
 - Endpoints filtrados por rol (admin ve todo, partes ven las suyas)
 - Filtros query: order_type, status, overdue
 - Action cancel + summary
@@ -13,11 +14,15 @@ from datetime import date, timedelta
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from payments.models import PaymentOrder
+from payments.models import PaymentOrder, PaymentOrderEvent, PaymentOrderSequence
 
 User = get_user_model()
 
@@ -63,6 +68,23 @@ class PaymentOrderModelTests(TestCase):
         n2 = int(o2.order_number.split("-")[-1])
         self.assertEqual(n2, n1 + 1)
 
+    def test_sequence_continues_after_issued_numbers(self):
+        landlord = _user("ll6@test.com", "landlord")
+        tenant = _user("tt6@test.com", "tenant")
+        year = timezone.now().year
+        _order(payer=tenant, payee=landlord, order_number=f"PO-{year}-00000041")
+        PaymentOrderSequence.objects.all().delete()
+
+        order = _order(payer=tenant, payee=landlord)
+        self.assertEqual(order.order_number, f"PO-{year}-00000042")
+        self.assertEqual(
+            PaymentOrderSequence.reserve(3),
+            [f"PO-{year}-{n:08d}" for n in (43, 44, 45)],
+        )
+        with self.assertNumQueries(2):  # SELECT ... FOR UPDATE + UPDATE
+            PaymentOrderSequence.reserve(60)
+        self.assertEqual(PaymentOrderSequence.objects.get(year=year).last_number, 105)
+
     def test_total_amount_includes_interest(self):
         landlord = _user("ll3@test.com", "landlord")
         tenant = _user("tt3@test.com", "tenant")
@@ -94,6 +116,81 @@ class PaymentOrderModelTests(TestCase):
         self.assertEqual(order.audit_log[0]["actor_id"], str(tenant.id))
 
 
+class PaymentOrderEventTests(TestCase):
+    """Historial append-only en PaymentOrderEvent."""
+
+    def setUp(self):
+        self.landlord = _user("ev-ll@test.com", "landlord")
+        self.tenant = _user("ev-tt@test.com", "tenant")
+        self.order = _order(payer=self.tenant, payee=self.landlord)
+
+    def test_event_write_does_not_depend_on_history_size(self):
+        for i in range(20):
+            self.order.add_audit_event("reminder_sent", f"recordatorio {i}")
+        with CaptureQueriesContext(connection) as queries:
+            self.order.add_audit_event("paid", "pagada", actor=self.tenant)
+        self.assertEqual(len(queries), 2)  # INSERT del evento + updated_at
+        update = next(q["sql"] for q in queries if q["sql"].startswith("UPDATE"))
+        self.assertNotIn("recordatorio", update)
+        self.assertEqual(self.order.events.count(), 21)
+        self.assertEqual(self.order.audit_log[-1]["type"], "paid")
+
+    def test_unsaved_events_are_written_with_the_order(self):
+        order = PaymentOrder(
+            order_type="rent",
+            payer=self.tenant,
+            payee=self.landlord,
+            created_by=self.landlord,
+            amount=Decimal(100),
+            date_due=date.today(),
+        )
+        order.add_audit_event("auto_generated", "generada", save=False)
+        self.assertEqual([e["type"] for e in order.audit_log], ["auto_generated"])
+        order.save()
+        self.assertEqual(
+            list(order.events.values_list("event_type", flat=True)),
+            ["auto_generated"],
+        )
+
+        self.order.status = "cancelled"
+        self.order.add_audit_event("cancelled", "cancelada", save=False)
+        self.assertFalse(self.order.events.exists())
+        self.order.save()
+        self.assertEqual(self.order.events.get().event_type, "cancelled")
+
+    def test_events_are_append_only(self):
+        self.order.add_audit_event("created", "creada")
+        event = self.order.events.get()
+        event.message = "otra cosa"
+        with self.assertRaises(ValidationError):
+            event.save()
+
+    def test_deleted_actor_keeps_event(self):
+        actor = _user("ev-actor@test.com", "landlord")
+        self.order.add_audit_event("created", "creada", actor=actor)
+        actor.delete()
+        self.assertIsNone(self.order.audit_log[0]["actor_id"])
+
+    def test_list_endpoint_prefetches_events(self):
+        admin = _user("ev-admin@test.com", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        self.order.add_audit_event("created", "creada")
+        _order(payer=self.tenant, payee=self.landlord).add_audit_event("x", "y")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/v1/payments/orders/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event_queries = [
+            q for q in queries if PaymentOrderEvent._meta.db_table in q["sql"]
+        ]
+        self.assertEqual(len(event_queries), 1)
+        logs = {
+            row["order_number"]: row["audit_log"] for row in response.data["results"]
+        }
+        self.assertEqual(logs[self.order.order_number][0]["type"], "created")
+
+
 class PaymentOrderViewSetPermissionsTests(TestCase):
     """Tests de filtros por rol en ViewSet."""
 
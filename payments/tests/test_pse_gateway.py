@@ -13,6 +13,7 @@ from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import requests
+from django.core.cache import cache
 from django.test import TestCase
 
 from payments.gateways.pse_gateway import PSEGateway
@@ -48,7 +49,7 @@ class PSEConfigTests(TestCase):
 
 
 class PSECreatePaymentTests(TestCase):
-    @patch("payments.gateways.pse_gateway.requests.post")
+    @patch("payments.gateways.pse_gateway.http.post")
     def test_create_payment_success(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -89,7 +90,7 @@ class PSECreatePaymentTests(TestCase):
         self.assertFalse(result.success)
         self.assertEqual(result.error_code, "INVALID_CURRENCY")
 
-    @patch("payments.gateways.pse_gateway.requests.post")
+    @patch("payments.gateways.pse_gateway.http.post")
     def test_create_payment_handles_network_error(self, mock_post):
         mock_post.side_effect = requests.ConnectionError("No route")
         gateway = _make_gateway()
@@ -106,7 +107,7 @@ class PSECreatePaymentTests(TestCase):
 
 
 class PSEConfirmPaymentTests(TestCase):
-    @patch("payments.gateways.pse_gateway.requests.get")
+    @patch("payments.gateways.pse_gateway.http.get")
     def test_confirm_payment_returns_completed_for_approved(self, mock_get):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -156,7 +157,11 @@ class PSEWebhookTests(TestCase):
 
 
 class PSEBanksTests(TestCase):
-    @patch("payments.gateways.pse_gateway.requests.get")
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @patch("payments.gateways.pse_gateway.http.get")
     def test_get_available_banks(self, mock_get):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -172,3 +177,7 @@ class PSEBanksTests(TestCase):
         result = gateway.get_available_banks()
         self.assertIn("banks", result)
         self.assertEqual(len(result["banks"]), 2)
+
+        # Segundo checkout: la lista sale del cache, sin otra llamada.
+        self.assertEqual(gateway.get_available_banks(), result)
+        mock_get.assert_called_once()
@@ -0,0 +1,327 @@
+"""Tests de la bandeja de webhooks de pasarelas (`payments.webhook_inbox`).
+
+Cubre:
+- Las vistas verifican la firma, guardan el evento y responden 200 sin
+  reconciliar dentro del request
+- Re-entregas de la pasarela: un solo evento, una sola reconciliación
+- Stripe, Wompi, Bold y PSE a través de `handle_webhook`
+- Orden por transacción e idempotencia de los manejadores
+- Reintentos con backoff, dead letter y replay
+"""
+
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from payments import webhook_inbox
+from payments.models import PaymentWebhookEvent, Transaction
+
+User = get_user_model()
+
+SECRETS = {
+    "BOLD_API_KEY": "bold-key",
+    "BOLD_INTEGRITY_SECRET": "bold-secret",
+    "WOMPI_EVENTS_SECRET": "wompi-secret",
+    "STRIPE_WEBHOOK_SECRET": "whsec_test",
+    "PSE_API_KEY": "pse-key",
+    "PSE_SECRET_KEY": "pse-secret",
+    "PSE_MERCHANT_ID": "pse-merchant",
+}
+
+
+def _sha256_signature(payload, secret):
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(f"{body}{secret}".encode()).hexdigest()
+
+
+def _bold(reference, status="APPROVED", event_id=None):
+    payload = {
+        "type": "PAYMENT",
+        "data": {
+            "reference": reference,
+            "status": status,
+            "order_id": f"ORD-{reference}",
+            "amount": 1500000,
+            "currency": "COP",
+        },
+    }
+    if event_id:
+        payload["id"] = event_id
+    return payload
+
+
+@override_settings(PAYMENT_WEBHOOK_ASYNC=False, **SECRETS)
+class _InboxTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.payer = User.objects.create_user(
+            email="payer@webhooks.test",
+            password="test1234",
+            first_name="Pa",
+            last_name="Gador",
+            user_type="tenant",
+        )
+        self.payee = User.objects.create_user(
+            email="payee@webhooks.test",
+            password="test1234",
+            first_name="Arren",
+            last_name="Dador",
+            user_type="landlord",
+        )
+        patcher = patch.multiple(
+            "payments.reconciliation_service",
+            reconcile_payment=lambda tx: True,
+            send_payment_confirmation=lambda tx: None,
+            send_payment_failure_notification=lambda tx: None,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _transaction(self, number="VH-0001", gateway_id=""):
+        return Transaction.objects.create(
+            transaction_number=number,
+            payer=self.payer,
+            payee=self.payee,
+            transaction_type="rent_payment",
+            direction="inbound",
+            amount=Decimal("1500000"),
+            total_amount=Decimal("1500000"),
+            gateway_transaction_id=gateway_id,
+        )
+
+    def _post_bold(self, payload, signature=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                "/api/v1/payments/webhooks/bold/",
+                payload,
+                format="json",
+                HTTP_X_BOLD_SIGNATURE=signature
+                or _sha256_signature(payload, "bold-secret"),
+            )
+
+
+class WebhookIngestionTests(_InboxTestCase):
+    def test_bold_event_is_stored_and_processed(self):
+        tx = self._transaction()
+        response = self._post_bold(_bold("VH-0001", event_id="evt-1"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["duplicate"])
+        event = PaymentWebhookEvent.objects.get()
+        self.assertEqual((event.gateway, event.event_id), ("bold", "evt-1"))
+        self.assertEqual(event.ordering_key, "bold:VH-0001")
+        self.assertEqual(event.status, "processed")
+        tx.refresh_from_db()
+        self.assertEqual(tx.status, "completed")
+        self.assertEqual(tx.gateway_transaction_id, "ORD-VH-0001")
+        self.assertIsNotNone(tx.processed_at)
+
+    def test_invalid_signature_is_rejected_without_storing(self):
+        response = self._post_bold(_bold("VH-0001"), signature="bad")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(PaymentWebhookEvent.objects.exists())
+
+    def test_redelivery_is_acknowledged_once(self):
+        self._transaction()
+        payload = _bold("VH-0001", event_id="evt-1")
+        with patch("payments.reconciliation_service.reconcile_payment") as reconcile:
+            self._post_bold(payload)
+            response = self._post_bold(payload)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["duplicate"])
+        self.assertEqual(PaymentWebhookEvent.objects.count(), 1)
+        reconcile.assert_called_once()
+
+    @override_settings(PAYMENT_WEBHOOK_ASYNC=True)
+    def test_response_does_not_wait_for_reconciliation(self):
+        tx = self._transaction()
+        with patch("payments.tasks.process_webhook_queue.apply_async") as apply_async:
+            response = self._post_bold(_bold("VH-0001", event_id="evt-1"))
+
+        self.assertEqual(response.status_code, 200)
+        apply_async.assert_called_once_with(("bold:VH-0001",), countdown=None)
+        tx.refresh_from_db()
+        self.assertEqual(tx.status, "pending")
+        self.assertEqual(PaymentWebhookEvent.objects.get().status, "pending")
+
+    @patch("payments.gateways.stripe_gateway.stripe.Webhook.construct_event")
+    def test_stripe_event_uses_the_raw_body(self, construct_event):
+        tx = self._transaction(gateway_id="pi_123")
+        stripe_event = MagicMock(type="payment_intent.succeeded")
+        stripe_event.data.object = MagicMock(
+            id="pi_123", amount=150000000, currency="cop"
+        )
+        construct_event.return_value = stripe_event
+        body = json.dumps({"id": "evt_stripe_1", "type": "payment_intent.succeeded"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/v1/payments/webhooks/stripe/",
+                body,
+                content_type="application/json",
+                HTTP_STRIPE_SIGNATURE="t=1,v1=firma",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        construct_event.assert_called_once_with(
+            payload=body, sig_header="t=1,v1=firma", secret="whsec_test"
+        )
+        event = PaymentWebhookEvent.objects.get()
+        self.assertEqual(
+            (event.event_id, event.ordering_key), ("evt_stripe_1", "stripe:pi_123")
+        )
+        tx.refresh_from_db()
+        self.assertEqual(tx.status, "completed")
+
+    def test_wompi_and_pse_through_handle_webhook(self):
+        wompi_tx = self._transaction("VH-W1")
+        pse_tx = self._transaction("VH-P1")
+        wompi = {
+            "event": "transaction.updated",
+            "data": {
+                "transaction": {
+                    "id": "wompi-1",
+                    "reference": "VH-W1",
+                    "status": "DECLINED",
+                    "status_message": "Fondos insuficientes",
+                    "amount_in_cents": 150000000,
+                }
+            },
+            "timestamp": 1760000000,
+        }
+        pse = {
+            "reference": "VH-P1",
+            "status": "APPROVED",
+            "pse_transaction_id": "pse-1",
+        }
+        pse_signature = hmac.new(
+            b"pse-secret",
+            "&".join(f"{k}={v}" for k, v in sorted(pse.items())).encode(),
+            hashlib.sha256,
+        ).hexdigest()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            wompi_response = self.client.post(
+                "/api/v1/payments/webhooks/wompi/",
+                wompi,
+                format="json",
+                HTTP_X_EVENT_CHECKSUM=_sha256_signature(wompi, "wompi-secret"),
+            )
+            pse_response = self.client.post(
+                "/api/v1/payments/webhooks/pse/",
+                pse,
+                format="json",
+                HTTP_X_PSE_SIGNATURE=pse_signature,
+            )
+
+        self.assertEqual(
+            (wompi_response.status_code, pse_response.status_code), (200, 200)
+        )
+        wompi_tx.refresh_from_db()
+        pse_tx.refresh_from_db()
+        self.assertEqual(
+            (wompi_tx.status, wompi_tx.metadata["failure_reason"]),
+            ("failed", "Fondos insuficientes"),
+        )
+        self.assertEqual(
+            (pse_tx.status, pse_tx.gateway_transaction_id), ("completed", "pse-1")
+        )
+
+
+class WebhookProcessingTests(_InboxTestCase):
+    def _ingest(self, payload):
+        with self.captureOnCommitCallbacks(execute=False):
+            event, _ = webhook_inbox.ingest(
+                "bold",
+                payload,
+                {"x-bold-signature": _sha256_signature(payload, "bold-secret")},
+            )
+        return event
+
+    def test_events_of_a_transaction_apply_in_arrival_order(self):
+        tx = self._transaction()
+        self._ingest(_bold("VH-0001", "DECLINED", event_id="evt-1"))
+        self._ingest(_bold("VH-0001", "APPROVED", event_id="evt-2"))
+        self.assertIsNone(webhook_inbox.process_queue("bold:VH-0001"))
+        tx.refresh_from_db()
+        self.assertEqual(tx.status, "completed")
+
+        # Un "failed" tardío no retrocede un pago completado.
+        self._ingest(_bold("VH-0001", "DECLINED", event_id="evt-3"))
+        webhook_inbox.process_queue("bold:VH-0001")
+        tx.refresh_from_db()
+        self.assertEqual(tx.status, "completed")
+        self.assertEqual(
+            list(
+                PaymentWebhookEvent.objects.order_by("received_at").values_list(
+                    "status", flat=True
+                )
+            ),
+            ["processed", "processed", "ignored"],
+        )
+
+    def test_unknown_transaction_is_ignored(self):
+        event = self._ingest(_bold("VH-404", event_id="evt-1"))
+        webhook_inbox.process_queue(event.ordering_key)
+        event.refresh_from_db()
+        self.assertEqual(event.status, "ignored")
+
+    @override_settings(PAYMENT_WEBHOOK_MAX_ATTEMPTS=2, PAYMENT_WEBHOOK_RETRY_DELAY=30)
+    def test_failures_block_the_transaction_then_dead_letter(self):
+        self._transaction()
+        first = self._ingest(_bold("VH-0001", "DECLINED", event_id="evt-1"))
+        second = self._ingest(_bold("VH-0001", "APPROVED", event_id="evt-2"))
+
+        with patch(
+            "payments.reconciliation_service.send_payment_failure_notification",
+            side_effect=RuntimeError("SMTP caído"),
+        ):
+            delay = webhook_inbox.process_queue(first.ordering_key)
+            self.assertAlmostEqual(delay, 30, delta=1)
+            first.refresh_from_db()
+            second.refresh_from_db()
+            self.assertEqual((first.status, first.attempts), ("failed", 1))
+            self.assertIn("SMTP caído", first.last_error)
+            self.assertEqual(second.status, "pending")
+
+            # Antes del próximo intento no se toca la cola.
+            self.assertIsNotNone(webhook_inbox.process_queue(first.ordering_key))
+            self.assertEqual(PaymentWebhookEvent.objects.get(pk=first.pk).attempts, 1)
+
+            PaymentWebhookEvent.objects.filter(pk=first.pk).update(
+                next_attempt_at=timezone.now()
+            )
+            self.assertIsNone(webhook_inbox.process_queue(first.ordering_key))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), ("dead", 2))
+        self.assertEqual(second.status, "processed")
+
+        out = StringIO()
+        call_command("replay_webhooks", "--sync", stdout=out)
+        self.assertIn("1 webhooks", out.getvalue())
+        first.refresh_from_db()
+        # El pago ya está completado: reprocesar no lo retrocede.
+        self.assertEqual(first.status, "ignored")
+        self.assertEqual(Transaction.objects.get().status, "completed")
+
+    def test_retry_due_requeues_stale_and_due_events(self):
+        self._transaction()
+        event = self._ingest(_bold("VH-0001", event_id="evt-1"))
+        self.assertEqual(webhook_inbox.retry_due(), 0)
+
+        later = timezone.now() + timedelta(minutes=5)
+        self.assertEqual(webhook_inbox.retry_due(now=later), 1)
+        event.refresh_from_db()
+        self.assertEqual(event.status, "processed")
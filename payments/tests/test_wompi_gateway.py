@@ -7,6 +7,7 @@ y get_pse_banks, sin depender de la API sandbox de Wompi.
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
+from django.core.cache import cache
 from django.test import TestCase
 
 from payments.gateways.wompi_gateway import WompiGateway
@@ -36,7 +37,7 @@ class WompiConfigTests(TestCase):
 
 
 class WompiCreatePaymentTests(TestCase):
-    @patch("payments.gateways.wompi_gateway.requests.post")
+    @patch("payments.gateways.wompi_gateway.http.post")
     def test_create_payment_pse_success(self, mock_post):
         # Mock Wompi response
         mock_resp = MagicMock()
@@ -87,7 +88,7 @@ class WompiCreatePaymentTests(TestCase):
         self.assertFalse(result.success)
         self.assertEqual(result.error_code, "INVALID_CURRENCY")
 
-    @patch("payments.gateways.wompi_gateway.requests.post")
+    @patch("payments.gateways.wompi_gateway.http.post")
     def test_create_payment_handles_network_error(self, mock_post):
         import requests
 
@@ -106,7 +107,7 @@ class WompiCreatePaymentTests(TestCase):
 
 
 class WompiConfirmPaymentTests(TestCase):
-    @patch("payments.gateways.wompi_gateway.requests.get")
+    @patch("payments.gateways.wompi_gateway.http.get")
     def test_confirm_payment_returns_status(self, mock_get):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -164,7 +165,11 @@ class WompiWebhookTests(TestCase):
 
 
 class WompiPSEBanksTests(TestCase):
-    @patch("payments.gateways.wompi_gateway.requests.get")
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @patch("payments.gateways.wompi_gateway.http.get")
     def test_get_pse_banks(self, mock_get):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -0,0 +1,388 @@
+"""
+Bandeja de entrada de webhooks de pasarelas (Stripe, Wompi, Bold y PSE).
+
+Antes las vistas de webhook verificaban la firma y, dentro del mismo
+request de la pasarela, actualizaban la transacción, la reconciliaban
+(`reconcile_payment`) y enviaban los correos. Una reconciliación lenta
+hacía que la pasarela cortara por timeout y reintentara, lo que a su vez
+duplicaba el trabajo. Ahora:
+
+1. `ingest()` verifica la firma con el `handle_webhook` de la pasarela,
+   guarda el evento crudo y su resultado normalizado en
+   `PaymentWebhookEvent` con clave única (gateway, event_id) y encola su
+   procesamiento al confirmar la transacción. La vista responde 200.
+2. `process_queue()` (tarea `payments.tasks.process_webhook_queue`)
+   procesa los eventos de una misma transacción (`ordering_key`) en orden
+   de llegada, tomando el primero con `select_for_update`: dos workers
+   nunca aplican eventos de la misma transacción a la vez.
+3. Aplicar un evento es idempotente: una transacción completada no se
+   vuelve a reconciliar ni a notificar, y un "failed" tardío no la
+   retrocede.
+4. Un evento que falla se reintenta con backoff exponencial y bloquea a
+   los siguientes de su transacción; tras PAYMENT_WEBHOOK_MAX_ATTEMPTS
+   queda como "dead" (dead letter) y la cola sigue. `replay()` y el
+   comando `replay_webhooks` los devuelven a la cola.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ("pending", "failed")
+FINAL_TRANSACTION_STATUSES = ("completed", "refunded", "cancelled")
+
+
+class WebhookRejected(Exception):
+    """La pasarela rechazó el webhook (firma inválida o payload ilegible)."""
+
+    def __init__(self, result):
+        super().__init__(result.error_message or "Webhook rechazado")
+        self.result = result
+
+
+# ---------------------------------------------------------------------------
+# Pasarelas
+# ---------------------------------------------------------------------------
+
+
+def _stripe_gateway():
+    from .gateways.stripe_gateway import StripeGateway
+
+    return StripeGateway(
+        {
+            "secret_key": getattr(settings, "STRIPE_SECRET_KEY", ""),
+            "publishable_key": getattr(settings, "STRIPE_PUBLIC_KEY", ""),
+            "webhook_secret": getattr(settings, "STRIPE_WEBHOOK_SECRET", ""),
+        }
+    )
+
+
+def _wompi_gateway():
+    from .gateways.wompi_gateway import WompiGateway
+
+    return WompiGateway(
+        {
+            "public_key": getattr(settings, "WOMPI_PUBLIC_KEY", ""),
+            "private_key": getattr(settings, "WOMPI_PRIVATE_KEY", ""),
+            "events_secret": getattr(settings, "WOMPI_EVENTS_SECRET", ""),
+            "sandbox_mode": getattr(settings, "WOMPI_SANDBOX_MODE", True),
+        }
+    )
+
+
+def _bold_gateway():
+    from .gateways.bold_gateway import BoldGateway
+
+    return BoldGateway(
+        {
+            "api_key": getattr(settings, "BOLD_API_KEY", ""),
+            "integrity_secret": getattr(settings, "BOLD_INTEGRITY_SECRET", ""),
+            "sandbox_mode": getattr(settings, "BOLD_SANDBOX_MODE", True),
+        }
+    )
+
+
+def _pse_gateway():
+    from .gateways.pse_gateway import PSEGateway
+
+    return PSEGateway(
+        {
+            "api_key": getattr(settings, "PSE_API_KEY", ""),
+            "secret_key": getattr(settings, "PSE_SECRET_KEY", ""),
+            "merchant_id": getattr(settings, "PSE_MERCHANT_ID", ""),
+            "sandbox_mode": getattr(settings, "PSE_SANDBOX_MODE", True),
+        }
+    )
+
+
+GATEWAYS = {
+    "stripe": _stripe_gateway,
+    "wompi": _wompi_gateway,
+    "bold": _bold_gateway,
+    "pse": _pse_gateway,
+}
+
+
+def _event_id(payload, headers):
+    """ID del evento: el de la pasarela si lo trae, si no un hash estable.
+
+    Stripe y Bold mandan `id`; Wompi no, pero su checksum firma los
+    campos del evento y su timestamp, así que identifica la entrega.
+    """
+    data = payload
+    if isinstance(payload, str):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            data = None
+    if isinstance(data, dict) and data.get("id"):
+        return str(data["id"])
+    checksum = headers.get("X-Event-Checksum")
+    if checksum:
+        return checksum
+    raw = payload if isinstance(payload, str) else json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Ingesta
+# ---------------------------------------------------------------------------
+
+
+def ingest(gateway_name, payload, headers):
+    """Verifica y guarda un webhook; encola su procesamiento.
+
+    Args:
+        gateway_name: clave de `GATEWAYS`.
+        payload: cuerpo tal como lo espera `handle_webhook` (texto crudo
+            para Stripe, dict para las demás).
+        headers: headers de firma de la pasarela.
+
+    Returns:
+        (PaymentWebhookEvent, created): `created` es False si la pasarela
+        re-entregó un evento ya recibido.
+
+    Raises:
+        WebhookRejected: `handle_webhook` devolvió un `error_code`.
+    """
+    from .models import PaymentWebhookEvent
+
+    result = GATEWAYS[gateway_name]().handle_webhook(payload, headers)
+    if result.error_code:
+        raise WebhookRejected(result)
+
+    event_id = _event_id(payload, headers)
+    reference = result.transaction_id or result.gateway_reference or event_id
+    event, created = PaymentWebhookEvent.objects.get_or_create(
+        gateway=gateway_name,
+        event_id=event_id,
+        defaults={
+            "ordering_key": f"{gateway_name}:{reference}",
+            "payload": payload,
+            "headers": headers,
+            "result": {**result.to_dict(), "raw_response": None},
+        },
+    )
+    if created:
+        key = event.ordering_key
+        transaction.on_commit(lambda: enqueue(key))
+    else:
+        logger.info(f"Webhook {gateway_name} {event_id} duplicado, ya recibido")
+    return event, created
+
+
+def enqueue(ordering_key, asynchronous=None, countdown=None):
+    """Encola la cola de eventos de `ordering_key` (en línea sin broker)."""
+    from .tasks import process_webhook_queue
+
+    if asynchronous is None:
+        asynchronous = getattr(settings, "PAYMENT_WEBHOOK_ASYNC", True)
+    if asynchronous:
+        try:
+            process_webhook_queue.apply_async((ordering_key,), countdown=countdown)
+            return
+        except Exception as exc:  # noqa: BLE001
+            logger.error(f"No se pudo encolar el webhook {ordering_key}: {exc}")
+    process_queue(ordering_key)
+
+
+# ---------------------------------------------------------------------------
+# Procesamiento
+# ---------------------------------------------------------------------------
+
+
+def process_queue(ordering_key):
+    """Procesa en orden los eventos abiertos de una transacción.
+
+    Returns:
+        Segundos hasta el próximo reintento si la cola quedó detenida en
+        un evento fallido, o None si no quedan eventos por procesar.
+    """
+    from .models import PaymentWebhookEvent
+
+    while True:
+        with transaction.atomic():
+            event = (
+                PaymentWebhookEvent.objects.select_for_update()
+                .filter(ordering_key=ordering_key, status__in=OPEN_STATUSES)
+                .order_by("received_at", "id")
+                .first()
+            )
+            if event is None:
+                return None
+            now = timezone.now()
+            if event.next_attempt_at and event.next_attempt_at > now:
+                return (event.next_attempt_at - now).total_seconds()
+
+            try:
+                with transaction.atomic():
+                    event.status = apply_event(event)
+            except Exception as exc:  # noqa: BLE001
+                _record_failure(event, exc, now)
+            else:
+                event.processed_at = now
+                event.last_error = ""
+                event.next_attempt_at = None
+            event.save(
+                update_fields=[
+                    "status",
+                    "attempts",
+                    "last_error",
+                    "next_attempt_at",
+                    "processed_at",
+                ]
+            )
+            if event.status == "failed":
+                return (event.next_attempt_at - now).total_seconds()
+
+
+def _record_failure(event, exc, now):
+    event.attempts += 1
+    event.last_error = f"{type(exc).__name__}: {exc}"
+    if event.attempts >= getattr(settings, "PAYMENT_WEBHOOK_MAX_ATTEMPTS", 8):
+        event.status = "dead"
+        event.next_attempt_at = None
+        logger.error(
+            f"Webhook {event.gateway} {event.event_id} descartado tras "
+            f"{event.attempts} intentos: {event.last_error}"
+        )
+        return
+    base_delay = getattr(settings, "PAYMENT_WEBHOOK_RETRY_DELAY", 30)
+    delay = base_delay * 2 ** (event.attempts - 1)
+    event.status = "failed"
+    event.next_attempt_at = now + timedelta(seconds=min(delay, 3600))
+    logger.warning(
+        f"Webhook {event.gateway} {event.event_id} falló (intento "
+        f"{event.attempts}): {event.last_error}"
+    )
+
+
+def _find_transaction(result):
+    from .models import Transaction
+
+    lookup = Q()
+    if result.get("transaction_id"):
+        lookup |= Q(transaction_number=result["transaction_id"])
+    if result.get("gateway_reference"):
+        lookup |= Q(gateway_transaction_id=result["gateway_reference"])
+    if not lookup:
+        return None
+    return Transaction.objects.select_for_update().filter(lookup).first()
+
+
+def apply_event(event):
+    """Aplica el resultado de un webhook a su transacción.
+
+    Returns:
+        "processed" si cambió la transacción, "ignored" si no había nada
+        que hacer (evento informativo, transacción desconocida o ya en
+        ese estado).
+    """
+    from .reconciliation_service import (
+        reconcile_payment,
+        send_payment_confirmation,
+        send_payment_failure_notification,
+    )
+
+    result = event.result
+    new_status = result.get("status")
+    if new_status not in ("completed", "failed"):
+        return "ignored"
+
+    payment = _find_transaction(result)
+    if payment is None:
+        logger.warning(
+            f"Webhook {event.gateway} {event.event_id}: transacción "
+            f"{result.get('transaction_id') or result.get('gateway_reference')} "
+            "no encontrada"
+        )
+        return "ignored"
+    if payment.status == new_status or payment.status in FINAL_TRANSACTION_STATUSES:
+        return "ignored"
+
+    metadata = {**(payment.metadata or {}), **(result.get("metadata") or {})}
+    payment.status = new_status
+    if result.get("gateway_reference"):
+        payment.gateway_transaction_id = result["gateway_reference"]
+    if new_status == "completed":
+        payment.processed_at = payment.completed_at = timezone.now()
+    else:
+        # Transaction no tiene campo propio para el motivo del rechazo.
+        metadata["failure_reason"] = (
+            metadata.get("status_message")
+            or metadata.get("bold_status")
+            or metadata.get("pse_status")
+            or result.get("error_message")
+            or "Payment failed"
+        )
+    payment.metadata = metadata
+    payment.save()
+
+    if new_status == "completed":
+        reconcile_payment(payment)
+        send_payment_confirmation(payment)
+    else:
+        send_payment_failure_notification(payment)
+    logger.info(
+        f"Webhook {event.gateway} {event.event_id}: "
+        f"{payment.transaction_number} → {new_status}"
+    )
+    return "processed"
+
+
+# ---------------------------------------------------------------------------
+# Reintentos y replay
+# ---------------------------------------------------------------------------
+
+
+def retry_due(now=None):
+    """Re-encola las transacciones con eventos vencidos.
+
+    Red de seguridad de `payments.tasks.retry_webhook_events`: cubre
+    tareas perdidas (worker caído, broker reiniciado) y eventos que
+    quedaron en "pending" porque el encolado falló.
+    """
+    from .models import PaymentWebhookEvent
+
+    now = now or timezone.now()
+    stale_after = getattr(settings, "PAYMENT_WEBHOOK_STALE_AFTER", 120)
+    stale = now - timedelta(seconds=stale_after)
+    keys = (
+        PaymentWebhookEvent.objects.filter(
+            Q(status="failed", next_attempt_at__lte=now)
+            | Q(status="pending", received_at__lte=stale)
+        )
+        .values_list("ordering_key", flat=True)
+        .distinct()
+    )
+    keys = sorted(keys)
+    for key in keys:
+        enqueue(key)
+    return len(keys)
+
+
+def replay(queryset, asynchronous=None):
+    """Devuelve eventos a la cola (p. ej. los "dead") y los reprocesa.
+
+    Reprocesar un evento ya aplicado no tiene efecto: `apply_event` es
+    idempotente.
+    """
+    keys = sorted(set(queryset.values_list("ordering_key", flat=True)))
+    count = queryset.update(
+        status="pending",
+        attempts=0,
+        last_error="",
+        next_attempt_at=None,
+        processed_at=None,
+    )
+    for key in keys:
+        enqueue(key, asynchronous)
+    return count
@@ -0,0 +1,8 @@
+"""
+Pruebas de rendimiento de VeriHome.
+
+- `locustfile.py`: carga contra un servidor en vivo; con
+  VERIHOME_SEED_MANIFEST entra con las cuentas de `manage.py seed_dataset`.
+- `test_api_budgets.py`: presupuestos de consultas, latencia y memoria
+  de la API REST, en proceso (ver `budgets.json`).
+"""
@@ -0,0 +1,160 @@
+"""
+Medición y presupuestos por endpoint para `test_api_budgets.py`.
+
+Cada escenario se ejecuta contra el cliente de DRF en proceso:
+
+- consultas SQL: máximo de `CaptureQueriesContext` en las iteraciones
+  medidas (después del calentamiento, con cachés ya pobladas);
+- latencia: p50/p95 de `time.perf_counter` sobre las iteraciones;
+- memoria: pico de `tracemalloc` de una petición adicional (se mide
+  aparte porque `tracemalloc` infla la latencia).
+
+Las líneas base viven en `budgets.json` y se regeneran con
+PERF_UPDATE_BASELINES=1. Las consultas y la memoria se exigen siempre;
+la latencia depende de la máquina y solo se exige con
+PERF_ENFORCE_LATENCY=1.
+"""
+
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+WARMUP = 2
+# Holguras sobre la línea base: factor y mínimo absoluto.
+MEMORY_TOLERANCE = (1.5, 256)  # KB
+LATENCY_TOLERANCE = (3.0, 50)  # ms
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    role: str  # "tenant", "landlord" o "admin" (cuentas del manifiesto)
+    path: str
+    method: str = "get"
+    data: dict = field(default_factory=dict)
+
+
+def env_flag(name):
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+def iterations():
+    return int(os.getenv("PERF_ITERATIONS", "5"))
+
+
+def scale():
+    return int(os.getenv("PERF_SCALE", "1"))
+
+
+def measure(client, scenario, runs, ids=None):
+    """Devuelve (status_code, métricas) del escenario.
+
+    `ids` completa los marcadores del path (`{property}`, `{thread}`...).
+    """
+    call = getattr(client, scenario.method)
+    path = scenario.path.format(**(ids or {}))
+
+    def request():
+        return call(path, scenario.data or None, format="json")
+
+    for _ in range(WARMUP):
+        response = request()
+    if response.status_code >= 400:
+        return response.status_code, None
+
+    timings, queries = [], 0
+    for _ in range(runs):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(captured))
+
+    tracemalloc.start()
+    try:
+        request()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return response.status_code, {
+        "queries": queries,
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(_percentile(timings, 95), 2),
+        "peak_kb": round(peak / 1024),
+    }
+
+
+def _percentile(values, percent):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def load():
+    if not BUDGETS_PATH.exists():
+        return {"scale": scale(), "endpoints": {}}
+    return json.loads(BUDGETS_PATH.read_text(encoding="utf-8"))
+
+
+def save(results, dataset_scale):
+    BUDGETS_PATH.write_text(
+        json.dumps(
+            {"scale": dataset_scale, "endpoints": dict(sorted(results.items()))},
+            indent=2,
+            ensure_ascii=False,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+
+
+def _limit(base, tolerance):
+    factor, minimum = tolerance
+    return max(base * factor, base + minimum)
+
+
+def violations(name, measured, budget, enforce_latency=False):
+    """Mensajes de los presupuestos excedidos (lista vacía si cumple)."""
+    if budget is None:
+        return [f"{name}: sin línea base (PERF_UPDATE_BASELINES=1)"]
+    found = []
+    if measured["queries"] > budget["queries"]:
+        found.append(f"{name}: {measured['queries']} consultas > {budget['queries']}")
+    memory = _limit(budget["peak_kb"], MEMORY_TOLERANCE)
+    if measured["peak_kb"] > memory:
+        found.append(f"{name}: pico {measured['peak_kb']} KB > {memory:.0f} KB")
+    latency = _limit(budget["p95_ms"], LATENCY_TOLERANCE)
+    if enforce_latency and measured["p95_ms"] > latency:
+        found.append(f"{name}: p95 {measured['p95_ms']} ms > {latency:.0f} ms")
+    return found
+
+
+def report(results, baseline):
+    """Tabla al estilo de pytest-benchmark con la línea base entre paréntesis."""
+    header = (
+        f"{'endpoint':<34}{'queries':>14}{'p50 ms':>10}{'p95 ms':>18}{'peak KB':>18}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, row in sorted(results.items()):
+        base = baseline.get(name) or {}
+
+        def cell(key, width, row=row, base=base):
+            value = f"{row[key]}"
+            if key in base:
+                value += f" ({base[key]})"
+            return f"{value:>{width}}"
+
+        lines.append(
+            f"{name:<34}{cell('queries', 14)}{row['p50_ms']:>10}"
+            f"{cell('p95_ms', 18)}{cell('peak_kb', 18)}"
+        )
+    return "\n".join(lines)
@@ -1,6 +1,28 @@
 from locust import HttpUser, task, between
+import json
+import os
 import random
 
+# Seeded dataset manifest (`python manage.py seed_dataset --manifest seed.json`).
+# When set, users log in as random seeded accounts instead of the fixed ones.
+SEED_MANIFEST = os.getenv("VERIHOME_SEED_MANIFEST")
+_manifest = None
+
+
+def credentials(role, email, password):
+    """Login payload: a random seeded account of `role`, or the given one."""
+    global _manifest
+    if not SEED_MANIFEST:
+        return {"email": email, "password": password}
+    if _manifest is None:
+        with open(SEED_MANIFEST, encoding="utf-8") as handle:
+            _manifest = json.load(handle)
+    n = random.randrange(_manifest["users"][role])
+    return {
+        "email": _manifest["email_pattern"].format(role=role, n=n),
+        "password": _manifest["password"],
+    }
+
 
 class VeriHomeUser(HttpUser):
     """
@@ -16,7 +38,7 @@ class VeriHomeUser(HttpUser):
 
     def login(self):
         """Login with test credentials"""
-        login_data = {"email": "tenant.test@verihome.com", "password": "TenantPass123!"}
+        login_data = credentials("tenant", "tenant.test@verihome.com", "TenantPass123!")
 
         response = self.client.post("/api/v1/auth/login/", json=login_data)
 
@@ -175,10 +197,9 @@ class LandlordUser(HttpUser):
 
     def on_start(self):
         """Login as landlord"""
-        login_data = {
-            "email": "landlord.test@verihome.com",
-            "password": "LandlordPass123!",
-        }
+        login_data = credentials(
+            "landlord", "landlord.test@verihome.com", "LandlordPass123!"
+        )
 
         response = self.client.post("/api/v1/auth/login/", json=login_data)
 
@@ -276,7 +297,7 @@ class TenantUser(HttpUser):
 
     def on_start(self):
         """Login as tenant"""
-        login_data = {"email": "tenant.test@verihome.com", "password": "TenantPass123!"}
+        login_data = credentials("tenant", "tenant.test@verihome.com", "TenantPass123!")
 
         response = self.client.post("/api/v1/auth/login/", json=login_data)
 
@@ -0,0 +1,175 @@
+"""
+Presupuestos de consultas, latencia y memoria de la API REST.
+
+Siembra `core.seeding.seed(PERF_SCALE)` y recorre los endpoints más usados
+con el cliente de DRF; falla si un endpoint excede su línea base en
+`budgets.json` (ver `budgets.py` para las holguras).
+
+Uso:
+
+    python manage.py test performance_tests
+    PERF_ENFORCE_LATENCY=1 PERF_ITERATIONS=20 python manage.py test performance_tests
+    PERF_UPDATE_BASELINES=1 python manage.py test performance_tests  # regenera
+    PERF_SCALE=10 python manage.py test performance_tests  # solo reporta
+
+Con una escala distinta a la de la línea base solo se imprime la tabla:
+sirve para ver qué endpoints crecen con los datos.
+"""
+
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.seeding import seed
+
+from . import budgets
+from .budgets import Scenario
+
+API = "/api/v1"
+
+SCENARIOS = [
+    # Inquilino
+    Scenario("users.me", "tenant", f"{API}/users/auth/me/"),
+    Scenario("users.notifications", "tenant", f"{API}/users/notifications/"),
+    Scenario("users.dashboard", "tenant", f"{API}/users/dashboard/"),
+    Scenario("properties.list", "tenant", f"{API}/properties/"),
+    Scenario(
+        "properties.search",
+        "tenant",
+        f"{API}/properties/search/",
+        data={"city": "Bogotá"},
+    ),
+    Scenario("properties.detail", "tenant", f"{API}/properties/{{property}}/"),
+    Scenario("properties.featured", "tenant", f"{API}/properties/featured/"),
+    Scenario("properties.favorites", "tenant", f"{API}/properties/favorites/"),
+    Scenario(
+        "contracts.tenant_processes", "tenant", f"{API}/contracts/tenant-processes/"
+    ),
+    Scenario(
+        "contracts.tenant_contracts", "tenant", f"{API}/contracts/tenant/contracts/"
+    ),
+    Scenario("messages.threads", "tenant", f"{API}/messages/threads/"),
+    Scenario("messages.thread_detail", "tenant", f"{API}/messages/threads/{{thread}}/"),
+    Scenario("messages.conversations", "tenant", f"{API}/messages/conversations/"),
+    Scenario("messages.unread_count", "tenant", f"{API}/messages/unread-count/"),
+    Scenario("messages.stats", "tenant", f"{API}/messages/stats/"),
+    Scenario("payments.transactions", "tenant", f"{API}/payments/transactions/"),
+    Scenario("payments.tenant_portal", "tenant", f"{API}/payments/tenant/portal/"),
+    Scenario("payments.orders", "tenant", f"{API}/payments/orders/"),
+    Scenario("payments.invoices", "tenant", f"{API}/payments/invoices/"),
+    Scenario("matching.requests", "tenant", f"{API}/matching/requests/"),
+    Scenario(
+        "matching.request_detail",
+        "tenant",
+        f"{API}/matching/requests/{{match_request}}/",
+    ),
+    Scenario(
+        "matching.potential_matches", "tenant", f"{API}/matching/potential-matches/"
+    ),
+    Scenario("matching.dashboard", "tenant", f"{API}/matching/dashboard/"),
+    Scenario(
+        "matching.smart_matching",
+        "tenant",
+        f"{API}/matching/smart-matching/",
+        method="post",
+        data={"algorithm": "ml", "limit": 10, "min_score": 0},
+    ),
+    Scenario("requests.sent", "tenant", f"{API}/requests/api/base/my_sent_requests/"),
+    Scenario("ratings.list", "tenant", f"{API}/ratings/ratings/"),
+    Scenario("core.notifications", "tenant", f"{API}/core/notifications/"),
+    Scenario(
+        "core.notifications_unread",
+        "tenant",
+        f"{API}/core/notifications/unread_count/",
+    ),
+    Scenario("services.listings", "tenant", f"{API}/services/listings/"),
+    # Arrendador
+    Scenario("properties.stats", "landlord", f"{API}/properties/stats/"),
+    Scenario(
+        "contracts.matched_candidates",
+        "landlord",
+        f"{API}/contracts/matched-candidates/",
+    ),
+    Scenario(
+        "contracts.landlord_contracts",
+        "landlord",
+        f"{API}/contracts/landlord/contracts/",
+    ),
+    Scenario("contracts.list", "landlord", f"{API}/contracts/contracts/"),
+    Scenario(
+        "contracts.detail", "landlord", f"{API}/contracts/contracts/{{contract}}/"
+    ),
+    Scenario("contracts.stats", "landlord", f"{API}/contracts/stats/"),
+    Scenario(
+        "payments.landlord_dashboard", "landlord", f"{API}/payments/landlord/dashboard/"
+    ),
+    Scenario(
+        "payments.landlord_arrears", "landlord", f"{API}/payments/landlord/arrears/"
+    ),
+    Scenario("payments.stats", "landlord", f"{API}/payments/stats/dashboard/"),
+    Scenario("matching.statistics", "landlord", f"{API}/matching/statistics/"),
+    Scenario(
+        "requests.received",
+        "landlord",
+        f"{API}/requests/api/base/my_received_requests/",
+    ),
+    Scenario("ratings.stats", "landlord", f"{API}/ratings/stats/"),
+]
+
+
+class APIBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.scale = budgets.scale()
+        cls.manifest = seed(scale=cls.scale)
+        cls.users = {
+            user.email: user
+            for user in get_user_model().objects.filter(
+                email__in=cls.manifest["accounts"].values()
+            )
+        }
+
+    def _client(self, role):
+        client = APIClient()
+        client.force_authenticate(user=self.users[self.manifest["accounts"][role]])
+        return client
+
+    def test_endpoints_within_budget(self):
+        baseline = budgets.load()
+        update = budgets.env_flag("PERF_UPDATE_BASELINES")
+        enforce = update is False and baseline["scale"] == self.scale
+        enforce_latency = budgets.env_flag("PERF_ENFORCE_LATENCY")
+        runs = budgets.iterations()
+
+        results = {}
+        for scenario in SCENARIOS:
+            with self.subTest(endpoint=scenario.name):
+                # Cada endpoint arranca en frío (caché y rate limit por IP)
+                # y se calienta en `measure`.
+                cache.clear()
+                status, measured = budgets.measure(
+                    self._client(scenario.role), scenario, runs, self.manifest["ids"]
+                )
+                self.assertLess(status, 400, f"{scenario.name} ({scenario.path})")
+                results[scenario.name] = measured
+                if enforce:
+                    self.assertEqual(
+                        budgets.violations(
+                            scenario.name,
+                            measured,
+                            baseline["endpoints"].get(scenario.name),
+                            enforce_latency=enforce_latency,
+                        ),
+                        [],
+                    )
+
+        sys.stderr.write(
+            f"\nAPI budgets (escala {self.scale}, {runs} iteraciones):\n"
+            + budgets.report(results, baseline["endpoints"])
+            + "\n"
+        )
+        if update and len(results) == len(SCENARIOS):
+            budgets.save(results, self.scale)
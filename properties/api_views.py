@@ -10,11 +10,11 @@ from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count
-from django.utils import timezone
-from datetime import timedelta
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, When
 
 # Importar utilidades de cache optimizadas
+from core import chunked_uploads
 from core.cache import SmartCache
 
 from .models import (
@@ -26,6 +26,7 @@ from .models import (
     PropertyFavorite,
     PropertyView,
 )
+from . import view_tracking
 from .serializers import (
     PropertyImageSerializer,
     PropertyVideoSerializer,
@@ -133,7 +134,6 @@ class PropertyViewSet(
         """Asigna el landlord al crear la propiedad."""
         property_obj = serializer.save(landlord=self.request.user)
 
-        SmartCache.invalidate_pattern("properties:list:v2:*")
         SmartCache.invalidate_pattern("property:detail:v2:*")
         SmartCache.invalidate_pattern("verihome:properties:*")
 
@@ -165,13 +165,8 @@ class PropertyViewSet(
         property_obj = serializer.save()
 
         # Invalidar cache específico de la propiedad
-        cache_patterns = [
-            f"property:detail:v2:{property_obj.id}:*",
-            "properties:list:v2:*",
-        ]
-
-        for pattern in cache_patterns:
-            SmartCache.invalidate_pattern(pattern)
+        # El listado se invalida vía properties/signals.py.
+        SmartCache.invalidate_pattern(f"property:detail:v2:{property_obj.id}:*")
 
         request = self.request
         # Logging automático
@@ -206,7 +201,6 @@ class PropertyViewSet(
             instance.delete()
 
             # Invalidar cache DESPUÉS de eliminar
-            SmartCache.invalidate_pattern("properties:list:v2:*")
             SmartCache.invalidate_pattern("property:detail:v2:*")
             SmartCache.invalidate_pattern("verihome:properties:*")
 
@@ -230,7 +224,6 @@ class PropertyViewSet(
                 if hasattr(instance, "is_active"):
                     instance.is_active = False
                     instance.save(update_fields=["is_active"])
-                    SmartCache.invalidate_pattern("properties:list:v2:*")
                     SmartCache.invalidate_pattern("property:detail:v2:*")
                     SmartCache.invalidate_pattern("verihome:properties:*")
                     logger.warning(
@@ -752,19 +745,16 @@ class TrendingPropertiesAPIView(PropertyAccessMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        # Propiedades más vistas en los últimos 30 días (PropertyView usa viewed_at, no created_at)
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        trending_properties = (
-            PropertyView.objects.filter(viewed_at__gte=thirty_days_ago)
-            .values("property")
-            .annotate(view_count=Count("id"))
-            .order_by("-view_count")[:10]
+        # Propiedades más vistas en los últimos 30 días, desde los agregados
+        # diarios de properties/view_tracking.py (no un Count sobre PropertyView).
+        property_ids = view_tracking.trending_property_ids(limit=10)
+        ranking = Case(
+            *[When(id=pk, then=rank) for rank, pk in enumerate(property_ids)],
+            output_field=IntegerField(),
         )
-
-        property_ids = [item["property"] for item in trending_properties]
         return Property.objects.filter(
             is_active=True, status="available", id__in=property_ids
-        )
+        ).order_by(ranking if property_ids else "pk")
 
 
 class PropertyStatsAPIView(APIView):
@@ -947,10 +937,24 @@ class PropertyVideoUploadAPIView(APIView):
         data = request.data.copy()
         data["property"] = property_obj.id
 
+        # Subida por partes: `upload_id` en vez del archivo (core/chunked_uploads.py)
+        try:
+            upload = chunked_uploads.attach_upload(
+                request, data, "video", "property_video"
+            )
+        except chunked_uploads.ChunkedUploadError as exc:
+            return Response({"error": str(exc)}, status=exc.status_code)
+
         # Crear video
         serializer = PropertyVideoSerializer(data=data)
         if serializer.is_valid():
-            video = serializer.save(property=property_obj)
+            with transaction.atomic():
+                if upload and not chunked_uploads.mark_consumed(upload):
+                    return Response(
+                        {"error": "La subida ya fue utilizada."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                video = serializer.save(property=property_obj)
 
             # Log de actividad
             from users.models import UserActivityLog
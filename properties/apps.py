@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PropertiesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "properties"
+
+    def ready(self):
+        # Invalidación de la cache del listado (properties/list_cache.py).
+        from . import signals  # noqa: F401
@@ -0,0 +1,247 @@
+"""Cache compartida del listado de propiedades (`GET /api/v1/properties/`).
+
+El listado se cachea en dos piezas dentro del cache `default` (Redis en
+producción, compartido por todos los workers de gunicorn):
+
+- Páginas de ids: `{count, ids}` por audiencia y query canónica. La
+  audiencia es lo único del usuario que cambia el resultado (`public`
+  para arrendatarios/anónimos, `landlord:<id>` para cada arrendador,
+  `all` para superusuarios), así que un listado público se cachea una
+  vez para todos los que lo ven. La query canónica ordena los
+  parámetros, descarta vacíos y valores por defecto y se hashea con
+  SHA-1: el mismo filtro produce la misma clave en cualquier proceso
+  (el `hash()` de Python cambia por proceso con PYTHONHASHSEED).
+- Fragmentos: el JSON de cada propiedad, sin las decoraciones por
+  usuario (`is_favorited` se calcula aparte en una sola query). Editar
+  una propiedad borra sólo su fragmento.
+
+Las páginas guardan la "generación" de cada scope del que dependen y
+dejan de valer cuando alguna cambia (ver `properties/signals.py`):
+
+- `listing`: crear/borrar propiedades o editar campos que filtran u
+  ordenan (`LISTING_FIELDS`). Todas las páginas dependen de ella.
+- `search`: editar texto buscable (`SEARCH_FIELDS`); sólo las páginas
+  con `search`.
+- `updates`: cualquier `save()`; sólo las páginas ordenadas por
+  `last_updated`.
+
+Ordenar por `views_count` se sirve con hasta `PAGE_TIMEOUT` de atraso:
+el flush de visualizaciones (`view_tracking.py`) lo incrementa con SQL
+directo, sin signals.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections.abc import Collection, Iterable, Mapping
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+
+from core.cache import CACHE_TIMEOUTS
+
+_PAGE_KEY = "properties:list:v3:page:{audience}:{query}"
+_FRAGMENT_KEY = "properties:list:v3:item:{property_id}:{origin}"
+_GENERATION_KEY = "properties:list:v3:generation:{scope}"
+_ORIGINS_KEY = "properties:list:v3:origins"
+_STATS_KEY = "properties:list:v3:stats:{event}"
+
+EVENTS = ("page_hits", "page_misses", "fragment_hits", "fragment_misses")
+
+# Parámetros que nunca cambian el resultado (formato, cache-busters).
+IGNORED_PARAMS = frozenset({"format", "_"})
+# Filtros case-insensitive (SearchFilter usa icontains).
+_CASE_INSENSITIVE_PARAMS = frozenset({"search"})
+
+# Campos de texto que sólo importan a las páginas con `search`
+# (search_fields de la vista que no son además filtros).
+SEARCH_FIELDS = frozenset({"title", "description", "address"})
+# Campos que deciden qué propiedades entran en una página y en qué
+# orden: cambiarlos invalida las páginas de ids.
+LISTING_FIELDS = SEARCH_FIELDS | {
+    "landlord_id",
+    "is_active",
+    "property_type",
+    "listing_type",
+    "status",
+    "city",
+    "state",
+    "country",
+    "rent_price",
+    "sale_price",
+    "created_at",
+}
+
+SCOPES = ("listing", "search", "updates")
+
+PAGE_TIMEOUT = CACHE_TIMEOUTS["medium"]
+FRAGMENT_TIMEOUT = CACHE_TIMEOUTS["properties"]
+
+
+def canonical_query(
+    params: Mapping[str, str],
+    allowed: Collection[str] | None = None,
+    defaults: Mapping[str, str] | None = None,
+) -> str:
+    """SHA-1 estable de los parámetros del listado.
+
+    Usa el último valor de cada parámetro (el que leen los filtros de
+    DRF), descarta los que la vista no lee (fuera de `allowed`), vacíos
+    y los iguales a `defaults` (p.ej. `page=1`), y normaliza espacios y
+    mayúsculas donde no importan.
+    """
+    defaults = defaults or {}
+    items = []
+    for name in sorted(params.keys()):
+        if name in IGNORED_PARAMS or (allowed is not None and name not in allowed):
+            continue
+        value = " ".join(str(params.get(name, "")).split())
+        if name in _CASE_INSENSITIVE_PARAMS:
+            value = value.lower()
+        if not value or defaults.get(name) == value:
+            continue
+        items.append((name, value))
+    return hashlib.sha1(urlencode(items).encode("utf-8")).hexdigest()
+
+
+def origin_of(request) -> str:
+    """Firma de esquema+host: los fragmentos llevan URLs absolutas."""
+    base = request.build_absolute_uri("/")
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12]
+
+
+# ----------------------------------------------------------------------
+# Páginas de ids
+# ----------------------------------------------------------------------
+
+
+def _generation(scope: str) -> str:
+    key = _GENERATION_KEY.format(scope=scope)
+    generation = cache.get(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def get_page(
+    audience: str, query: str, scopes: Collection[str] = ("listing",)
+) -> dict | None:
+    """`{count, ids}` cacheado o None si falta o es de otra generación."""
+    key = _PAGE_KEY.format(audience=audience, query=query)
+    generation_keys = {scope: _GENERATION_KEY.format(scope=scope) for scope in scopes}
+    found = cache.get_many([key, *generation_keys.values()])
+    page = found.get(key)
+    if page is None or any(
+        page["generations"].get(scope) != found.get(generation_key)
+        for scope, generation_key in generation_keys.items()
+    ):
+        _record("page_misses")
+        return None
+    _record("page_hits")
+    return page
+
+
+def set_page(
+    audience: str,
+    query: str,
+    count: int,
+    ids: list[str],
+    scopes: Collection[str] = ("listing",),
+) -> None:
+    generations = {scope: _generation(scope) for scope in scopes}
+    cache.set(
+        _PAGE_KEY.format(audience=audience, query=query),
+        {"generations": generations, "count": count, "ids": ids},
+        PAGE_TIMEOUT,
+    )
+
+
+def bump_generation(*scopes: str) -> None:
+    """Invalida las páginas que dependen de `scopes` (todas si no se indica)."""
+    cache.set_many(
+        {
+            _GENERATION_KEY.format(scope=scope): uuid.uuid4().hex
+            for scope in scopes or SCOPES
+        },
+        None,
+    )
+
+
+# ----------------------------------------------------------------------
+# Fragmentos por propiedad
+# ----------------------------------------------------------------------
+
+
+def get_fragments(property_ids: Iterable[str], origin: str) -> dict[str, dict]:
+    property_ids = list(property_ids)
+    keys = {
+        _FRAGMENT_KEY.format(property_id=pk, origin=origin): pk for pk in property_ids
+    }
+    found = cache.get_many(list(keys))
+    fragments = {keys[key]: value for key, value in found.items()}
+    _record("fragment_hits", len(fragments))
+    _record("fragment_misses", len(property_ids) - len(fragments))
+    return fragments
+
+
+def set_fragments(fragments: Mapping[str, dict], origin: str) -> None:
+    if not fragments:
+        return
+    origins = cache.get(_ORIGINS_KEY) or []
+    if origin not in origins:
+        cache.set(_ORIGINS_KEY, [*origins, origin], None)
+    cache.set_many(
+        {
+            _FRAGMENT_KEY.format(property_id=pk, origin=origin): data
+            for pk, data in fragments.items()
+        },
+        FRAGMENT_TIMEOUT,
+    )
+
+
+def invalidate_property(property_id) -> None:
+    """Borra el fragmento de una propiedad en todos los hosts servidos."""
+    origins = cache.get(_ORIGINS_KEY) or []
+    if origins:
+        cache.delete_many(
+            [
+                _FRAGMENT_KEY.format(property_id=property_id, origin=origin)
+                for origin in origins
+            ]
+        )
+
+
+# ----------------------------------------------------------------------
+# Métricas
+# ----------------------------------------------------------------------
+
+
+def _record(event: str, amount: int = 1) -> None:
+    if amount <= 0:
+        return
+    key = _STATS_KEY.format(event=event)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        if not cache.add(key, amount, None):
+            cache.incr(key, amount)
+
+
+def stats() -> dict[str, float]:
+    """Contadores agregados de todos los workers y tasas de acierto."""
+    keys = {event: _STATS_KEY.format(event=event) for event in EVENTS}
+    found = cache.get_many(list(keys.values()))
+    counters = {event: int(found.get(key) or 0) for event, key in keys.items()}
+    for kind in ("page", "fragment"):
+        total = counters[f"{kind}_hits"] + counters[f"{kind}_misses"]
+        counters[f"{kind}_hit_rate"] = (
+            round(counters[f"{kind}_hits"] / total, 4) if total else 0.0
+        )
+    return counters
+
+
+def reset_stats() -> None:
+    cache.delete_many([_STATS_KEY.format(event=event) for event in EVENTS])
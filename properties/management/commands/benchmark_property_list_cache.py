@@ -0,0 +1,244 @@
+"""Tasa de acierto de la cache del listado bajo el escenario de locust.
+
+Reproduce la mezcla de `performance_tests/locustfile.py` sobre
+`GET /api/v1/properties/` (browse/search/detalle de `VeriHomeUser` y la
+búsqueda de `TenantUser`, con las mismas probabilidades de filtros) y
+las ediciones de descripción de `LandlordUser`, contra el cache
+configurado. Los datos sintéticos se crean dentro de una transacción que
+se revierte al final.
+
+Para comparar, estima la tasa del esquema anterior (clave por usuario y
+`hash()` por proceso): sólo acierta si el mismo usuario repite la misma
+query en el mismo worker, y cada edición vacía todos los listados.
+
+Uso:
+
+    python manage.py benchmark_property_list_cache
+    python manage.py benchmark_property_list_cache --requests 5000 \\
+        --users 200 --workers 8 --edit-ratio 0.1 --json
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from properties import list_cache
+from properties.models import Property
+
+_CITIES = ("Bogotá", "Medellín", "Cali")
+_TYPES = ("apartment", "house", "studio")
+_SEARCH_TERMS = (
+    "apartment",
+    "house",
+    "luxury",
+    "furnished",
+    "parking",
+    "gym",
+    "pool",
+    "balcony",
+    "pets",
+)
+# Peso de cada tarea de locust que pide el listado.
+_TASKS = (("browse", 30), ("search", 10), ("detail", 8), ("tenant_search", 40))
+
+
+def _locust_params(rng: random.Random) -> dict[str, str]:
+    task = rng.choices([name for name, _ in _TASKS], [w for _, w in _TASKS])[0]
+    params: dict[str, object] = {}
+    if task == "browse":
+        if rng.random() < 0.3:
+            params["city"] = rng.choice(_CITIES)
+        if rng.random() < 0.2:
+            params["max_price"] = rng.choice([1000000, 2000000, 3000000])
+        if rng.random() < 0.2:
+            params["property_type"] = rng.choice(_TYPES)
+        if rng.random() < 0.1:
+            params["bedrooms"] = rng.choice([1, 2, 3])
+    elif task == "search":
+        params["search"] = rng.choice(_SEARCH_TERMS)
+    elif task == "tenant_search":
+        if rng.random() < 0.4:
+            params["city"] = rng.choice(_CITIES[:2])
+        if rng.random() < 0.3:
+            params["max_price"] = rng.choice([1500000, 2000000, 2500000])
+        if rng.random() < 0.3:
+            params["min_bedrooms"] = rng.choice([1, 2])
+        if rng.random() < 0.2:
+            params["furnished"] = "true"
+        if rng.random() < 0.1:
+            params["pets_allowed"] = "true"
+    return {key: str(value) for key, value in params.items()}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mide la tasa de acierto de la cache del listado de propiedades."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=2000,
+            help="Requests de listado (default: 2000).",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=100,
+            help="Arrendatarios distintos (default: 100).",
+        )
+        parser.add_argument(
+            "--properties",
+            type=int,
+            default=300,
+            help="Propiedades sintéticas (default: 300).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Workers de gunicorn para estimar el esquema anterior (default: 4).",
+        )
+        parser.add_argument(
+            "--edit-ratio",
+            type=float,
+            default=0.05,
+            help="Ediciones de descripción por request (default: 0.05).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["users"] < 1:
+            raise CommandError("--requests y --users deben ser >= 1")
+        report = {}
+        try:
+            with transaction.atomic():
+                report = self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+        # Las páginas cacheadas apuntan a propiedades revertidas.
+        list_cache.bump_generation()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            self.style.MIGRATE_HEADING("═══ Cache del listado de propiedades ═══")
+        )
+        for key, value in report.items():
+            self.stdout.write(f"  {key}: {value}")
+
+    def _run(self, options) -> dict:
+        rng = random.Random(options["seed"])
+        tenants, property_ids = self._seed(rng, options)
+        client = APIClient()
+
+        list_cache.reset_stats()
+        legacy_seen: set = set()
+        legacy_hits = 0
+        latencies: dict[str, list[float]] = {"hit": [], "miss": []}
+        edits = 0
+
+        for _ in range(options["requests"]):
+            user = rng.choice(tenants)
+            params = _locust_params(rng)
+            worker = rng.randrange(options["workers"])
+
+            legacy_key = (worker, user.pk, frozenset(params.items()))
+            legacy_hits += legacy_key in legacy_seen
+            legacy_seen.add(legacy_key)
+
+            hits_before = list_cache.stats()["page_hits"]
+            client.force_authenticate(user=user)
+            start = time.perf_counter()
+            response = client.get("/api/v1/properties/", params)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            if response.status_code != 200:
+                raise CommandError(
+                    f"GET /api/v1/properties/ → {response.status_code}: "
+                    f"{str(response.content)[:200]}"
+                )
+            hit = list_cache.stats()["page_hits"] > hits_before
+            latencies["hit" if hit else "miss"].append(elapsed)
+
+            if rng.random() < options["edit_ratio"]:
+                prop = Property.objects.get(pk=rng.choice(property_ids))
+                prop.description = (
+                    f"Updated property description {rng.randint(1, 1000)}"
+                )
+                prop.save()
+                legacy_seen.clear()
+                edits += 1
+
+        stats = list_cache.stats()
+        return {
+            "requests": options["requests"],
+            "users": len(tenants),
+            "properties": len(property_ids),
+            "edits": edits,
+            "page_hit_rate": stats["page_hit_rate"],
+            "fragment_hit_rate": stats["fragment_hit_rate"],
+            "legacy_hit_rate_estimate": round(legacy_hits / options["requests"], 4),
+            "legacy_workers": options["workers"],
+            "hit_mean_ms": _mean(latencies["hit"]),
+            "miss_mean_ms": _mean(latencies["miss"]),
+        }
+
+    @staticmethod
+    def _seed(rng: random.Random, options):
+        User = get_user_model()
+        stamp = rng.randrange(10**9)
+        landlord = User.objects.create(
+            email=f"bench-landlord-{stamp}@verihome.test", user_type="landlord"
+        )
+        tenants = User.objects.bulk_create(
+            [
+                User(
+                    email=f"bench-tenant-{stamp}-{i}@verihome.test", user_type="tenant"
+                )
+                for i in range(options["users"])
+            ]
+        )
+        properties = Property.objects.bulk_create(
+            [
+                Property(
+                    landlord=landlord,
+                    title=f"{rng.choice(_TYPES)} {rng.choice(_SEARCH_TERMS)} {i}",
+                    description=f"Propiedad de prueba con {rng.choice(_SEARCH_TERMS)}",
+                    property_type=rng.choice(_TYPES),
+                    listing_type="rent",
+                    status="available",
+                    address=f"Calle {i} #10-30",
+                    city=rng.choice(_CITIES),
+                    state="Test",
+                    country="Colombia",
+                    bedrooms=rng.randint(1, 4),
+                    bathrooms=Decimal("1.0"),
+                    total_area=Decimal(rng.randint(40, 200)),
+                    rent_price=Decimal(rng.randint(800, 5000) * 1000),
+                    is_active=True,
+                )
+                for i in range(options["properties"])
+            ]
+        )
+        # bulk_create no dispara signals.
+        list_cache.bump_generation()
+        return tenants, [prop.pk for prop in properties]
+
+
+def _mean(values: list[float]) -> float:
+    return round(statistics.fmean(values), 2) if values else 0.0
@@ -0,0 +1,39 @@
+"""Reconstruye los agregados de tendencias desde `PropertyView`.
+
+Correr una vez al desplegar el registro bufferizado de visualizaciones
+(o si se vació Redis) para que `/api/v1/properties/trending/` no arranque
+con sólo los días nuevos. Antes vacía el buffer pendiente.
+
+Uso:
+
+    python manage.py rebuild_property_trending
+    python manage.py rebuild_property_trending --days 7
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from properties import view_tracking
+
+
+class Command(BaseCommand):
+    help = "Reconstruye las tendencias de propiedades desde PropertyView."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Días hacia atrás (default: PROPERTY_TRENDING_DAYS).",
+        )
+
+    def handle(self, *args, **options):
+        flushed = view_tracking.flush_views()
+        days = view_tracking.rebuild_trending(options["days"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Tendencias reconstruidas: {days} días "
+                f"({flushed} visualizaciones pendientes persistidas)."
+            )
+        )
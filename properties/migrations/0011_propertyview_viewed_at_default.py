@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:23
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("properties", "0010_property_idx_property_status_active_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="propertyview",
+            name="viewed_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, verbose_name="Fecha de visualización"
+            ),
+        ),
+    ]
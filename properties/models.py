@@ -4,8 +4,8 @@ Incluye propiedades, imágenes, amenidades y características.
 """
 
 from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.auth import get_user_model
-from PIL import Image
 import uuid
 
 User = get_user_model()
@@ -230,6 +230,8 @@ class PropertyImage(models.Model):
     is_main = models.BooleanField("Imagen principal", default=False)
     order = models.PositiveIntegerField("Orden", default=0)
     created_at = models.DateTimeField("Fecha de subida", auto_now_add=True)
+    # Versiones thumb/card/full y placeholders (core/image_pipeline.py).
+    renditions = models.JSONField("Versiones", default=dict, blank=True)
 
     class Meta:
         verbose_name = "Imagen de Propiedad"
@@ -246,16 +248,10 @@ class PropertyImage(models.Model):
                 pk=self.pk
             ).update(is_main=False)
 
+        # El redimensionado y las versiones se generan fuera del request
+        # (properties/signals.py → core/image_pipeline.py).
         super().save(*args, **kwargs)
 
-        # Redimensionar imagen si es muy grande
-        if self.image:
-            img = Image.open(self.image.path)
-            if img.height > 1080 or img.width > 1920:
-                output_size = (1920, 1080)
-                img.thumbnail(output_size, Image.Resampling.LANCZOS)
-                img.save(self.image.path, optimize=True, quality=85)
-
 
 class PropertyVideo(models.Model):
     """Videos de las propiedades."""
@@ -374,7 +370,9 @@ class PropertyView(models.Model):
     )
     ip_address = models.GenericIPAddressField("Dirección IP", null=True, blank=True)
     user_agent = models.TextField("User Agent", blank=True)
-    viewed_at = models.DateTimeField("Fecha de visualización", auto_now_add=True)
+    # default (no auto_now_add) para que el flush bufferizado conserve la
+    # hora real de la visualización (properties/view_tracking.py).
+    viewed_at = models.DateTimeField("Fecha de visualización", default=timezone.now)
     session_key = models.CharField("Clave de sesión", max_length=40, blank=True)
 
     class Meta:
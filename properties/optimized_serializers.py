@@ -6,6 +6,8 @@ Uses annotations and prefetched data to eliminate all N+1 query problems
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
+from core import image_pipeline
+
 from .models import (
     Property,
     PropertyImage,
@@ -22,11 +24,14 @@ User = get_user_model()
 class OptimizedPropertyImageSerializer(serializers.ModelSerializer):
     """Optimized PropertyImage serializer."""
 
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = PropertyImage
         fields = [
             "id",
             "image",
+            "renditions",
             "caption",
             "is_main",
             "order",
@@ -35,6 +40,12 @@ class OptimizedPropertyImageSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
+    def get_renditions(self, obj):
+        """Versiones thumb/card/full ya procesadas (core/image_pipeline.py)."""
+        return image_pipeline.rendition_payload(
+            obj.renditions, obj.image.storage, self.context.get("request")
+        )
+
 
 class OptimizedAmenitySerializer(serializers.ModelSerializer):
     """Optimized PropertyAmenity serializer."""
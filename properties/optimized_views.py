@@ -33,6 +33,7 @@ from .models import (
     PropertyView,
 )
 from .serializers import (
+    PropertyListItemSerializer,
     PropertySerializer,
     CreatePropertySerializer,
     UpdatePropertySerializer,
@@ -42,6 +43,7 @@ from .serializers import (
 )
 from users.permissions import PropertyAccessMixin, RoleBasedPermissionMixin
 from core.cache import SmartCache, CACHE_TIMEOUTS
+from . import list_cache, view_tracking
 
 logger = logging.getLogger(__name__)
 
@@ -234,32 +236,98 @@ class OptimizedPropertyViewSet(
 
     def list(self, request, *args, **kwargs):
         """
-        Optimized list view with intelligent caching.
-        Cache keys include user context and filter parameters.
-        """
-        # Generate cache key including user and filters
-        user_id = request.user.id if request.user.is_authenticated else "anon"
-        filters_hash = hash(frozenset(request.GET.items()))
-        cache_key = f"properties:list:v2:{user_id}:{filters_hash}"
-
-        # Try to get from cache
-        cached_response = cache.get(cache_key)
-        if cached_response:
-            logger.debug(f"Cache HIT for property list: {cache_key}")
-            return Response(cached_response)
+        Listado cacheado entre workers (ver properties/list_cache.py).
 
-        # Execute query
-        logger.debug(f"Cache MISS for property list: {cache_key}")
-        response = super().list(request, *args, **kwargs)
+        La página de ids se comparte por audiencia y query canónica; cada
+        propiedad se arma desde su fragmento cacheado y `is_favorited`
+        se agrega al final para el usuario actual.
+        """
+        paginator = self.paginator
+        audience = self._listing_audience()
+        query = list_cache.canonical_query(
+            request.query_params,
+            allowed={
+                *self.filterset_fields,
+                filters.SearchFilter.search_param,
+                filters.OrderingFilter.ordering_param,
+                paginator.page_query_param,
+                paginator.page_size_query_param,
+            },
+            defaults={
+                paginator.page_query_param: "1",
+                paginator.page_size_query_param: str(paginator.page_size),
+            },
+        )
 
-        # Cache successful responses
-        if response.status_code == 200:
-            cache.set(
-                cache_key, response.data, timeout=CACHE_TIMEOUTS.get("properties", 300)
+        scopes = ["listing"]
+        if request.query_params.get(filters.SearchFilter.search_param):
+            scopes.append("search")
+        if "last_updated" in request.query_params.get(
+            filters.OrderingFilter.ordering_param, ""
+        ):
+            scopes.append("updates")
+        cached_page = list_cache.get_page(audience, query, scopes)
+        if cached_page is None:
+            instances = self.paginate_queryset(
+                self.filter_queryset(self.get_queryset())
             )
-            logger.debug(f"Cached property list response: {cache_key}")
-
-        return response
+            ids = [str(obj.pk) for obj in instances]
+            list_cache.set_page(
+                audience, query, paginator.page.paginator.count, ids, scopes
+            )
+            known = dict(zip(ids, instances))
+        else:
+            # Paginar un range(count) reconstruye page/next/previous (y
+            # valida el número de página) sin tocar la base de datos.
+            self.paginate_queryset(range(cached_page["count"]))
+            ids = cached_page["ids"]
+            known = {}
+
+        results = self._listing_fragments(ids, known)
+        self._decorate_favorites(results)
+        return self.get_paginated_response(results)
+
+    def _listing_audience(self):
+        """Qué subconjunto ve el usuario; espejo de `get_queryset`."""
+        user = self.request.user
+        if user.is_authenticated and getattr(user, "user_type", None) == "landlord":
+            return "all" if user.is_superuser else f"landlord:{user.pk}"
+        return "public"
+
+    def _listing_fragments(self, ids, known):
+        """Propiedades serializadas en el orden de `ids`, desde la cache."""
+        origin = list_cache.origin_of(self.request)
+        fragments = list_cache.get_fragments(ids, origin)
+        missing = [pk for pk in ids if pk not in fragments]
+        if missing:
+            if not all(pk in known for pk in missing):
+                known = {
+                    str(obj.pk): obj
+                    for obj in self.get_queryset().filter(pk__in=missing)
+                }
+            # Borradas/desactivadas desde que se cacheó la página: se omiten.
+            instances = [known[pk] for pk in missing if pk in known]
+            rendered = PropertyListItemSerializer(
+                instances, many=True, context=self.get_serializer_context()
+            ).data
+            fresh = {item["id"]: dict(item) for item in rendered}
+            list_cache.set_fragments(fresh, origin)
+            fragments.update(fresh)
+        return [dict(fragments[pk]) for pk in ids if pk in fragments]
+
+    def _decorate_favorites(self, results):
+        """`is_favorited` de toda la página en una sola query."""
+        user = self.request.user
+        favorited = set()
+        if user.is_authenticated and results:
+            favorited = {
+                str(pk)
+                for pk in PropertyFavorite.objects.filter(
+                    user=user, property_id__in=[item["id"] for item in results]
+                ).values_list("property_id", flat=True)
+            }
+        for item in results:
+            item["is_favorited"] = item["id"] in favorited
 
     def retrieve(self, request, *args, **kwargs):
         """
@@ -296,37 +364,21 @@ class OptimizedPropertyViewSet(
 
     def _track_property_view(self, property_obj, request):
         """
-        Efficiently track property views without causing performance issues.
-        Uses get_or_create to avoid duplicates within the same session.
+        Registra la visualización en el buffer (properties/view_tracking.py).
+        La escritura en base de datos la hace el flush periódico.
         """
-        if request.user.is_authenticated:
-            # Use get_or_create to avoid duplicate views within same day
-            today = timezone.localdate()
-            view, created = PropertyView.objects.get_or_create(
-                property=property_obj,
-                user=request.user,
-                viewed_at__date=today,
-                defaults={
-                    "viewed_at": timezone.now(),
-                    "ip_address": request.META.get("REMOTE_ADDR", ""),
-                    "user_agent": request.META.get("HTTP_USER_AGENT", "")[:200],
-                },
+        if view_tracking.record_view(property_obj, request):
+            logger.debug(
+                "Buffered new view for property %s by user %s",
+                property_obj.id,
+                request.user.id,
             )
 
-            if created:
-                # Update view count using F() to avoid race conditions
-                Property.objects.filter(id=property_obj.id).update(
-                    views_count=F("views_count") + 1
-                )
-                logger.debug(
-                    f"Tracked new view for property {property_obj.id} by user {request.user.id}"
-                )
-
     def perform_create(self, serializer):
         """Create property with cache invalidation."""
         property_obj = serializer.save(landlord=self.request.user)
 
-        SmartCache.invalidate_pattern("properties:list:v2:*")
+        # El listado se invalida vía properties/signals.py.
         SmartCache.invalidate_pattern("property:detail:v2:*")
         SmartCache.invalidate_pattern("verihome:properties:*")
 
@@ -354,26 +406,11 @@ class OptimizedPropertyViewSet(
             detail_keys.append(f"property:detail:{property_obj.id}")
             detail_keys.append(f"property:{property_obj.id}")
 
-        # 2. Invalidar listas de propiedades
-        list_keys = []
-        if self.request.user:
-            # Generar diferentes combinaciones de keys de lista basadas en el log
-            user_id = str(self.request.user.id)
-            # Keys exactas del log
-            list_keys.extend(
-                [
-                    f"properties:list:v2:{user_id}:133146708735736",
-                    f"properties:list:v2:{user_id}:-4096558671697864446",
-                    f"properties:list:v2:{user_id}:*",
-                    "properties:list:v2:*",
-                    "properties:list:*",
-                    "verihome:properties:list",
-                ]
-            )
+        # 2. El listado (páginas y fragmento) se invalida vía
+        #    properties/signals.py.
 
         # 3. Eliminar todas las keys directamente del cache
-        all_keys = detail_keys + list_keys
-        for key in all_keys:
+        for key in detail_keys:
             try:
                 cache.delete(key)
                 logger.debug(f"Deleted cache key: {key}")
@@ -381,13 +418,7 @@ class OptimizedPropertyViewSet(
                 logger.debug(f"Could not delete key {key}: {e}")
 
         # 4. También intentar con SmartCache por si acaso
-        cache_patterns = [
-            f"property:detail:v2:{property_obj.id}:*",
-            "properties:list:v2:*",
-        ]
-
-        for pattern in cache_patterns:
-            SmartCache.invalidate_pattern(pattern)
+        SmartCache.invalidate_pattern(f"property:detail:v2:{property_obj.id}:*")
 
         logger.info(f"Updated property {property_obj.id} and invalidated cache")
 
@@ -426,14 +457,8 @@ class OptimizedPropertyViewSet(
             favorited = True
             message = "Property added to favorites"
 
-        # Invalidate relevant caches
-        cache_patterns = [
-            f"property:detail:v2:{property_obj.id}:*",
-            f"properties:list:v2:{request.user.id}:*",
-        ]
-
-        for pattern in cache_patterns:
-            SmartCache.invalidate_pattern(pattern)
+        # Invalidate relevant caches (el listado calcula is_favorited en vivo)
+        SmartCache.invalidate_pattern(f"property:detail:v2:{property_obj.id}:*")
 
         return Response(
             {
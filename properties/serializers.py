@@ -3,6 +3,8 @@ Serializadores para la aplicación de propiedades de VeriHome.
 """
 
 from rest_framework import serializers
+
+from core import image_pipeline
 from .models import (
     Property,
     PropertyImage,
@@ -28,6 +30,7 @@ class PropertyImageSerializer(serializers.ModelSerializer):
     """Serializador para imágenes de propiedades."""
 
     image_url = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = PropertyImage
@@ -36,6 +39,7 @@ class PropertyImageSerializer(serializers.ModelSerializer):
             "property",
             "image",
             "image_url",
+            "renditions",
             "caption",
             "is_main",
             "order",
@@ -50,6 +54,12 @@ class PropertyImageSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_renditions(self, obj):
+        """thumb/card/full (WebP + JPEG) y placeholders; None si está pendiente."""
+        return image_pipeline.rendition_payload(
+            obj.renditions, obj.image.storage, self.context.get("request")
+        )
+
 
 class PropertyVideoSerializer(serializers.ModelSerializer):
     """Serializador para videos de propiedades."""
@@ -162,6 +172,7 @@ class PropertySerializer(serializers.ModelSerializer):
     videos = PropertyVideoSerializer(many=True, read_only=True)
     amenity_relations = PropertyAmenityRelationSerializer(many=True, read_only=True)
     main_image_url = serializers.SerializerMethodField()
+    main_image_renditions = serializers.SerializerMethodField()
     formatted_price = serializers.CharField(read_only=True)
     is_favorited = serializers.SerializerMethodField()
 
@@ -216,6 +227,7 @@ class PropertySerializer(serializers.ModelSerializer):
             "videos",
             "amenity_relations",
             "main_image_url",
+            "main_image_renditions",
             "formatted_price",
             "is_favorited",
         ]
@@ -227,29 +239,48 @@ class PropertySerializer(serializers.ModelSerializer):
             "views_count",
             "favorites_count",
             "main_image_url",
+            "main_image_renditions",
             "formatted_price",
             "is_favorited",
         ]
 
+    # Versión de `main_image_renditions` que usa `main_image_url` cuando
+    # ya está procesada; None = el original.
+    main_image_rendition = None
+
+    def _main_image(self, obj):
+        """Imagen principal marcada o, si no hay, la primera disponible."""
+        images = [image for image in obj.images.all() if image.image]
+        return next((image for image in images if image.is_main), None) or next(
+            iter(images), None
+        )
+
     def get_main_image_url(self, obj):
         """Obtiene la URL de la imagen principal."""
-        # Intentar obtener imagen principal marcada
-        main_image = obj.get_main_image()
-
-        # Si no hay imagen principal, usar la primera imagen disponible
-        if not main_image:
-            first_image = obj.images.first()
-            if first_image and first_image.image:
-                main_image = first_image.image.url
-            else:
-                return None
-
-        if main_image:
-            request = self.context.get("request")
-            if request:
-                return request.build_absolute_uri(main_image)
-            return main_image
-        return None
+        main_image = self._main_image(obj)
+        if main_image is None:
+            return None
+
+        url = main_image.image.url
+        rendition = (main_image.renditions.get("renditions") or {}).get(
+            self.main_image_rendition or ""
+        )
+        if rendition:
+            url = main_image.image.storage.url(rendition["jpeg"])
+        request = self.context.get("request")
+        if request:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_main_image_renditions(self, obj):
+        main_image = self._main_image(obj)
+        if main_image is None:
+            return None
+        return image_pipeline.rendition_payload(
+            main_image.renditions,
+            main_image.image.storage,
+            self.context.get("request"),
+        )
 
     def get_is_favorited(self, obj):
         """Verifica si la propiedad está en favoritos del usuario actual."""
@@ -265,6 +296,19 @@ class PropertySerializer(serializers.ModelSerializer):
         return data
 
 
+class PropertyListItemSerializer(PropertySerializer):
+    """Propiedad del listado sin decoraciones por usuario (cacheable).
+
+    `is_favorited` lo agrega la vista en bloque para toda la página. Las
+    tarjetas del listado usan la versión `card` de la imagen principal.
+    """
+
+    main_image_rendition = "card"
+
+    class Meta(PropertySerializer.Meta):
+        fields = [f for f in PropertySerializer.Meta.fields if f != "is_favorited"]
+
+
 class CreatePropertySerializer(serializers.ModelSerializer):
     """Serializador para crear propiedades."""
 
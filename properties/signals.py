@@ -0,0 +1,87 @@
+"""Signals del módulo properties.
+
+Mantienen coherente la cache del listado (`properties/list_cache.py`):
+cualquier cambio de una propiedad o de sus imágenes, videos o amenities
+borra sólo el fragmento de esa propiedad; crear, borrar o cambiar un
+campo que filtra u ordena (`LISTING_FIELDS`) invalida además las
+páginas de ids (sólo las de búsqueda si el cambio es de texto, y las
+ordenadas por `last_updated` con cualquier cambio).
+Cubre todas las vías de escritura (API, admin, shell).
+
+Las imágenes subidas se procesan fuera del request con
+`core.image_pipeline` (versiones, EXIF, placeholders).
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import image_pipeline
+
+from . import list_cache
+from .models import Property, PropertyAmenityRelation, PropertyImage, PropertyVideo
+
+
+@receiver(pre_save, sender=Property)
+def _track_listing_fields(sender, instance, update_fields=None, **kwargs):
+    """Guarda los campos de listado previos para detectar cambios."""
+    instance._previous_listing = None
+    if instance._state.adding:
+        return
+    fields = list_cache.LISTING_FIELDS
+    if update_fields is not None:
+        fields = fields & {
+            sender._meta.get_field(name).attname for name in update_fields
+        }
+        if not fields:
+            return
+    instance._previous_listing = (
+        sender.objects.filter(pk=instance.pk).values(*sorted(fields)).first()
+    )
+
+
+@receiver(post_save, sender=Property)
+def invalidate_property_listing(sender, instance, created, **kwargs):
+    list_cache.invalidate_property(instance.pk)
+    if created:
+        list_cache.bump_generation()
+        return
+    previous = getattr(instance, "_previous_listing", None) or {}
+    changed = {
+        name for name, value in previous.items() if getattr(instance, name) != value
+    }
+    if changed and not changed <= list_cache.SEARCH_FIELDS:
+        list_cache.bump_generation()
+    elif changed:
+        list_cache.bump_generation("search", "updates")
+    else:
+        list_cache.bump_generation("updates")
+
+
+@receiver(post_delete, sender=Property)
+def invalidate_deleted_property(sender, instance, **kwargs):
+    list_cache.invalidate_property(instance.pk)
+    list_cache.bump_generation()
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+@receiver(post_save, sender=PropertyVideo)
+@receiver(post_delete, sender=PropertyVideo)
+@receiver(post_save, sender=PropertyAmenityRelation)
+@receiver(post_delete, sender=PropertyAmenityRelation)
+def invalidate_property_media(sender, instance, **kwargs):
+    list_cache.invalidate_property(instance.property_id)
+
+
+@receiver(post_save, sender=PropertyImage)
+def schedule_property_image_renditions(sender, instance, **kwargs):
+    image_pipeline.schedule_renditions(instance, "image", "property")
+
+
+@receiver(post_delete, sender=PropertyImage)
+def delete_property_image_renditions(sender, instance, **kwargs):
+    meta, storage = instance.renditions, instance.image.storage
+    transaction.on_commit(lambda: image_pipeline.delete_renditions(meta, storage))
@@ -0,0 +1,19 @@
+"""
+Tareas asíncronas de Celery para el módulo properties de VeriHome.
+"""
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(ignore_result=True)
+def flush_property_views():
+    """Persiste las visualizaciones bufferizadas (properties/view_tracking.py)."""
+    from .view_tracking import flush_views
+
+    written = flush_views()
+    if written:
+        logger.info(f"Visualizaciones de propiedades persistidas: {written}")
+    return written
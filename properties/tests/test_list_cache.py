@@ -0,0 +1,192 @@
+"""Tests de la cache compartida del listado (`properties.list_cache`)."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from properties import list_cache
+from properties.models import Property, PropertyFavorite
+
+User = get_user_model()
+
+_LOCMEM = {
+    alias: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": f"property-list-cache-tests-{alias}",
+    }
+    for alias in ("default", "sessions", "query_cache", "local_fallback")
+}
+
+_URL = "/api/v1/properties/"
+
+
+def _user(email, user_type):
+    return User.objects.create_user(
+        email=email, password="TestPass123!", user_type=user_type
+    )
+
+
+def _property(landlord, **kwargs):
+    defaults = {
+        "landlord": landlord,
+        "title": "Apartamento Centro",
+        "description": "Hermoso apartamento en el centro de la ciudad.",
+        "property_type": "apartment",
+        "listing_type": "rent",
+        "status": "available",
+        "address": "Calle 50 #10-30",
+        "city": "Bucaramanga",
+        "state": "Santander",
+        "country": "Colombia",
+        "bedrooms": 3,
+        "bathrooms": Decimal("2.0"),
+        "total_area": Decimal("85.00"),
+        "rent_price": Decimal("1500000.00"),
+        "is_active": True,
+    }
+    defaults.update(kwargs)
+    return Property.objects.create(**defaults)
+
+
+class CanonicalQueryTests(SimpleTestCase):
+    def test_order_defaults_and_whitespace_do_not_change_key(self):
+        key = list_cache.canonical_query({"city": "Cali", "search": "casa grande"})
+        self.assertEqual(
+            key,
+            list_cache.canonical_query(
+                {
+                    "search": "  Casa   GRANDE ",
+                    "city": "Cali",
+                    "page": "1",
+                    "format": "json",
+                    "max_price": "",
+                },
+                defaults={"page": "1"},
+            ),
+        )
+        self.assertEqual(len(key), 40)
+
+    def test_unread_params_are_dropped(self):
+        allowed = {"city"}
+        self.assertEqual(
+            list_cache.canonical_query({"city": "Cali", "utm": "x"}, allowed),
+            list_cache.canonical_query({"city": "Cali"}, allowed),
+        )
+
+    def test_values_change_key(self):
+        self.assertNotEqual(
+            list_cache.canonical_query({"city": "Cali"}),
+            list_cache.canonical_query({"city": "cali"}),
+        )
+        self.assertNotEqual(
+            list_cache.canonical_query({"page": "2"}, defaults={"page": "1"}),
+            list_cache.canonical_query({}, defaults={"page": "1"}),
+        )
+
+
+@override_settings(CACHES=_LOCMEM)
+class PropertyListCacheAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.landlord = _user("landlord@test.com", "landlord")
+        self.tenant = _user("tenant@test.com", "tenant")
+        self.other_tenant = _user("tenant2@test.com", "tenant")
+        self.first = _property(self.landlord, title="Casa norte")
+        self.second = _property(
+            self.landlord, title="Apartamento sur", rent_price=Decimal("900000.00")
+        )
+        list_cache.reset_stats()
+
+    def _list(self, user, params=None):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(_URL, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def _ids(self, data):
+        return [item["id"] for item in data["results"]]
+
+    def test_tenants_share_page_with_own_favorites(self):
+        PropertyFavorite.objects.create(user=self.tenant, property=self.first)
+        first = self._list(self.tenant, {"city": "Bucaramanga"})
+        with mock.patch.object(
+            Property.objects, "filter", side_effect=AssertionError("consulta")
+        ):
+            second = self._list(self.other_tenant, {"city": "Bucaramanga", "page": 1})
+
+        self.assertEqual(self._ids(first), self._ids(second))
+        favorites = {item["id"]: item["is_favorited"] for item in first["results"]}
+        self.assertTrue(favorites[str(self.first.pk)])
+        self.assertFalse(favorites[str(self.second.pk)])
+        self.assertFalse(any(item["is_favorited"] for item in second["results"]))
+        stats = list_cache.stats()
+        self.assertEqual((stats["page_hits"], stats["page_misses"]), (1, 1))
+        self.assertEqual(stats["fragment_hits"], 2)
+
+    def test_filtering_edit_invalidates_pages(self):
+        ordered = {"ordering": "rent_price"}
+        self.assertEqual(
+            self._ids(self._list(self.tenant, ordered))[0], str(self.second.pk)
+        )
+        self.first.rent_price = Decimal("500000.00")
+        self.first.save()
+        data = self._list(self.tenant, ordered)
+        self.assertEqual(self._ids(data)[0], str(self.first.pk))
+        self.assertEqual(data["results"][0]["rent_price"], "500000.00")
+
+    def test_text_edit_refreshes_only_its_fragment(self):
+        self._list(self.tenant)
+        self._list(self.tenant, {"search": "norte"})
+        self.first.title = "Casa oriente"
+        self.first.save()
+        list_cache.reset_stats()
+
+        data = self._list(self.tenant)
+        titles = {item["id"]: item["title"] for item in data["results"]}
+        self.assertEqual(titles[str(self.first.pk)], "Casa oriente")
+        self.assertEqual(self._list(self.tenant, {"search": "norte"})["count"], 0)
+
+        stats = list_cache.stats()
+        self.assertEqual((stats["page_hits"], stats["page_misses"]), (1, 1))
+        self.assertEqual((stats["fragment_hits"], stats["fragment_misses"]), (1, 1))
+
+    def test_any_save_invalidates_pages_ordered_by_last_updated(self):
+        ordered = {"ordering": "-last_updated"}
+        self.assertEqual(
+            self._ids(self._list(self.tenant, ordered))[0], str(self.second.pk)
+        )
+        self.first.bedrooms = 4
+        self.first.save()
+        self.assertEqual(
+            self._ids(self._list(self.tenant, ordered))[0], str(self.first.pk)
+        )
+
+    def test_deactivated_property_leaves_public_listing(self):
+        self._list(self.tenant)
+        self.first.is_active = False
+        self.first.save(update_fields=["is_active"])
+        self.assertEqual(self._ids(self._list(self.tenant)), [str(self.second.pk)])
+        self.assertEqual(len(self._ids(self._list(self.landlord))), 2)
+
+    def test_audiences_are_isolated(self):
+        other_landlord = _user("landlord2@test.com", "landlord")
+        _property(other_landlord, title="Finca")
+        self.assertEqual(self._list(self.tenant)["count"], 3)
+        self.assertEqual(self._list(self.landlord)["count"], 2)
+        self.assertEqual(self._list(other_landlord)["count"], 1)
+
+    def test_cached_page_keeps_pagination_links(self):
+        params = {"page_size": 1, "page": 2}
+        first = self._list(self.tenant, params)
+        second = self._list(self.other_tenant, params)
+        self.assertEqual(list_cache.stats()["page_hits"], 1)
+        self.assertEqual(first["count"], second["count"])
+        self.assertEqual(first["next"], second["next"])
+        self.assertEqual(first["previous"], second["previous"])
+        self.assertEqual(self._ids(first), self._ids(second))
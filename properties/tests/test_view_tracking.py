@@ -0,0 +1,259 @@
+"""Tests del registro bufferizado de visualizaciones (`properties.view_tracking`)."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework.test import APITestCase
+
+from properties import view_tracking
+from properties.models import Property, PropertyView
+
+User = get_user_model()
+
+_LOCMEM = {
+    alias: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": f"property-view-tracking-tests-{alias}",
+    }
+    for alias in ("default", "sessions", "query_cache", "local_fallback")
+}
+
+
+def _user(email, user_type="tenant"):
+    return User.objects.create_user(
+        email=email, password="TestPass123!", user_type=user_type
+    )
+
+
+def _property(landlord, **kwargs):
+    defaults = {
+        "landlord": landlord,
+        "title": "Apartamento Centro",
+        "description": "Hermoso apartamento en el centro de la ciudad.",
+        "property_type": "apartment",
+        "listing_type": "rent",
+        "status": "available",
+        "address": "Calle 50 #10-30",
+        "city": "Bucaramanga",
+        "state": "Santander",
+        "country": "Colombia",
+        "bedrooms": 3,
+        "bathrooms": Decimal("2.0"),
+        "total_area": Decimal("85.00"),
+        "rent_price": Decimal("1500000.00"),
+        "is_active": True,
+    }
+    defaults.update(kwargs)
+    return Property.objects.create(**defaults)
+
+
+class _LocalStoreMixin:
+    def setUp(self):
+        super().setUp()
+        view_tracking.reset_local_store()
+        self.addCleanup(view_tracking.reset_local_store)
+        self.landlord = _user("landlord@test.com", "landlord")
+        self.tenant = _user("tenant@test.com")
+        self.other_tenant = _user("tenant2@test.com")
+        self.first = _property(self.landlord, title="Casa norte")
+        self.second = _property(self.landlord, title="Apartamento sur")
+
+    def _view(self, user, property_obj):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(f"/api/v1/properties/{property_obj.pk}/")
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=_LOCMEM)
+class BufferedViewTrackingTests(_LocalStoreMixin, APITestCase):
+    def test_detail_only_buffers_and_dedups_per_day(self):
+        self._view(self.tenant, self.first)
+        self._view(self.tenant, self.first)
+
+        self.assertFalse(PropertyView.objects.exists())
+        self.assertEqual(view_tracking.get_store().pending(), 1)
+
+        self.assertEqual(view_tracking.flush_views(), 1)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views_count, 1)
+        view = PropertyView.objects.get()
+        self.assertEqual(view.user, self.tenant)
+        self.assertLess(timezone.now() - view.viewed_at, timedelta(minutes=1))
+
+    def test_flush_increments_counters_in_one_update(self):
+        for user in (self.tenant, self.other_tenant):
+            self._view(user, self.first)
+        self._view(self.tenant, self.second)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(view_tracking.flush_views(), 3)
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            dict(Property.objects.values_list("title", "views_count")),
+            {"Casa norte": 2, "Apartamento sur": 1},
+        )
+        self.assertEqual(PropertyView.objects.count(), 3)
+
+    def test_deleted_property_events_are_dropped(self):
+        self._view(self.tenant, self.first)
+        self._view(self.tenant, self.second)
+        self.second.delete()
+        self.assertEqual(view_tracking.flush_views(), 1)
+        self.assertEqual(PropertyView.objects.get().property, self.first)
+
+    def test_failed_write_is_requeued(self):
+        self._view(self.tenant, self.first)
+        with (
+            mock.patch.object(
+                view_tracking, "increment_views_count", side_effect=RuntimeError("bd")
+            ),
+            self.assertRaises(RuntimeError),
+        ):
+            view_tracking.flush_views()
+        self.assertEqual(view_tracking.get_store().pending(), 1)
+        self.assertEqual(view_tracking.flush_views(), 1)
+
+    @override_settings(PROPERTY_VIEW_BUFFER_MAX=2)
+    def test_local_buffer_flushes_inline_when_full(self):
+        self._view(self.tenant, self.first)
+        self.assertFalse(PropertyView.objects.exists())
+        self._view(self.other_tenant, self.first)
+        self.assertEqual(PropertyView.objects.count(), 2)
+
+    def test_flush_task(self):
+        from properties.tasks import flush_property_views
+
+        self._view(self.tenant, self.first)
+        self.assertEqual(flush_property_views(), 1)
+
+
+@override_settings(CACHES=_LOCMEM)
+class TrendingTests(_LocalStoreMixin, APITestCase):
+    def test_trending_reads_aggregates_in_score_order(self):
+        self._view(self.tenant, self.first)
+        for user in (self.tenant, self.other_tenant):
+            self._view(user, self.second)
+
+        self.client.force_authenticate(user=self.tenant)
+        with mock.patch.object(PropertyView.objects, "filter") as view_query:
+            response = self.client.get("/api/v1/properties/trending/")
+        view_query.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        results = response.data.get("results", response.data)
+        self.assertEqual(
+            [item["id"] for item in results],
+            [str(self.second.pk), str(self.first.pk)],
+        )
+
+    def test_rebuild_from_property_views(self):
+        PropertyView.objects.create(property=self.first, user=self.tenant)
+        PropertyView.objects.create(
+            property=self.second,
+            user=self.tenant,
+            viewed_at=timezone.now() - timedelta(days=2),
+        )
+        PropertyView.objects.create(
+            property=self.second,
+            user=self.other_tenant,
+            viewed_at=timezone.now() - timedelta(days=2),
+        )
+        PropertyView.objects.create(
+            property=self.first,
+            user=self.other_tenant,
+            viewed_at=timezone.now() - timedelta(days=40),
+        )
+        self.assertEqual(view_tracking.rebuild_trending(), 30)
+        self.assertEqual(
+            view_tracking.trending_property_ids(),
+            [str(self.second.pk), str(self.first.pk)],
+        )
+        self.assertEqual(
+            view_tracking.trending_property_ids(days=1), [str(self.first.pk)]
+        )
+
+
+@override_settings(CACHES=_LOCMEM)
+class RedisOutageTests(_LocalStoreMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        client = mock.MagicMock()
+        client.pipeline.return_value.execute.side_effect = RedisConnectionError()
+        client.exists.side_effect = RedisConnectionError()
+        patcher = mock.patch.object(
+            view_tracking,
+            "get_store",
+            return_value=view_tracking._RedisViewStore(client),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_views_are_written_inline(self):
+        with self.assertLogs("properties.view_tracking", "WARNING"):
+            self._view(self.tenant, self.first)
+            self._view(self.tenant, self.first)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views_count, 1)
+        self.assertEqual(PropertyView.objects.get().user, self.tenant)
+
+    def test_trending_falls_back_to_property_views(self):
+        for user in (self.tenant, self.other_tenant):
+            PropertyView.objects.create(property=self.second, user=user)
+        PropertyView.objects.create(property=self.first, user=self.tenant)
+
+        self.client.force_authenticate(user=self.tenant)
+        with self.assertLogs("properties.view_tracking", "WARNING"):
+            response = self.client.get("/api/v1/properties/trending/")
+        self.assertEqual(response.status_code, 200)
+        results = response.data.get("results", response.data)
+        self.assertEqual(
+            [item["id"] for item in results],
+            [str(self.second.pk), str(self.first.pk)],
+        )
+
+
+class IncrementViewsCountTests(TestCase):
+    def test_single_update_for_many_properties(self):
+        landlord = _user("landlord@test.com", "landlord")
+        first = _property(landlord)
+        second = _property(landlord)
+        view_tracking.increment_views_count({str(first.pk): 3, str(second.pk): 1})
+        view_tracking.increment_views_count({str(first.pk): 1})
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.views_count, second.views_count), (4, 1))
+
+
+class RedisViewStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.pipe = self.client.pipeline.return_value
+        self.store = view_tracking._RedisViewStore(self.client)
+        self.event = {"property": "p1", "user": "u1"}
+
+    def test_repeat_view_only_touches_seen_set(self):
+        self.pipe.execute.return_value = [0, True]
+        self.assertFalse(self.store.record(self.event, "u:u1", "2026-10-18"))
+        self.pipe.rpush.assert_not_called()
+        self.pipe.zincrby.assert_not_called()
+
+    def test_new_view_is_buffered_and_counted(self):
+        self.pipe.execute.return_value = [1, True]
+        self.assertTrue(self.store.record(self.event, "u:u1", "2026-10-18"))
+        self.pipe.rpush.assert_called_once()
+        self.assertEqual(self.pipe.zincrby.call_args.args[1:], (1, "p1"))
+
+    def test_drain_is_atomic(self):
+        self.pipe.execute.return_value = [[b'{"property": "p1"}'], True]
+        self.assertEqual(self.store.drain(10), [{"property": "p1"}])
+        self.client.pipeline.assert_called_with(transaction=True)
+        self.assertEqual(self.pipe.ltrim.call_args.args[1:], (10, -1))
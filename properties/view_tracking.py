@@ -0,0 +1,410 @@
+"""Registro bufferizado de visualizaciones de propiedades.
+
+El detalle (`GET /api/v1/properties/<id>/`) es la ruta de lectura más
+caliente y antes escribía dos veces por request (`get_or_create` de
+`PropertyView` + `UPDATE views_count`). Ahora cada visualización sólo
+toca Redis:
+
+- Dedup por propiedad y día: un SET con los visitantes del día
+  (`SADD` devuelve 0 si ya vio la propiedad hoy).
+- Las visualizaciones nuevas se encolan en una lista y suman 1 al ZSET
+  de tendencias del día, que es de donde lee
+  `TrendingPropertiesAPIView`.
+
+`flush_views()` (tarea `properties.tasks.flush_property_views`, cada
+minuto en beat) vacía el buffer con un `bulk_create` de `PropertyView`
+y un único `UPDATE ... FROM (VALUES ...)` para los contadores.
+
+Sin Redis (desarrollo/tests con LocMem) se usa un buffer en memoria del
+proceso que se vacía en línea al llenarse o envejecer. Si Redis está
+configurado pero no responde, la visualización se escribe en línea como
+antes y las tendencias se calculan desde `PropertyView`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from .models import Property, PropertyView
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+_SEEN_KEY = "properties:views:v1:seen:{day}:{property_id}"
+_BUFFER_KEY = "properties:views:v1:buffer"
+_TRENDING_KEY = "properties:views:v1:trending:{day}"
+_TRENDING_TOP_KEY = "properties:views:v1:trending:top:{days}"
+
+# El SET de un día sólo se consulta ese día; se deja margen por husos.
+_SEEN_TTL = 2 * 24 * 3600
+# El top de tendencias se recalcula como mucho cada 5 minutos.
+_TRENDING_TOP_TTL = 300
+
+
+def trending_days() -> int:
+    return getattr(settings, "PROPERTY_TRENDING_DAYS", 30)
+
+
+def _days(today: date, days: int) -> list[str]:
+    return [(today - timedelta(days=offset)).isoformat() for offset in range(days)]
+
+
+def _since(today: date, days: int) -> datetime:
+    return timezone.make_aware(
+        datetime.combine(today - timedelta(days=days - 1), datetime.min.time())
+    )
+
+
+class _RedisViewStore:
+    """Buffer y agregados en el Redis del cache `default`."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, key: str) -> str:
+        return cache.make_key(key)
+
+    def record(self, event: dict, viewer: str, day: str) -> bool:
+        seen = self._key(_SEEN_KEY.format(day=day, property_id=event["property"]))
+        pipe = self.client.pipeline()
+        pipe.sadd(seen, viewer)
+        pipe.expire(seen, _SEEN_TTL)
+        added = pipe.execute()[0]
+        if not added:
+            return False
+        trending = self._key(_TRENDING_KEY.format(day=day))
+        pipe = self.client.pipeline()
+        pipe.rpush(self._key(_BUFFER_KEY), json.dumps(event))
+        pipe.zincrby(trending, 1, event["property"])
+        pipe.expire(trending, (trending_days() + 1) * 24 * 3600)
+        pipe.execute()
+        return True
+
+    def drain(self, limit: int) -> list[dict]:
+        # LRANGE+LTRIM en MULTI: dos flushes concurrentes no se pisan.
+        buffer = self._key(_BUFFER_KEY)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(buffer, 0, limit - 1)
+        pipe.ltrim(buffer, limit, -1)
+        raw, _ = pipe.execute()
+        return [json.loads(item) for item in raw]
+
+    def requeue(self, events: list[dict]) -> None:
+        if events:
+            self.client.lpush(
+                self._key(_BUFFER_KEY),
+                *[json.dumps(event) for event in reversed(events)],
+            )
+
+    def pending(self) -> int:
+        return self.client.llen(self._key(_BUFFER_KEY))
+
+    def trending(self, today: date, days: int, limit: int) -> list[tuple[str, int]]:
+        top = self._key(_TRENDING_TOP_KEY.format(days=days))
+        if not self.client.exists(top):
+            pipe = self.client.pipeline()
+            pipe.zunionstore(
+                top,
+                [
+                    self._key(_TRENDING_KEY.format(day=day))
+                    for day in _days(today, days)
+                ],
+            )
+            pipe.expire(top, _TRENDING_TOP_TTL)
+            pipe.execute()
+        return [
+            (member.decode() if isinstance(member, bytes) else member, int(score))
+            for member, score in self.client.zrevrange(
+                top, 0, limit - 1, withscores=True
+            )
+        ]
+
+    def add_trending(self, day: str, counts: dict[str, int]) -> None:
+        trending = self._key(_TRENDING_KEY.format(day=day))
+        pipe = self.client.pipeline()
+        pipe.delete(trending)
+        if counts:
+            pipe.zadd(trending, counts)
+            pipe.expire(trending, (trending_days() + 1) * 24 * 3600)
+        pipe.execute()
+
+    def clear_trending_top(self) -> None:
+        self.client.delete(self._key(_TRENDING_TOP_KEY.format(days=trending_days())))
+
+
+class _LocalViewStore:
+    """Mismo contrato en memoria del proceso (sin Redis)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._seen: dict[str, set[tuple[str, str]]] = {}
+        self._buffer: list[dict] = []
+        self._trending: dict[str, Counter] = {}
+        self._oldest: float | None = None
+
+    def record(self, event: dict, viewer: str, day: str) -> bool:
+        with self._lock:
+            if day not in self._seen:
+                # Sólo interesa el día en curso: lo anterior se descarta.
+                self._seen = {day: set()}
+            seen = self._seen[day]
+            if (event["property"], viewer) in seen:
+                return False
+            seen.add((event["property"], viewer))
+            self._buffer.append(event)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._trending.setdefault(day, Counter())[event["property"]] += 1
+            return True
+
+    def drain(self, limit: int) -> list[dict]:
+        with self._lock:
+            events, self._buffer = self._buffer[:limit], self._buffer[limit:]
+            if not self._buffer:
+                self._oldest = None
+            return events
+
+    def requeue(self, events: list[dict]) -> None:
+        with self._lock:
+            self._buffer[:0] = events
+            if self._buffer and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def due(self) -> bool:
+        """Hay que vaciar en línea: no hay beat que lo haga por nosotros."""
+        if self._oldest is None:
+            return False
+        max_size = getattr(settings, "PROPERTY_VIEW_BUFFER_MAX", 100)
+        interval = getattr(settings, "PROPERTY_VIEW_FLUSH_INTERVAL", 60)
+        return (
+            len(self._buffer) >= max_size or time.monotonic() - self._oldest >= interval
+        )
+
+    def trending(self, today: date, days: int, limit: int) -> list[tuple[str, int]]:
+        total = Counter()
+        with self._lock:
+            for day in _days(today, days):
+                total.update(self._trending.get(day, {}))
+        return total.most_common(limit)
+
+    def add_trending(self, day: str, counts: dict[str, int]) -> None:
+        with self._lock:
+            self._trending[day] = Counter(counts)
+
+    def clear_trending_top(self) -> None:
+        pass
+
+    def needs_rebuild(self) -> bool:
+        """Los agregados viven en el proceso: tras reiniciar se rehacen."""
+        return not self._trending
+
+
+_local_store = _LocalViewStore()
+
+
+def get_store():
+    client = getattr(cache, "client", None)
+    if client is not None and hasattr(client, "get_client"):
+        return _RedisViewStore(client.get_client(write=True))
+    return _local_store
+
+
+def reset_local_store() -> None:
+    _local_store.reset()
+
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+
+
+def record_view(property_obj, request) -> bool:
+    """Registra la visualización; True si es la primera del día del usuario.
+
+    Como antes, sólo se cuentan usuarios autenticados, una vez por día.
+    """
+    if not request.user.is_authenticated:
+        return False
+    now = timezone.now()
+    event = {
+        "property": str(property_obj.pk),
+        "user": str(request.user.pk),
+        "ip_address": request.META.get("REMOTE_ADDR") or None,
+        "user_agent": request.META.get("HTTP_USER_AGENT", "")[:200],
+        "viewed_at": now.isoformat(),
+    }
+    store = get_store()
+    try:
+        created = store.record(
+            event, f"u:{request.user.pk}", timezone.localdate(now).isoformat()
+        )
+    except RedisError as exc:
+        logger.warning(
+            "Buffer de visualizaciones no disponible (%s): escritura en línea", exc
+        )
+        return _record_view_inline(property_obj, request.user, event, now)
+    if created and isinstance(store, _LocalViewStore) and store.due():
+        flush_views()
+    return created
+
+
+def _record_view_inline(property_obj, user, event: dict, now: datetime) -> bool:
+    """Escritura directa en `PropertyView`, deduplicada por día."""
+    _, created = PropertyView.objects.get_or_create(
+        property=property_obj,
+        user=user,
+        viewed_at__date=timezone.localdate(now),
+        defaults={
+            "viewed_at": now,
+            "ip_address": event["ip_address"],
+            "user_agent": event["user_agent"],
+        },
+    )
+    if created:
+        increment_views_count({event["property"]: 1})
+    return created
+
+
+def flush_views(batch_size: int | None = None) -> int:
+    """Persiste el buffer en la base de datos; retorna los eventos escritos."""
+    batch_size = batch_size or getattr(settings, "PROPERTY_VIEW_FLUSH_BATCH", 1000)
+    store = get_store()
+    written = 0
+    while True:
+        events = store.drain(batch_size)
+        if not events:
+            return written
+        try:
+            written += _write_events(events)
+        except Exception:
+            store.requeue(events)
+            raise
+
+
+def _write_events(events: list[dict]) -> int:
+    with transaction.atomic():
+        # Propiedades o usuarios borrados desde la visualización se
+        # descartan: un FK roto tumbaría el lote entero en cada intento.
+        properties = _existing(Property, {event["property"] for event in events})
+        users = _existing(User, {event["user"] for event in events})
+        events = [
+            event
+            for event in events
+            if event["property"] in properties and event["user"] in users
+        ]
+        PropertyView.objects.bulk_create(
+            [
+                PropertyView(
+                    property_id=event["property"],
+                    user_id=event["user"],
+                    ip_address=event["ip_address"],
+                    user_agent=event["user_agent"],
+                    viewed_at=datetime.fromisoformat(event["viewed_at"]),
+                )
+                for event in events
+            ]
+        )
+        increment_views_count(Counter(event["property"] for event in events))
+    return len(events)
+
+
+def _existing(model, ids: set[str]) -> set[str]:
+    return {
+        str(pk) for pk in model.objects.filter(pk__in=ids).values_list("pk", flat=True)
+    }
+
+
+def increment_views_count(counts: dict[str, int]) -> None:
+    """`views_count += n` de varias propiedades en un solo UPDATE.
+
+    `UPDATE ... FROM (VALUES ...)` funciona igual en PostgreSQL y en
+    SQLite >= 3.33; las columnas de VALUES se llaman column1, column2 en
+    ambos.
+    """
+    if not counts:
+        return
+    pk = Property._meta.pk
+    table = connection.ops.quote_name(Property._meta.db_table)
+    column = connection.ops.quote_name("views_count")
+    params = []
+    for property_id, amount in counts.items():
+        params += [pk.get_db_prep_value(pk.to_python(property_id), connection), amount]
+    rows = ", ".join(["(%s, %s)"] * len(counts))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET {column} = {column} + v.column2 "
+            f"FROM (VALUES {rows}) AS v "
+            f"WHERE {table}.{connection.ops.quote_name(pk.column)} = v.column1",
+            params,
+        )
+
+
+def trending_property_ids(limit: int = 10, days: int | None = None) -> list[str]:
+    """Ids más vistos en los últimos `days` días, de mayor a menor."""
+    days = days or trending_days()
+    store = get_store()
+    if getattr(store, "needs_rebuild", lambda: False)():
+        rebuild_trending()
+    today = timezone.localdate()
+    try:
+        top = store.trending(today, days, limit)
+    except RedisError as exc:
+        logger.warning(
+            "Agregados de tendencias no disponibles (%s): se leen de la BD", exc
+        )
+        top = (
+            PropertyView.objects.filter(viewed_at__gte=_since(today, days))
+            .values_list("property_id")
+            .annotate(views=Count("id"))
+            .order_by("-views")[:limit]
+        )
+    return [str(property_id) for property_id, _ in top]
+
+
+def rebuild_trending(days: int | None = None) -> int:
+    """Reconstruye los agregados diarios desde `PropertyView`.
+
+    Para el primer despliegue o si se perdió Redis. Retorna los días
+    escritos.
+    """
+    days = days or trending_days()
+    today = timezone.localdate()
+    store = get_store()
+    since = _since(today, days)
+    per_day: dict[str, dict] = {day: {} for day in _days(today, days)}
+    rows = (
+        PropertyView.objects.filter(viewed_at__gte=since)
+        .annotate(day=TruncDate("viewed_at"))
+        .values("day", "property_id")
+        .annotate(views=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        day = row["day"].isoformat()
+        if day in per_day:
+            per_day[day][str(row["property_id"])] = row["views"]
+    for day, counts in per_day.items():
+        store.add_trending(day, counts)
+    store.clear_trending_top()
+    return len(per_day)
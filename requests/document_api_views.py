@@ -3,13 +3,16 @@ API Views para el sistema de documentos de inquilinos.
 Maneja la carga, revisión y gestión de documentos para el proceso de arrendamiento.
 """
 
+import logging
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.views import APIView
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from django.http import FileResponse
+
+from core import chunked_uploads, file_delivery
 
 from .models import TenantDocument, PropertyInterestRequest, DocumentAccessLog
 from .serializers import (
@@ -19,13 +22,15 @@ from .serializers import (
     DocumentChecklistSerializer,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class TenantDocumentUploadAPIView(generics.CreateAPIView):
     """Vista para subir documentos de inquilinos."""
 
     serializer_class = TenantDocumentUploadSerializer
     permission_classes = [permissions.IsAuthenticated]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def create(self, request, *args, **kwargs):
         """Subir un documento con validaciones específicas."""
@@ -66,12 +71,26 @@ class TenantDocumentUploadAPIView(generics.CreateAPIView):
         mutable_data = request.data.copy()
         mutable_data["property_request"] = str(property_request.id)
 
+        # Subida por partes: `upload_id` en vez del archivo (core/chunked_uploads.py)
+        try:
+            upload = chunked_uploads.attach_upload(
+                request, mutable_data, "document_file", "tenant_document"
+            )
+        except chunked_uploads.ChunkedUploadError as exc:
+            return Response({"error": str(exc)}, status=exc.status_code)
+
         serializer = self.get_serializer(
             data=mutable_data, context={"request": request}
         )
         if serializer.is_valid():
             try:
-                document = serializer.save()
+                with transaction.atomic():
+                    if upload and not chunked_uploads.mark_consumed(upload):
+                        return Response(
+                            {"error": "La subida ya fue utilizada."},
+                            status=status.HTTP_409_CONFLICT,
+                        )
+                    document = serializer.save()
 
                 # Respuesta con información completa del documento
                 response_serializer = TenantDocumentSerializer(document)
@@ -103,7 +122,7 @@ class TenantDocumentUploadAPIView(generics.CreateAPIView):
 
             # Verificar permisos: solo el tenant puede subir documentos
             if user != match_request.tenant:
-                print(
+                logger.error(
                     f"❌ CONSOLIDACIÓN: Usuario {user.id} no es el tenant {match_request.tenant.id}"
                 )
                 return None
@@ -114,7 +133,7 @@ class TenantDocumentUploadAPIView(generics.CreateAPIView):
             ).first()
 
             if existing_property_request:
-                print(
+                logger.info(
                     f"✅ CONSOLIDACIÓN: Using existing PropertyInterestRequest {existing_property_request.id}"
                 )
                 return existing_property_request
@@ -143,13 +162,15 @@ class TenantDocumentUploadAPIView(generics.CreateAPIView):
                 pet_details=getattr(match_request, "pet_details", ""),
             )
 
-            print(
-                f"🆕 CONSOLIDACIÓN: Created new PropertyInterestRequest {new_property_request.id} from MatchRequest {process_id}"
+            logger.debug(
+                "🆕 CONSOLIDACIÓN: Created new PropertyInterestRequest %s from MatchRequest %s",
+                new_property_request.id,
+                process_id,
             )
             return new_property_request
 
         except Exception as e:
-            print(
+            logger.warning(
                 f"⚠️ CONSOLIDACIÓN: MatchRequest {process_id} not found, trying PropertyInterestRequest: {e}"
             )
             pass
@@ -160,18 +181,18 @@ class TenantDocumentUploadAPIView(generics.CreateAPIView):
 
             # Verificar permisos
             if user != property_request.requester:
-                print(
+                logger.error(
                     f"❌ FALLBACK: Usuario {user.id} no es el requester {property_request.requester.id}"
                 )
                 return None
 
-            print(
+            logger.info(
                 f"✅ FALLBACK: Using direct PropertyInterestRequest {property_request.id}"
             )
             return property_request
 
         except Exception as e:
-            print(
+            logger.error(
                 f"❌ ERROR: Process {process_id} not found in either MatchRequest or PropertyInterestRequest: {e}"
             )
             return None
@@ -238,7 +259,7 @@ class TenantDocumentReviewAPIView(generics.UpdateAPIView):
                 if pending == 0 and rejected == 0 and all_docs.exists():
                     match_request.workflow_data["all_documents_approved"] = True
                     match_request.save()
-                    print(
+                    logger.info(
                         f"✅ Todos los documentos aprobados para match {match_request.match_code}"
                     )
                 else:
@@ -289,7 +310,9 @@ class DocumentChecklistAPIView(generics.GenericAPIView):
                     self._match_request = match_request
 
             property_request = MatchRequestWrapper(match_request)
-            print(f"🔄 CONSOLIDACIÓN: Using MatchRequest {process_id} for documents")
+            logger.debug(
+                "🔄 CONSOLIDACIÓN: Using MatchRequest %s for documents", process_id
+            )
 
         except Exception:
             # 2. Fallback a PropertyInterestRequest si MatchRequest no existe
@@ -297,8 +320,9 @@ class DocumentChecklistAPIView(generics.GenericAPIView):
                 property_request = get_object_or_404(
                     PropertyInterestRequest, id=process_id
                 )
-                print(
-                    f"🔄 FALLBACK: Using PropertyInterestRequest {process_id} for documents"
+                logger.debug(
+                    "🔄 FALLBACK: Using PropertyInterestRequest %s for documents",
+                    process_id,
                 )
             except Exception:
                 return Response(
@@ -307,14 +331,20 @@ class DocumentChecklistAPIView(generics.GenericAPIView):
                 )
 
         # Debug logging para permisos
-        print("🔍 CHECKLIST DEBUG:")
-        print(f"  - Process ID: {process_id}")
-        print(f"  - Request User: {request.user.email} (ID: {request.user.id})")
-        print(
-            f"  - Requester: {property_request.requester.email if property_request.requester else 'None'} (ID: {property_request.requester.id if property_request.requester else 'None'})"
+        logger.debug("🔍 CHECKLIST DEBUG:")
+        logger.debug("  - Process ID: %s", process_id)
+        logger.debug(
+            "  - Request User: %s (ID: %s)", request.user.email, request.user.id
+        )
+        logger.debug(
+            "  - Requester: %s (ID: %s)",
+            property_request.requester.email if property_request.requester else "None",
+            property_request.requester.id if property_request.requester else "None",
         )
-        print(
-            f"  - Assignee: {property_request.assignee.email if property_request.assignee else 'None'} (ID: {property_request.assignee.id if property_request.assignee else 'None'})"
+        logger.debug(
+            "  - Assignee: %s (ID: %s)",
+            property_request.assignee.email if property_request.assignee else "None",
+            property_request.assignee.id if property_request.assignee else "None",
         )
 
         # Verificar permisos con mensajes específicos
@@ -322,11 +352,11 @@ class DocumentChecklistAPIView(generics.GenericAPIView):
         user_is_requester = request.user == property_request.requester
         user_is_assignee = request.user == property_request.assignee
 
-        print(f"  - User is requester (tenant): {user_is_requester}")
-        print(f"  - User is assignee (landlord): {user_is_assignee}")
+        logger.debug("  - User is requester (tenant): %s", user_is_requester)
+        logger.debug("  - User is assignee (landlord): %s", user_is_assignee)
 
         if request.user not in allowed_users:
-            print(
+            logger.error(
                 f"❌ CHECKLIST: Permission denied - User {request.user.email} not in allowed list"
             )
             error_details = {
@@ -344,7 +374,7 @@ class DocumentChecklistAPIView(generics.GenericAPIView):
             }
             return Response(error_details, status=status.HTTP_403_FORBIDDEN)
 
-        print(f"✅ CHECKLIST: Permission granted for user {request.user.email}")
+        logger.info(f"✅ CHECKLIST: Permission granted for user {request.user.email}")
 
         # Obtener todos los documentos subidos para este proceso
         # CONSOLIDACIÓN: Buscar documentos según el tipo de request
@@ -360,17 +390,20 @@ class DocumentChecklistAPIView(generics.GenericAPIView):
                     uploaded_documents = TenantDocument.objects.filter(
                         property_request=related_property_request
                     ).select_related("uploaded_by", "reviewed_by")
-                    print(
-                        f"🔄 CONSOLIDACIÓN: Found {uploaded_documents.count()} documents via PropertyInterestRequest"
-                    )
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "🔄 CONSOLIDACIÓN: Found %s documents via PropertyInterestRequest",
+                            uploaded_documents.count(),
+                        )
                 else:
                     uploaded_documents = TenantDocument.objects.none()
-                    print(
-                        f"🔄 CONSOLIDACIÓN: No PropertyInterestRequest found for MatchRequest {process_id}"
+                    logger.debug(
+                        "🔄 CONSOLIDACIÓN: No PropertyInterestRequest found for MatchRequest %s",
+                        process_id,
                     )
             except Exception as e:
                 uploaded_documents = TenantDocument.objects.none()
-                print(f"❌ Error finding documents: {e}")
+                logger.error(f"❌ Error finding documents: {e}")
         else:
             # Si es PropertyInterestRequest directo
             uploaded_documents = TenantDocument.objects.filter(
@@ -518,7 +551,7 @@ class DocumentChecklistAPIView(generics.GenericAPIView):
                 }
                 documents.append(doc_info)
 
-            print(f"✅ Built {len(documents)} 'otros' documents dynamically")
+            logger.info(f"✅ Built {len(documents)} 'otros' documents dynamically")
             return documents
 
         return {
@@ -699,7 +732,7 @@ class SecureDocumentDownloadView(APIView):
         # 🔒 Verificar permisos
         if not self._can_access(request.user, document):
             # Log intento de acceso no autorizado
-            print(
+            logger.warning(
                 f"⚠️ SECURE_DOWNLOAD: Acceso denegado - Usuario {request.user.email} intentó acceder a documento {document_id}"
             )
             return Response(
@@ -715,12 +748,14 @@ class SecureDocumentDownloadView(APIView):
             DocumentAccessLog.log_access(
                 document=document, user=request.user, action="download", request=request
             )
-            print(
-                f"📋 SECURE_DOWNLOAD: Acceso registrado - {request.user.email} descargó {document.document_type}"
+            logger.debug(
+                "📋 SECURE_DOWNLOAD: Acceso registrado - %s descargó %s",
+                request.user.email,
+                document.document_type,
             )
         except Exception as log_error:
             # No fallar la descarga si hay error en el log
-            print(f"⚠️ SECURE_DOWNLOAD: Error al registrar acceso: {log_error}")
+            logger.warning(f"⚠️ SECURE_DOWNLOAD: Error al registrar acceso: {log_error}")
 
         # 📂 Verificar que el archivo existe
         if not document.document_file:
@@ -733,30 +768,31 @@ class SecureDocumentDownloadView(APIView):
             )
 
         try:
-            # Abrir el archivo
-            file_handle = document.document_file.open("rb")
-
             # Determinar el nombre del archivo para descarga
             filename = (
                 document.original_filename
                 or f"{document.document_type}_{document.id}.pdf"
             )
 
-            # Crear respuesta con FileResponse
-            response = FileResponse(file_handle, as_attachment=True, filename=filename)
-
-            # Headers adicionales de seguridad
-            response["Content-Type"] = "application/pdf"
-            response["X-Content-Type-Options"] = "nosniff"
-            response["Cache-Control"] = "no-cache, no-store, must-revalidate"
-            response["Pragma"] = "no-cache"
-            response["Expires"] = "0"
-
-            # Header personalizado para auditoría
-            response["X-VeriHome-Access-Logged"] = "true"
-            response["X-VeriHome-Document-Locked"] = str(document.is_locked).lower()
-
-            return response
+            # Los bytes los sirve nginx (X-Accel-Redirect) o Python con
+            # soporte de Range/ETag, según PROTECTED_FILE_DELIVERY.
+            return file_delivery.serve_protected_file(
+                request,
+                document.document_file,
+                filename=filename,
+                content_type="application/pdf",
+                as_attachment=True,
+                headers={
+                    # Headers adicionales de seguridad
+                    "X-Content-Type-Options": "nosniff",
+                    "Cache-Control": "no-cache, no-store, must-revalidate",
+                    "Pragma": "no-cache",
+                    "Expires": "0",
+                    # Header personalizado para auditoría
+                    "X-VeriHome-Access-Logged": "true",
+                    "X-VeriHome-Document-Locked": str(document.is_locked).lower(),
+                },
+            )
 
         except FileNotFoundError:
             return Response(
@@ -767,7 +803,7 @@ class SecureDocumentDownloadView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
         except Exception as e:
-            print(f"❌ SECURE_DOWNLOAD: Error al servir archivo: {e}")
+            logger.error(f"❌ SECURE_DOWNLOAD: Error al servir archivo: {e}")
             return Response(
                 {
                     "error": f"Error al descargar el archivo: {str(e)}",
@@ -848,7 +884,7 @@ class SecureDocumentPreviewView(APIView):
                 document=document, user=request.user, action="preview", request=request
             )
         except Exception as log_error:
-            print(f"⚠️ SECURE_PREVIEW: Error al registrar acceso: {log_error}")
+            logger.warning(f"⚠️ SECURE_PREVIEW: Error al registrar acceso: {log_error}")
 
         # 📂 Verificar que el archivo existe
         if not document.document_file:
@@ -861,23 +897,19 @@ class SecureDocumentPreviewView(APIView):
             )
 
         try:
-            file_handle = document.document_file.open("rb")
-
-            # Vista previa inline (no descarga)
-            response = FileResponse(
-                file_handle,
-                as_attachment=False,  # Mostrar inline
-                filename=document.original_filename or f"{document.document_type}.pdf",
-            )
-
-            response["Content-Type"] = "application/pdf"
-            response["Content-Disposition"] = (
-                f'inline; filename="{document.original_filename or "documento.pdf"}"'
+            # Vista previa inline (no descarga). Con Range el visor de PDF
+            # pide sólo las páginas que muestra.
+            return file_delivery.serve_protected_file(
+                request,
+                document.document_file,
+                filename=document.original_filename or "documento.pdf",
+                content_type="application/pdf",
+                as_attachment=False,
+                headers={
+                    "X-Content-Type-Options": "nosniff",
+                    "X-VeriHome-Access-Logged": "true",
+                },
             )
-            response["X-Content-Type-Options"] = "nosniff"
-            response["X-VeriHome-Access-Logged"] = "true"
-
-            return response
 
         except FileNotFoundError:
             return Response(
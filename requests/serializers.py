@@ -2,6 +2,7 @@
 Serializers para el sistema de solicitudes de VeriHome.
 """
 
+import logging
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -17,6 +18,8 @@ from .models import (
     TenantDocument,
 )
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 
@@ -525,15 +528,15 @@ class TenantDocumentUploadSerializer(serializers.ModelSerializer):
 
             if match_request:
                 validated_data["match_request"] = match_request
-                print(
+                logger.info(
                     f"✅ SERIALIZER: Asignando match_request {match_request.id} al documento"
                 )
             else:
-                print(
+                logger.warning(
                     f"⚠️ SERIALIZER: No se encontró MatchRequest para {property_request.id}"
                 )
         except Exception as e:
-            print(f"❌ SERIALIZER: Error buscando MatchRequest: {e}")
+            logger.error(f"❌ SERIALIZER: Error buscando MatchRequest: {e}")
 
         # ✅ FIX: Solo verificar reemplazo para documentos NO personalizables
         # Los documentos "otros_*" no deben sobreescribirse
@@ -545,16 +548,18 @@ class TenantDocumentUploadSerializer(serializers.ModelSerializer):
             if existing_document:
                 # Eliminar el documento existente (reemplazo)
                 existing_document.delete()
-                print(
-                    f"🔄 Documento existente eliminado para reemplazo: {document_type}"
+                logger.debug(
+                    "🔄 Documento existente eliminado para reemplazo: %s", document_type
                 )
         else:
-            print(f"📄 Documento personalizado - no hay reemplazo: {document_type}")
+            logger.debug(
+                "📄 Documento personalizado - no hay reemplazo: %s", document_type
+            )
 
         # Crear el nuevo documento con status 'pending'
         validated_data["status"] = "pending"
         new_document = super().create(validated_data)
-        print(
+        logger.info(
             f"✅ Nuevo documento creado: {document_type} - Status: {new_document.status}"
         )
 
@@ -0,0 +1,183 @@
+"""Tests de la entrega de documentos protegidos (`core.file_delivery`)."""
+
+import base64
+import hashlib
+import shutil
+import tempfile
+from decimal import Decimal
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from core import file_delivery
+from matching.models import MatchRequest
+from properties.models import Property
+from requests.models import DocumentAccessLog, TenantDocument
+
+User = get_user_model()
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+
+class SecureDocumentDeliveryTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.landlord = User.objects.create_user(
+            email="landlord@test.com", password="TestPass123!", user_type="landlord"
+        )
+        self.tenant = User.objects.create_user(
+            email="tenant@test.com", password="TestPass123!", user_type="tenant"
+        )
+        property_obj = Property.objects.create(
+            landlord=self.landlord,
+            title="Apartamento",
+            description="Apartamento en el centro.",
+            property_type="apartment",
+            listing_type="rent",
+            status="available",
+            address="Calle 50 #10-30",
+            city="Bucaramanga",
+            state="Santander",
+            country="Colombia",
+            bedrooms=2,
+            bathrooms=Decimal("1.0"),
+            total_area=Decimal("60.00"),
+            rent_price=Decimal("1200000.00"),
+        )
+        match_request = MatchRequest.objects.create(
+            property=property_obj,
+            tenant=self.tenant,
+            landlord=self.landlord,
+            status="accepted",
+        )
+        self.document = TenantDocument.objects.create(
+            match_request=match_request,
+            uploaded_by=self.tenant,
+            document_type="tomador_cedula_ciudadania",
+            document_file=ContentFile(PDF, name="cedula.pdf"),
+            original_filename="cédula.pdf",
+            file_size=len(PDF),
+        )
+        base = f"/api/v1/requests/api/documents/{self.document.pk}"
+        self.download_url = f"{base}/secure-download/"
+        self.preview_url = f"{base}/secure-preview/"
+        self.client.force_authenticate(user=self.landlord)
+
+    @staticmethod
+    def _body(response):
+        return b"".join(response.streaming_content)
+
+    def test_full_download_advertises_ranges_and_validators(self):
+        response = self.client.get(self.download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._body(response), PDF)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Length"], str(len(PDF)))
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+        self.assertTrue(response["Content-Disposition"].startswith("attachment;"))
+        self.assertEqual(
+            response["Cache-Control"], "no-cache, no-store, must-revalidate"
+        )
+        self.assertEqual(DocumentAccessLog.objects.filter(action="download").count(), 1)
+
+    def test_range_request_returns_partial_content(self):
+        response = self.client.get(self.preview_url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self._body(response), PDF[100:200])
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(PDF)}")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertTrue(response["Content-Disposition"].startswith("inline;"))
+
+    def test_suffix_and_open_ended_ranges(self):
+        response = self.client.get(self.preview_url, HTTP_RANGE="bytes=-50")
+        self.assertEqual(self._body(response), PDF[-50:])
+        response = self.client.get(
+            self.preview_url, HTTP_RANGE=f"bytes={len(PDF) - 10}-"
+        )
+        self.assertEqual(self._body(response), PDF[-10:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(
+            self.preview_url, HTTP_RANGE=f"bytes={len(PDF)}-{len(PDF) + 10}"
+        )
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(PDF)}")
+
+    def test_conditional_requests(self):
+        etag = self.client.get(self.preview_url)["ETag"]
+        response = self.client.get(self.preview_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # If-Range con un validador viejo: se entrega el archivo completo.
+        response = self.client.get(
+            self.preview_url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"viejo"'
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            self.preview_url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag
+        )
+        self.assertEqual(response.status_code, 206)
+
+    @override_settings(
+        PROTECTED_FILE_DELIVERY="x-accel",
+        PROTECTED_FILE_SECRET="secreto",
+        PROTECTED_FILE_URL_TTL=60,
+    )
+    def test_x_accel_redirect_after_permission_check_and_audit(self):
+        response = self.client.get(self.download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(DocumentAccessLog.objects.count(), 1)
+
+        location = urlsplit(response["X-Accel-Redirect"])
+        uri = unquote(location.path)
+        self.assertEqual(uri, f"/_protected/{self.document.document_file.name}")
+        query = {key: values[0] for key, values in parse_qs(location.query).items()}
+        expected = hashlib.md5(f"{query['expires']}{uri} secreto".encode()).digest()
+        self.assertEqual(
+            query["md5"], base64.urlsafe_b64encode(expected).rstrip(b"=").decode()
+        )
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+    @override_settings(PROTECTED_FILE_DELIVERY="x-accel", PROTECTED_FILE_SECRET="")
+    def test_x_accel_without_secret_falls_back_to_python(self):
+        response = self.client.get(self.download_url)
+        self.assertNotIn("X-Accel-Redirect", response)
+        self.assertEqual(self._body(response), PDF)
+
+    @override_settings(PROTECTED_FILE_DELIVERY="x-accel", PROTECTED_FILE_SECRET="s")
+    def test_permission_check_still_applies(self):
+        intruder = User.objects.create_user(
+            email="otro@test.com", password="TestPass123!", user_type="tenant"
+        )
+        self.client.force_authenticate(user=intruder)
+        response = self.client.get(self.download_url)
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn("X-Accel-Redirect", response)
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_parse_range(self):
+        cases = {
+            "bytes=0-99": (0, 99),
+            "bytes=10-": (10, 999),
+            "bytes=-100": (900, 999),
+            "bytes=990-2000": (990, 999),
+            "bytes=1000-": "unsatisfiable",
+            "bytes=-0": "unsatisfiable",
+            "bytes=50-10": "unsatisfiable",
+            "bytes=0-1,5-9": None,
+            "items=0-9": None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(file_delivery.parse_range(header, 1000), expected)
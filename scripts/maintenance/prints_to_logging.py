@@ -0,0 +1,287 @@
+"""
+Codemod: reemplaza los print() de depuración por llamadas al logger del módulo.
+
+Uso:
+
+    python scripts/maintenance/prints_to_logging.py contracts matching requests
+    python scripts/maintenance/prints_to_logging.py --check contracts   # solo lista
+
+- El nivel sale del texto del mensaje: ❌/error → error, ⚠️/warning →
+  warning, ✅/🚀/💾/🗑️/📧 → info y el resto (🔍, 📊, volcados de datos) →
+  debug. Un print sin texto literal dentro de un `except` → error.
+- Los debug usan argumentos diferidos (`"... %s", valor`): con el nivel
+  apagado no se formatea nada (p. ej. el `workflow_data` completo).
+- Agrega `import logging` y `logger = logging.getLogger(__name__)` si el
+  módulo no los tiene.
+- Omite tests, migraciones y comandos de gestión (su salida es la consola).
+"""
+
+import argparse
+import ast
+import io
+import re
+import sys
+import tokenize
+from pathlib import Path
+
+SKIP_PARTS = {"tests", "migrations", "management"}
+LINE_LENGTH = 88
+# El emoji manda sobre el texto ("⚠️ Error ..." es un warning).
+LEVELS = (
+    ("error", re.compile(r"❌")),
+    ("warning", re.compile(r"⚠")),
+    ("info", re.compile(r"✅|🚀|💾|🗑|📧")),
+    ("error", re.compile(r"\berror|\bfail|falló|excepci", re.IGNORECASE)),
+    ("warning", re.compile(r"\bwarning|advertencia", re.IGNORECASE)),
+    ("info", re.compile(r"\bsuccess", re.IGNORECASE)),
+)
+
+
+def _quote(text):
+    literal = repr(text)
+    if literal.startswith("'") and '"' not in text:
+        literal = '"' + literal[1:-1].replace("\\'", "'") + '"'
+    return literal
+
+
+def _expression(node):
+    """Código de una expresión con comillas dobles (estilo del repo)."""
+    code = ast.unparse(node)  # una sola línea
+    strings = [
+        token
+        for token in tokenize.generate_tokens(io.StringIO(code).readline)
+        if token.type == tokenize.STRING
+        and token.string[:1] == "'"
+        and '"' not in token.string
+    ]
+    for token in reversed(strings):
+        start, end = token.start[1], token.end[1]
+        quoted = '"' + token.string[1:-1].replace("\\'", "'") + '"'
+        code = code[:start] + quoted + code[end:]
+    return code
+
+
+def _literal_text(args):
+    parts = []
+    for arg in args:
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            parts.append(arg.value)
+        elif isinstance(arg, ast.JoinedStr):
+            parts.extend(v.value for v in arg.values if isinstance(v, ast.Constant))
+    return "".join(parts)
+
+
+def _level(args, keywords, in_except):
+    text = _literal_text(args)
+    if not text.strip():
+        return "error" if in_except else "debug"
+    for level, pattern in LEVELS:
+        if pattern.search(text):
+            return level
+    if any(k.arg == "file" and "stderr" in ast.unparse(k.value) for k in keywords):
+        return "warning"
+    return "debug"
+
+
+def _lazy(args, sep):
+    """("formato %s", [expr, ...]) o None si hay format_spec/!a."""
+    fmt, values = [], []
+    for arg in args:
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            fmt.append(arg.value.replace("%", "%%"))
+        elif isinstance(arg, ast.JoinedStr):
+            piece = []
+            for value in arg.values:
+                if isinstance(value, ast.Constant):
+                    piece.append(value.value.replace("%", "%%"))
+                elif value.format_spec is not None or value.conversion == ord("a"):
+                    return None
+                else:
+                    piece.append("%r" if value.conversion == ord("r") else "%s")
+                    values.append(_expression(value.value))
+            fmt.append("".join(piece))
+        else:
+            fmt.append("%s")
+            values.append(_expression(arg))
+    return [_quote(sep.join(fmt)), *values]
+
+
+def _eager(args, sep, source):
+    if len(args) == 1:
+        return [ast.get_source_segment(source, args[0])]
+    values = []
+    for index, arg in enumerate(args):
+        if index:
+            values.append(ast.Constant(sep))
+        if isinstance(arg, ast.JoinedStr):
+            values.extend(arg.values)
+        elif isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            values.append(arg)
+        else:
+            values.append(ast.FormattedValue(arg, -1, None))
+    return [ast.unparse(ast.JoinedStr(values))]
+
+
+def _render_call(level, arguments, indent):
+    flat = f"logger.{level}({', '.join(arguments)})"
+    if indent + len(flat) <= LINE_LENGTH:
+        return flat
+    pad = " " * (indent + 4)
+    inner = ", ".join(arguments)
+    if len(arguments) == 1 or indent + 4 + len(inner) <= LINE_LENGTH:
+        return f"logger.{level}(\n{pad}{inner}\n{' ' * indent})"
+    body = "".join(f"{pad}{argument},\n" for argument in arguments)
+    return f"logger.{level}(\n{body}{' ' * indent})"
+
+
+class _PrintFinder(ast.NodeVisitor):
+    def __init__(self):
+        self.prints = []  # (Call, in_except, shadowed)
+        self._except = 0
+        self._shadowed = [False]
+
+    def visit_ExceptHandler(self, node):
+        self._except += 1
+        self.generic_visit(node)
+        self._except -= 1
+
+    def _visit_function(self, node):
+        assigns_logger = any(
+            isinstance(target, ast.Name) and target.id == "logger"
+            for child in ast.walk(node)
+            if isinstance(child, ast.Assign)
+            for target in child.targets
+        )
+        self._shadowed.append(self._shadowed[-1] or assigns_logger)
+        self.generic_visit(node)
+        self._shadowed.pop()
+
+    visit_FunctionDef = visit_AsyncFunctionDef = _visit_function
+
+    def visit_Expr(self, node):
+        call = node.value
+        if (
+            isinstance(call, ast.Call)
+            and isinstance(call.func, ast.Name)
+            and call.func.id == "print"
+        ):
+            self.prints.append((call, self._except > 0, self._shadowed[-1]))
+        self.generic_visit(node)
+
+
+def _logger_insertions(tree):
+    """[(línea 0-based antes de la que se inserta, [líneas])], de abajo arriba."""
+    has_import = has_logger = False
+    first_import = last_import = None
+    for node in tree.body:
+        if isinstance(node, ast.Import) and any(
+            alias.name == "logging" for alias in node.names
+        ):
+            has_import = True
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "logger" for t in node.targets
+        ):
+            has_logger = True
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            first_import = first_import or node
+            last_import = node
+        elif not isinstance(node, (ast.Expr, ast.Try, ast.If, ast.Assign)):
+            break
+    if has_logger:
+        return []
+    if last_import is None:
+        # Sin imports: después del docstring del módulo, si lo hay.
+        docstring = ast.get_docstring(tree) is not None
+        after = tree.body[0].end_lineno if docstring else 0
+        return [
+            (after, ["", "import logging", "", "logger = logging.getLogger(__name__)"])
+        ]
+    insertions = [
+        (last_import.end_lineno, ["", "logger = logging.getLogger(__name__)"])
+    ]
+    if not has_import:
+        insertions.append((first_import.lineno - 1, ["import logging"]))
+    return insertions
+
+
+def migrate(path, check=False):
+    source = path.read_text(encoding="utf-8")
+    tree = ast.parse(source)
+    finder = _PrintFinder()
+    finder.visit(tree)
+    if not finder.prints:
+        return 0, []
+
+    encoded = [line.encode("utf-8") for line in source.splitlines(keepends=True)]
+    skipped, edits = [], []
+    for call, in_except, shadowed in finder.prints:
+        if (
+            shadowed
+            or not call.args
+            or any(isinstance(a, ast.Starred) for a in call.args)
+        ):
+            skipped.append(f"{path}:{call.lineno}")
+            continue
+        sep = " "
+        for keyword in call.keywords:
+            if keyword.arg == "sep" and isinstance(keyword.value, ast.Constant):
+                sep = keyword.value.value
+        level = _level(call.args, call.keywords, in_except)
+        arguments = (level == "debug" and _lazy(call.args, sep)) or _eager(
+            call.args, sep, source
+        )
+        indent = len(encoded[call.lineno - 1]) - len(encoded[call.lineno - 1].lstrip())
+        edits.append((call, _render_call(level, arguments, indent)))
+
+    if check:
+        return len(edits), skipped
+
+    # Reemplaza de abajo hacia arriba para no mover las posiciones pendientes.
+    for call, replacement in sorted(
+        edits, key=lambda e: (e[0].lineno, e[0].col_offset), reverse=True
+    ):
+        start, end = call.lineno - 1, call.end_lineno - 1
+        head = encoded[start][: call.col_offset]
+        tail = encoded[end][call.end_col_offset :]
+        encoded[start : end + 1] = [head + replacement.encode("utf-8") + tail]
+
+    # Los print() están después de los imports: sus índices no se movieron.
+    for index, new_lines in _logger_insertions(tree):
+        encoded[index:index] = [f"{line}\n".encode() for line in new_lines]
+    text = b"".join(encoded).decode("utf-8")
+    ast.parse(text)
+    path.write_text(text, encoding="utf-8")
+    return len(edits), skipped
+
+
+def _python_files(paths):
+    for root in paths:
+        root = Path(root)
+        files = [root] if root.is_file() else sorted(root.rglob("*.py"))
+        for path in files:
+            if not SKIP_PARTS.intersection(path.parts) and not path.name.startswith(
+                "test_"
+            ):
+                yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--check", action="store_true", help="Solo listar.")
+    options = parser.parse_args(argv)
+
+    total = 0
+    for path in _python_files(options.paths):
+        count, skipped = migrate(path, check=options.check)
+        if count:
+            print(f"{path}: {count} print()")
+        for location in skipped:
+            print(f"  omitido (logger local, *args o vacío): {location}")
+        total += count
+    print(f"Total: {total}")
+    return 1 if options.check and total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
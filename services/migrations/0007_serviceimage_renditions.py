@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("services", "0006_bio_1_9_5_service_order_history"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="serviceimage",
+            name="renditions",
+            field=models.JSONField(blank=True, default=dict, verbose_name="Versiones"),
+        ),
+    ]
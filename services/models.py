@@ -237,6 +237,8 @@ class ServiceImage(models.Model):
     )
     is_main = models.BooleanField(default=False, verbose_name="Imagen Principal")
     order = models.PositiveIntegerField(default=0, verbose_name="Orden")
+    # Versiones thumb/card/full y placeholders (core/image_pipeline.py).
+    renditions = models.JSONField(default=dict, blank=True, verbose_name="Versiones")
 
     class Meta:
         verbose_name = "Imagen de Servicio"
@@ -3,6 +3,8 @@ Serializers para la API de servicios adicionales.
 """
 
 from rest_framework import serializers
+
+from core import image_pipeline
 from .models import SubscriptionPlan, ServiceSubscription, SubscriptionBillingHistory
 from .models import ServiceCategory, Service, ServiceImage, ServiceRequest
 from .models import ServiceOrder, ServicePayment
@@ -10,10 +12,19 @@ from .models import ServiceOrder, ServicePayment
 
 class ServiceImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = ServiceImage
-        fields = ["id", "image", "image_url", "alt_text", "is_main", "order"]
+        fields = [
+            "id",
+            "image",
+            "image_url",
+            "renditions",
+            "alt_text",
+            "is_main",
+            "order",
+        ]
 
     def get_image_url(self, obj):
         if obj.image:
@@ -23,6 +34,12 @@ class ServiceImageSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_renditions(self, obj):
+        """thumb/card/full (WebP + JPEG) y placeholders; None si está pendiente."""
+        return image_pipeline.rendition_payload(
+            obj.renditions, obj.image.storage, self.context.get("request")
+        )
+
 
 class ServiceCategorySerializer(serializers.ModelSerializer):
     services_count = serializers.SerializerMethodField()
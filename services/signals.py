@@ -2,6 +2,9 @@
 
 Fase 1.9.5: trazabilidad automática de ServiceOrder.
 
+Las imágenes de servicio se procesan fuera del request con
+``core.image_pipeline`` (versiones, EXIF, placeholders).
+
 El receptor `record_service_order_state_transition` graba cada cambio
 de ``status`` en ``ServiceOrderHistory``. Los views pueden setear
 ``instance._updated_by = request.user`` antes de ``save()`` para
@@ -13,10 +16,12 @@ from __future__ import annotations
 
 import logging
 
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from services.models import ServiceOrder
+from core import image_pipeline
+from services.models import ServiceImage, ServiceOrder
 
 logger = logging.getLogger(__name__)
 
@@ -104,3 +109,14 @@ def record_service_order_state_transition(sender, instance, created, **kwargs):
             instance.id,
             exc,
         )
+
+
+@receiver(post_save, sender=ServiceImage)
+def schedule_service_image_renditions(sender, instance, **kwargs):
+    image_pipeline.schedule_renditions(instance, "image", "service")
+
+
+@receiver(post_delete, sender=ServiceImage)
+def delete_service_image_renditions(sender, instance, **kwargs):
+    meta, storage = instance.renditions, instance.image.storage
+    transaction.on_commit(lambda: image_pipeline.delete_renditions(meta, storage))
@@ -2,6 +2,7 @@
 Vistas de API REST para la aplicación de usuarios de VeriHome.
 """
 
+import logging
 from rest_framework import viewsets, generics, permissions, status, serializers
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -40,6 +41,8 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 
@@ -723,7 +726,8 @@ class AvatarUploadView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Guardar avatar
+        # Guardar avatar; las versiones (thumb/card/full) se generan fuera
+        # del request y se exponen en `avatar_renditions` del perfil.
         try:
             request.user.avatar = avatar_file
             request.user.save()
@@ -1146,9 +1150,9 @@ class UserRegistrationView(APIView):
                     )
                     try:
                         email_address.send_confirmation(request, signup=True)
-                        print(f"✅ Email de confirmación enviado a {user.email}")
+                        logger.info(f"✅ Email de confirmación enviado a {user.email}")
                     except Exception as e:
-                        print(f"❌ Error enviando email de confirmación: {e}")
+                        logger.error(f"❌ Error enviando email de confirmación: {e}")
                         # Continuar sin fallar el registro
                         pass
 
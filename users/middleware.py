@@ -2,6 +2,7 @@
 Middleware para el sistema de impersonación de usuarios y logging de actividades.
 """
 
+import logging
 import time
 from django.contrib.auth import get_user_model
 from django.utils.deprecation import MiddlewareMixin
@@ -12,6 +13,7 @@ from django.utils import timezone
 from .models import AdminImpersonationSession
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class ImpersonationMiddleware(MiddlewareMixin):
@@ -92,34 +94,43 @@ class AdminActionLoggingMiddleware(MiddlewareMixin):
 
     def process_response(self, request, response):
         # Registrar acciones si hay una sesión de impersonación
-        if hasattr(request, "impersonation_session") and hasattr(
-            request, "admin_action_log"
+        if hasattr(request, "impersonation_session") and getattr(
+            request, "admin_action_log", None
         ):
-            for action_data in request.admin_action_log:
-                self._log_admin_action(request, action_data)
+            self._log_admin_actions(request, request.admin_action_log)
 
         return response
 
-    def _log_admin_action(self, request, action_data):
-        """Registrar una acción administrativa."""
+    def _log_admin_actions(self, request, actions):
+        """Registrar las acciones administrativas del request en un INSERT.
+
+        Son acciones durante una impersonación: se escriben en línea, nunca
+        en el buffer diferido de auditoría.
+        """
         try:
             from .models import AdminActionLog
 
-            AdminActionLog.objects.create(
-                impersonation_session=request.impersonation_session,
-                action_type=action_data.get("action_type", "other"),
-                action_description=action_data.get("description", ""),
-                target_object_type=action_data.get("object_type", ""),
-                target_object_id=action_data.get("object_id", ""),
-                old_data=action_data.get("old_data", {}),
-                new_data=action_data.get("new_data", {}),
-                ip_address=self._get_client_ip(request),
-                success=action_data.get("success", True),
-                error_message=action_data.get("error_message", ""),
+            ip_address = self._get_client_ip(request)
+            AdminActionLog.objects.bulk_create(
+                [
+                    AdminActionLog(
+                        impersonation_session=request.impersonation_session,
+                        action_type=action_data.get("action_type", "other"),
+                        action_description=action_data.get("description", ""),
+                        target_object_type=action_data.get("object_type", ""),
+                        target_object_id=action_data.get("object_id", ""),
+                        old_data=action_data.get("old_data", {}),
+                        new_data=action_data.get("new_data", {}),
+                        ip_address=ip_address,
+                        success=action_data.get("success", True),
+                        error_message=action_data.get("error_message", ""),
+                    )
+                    for action_data in actions
+                ]
             )
-        except Exception as e:
+        except Exception:
             # Log error pero no fallar la aplicación
-            print(f"Error logging admin action: {e}")
+            logger.exception("Error logging admin actions")
 
     def _get_client_ip(self, request):
         """Obtener la IP del cliente."""
@@ -202,7 +213,7 @@ class ActivityLoggerMiddleware(MiddlewareMixin):
 
         except Exception as e:
             # No interrumpir la respuesta si hay error en el logging
-            print(f"Error in ActivityLoggerMiddleware: {e}")
+            logger.warning("Error in ActivityLoggerMiddleware: %s", e)
 
         return response
 
@@ -300,21 +311,31 @@ class ActivityLoggerMiddleware(MiddlewareMixin):
             # Preparar descripción legible
             description = self._generate_description(activity_type, request, metadata)
 
-            # Crear el registro usando el método del modelo
+            # Escritura diferida (core/audit_buffer.py): el request no
+            # espera el INSERT salvo en acciones críticas (login, etc.).
+            from core import audit_buffer
             from .models import UserActivityLog
 
-            UserActivityLog.log_activity(
-                user=request.user,
-                activity_type=activity_type,
-                description=description,
-                metadata=metadata,
-                response_time_ms=response_time,
-                request=request,
+            audit_buffer.record(
+                request.user,
+                user_activity={
+                    "activity_type": activity_type,
+                    "description": description,
+                    "metadata": metadata,
+                    "response_time_ms": response_time,
+                    "ip_address": UserActivityLog.get_client_ip(request),
+                    "user_agent": request.META.get("HTTP_USER_AGENT", ""),
+                    "session_key": getattr(
+                        getattr(request, "session", None), "session_key", None
+                    )
+                    or "",
+                },
+                durable=audit_buffer.is_durable(activity_type),
             )
 
         except Exception as e:
             # Silenciar errores para no interrumpir la aplicación
-            print(f"Error logging activity: {e}")
+            logger.warning("Error logging activity: %s", e)
 
     def _generate_description(self, activity_type, request, metadata):
         """Generar una descripción legible para la actividad."""
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0007_user_is_online_user_last_seen_user_status_mode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_renditions",
+            field=models.JSONField(
+                blank=True, default=dict, verbose_name="Versiones del avatar"
+            ),
+        ),
+    ]
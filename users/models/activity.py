@@ -87,7 +87,11 @@ class UserActivityLog(models.Model):
     )
 
     # Timestamps
-    timestamp = models.DateTimeField("Fecha y hora", auto_now_add=True)
+    # Sin `auto_now_add` para conservar la hora de los eventos escritos
+    # en diferido (core/audit_buffer.py).
+    timestamp = models.DateTimeField(
+        "Fecha y hora", default=timezone.now, editable=False
+    )
 
     class Meta:
         verbose_name = "Registro de Actividad"
@@ -3,11 +3,14 @@ Profile models for VeriHome.
 Contains BaseProfile and specific profiles for each user type.
 """
 
+import logging
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from PIL import Image
 from .user import User
 
+logger = logging.getLogger(__name__)
+
 
 class BaseProfile(models.Model):
     """Modelo base para todos los perfiles."""
@@ -69,7 +72,7 @@ class BaseProfile(models.Model):
                     img.thumbnail(output_size)
                     img.save(self.profile_image.path)
             except Exception as e:
-                print(f"Error processing image: {e}")
+                logger.error(f"Error processing image: {e}")
 
 
 class LandlordProfile(BaseProfile):
@@ -195,6 +195,10 @@ class User(AbstractUser):
     move_in_date = models.DateField("Fecha deseada de ingreso", null=True, blank=True)
 
     avatar = models.ImageField("Avatar", upload_to="avatars/", null=True, blank=True)
+    # Versiones del avatar y placeholders (core/image_pipeline.py).
+    avatar_renditions = models.JSONField(
+        "Versiones del avatar", default=dict, blank=True
+    )
 
     interview_code = models.OneToOneField(
         "InterviewCode",
@@ -5,6 +5,8 @@ Serializers para la aplicación de usuarios de VeriHome.
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.db import transaction
+
+from core import image_pipeline
 from .models import (
     LandlordProfile,
     TenantProfile,
@@ -47,6 +49,8 @@ class UserSerializer(serializers.ModelSerializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer para actualización de perfil de usuario."""
 
+    avatar_renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = User
         fields = (
@@ -85,9 +89,16 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "source",
             "marketing_consent",
             "avatar",
+            "avatar_renditions",
         )
         read_only_fields = ("email",)
 
+    def get_avatar_renditions(self, obj):
+        """Versiones del avatar ya procesadas (core/image_pipeline.py)."""
+        return image_pipeline.rendition_payload(
+            obj.avatar_renditions, obj.avatar.storage, self.context.get("request")
+        )
+
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer para registro de usuarios con creación automática de perfiles."""
@@ -2,6 +2,7 @@
 Servicios para el sistema de administración y notificaciones.
 """
 
+import logging
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.db.models import Count
@@ -15,6 +16,8 @@ from .models import (
     AdminSessionSummary,
 )
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 
@@ -142,7 +145,7 @@ class AdminActionLogger:
             self._send_email_notification(notification)
 
         except Exception as e:
-            print(f"Error enviando notificación: {e}")
+            logger.error(f"Error enviando notificación: {e}")
 
     def _generate_notification_message(self, admin_action):
         """Generar mensaje detallado para la notificación."""
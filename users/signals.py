@@ -4,6 +4,7 @@ Signals para la aplicación de usuarios.
 
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from core import image_pipeline
 from .models import (
     User,
     LandlordProfile,
@@ -76,3 +77,11 @@ def update_user_profile(sender, instance, created, **kwargs):
             profile = instance.service_provider_profile
             # Actualizar campos relevantes si es necesario
             profile.save()
+
+
+@receiver(post_save, sender=User)
+def schedule_avatar_renditions(sender, instance, **kwargs):
+    """Versiones del avatar fuera del request (core/image_pipeline.py)."""
+    image_pipeline.schedule_renditions(
+        instance, "avatar", "avatar", renditions_field="avatar_renditions"
+    )
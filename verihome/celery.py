@@ -38,6 +38,10 @@ app.conf.update(
 
 # Configuración de rutas de tareas
 app.conf.task_routes = {
+    # Cola dedicada para análisis biométrico CPU-bound (dlib/Tesseract);
+    # la sirve el worker `celery_biometrics`. Las rutas exactas tienen
+    # prioridad sobre los globs.
+    "contracts.tasks.run_biometric_analysis": {"queue": "biometrics"},
     "core.tasks.*": {"queue": "core"},
     "users.tasks.*": {"queue": "users"},
     "properties.tasks.*": {"queue": "properties"},
@@ -5,6 +5,7 @@ VeriHome - Plataforma Inmobiliaria Revolucionaria
 Desarrollada para conectar arrendadores, arrendatarios y prestadores de servicios.
 """
 
+import json
 import os
 from pathlib import Path
 from decouple import config
@@ -591,6 +592,28 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": crontab(hour=3, minute=0),  # diario 3:00 AM
         "options": {"expires": 3600},
     },
+    "cleanup-chunked-uploads": {
+        "task": "core.tasks.cleanup_chunked_uploads",
+        "schedule": 3600.0,  # cada hora
+    },
+    "flush-audit-events": {
+        "task": "core.tasks.flush_audit_events",
+        "schedule": 10.0,  # cada 10 segundos
+    },
+    "maintain-log-partitions": {
+        "task": "core.tasks.maintain_log_partitions",
+        "schedule": crontab(hour=2, minute=30),  # diario 2:30 AM
+    },
+    # --- messaging ---
+    "flush-presence": {
+        "task": "messaging.tasks.flush_presence",
+        "schedule": 60.0,  # cada minuto
+    },
+    # --- properties ---
+    "flush-property-views": {
+        "task": "properties.tasks.flush_property_views",
+        "schedule": 60.0,  # cada minuto
+    },
     # --- contracts ---
     "check-contract-renewals": {
         "task": "contracts.tasks.check_contract_renewals",
@@ -617,6 +640,18 @@ CELERY_BEAT_SCHEDULE = {
         "task": "payments.tasks.escalate_overdue_payments",
         "schedule": crontab(hour=9, minute=0, day_of_week=1),  # lunes 9:00 AM
     },
+    "retry-webhook-events": {
+        "task": "payments.tasks.retry_webhook_events",
+        "schedule": 300.0,  # cada 5 minutos
+    },
+    "release-due-escrow": {
+        "task": "payments.tasks.release_due_escrow",
+        "schedule": 900.0,  # cada 15 minutos
+    },
+    "run-dian-invoice-batch": {
+        "task": "payments.tasks.run_dian_invoice_batch",
+        "schedule": crontab(day_of_month=1, hour=2, minute=0),  # día 1, 2:00 AM
+    },
 }
 
 # Campo de clave primaria por defecto
@@ -666,7 +701,7 @@ EMAIL_USE_LOCALTIME = False
 os.makedirs(BASE_DIR / "logs", exist_ok=True)
 
 # Importar configuración personalizada de logging
-from core.logging import get_logging_config
+from core.logging import get_logging_config, queued_logging_config
 
 # Usar configuración optimizada según el modo debug
 LOGGING = get_logging_config(debug_mode=DEBUG)
@@ -769,6 +804,20 @@ else:
         }
     )
 
+# Logging fuera del hilo del request: los handlers quedan detrás de una cola
+# (QueueHandler/QueueListener) y los DEBUG se limitan a LOG_SAMPLE_RATE por
+# segundo y logger. En tests se escribe en línea para que la salida sea
+# determinista.
+LOG_ASYNC = config("LOG_ASYNC", default=not TESTING, cast=bool)
+LOG_SAMPLE_RATE = int(os.getenv("LOG_SAMPLE_RATE", "20"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOGGING = queued_logging_config(
+    LOGGING,
+    queued=LOG_ASYNC,
+    sample_rate=LOG_SAMPLE_RATE,
+    queue_size=LOG_QUEUE_SIZE,
+)
+
 # =============================================================================
 # DJANGO CHANNELS CONFIGURATION
 # =============================================================================
@@ -883,6 +932,12 @@ BOLD_API_KEY = config("BOLD_API_KEY", default="")
 BOLD_INTEGRITY_SECRET = config("BOLD_INTEGRITY_SECRET", default="")
 BOLD_SANDBOX_MODE = config("BOLD_SANDBOX_MODE", default=True, cast=bool)
 
+# PSE directo (ACH Colombia) — firma HMAC de los webhooks con PSE_SECRET_KEY
+PSE_API_KEY = config("PSE_API_KEY", default="")
+PSE_SECRET_KEY = config("PSE_SECRET_KEY", default="")
+PSE_MERCHANT_ID = config("PSE_MERCHANT_ID", default="")
+PSE_SANDBOX_MODE = config("PSE_SANDBOX_MODE", default=True, cast=bool)
+
 # Stripe Payment Gateway Settings (Legacy - Optional)
 STRIPE_PUBLIC_KEY = config("STRIPE_PUBLIC_KEY", default="")
 STRIPE_SECRET_KEY = config("STRIPE_SECRET_KEY", default="")
@@ -989,6 +1044,24 @@ SIMPLE_HISTORY_REVERT_DISABLED = True  # Solo admin puede revertir
 # liveness con head movements + cruce Registraduría en un único proceso.
 BIOMETRIC_FACIAL_PROVIDER = os.getenv("BIOMETRIC_FACIAL_PROVIDER", "demo")
 
+# Proveedores locales: lado mayor (px) de la copia reducida sobre la que
+# corre la detección de rostro. 0 = resolución completa.
+BIOMETRIC_DETECTION_MAX_SIDE = (
+    int(os.getenv("BIOMETRIC_DETECTION_MAX_SIDE", "640")) or None
+)
+
+# Búsqueda 1:N del embedding frontal contra las autenticaciones previas
+# (contracts/face_index.py): marca la misma cara firmando con otra cuenta.
+# La distancia es euclídea entre embeddings dlib (0.6 = tolerancia
+# habitual de "misma persona"; más estricto para reducir falsos positivos).
+BIOMETRIC_DUPLICATE_CHECK = os.getenv("BIOMETRIC_DUPLICATE_CHECK", "1") == "1"
+BIOMETRIC_DUPLICATE_MAX_DISTANCE = float(
+    os.getenv("BIOMETRIC_DUPLICATE_MAX_DISTANCE", "0.45")
+)
+# Snapshot memory-mapped del índice (manage.py build_face_index). Vacío:
+# cada proceso construye el índice desde la tabla FaceEmbedding.
+BIOMETRIC_FACE_INDEX_PATH = os.getenv("BIOMETRIC_FACE_INDEX_PATH", "")
+
 # Umbrales compartidos por los proveedores.
 BIOMETRIC_MIN_FACE_QUALITY = float(os.getenv("BIOMETRIC_MIN_FACE_QUALITY", "0.7"))
 BIOMETRIC_MIN_FACE_SIMILARITY = float(
@@ -998,9 +1071,155 @@ BIOMETRIC_MIN_FACE_SIMILARITY = float(
 # Proveedor OCR para documento de identidad. Mismo plan: `demo` por ahora,
 # Truora cubrirá cédula CO con cruce Registraduría en TR-3.
 BIOMETRIC_DOCUMENT_PROVIDER = os.getenv("BIOMETRIC_DOCUMENT_PROVIDER", "demo")
+# Provider `local`: motor OCR (`auto` prefiere tesserocr, con el modelo
+# cargado una vez por proceso, y cae a pytesseract) y OCR sólo de las
+# franjas de texto de la cédula (0 = imagen completa, como antes).
+BIOMETRIC_OCR_ENGINE = os.getenv("BIOMETRIC_OCR_ENGINE", "auto")
+BIOMETRIC_OCR_ROI = os.getenv("BIOMETRIC_OCR_ROI", "1") == "1"
 
 # P0.3 · proveedor de análisis de voz.
 # Hoy sólo acepta `demo` (andamio listo). P0.3b integrará un provider
 # real (Google Speech-to-Text / AWS Transcribe streaming / Azure Speech).
 # El factory ya hace fallback a demo ante valores desconocidos.
 BIOMETRIC_VOICE_PROVIDER = os.getenv("BIOMETRIC_VOICE_PROVIDER", "demo")
+
+# Dónde corren los providers facial/documento. `inline`: en el propio
+# worker web (dev/CI). `celery`: cola dedicada `biometrics` servida por
+# el worker `celery_biometrics` (ver contracts/biometric_worker.py).
+BIOMETRIC_EXECUTION_BACKEND = os.getenv("BIOMETRIC_EXECUTION_BACKEND", "inline")
+# Backpressure: análisis en curso admitidos antes de responder 503.
+BIOMETRIC_MAX_PENDING_ANALYSES = int(os.getenv("BIOMETRIC_MAX_PENDING_ANALYSES", "32"))
+# Espera máxima (s) de un análisis encolado en las llamadas síncronas.
+BIOMETRIC_ANALYSIS_TIMEOUT = float(os.getenv("BIOMETRIC_ANALYSIS_TIMEOUT", "60"))
+# Precarga de modelos al iniciar cada proceso del worker biométrico.
+BIOMETRIC_WORKER_WARMUP = os.getenv("BIOMETRIC_WORKER_WARMUP", "0") == "1"
+
+# Cache de análisis por contenido de la captura (contracts/biometric_cache.py):
+# LRU por proceso + nivel compartido en el cache `default` (Redis).
+# TTL 0 = sin cache. SHARED_MAX_ENTRIES 0 = sólo el nivel local.
+BIOMETRIC_ANALYSIS_CACHE_TTL = int(os.getenv("BIOMETRIC_ANALYSIS_CACHE_TTL", "900"))
+BIOMETRIC_ANALYSIS_CACHE_LOCAL_MAX = int(
+    os.getenv("BIOMETRIC_ANALYSIS_CACHE_LOCAL_MAX", "64")
+)
+BIOMETRIC_ANALYSIS_CACHE_SHARED_MAX_ENTRIES = int(
+    os.getenv("BIOMETRIC_ANALYSIS_CACHE_SHARED_MAX_ENTRIES", "5000")
+)
+# Análisis serializados más grandes no suben al nivel compartido.
+BIOMETRIC_ANALYSIS_CACHE_MAX_ENTRY_BYTES = int(
+    os.getenv("BIOMETRIC_ANALYSIS_CACHE_MAX_ENTRY_BYTES", "65536")
+)
+
+# Visualizaciones de propiedades bufferizadas (properties/view_tracking.py):
+# el detalle sólo escribe en Redis y `flush-property-views` persiste el
+# buffer. BUFFER_MAX/FLUSH_INTERVAL sólo aplican sin Redis (vaciado en línea).
+PROPERTY_VIEW_FLUSH_BATCH = int(os.getenv("PROPERTY_VIEW_FLUSH_BATCH", "1000"))
+PROPERTY_VIEW_BUFFER_MAX = int(os.getenv("PROPERTY_VIEW_BUFFER_MAX", "100"))
+PROPERTY_VIEW_FLUSH_INTERVAL = int(os.getenv("PROPERTY_VIEW_FLUSH_INTERVAL", "60"))
+PROPERTY_TRENDING_DAYS = int(os.getenv("PROPERTY_TRENDING_DAYS", "30"))
+
+# Presencia de usuarios en Redis (messaging/presence.py): un socket sin
+# heartbeat por PRESENCE_TTL segundos se da por caído. `flush-presence`
+# persiste last_seen; FLUSH_INTERVAL sólo aplica sin Redis (en línea).
+PRESENCE_TTL = int(os.getenv("PRESENCE_TTL", "90"))
+PRESENCE_FLUSH_BATCH = int(os.getenv("PRESENCE_FLUSH_BATCH", "1000"))
+PRESENCE_FLUSH_INTERVAL = int(os.getenv("PRESENCE_FLUSH_INTERVAL", "60"))
+PRESENCE_CONTACTS_TTL = int(os.getenv("PRESENCE_CONTACTS_TTL", "300"))
+
+# Versiones de imágenes subidas (core/image_pipeline.py). Sin broker o con
+# False se procesan en línea tras el commit.
+IMAGE_RENDITIONS_ASYNC = config(
+    "IMAGE_RENDITIONS_ASYNC", default=not TESTING, cast=bool
+)
+
+# Subidas reanudables por partes (core/chunked_uploads.py). Los trozos
+# deben caber en `client_max_body_size` de nginx (20M).
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.getenv("CHUNKED_UPLOAD_CHUNK_SIZE", "5242880"))
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = int(
+    os.getenv("CHUNKED_UPLOAD_MAX_CHUNK_SIZE", "16777216")
+)
+CHUNKED_UPLOAD_EXPIRY_HOURS = int(os.getenv("CHUNKED_UPLOAD_EXPIRY_HOURS", "24"))
+
+# Entrega de documentos protegidos (core/file_delivery.py): "python"
+# (Range/ETag desde Django), "x-accel" (nginx, ver nginx/nginx.prod.conf)
+# o "x-sendfile". docker-compose inyecta la misma variable
+# PROTECTED_FILE_SECRET en la plantilla de nginx (`secure_link_md5`).
+PROTECTED_FILE_DELIVERY = config("PROTECTED_FILE_DELIVERY", default="python")
+PROTECTED_FILE_ACCEL_PREFIX = config(
+    "PROTECTED_FILE_ACCEL_PREFIX", default="/_protected/"
+)
+PROTECTED_FILE_SECRET = config("PROTECTED_FILE_SECRET", default="")
+PROTECTED_FILE_URL_TTL = config("PROTECTED_FILE_URL_TTL", default=60, cast=int)
+
+# Auditoría diferida (core/audit_buffer.py): los eventos van a Redis y
+# `flush-audit-events` los escribe por lotes. Las acciones de
+# AUDIT_DURABLE_ACTIONS (prefijos terminados en ".") se escriben en línea.
+# Por encima de AUDIT_BUFFER_MAX_PENDING el request vacía un lote
+# (contrapresión). BUFFER_LOCAL_MAX/FLUSH_INTERVAL sólo aplican sin Redis.
+AUDIT_WRITE_BEHIND = config("AUDIT_WRITE_BEHIND", default=not TESTING, cast=bool)
+AUDIT_FLUSH_BATCH = int(os.getenv("AUDIT_FLUSH_BATCH", "500"))
+AUDIT_BUFFER_MAX_PENDING = int(os.getenv("AUDIT_BUFFER_MAX_PENDING", "10000"))
+AUDIT_BUFFER_LOCAL_MAX = int(os.getenv("AUDIT_BUFFER_LOCAL_MAX", "100"))
+AUDIT_FLUSH_INTERVAL = int(os.getenv("AUDIT_FLUSH_INTERVAL", "10"))
+AUDIT_DURABLE_ACTIONS = [
+    "login",
+    "logout",
+    "password_change",
+    "password_reset",
+    "delete",
+    "cleanup",
+    "export",
+    "payment.",
+    "verihome_id.",
+]
+
+# Cobros automáticos de arriendo (payments/auto_charge_service.py): la
+# corrida diaria encola un lote de CHUNK_SIZE cronogramas por tarea. Sin
+# broker o con False los lotes se procesan en línea.
+AUTO_CHARGE_ASYNC = config("AUTO_CHARGE_ASYNC", default=not TESTING, cast=bool)
+AUTO_CHARGE_CHUNK_SIZE = int(os.getenv("AUTO_CHARGE_CHUNK_SIZE", "200"))
+
+# Bandeja de webhooks de pasarelas (payments/webhook_inbox.py): la vista
+# guarda el evento y responde 200; una tarea por transacción lo procesa.
+# Un evento fallido se reintenta con backoff (RETRY_DELAY·2^n segundos,
+# tope 1 h) y tras MAX_ATTEMPTS queda como dead letter. Sin broker o con
+# ASYNC=False se procesa en línea al confirmar el request.
+PAYMENT_WEBHOOK_ASYNC = config("PAYMENT_WEBHOOK_ASYNC", default=not TESTING, cast=bool)
+PAYMENT_WEBHOOK_MAX_ATTEMPTS = int(os.getenv("PAYMENT_WEBHOOK_MAX_ATTEMPTS", "8"))
+PAYMENT_WEBHOOK_RETRY_DELAY = int(os.getenv("PAYMENT_WEBHOOK_RETRY_DELAY", "30"))
+PAYMENT_WEBHOOK_STALE_AFTER = int(os.getenv("PAYMENT_WEBHOOK_STALE_AFTER", "120"))
+
+# Liberaciones automáticas de escrow (payments/escrow_schedule.py): la tarea
+# toma BATCH_SIZE reglas vencidas por transacción (skip_locked); una regla
+# con fallos se reintenta pasados RETRY_DELAY segundos.
+ESCROW_RELEASE_BATCH_SIZE = int(os.getenv("ESCROW_RELEASE_BATCH_SIZE", "100"))
+ESCROW_RELEASE_RETRY_DELAY = int(os.getenv("ESCROW_RELEASE_RETRY_DELAY", "3600"))
+
+# Facturación DIAN por lotes (payments/dian_batch.py): el día 1 se facturan
+# los pagos de arriendo sin factura del mes anterior, CHUNK_SIZE por lote.
+# WORKERS > 1 reparte XML, CUFE y firma en un pool de procesos.
+DIAN_BATCH_CHUNK_SIZE = int(os.getenv("DIAN_BATCH_CHUNK_SIZE", "1000"))
+DIAN_BATCH_WORKERS = int(os.getenv("DIAN_BATCH_WORKERS", "0"))
+
+# Cliente HTTP saliente compartido (core/http_client.py) para pasarelas y
+# el DANE: timeouts (conexión, lectura), reintentos con backoff+jitter,
+# circuit breaker por host (THRESHOLD fallos seguidos lo abren por RESET
+# segundos) y métricas de latencia volcadas al cache cada METRICS_INTERVAL.
+HTTP_CLIENT_CONNECT_TIMEOUT = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", "5"))
+HTTP_CLIENT_READ_TIMEOUT = float(os.getenv("HTTP_CLIENT_READ_TIMEOUT", "30"))
+HTTP_CLIENT_RETRIES = int(os.getenv("HTTP_CLIENT_RETRIES", "2"))
+HTTP_CLIENT_BACKOFF = float(os.getenv("HTTP_CLIENT_BACKOFF", "0.3"))
+HTTP_CLIENT_POOL_SIZE = int(os.getenv("HTTP_CLIENT_POOL_SIZE", "10"))
+HTTP_CLIENT_BREAKER_THRESHOLD = int(os.getenv("HTTP_CLIENT_BREAKER_THRESHOLD", "5"))
+HTTP_CLIENT_BREAKER_RESET = int(os.getenv("HTTP_CLIENT_BREAKER_RESET", "30"))
+HTTP_CLIENT_SLOW_MS = int(os.getenv("HTTP_CLIENT_SLOW_MS", "1000"))
+HTTP_CLIENT_METRICS_INTERVAL = int(os.getenv("HTTP_CLIENT_METRICS_INTERVAL", "10"))
+# Lista de bancos PSE (PSE y Wompi) cacheada entre checkouts.
+PAYMENT_BANKS_CACHE_TTL = int(os.getenv("PAYMENT_BANKS_CACHE_TTL", "3600"))
+
+# Tablas de logs particionadas por mes en PostgreSQL (core/log_partitions.py).
+# `maintain-log-partitions` crea MONTHS_AHEAD meses por adelantado y aplica
+# LOG_RETENTION_DAYS ({"app.Modelo": días}); vacío = sin retención
+# automática. Ej.: {"core.ActivityLog": 365, "users.UserActivityLog": 365}.
+LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("LOG_PARTITION_MONTHS_AHEAD", "3"))
+LOG_RETENTION_DAYS = json.loads(os.getenv("LOG_RETENTION_DAYS", "{}"))
+LOG_RETENTION_DELETE_BATCH = int(os.getenv("LOG_RETENTION_DELETE_BATCH", "5000"))